@@ -1,7 +1,9 @@
+import importlib
 import os
 import logging
 from os.path import dirname
 import sys
+import types
 
 logger = logging.getLogger(__name__)
 
@@ -90,15 +92,39 @@ from ray.worker import (
     show_in_webui,
     wait,
 )  # noqa: E402
-import ray.internal  # noqa: E402
-import ray.projects  # noqa: E402
 # We import ray.actor because some code is run in actor.py which initializes
 # some functions in the worker.
 import ray.actor  # noqa: F401
 from ray.actor import method  # noqa: E402
 from ray.runtime_context import _get_runtime_context  # noqa: E402
 from ray.cross_language import java_function, java_actor_class  # noqa: E402
-from ray import util  # noqa: E402
+
+# Subpackages that are imported on first attribute access (e.g., by
+# ray.util.ActorPool) rather than by "import ray", which every worker and
+# every CLI invocation pays for.
+_lazy_submodules = {
+    "dashboard",
+    "experimental",
+    "internal",
+    "projects",
+    "rllib",
+    "serve",
+    "tune",
+    "util",
+}
+
+
+class _RayModule(types.ModuleType):
+    def __getattr__(self, name):
+        # Only called if the attribute isn't found the usual way, i.e., if
+        # the subpackage hasn't been imported yet. Importing it sets it as an
+        # attribute of this module.
+        if name in _lazy_submodules:
+            return importlib.import_module("ray." + name)
+        raise AttributeError("module 'ray' has no attribute '{}'".format(name))
+
+
+sys.modules[__name__].__class__ = _RayModule
 
 # Replaced with the current commit when building the wheels.
 __commit__ = "{{RAY_COMMIT_SHA}}"
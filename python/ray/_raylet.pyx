@@ -355,6 +355,11 @@ cdef execute_task(
         execution_infos[function_descriptor] = execution_info
 
     function_name = execution_info.function_name
+    task_function_name = memory_monitor.get_function_name(function_descriptor)
+    if <int>task_type == <int>TASK_TYPE_NORMAL_TASK:
+        task_memory_actor_id = None
+    else:
+        task_memory_actor_id = core_worker.get_actor_id().hex()
     extra_data = (b'{"name": ' + function_name.encode("ascii") +
                   b' "task_id": ' + task_id.Hex() + b'}')
 
@@ -427,24 +432,32 @@ cdef execute_task(
             if not (<int>task_type == <int>TASK_TYPE_ACTOR_TASK
                     and function_name == "__ray_terminate__"):
                 worker.reraise_actor_init_error()
+                worker.memory_monitor.wait_for_memory(task_function_name)
                 worker.memory_monitor.raise_if_low_memory()
 
-            with core_worker.profile_event(b"task:deserialize_arguments"):
-                args, kwargs = deserialize_args(c_args, c_arg_reference_ids)
-            if (<int>task_type == <int>TASK_TYPE_ACTOR_CREATION_TASK):
-                actor = worker.actors[core_worker.get_actor_id()]
-                class_name = actor.__class__.__name__
-                actor_title = "{}({}, {})".format(
-                    class_name, repr(args), repr(kwargs))
-                core_worker.set_actor_title(actor_title.encode("utf-8"))
-            # Execute the task.
-            with ray.worker._changeproctitle(title, next_title):
-                with core_worker.profile_event(b"task:execute"):
-                    task_exception = True
-                    outputs = function_executor(*args, **kwargs)
-                    task_exception = False
-                    if c_return_ids.size() == 1:
-                        outputs = (outputs,)
+            with worker.memory_monitor.track_task(
+                    task_id.Hex().decode("ascii"), task_function_name,
+                    task_memory_actor_id), \
+                    worker.sampling_profiler.track_task(
+                        job_id.hex(), task_function_name):
+                with core_worker.profile_event(
+                        b"task:deserialize_arguments"):
+                    args, kwargs = deserialize_args(
+                        c_args, c_arg_reference_ids)
+                if (<int>task_type == <int>TASK_TYPE_ACTOR_CREATION_TASK):
+                    actor = worker.actors[core_worker.get_actor_id()]
+                    class_name = actor.__class__.__name__
+                    actor_title = "{}({}, {})".format(
+                        class_name, repr(args), repr(kwargs))
+                    core_worker.set_actor_title(actor_title.encode("utf-8"))
+                # Execute the task.
+                with ray.worker._changeproctitle(title, next_title):
+                    with core_worker.profile_event(b"task:execute"):
+                        task_exception = True
+                        outputs = function_executor(*args, **kwargs)
+                        task_exception = False
+                        if c_return_ids.size() == 1:
+                            outputs = (outputs,)
 
             # Store the outputs in the object store.
             with core_worker.profile_event(b"task:store_outputs"):
@@ -789,6 +802,48 @@ cdef class CoreWorker:
 
             return VectorToObjectIDs(return_ids)
 
+    def submit_tasks(self,
+                     Language language,
+                     FunctionDescriptor function_descriptor,
+                     args_list,
+                     int num_return_vals,
+                     resources,
+                     int max_retries):
+        """Submit one task per entry of args_list in a single call.
+
+        The function, resources and task options are converted once and the
+        tasks are submitted in a single nogil section. Returns a list with the
+        return ObjectIDs of each task.
+        """
+        cdef:
+            unordered_map[c_string, double] c_resources
+            CTaskOptions task_options
+            CRayFunction ray_function
+            c_vector[c_vector[CTaskArg]] args_vectors
+            c_vector[c_vector[CObjectID]] return_ids
+            size_t i
+            size_t num_tasks = len(args_list)
+
+        with self.profile_event(b"submit_tasks"):
+            prepare_resources(resources, &c_resources)
+            task_options = CTaskOptions(
+                num_return_vals, True, c_resources)
+            ray_function = CRayFunction(
+                language.lang, function_descriptor.descriptor)
+            args_vectors.resize(num_tasks)
+            return_ids.resize(num_tasks)
+            for i in range(num_tasks):
+                prepare_args(self, args_list[i], &args_vectors[i])
+
+            with nogil:
+                for i in range(num_tasks):
+                    check_status(self.core_worker.get().SubmitTask(
+                        ray_function, args_vectors[i], task_options,
+                        &return_ids[i], max_retries))
+
+            return [VectorToObjectIDs(return_ids[i])
+                    for i in range(num_tasks)]
+
     def create_actor(self,
                      Language language,
                      FunctionDescriptor function_descriptor,
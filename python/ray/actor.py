@@ -2,6 +2,7 @@ import copy
 import inspect
 import logging
 import six
+import traceback
 import weakref
 
 from abc import ABCMeta, abstractmethod
@@ -14,6 +15,7 @@ import ray.worker
 from ray import ActorID, ActorClassID, Language
 from ray._raylet import PythonFunctionDescriptor
 from ray import cross_language
+from ray.exceptions import RayTaskError
 
 logger = logging.getLogger(__name__)
 
@@ -123,6 +125,41 @@ class ActorMethod:
 
         return invocation(args, kwargs)
 
+    def batch_remote(self, args_list, kwargs_list=None):
+        """Invoke the method once per entry of args_list in a single task.
+
+        This is equivalent to [actor.method.remote(*args, **kwargs) for args,
+        kwargs in zip(args_list, kwargs_list)]: the calls run in order and
+        each returns its own ObjectID, which raises the call's exception on
+        ray.get if it failed. However, all calls share one task, so they pay
+        for task submission and the reply only once. Only methods with a
+        single return value are supported.
+
+        Args:
+            args_list: A list with the positional arguments of each call.
+            kwargs_list: An optional list with the keyword arguments of each
+                call.
+
+        Returns:
+            A list with the ObjectID returned by each call.
+        """
+        if kwargs_list is None:
+            kwargs_list = [None] * len(args_list)
+        elif len(kwargs_list) != len(args_list):
+            raise ValueError(
+                "args_list and kwargs_list must have the same length.")
+        if self._decorator is not None:
+            return [
+                self._remote(args, kwargs)
+                for args, kwargs in zip(args_list, kwargs_list)
+            ]
+
+        actor = self._actor_hard_ref or self._actor_ref()
+        if actor is None:
+            raise RuntimeError("Lost reference to actor")
+        return actor._actor_method_call_batch(self._method_name, args_list,
+                                              kwargs_list)
+
     def __getstate__(self):
         return {
             "actor": self._actor_ref(),
@@ -722,6 +759,54 @@ class ActorHandle:
 
         return object_ids
 
+    def _actor_method_call_batch(self, method_name, args_list, kwargs_list):
+        """Submit several invocations of an actor method as one task.
+
+        The calls are validated and flattened here and executed in order by
+        the actor's __ray_call_batch__ method, which returns one value per
+        call. The flattened arguments of all calls are arguments of the one
+        task, so ObjectIDs among them are resolved before the calls run.
+        Falls back to one task per call in local mode and for cross-language
+        actors.
+
+        Args:
+            method_name: The name of the actor method to execute.
+            args_list: A list with the arguments of each call.
+            kwargs_list: A list with the keyword arguments of each call.
+
+        Returns:
+            A list with the object ID returned by each call.
+        """
+        worker = ray.worker.get_global_worker()
+        if self._ray_is_cross_language or worker.mode == ray.LOCAL_MODE:
+            return [
+                self._actor_method_call(
+                    method_name, args=args, kwargs=kwargs, num_return_vals=1)
+                for args, kwargs in zip(args_list, kwargs_list)
+            ]
+        if self._ray_method_num_return_vals[method_name] != 1:
+            raise ValueError("batch_remote only supports methods with a "
+                             "single return value.")
+        if len(args_list) == 0:
+            return []
+
+        list_args_batch = signature.flatten_args_batch(
+            self._ray_method_signatures[method_name],
+            [args or [] for args in args_list],
+            [kwargs or {} for kwargs in kwargs_list])
+        arg_counts = []
+        flat_args = []
+        for list_args in list_args_batch:
+            arg_counts.append(len(list_args))
+            flat_args.extend(list_args)
+        object_ids = self._actor_method_call(
+            "__ray_call_batch__",
+            args=[method_name, arg_counts] + flat_args,
+            num_return_vals=len(list_args_batch))
+        if len(list_args_batch) == 1:
+            object_ids = [object_ids]
+        return object_ids
+
     def __getattr__(self, item):
         if not self._ray_is_cross_language:
             raise AttributeError("'{}' object has no attribute '{}'".format(
@@ -877,6 +962,46 @@ def modify_class(cls):
                     "that implement ray.actor.Checkpointable")
             return worker._save_actor_checkpoint()
 
+        def __ray_call_batch__(self, method_name, arg_counts, *flat_args):
+            """Run a batch of calls submitted by batch_remote in order.
+
+            flat_args holds the flattened arguments of all calls, and
+            arg_counts the number of flattened arguments of each call.
+
+            A failing call doesn't stop the batch: its return value is the
+            RayTaskError that a separate task would have stored, so only its
+            own ObjectID raises on ray.get, and the error is pushed to the
+            driver.
+            """
+            worker = ray.worker.global_worker
+            method = getattr(self, method_name)
+            if inspect.iscoroutinefunction(method):
+                raise TypeError("batch_remote is not supported for async "
+                                "actor methods.")
+            results = []
+            start = 0
+            for arg_count in arg_counts:
+                args, kwargs = signature.recover_args(
+                    flat_args[start:start + arg_count])
+                start += arg_count
+                try:
+                    results.append(method(*args, **kwargs))
+                except Exception as e:
+                    backtrace = ray.utils.format_error_message(
+                        traceback.format_exc(), task_exception=True)
+                    cause_cls = (e.cause_cls if isinstance(e, RayTaskError)
+                                 else e.__class__)
+                    error = RayTaskError(method_name, backtrace, cause_cls)
+                    results.append(error)
+                    ray.utils.push_error_to_driver(
+                        worker,
+                        ray_constants.TASK_PUSH_ERROR,
+                        str(error),
+                        job_id=worker.current_job_id)
+            if len(results) == 1:
+                return results[0]
+            return tuple(results)
+
     Class.__module__ = cls.__module__
     Class.__name__ = cls.__name__
 
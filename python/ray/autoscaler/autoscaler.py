@@ -16,13 +16,16 @@ import ray
 from ray.autoscaler.docker import dockerize_if_needed
 from ray.autoscaler.node_provider import get_node_provider, \
     get_default_config
-from ray.autoscaler.tags import (TAG_RAY_LAUNCH_CONFIG, TAG_RAY_RUNTIME_CONFIG,
-                                 TAG_RAY_NODE_STATUS, TAG_RAY_NODE_TYPE,
-                                 TAG_RAY_NODE_NAME, STATUS_UP_TO_DATE,
-                                 STATUS_UNINITIALIZED, NODE_TYPE_WORKER)
-from ray.autoscaler.updater import NodeUpdaterThread
+from ray.autoscaler.resource_demand_scheduler import \
+    ResourceDemandScheduler
+from ray.autoscaler.tags import (
+    TAG_RAY_LAUNCH_CONFIG, TAG_RAY_RUNTIME_CONFIG, TAG_RAY_NODE_STATUS,
+    TAG_RAY_NODE_TYPE, TAG_RAY_NODE_NAME, TAG_RAY_USER_NODE_TYPE,
+    STATUS_UP_TO_DATE, STATUS_UNINITIALIZED, NODE_TYPE_WORKER)
+from ray.autoscaler.updater import NodeUpdaterThread, hash_file_mount
 from ray.ray_constants import AUTOSCALER_MAX_NUM_FAILURES, \
     AUTOSCALER_MAX_LAUNCH_BATCH, AUTOSCALER_MAX_CONCURRENT_LAUNCHES, \
+    AUTOSCALER_MAX_CONCURRENT_SYNCS, \
     AUTOSCALER_UPDATE_INTERVAL_S, AUTOSCALER_HEARTBEAT_TIMEOUT_S, \
     AUTOSCALER_RESOURCE_REQUEST_CHANNEL, MEMORY_RESOURCE_UNIT_BYTES
 import ray.services as services
@@ -50,10 +53,17 @@ class LoadMetrics:
         self.static_resources_by_ip = {}
         self.dynamic_resources_by_ip = {}
         self.resource_load_by_ip = {}
+        self.resource_demands_by_ip = {}
         self.local_ip = services.get_node_ip_address()
 
-    def update(self, ip, static_resources, dynamic_resources, resource_load):
+    def update(self,
+               ip,
+               static_resources,
+               dynamic_resources,
+               resource_load,
+               resource_demands=None):
         self.resource_load_by_ip[ip] = resource_load
+        self.resource_demands_by_ip[ip] = resource_demands or []
         self.static_resources_by_ip[ip] = static_resources
 
         # We are not guaranteed to have a corresponding dynamic resource for
@@ -99,6 +109,7 @@ class LoadMetrics:
         prune(self.static_resources_by_ip)
         prune(self.dynamic_resources_by_ip)
         prune(self.resource_load_by_ip)
+        prune(self.resource_demands_by_ip)
         prune(self.last_heartbeat_time_by_ip)
 
     def approx_workers_used(self):
@@ -107,6 +118,19 @@ class LoadMetrics:
     def num_workers_connected(self):
         return self._info()["NumNodesConnected"]
 
+    def get_resource_demands(self):
+        """Get the queued tasks of all nodes, grouped by resource shape.
+
+        Returns:
+            A list of (shape, count) pairs, where shape is a dict of the
+            resources that each of count queued tasks requires.
+        """
+        counts = defaultdict(int)
+        for demands in self.resource_demands_by_ip.values():
+            for shape, count in demands:
+                counts[tuple(sorted(shape.items()))] += count
+        return [(dict(shape), count) for shape, count in counts.items()]
+
     def get_resource_usage(self):
         num_nodes = len(self.static_resources_by_ip)
         nodes_used = 0.0
@@ -202,33 +226,37 @@ class NodeLauncher(threading.Thread):
         self.index = str(index) if index is not None else ""
         super(NodeLauncher, self).__init__(*args, **kwargs)
 
-    def _launch_node(self, config, count):
+    def _launch_node(self, config, count, node_type):
         worker_filter = {TAG_RAY_NODE_TYPE: NODE_TYPE_WORKER}
         before = self.provider.non_terminated_nodes(tag_filters=worker_filter)
-        launch_hash = hash_launch_conf(config["worker_nodes"], config["auth"])
-        self.log("Launching {} nodes.".format(count))
-        self.provider.create_node(
-            config["worker_nodes"], {
-                TAG_RAY_NODE_NAME: "ray-{}-worker".format(
-                    config["cluster_name"]),
-                TAG_RAY_NODE_TYPE: NODE_TYPE_WORKER,
-                TAG_RAY_NODE_STATUS: STATUS_UNINITIALIZED,
-                TAG_RAY_LAUNCH_CONFIG: launch_hash,
-            }, count)
+        node_config = worker_node_config(config, node_type)
+        launch_hash = hash_launch_conf(node_config, config["auth"])
+        node_tags = {
+            TAG_RAY_NODE_NAME: "ray-{}-worker".format(config["cluster_name"]),
+            TAG_RAY_NODE_TYPE: NODE_TYPE_WORKER,
+            TAG_RAY_NODE_STATUS: STATUS_UNINITIALIZED,
+            TAG_RAY_LAUNCH_CONFIG: launch_hash,
+        }
+        if node_type is not None:
+            node_tags[TAG_RAY_USER_NODE_TYPE] = node_type
+            self.log("Launching {} nodes of type {}.".format(count, node_type))
+        else:
+            self.log("Launching {} nodes.".format(count))
+        self.provider.create_node(node_config, node_tags, count)
         after = self.provider.non_terminated_nodes(tag_filters=worker_filter)
         if set(after).issubset(before):
             self.log("No new nodes reported after node creation.")
 
     def run(self):
         while True:
-            config, count = self.queue.get()
+            config, count, node_type = self.queue.get()
             self.log("Got {} nodes to launch.".format(count))
             try:
-                self._launch_node(config, count)
+                self._launch_node(config, count, node_type)
             except Exception:
                 logger.exception("Launch failed")
             finally:
-                self.pending.dec(count)
+                self.pending.dec(count, key=node_type)
 
     def log(self, statement):
         prefix = "NodeLauncher{}:".format(self.index)
@@ -236,19 +264,26 @@ class NodeLauncher(threading.Thread):
 
 
 class ConcurrentCounter:
+    """A thread-safe counter that also keeps a count per key."""
+
     def __init__(self):
         self._value = 0
+        self._counts = defaultdict(int)
         self._lock = threading.Lock()
 
-    def inc(self, count):
+    def inc(self, count, key=None):
         with self._lock:
             self._value += count
+            self._counts[key] += count
             return self._value
 
-    def dec(self, count):
+    def dec(self, count, key=None):
         with self._lock:
-            assert self._value >= count, "counter cannot go negative"
+            assert self._counts[key] >= count, "counter cannot go negative"
             self._value -= count
+            self._counts[key] -= count
+            if self._counts[key] == 0:
+                del self._counts[key]
             return self._value
 
     @property
@@ -256,6 +291,11 @@ class ConcurrentCounter:
         with self._lock:
             return self._value
 
+    def breakdown(self):
+        """Get the current count of each key."""
+        with self._lock:
+            return dict(self._counts)
+
 
 class StandardAutoscaler:
     """The autoscaling control loop for a Ray cluster.
@@ -280,6 +320,7 @@ class StandardAutoscaler:
                  load_metrics,
                  max_launch_batch=AUTOSCALER_MAX_LAUNCH_BATCH,
                  max_concurrent_launches=AUTOSCALER_MAX_CONCURRENT_LAUNCHES,
+                 max_concurrent_syncs=AUTOSCALER_MAX_CONCURRENT_SYNCS,
                  max_failures=AUTOSCALER_MAX_NUM_FAILURES,
                  process_runner=subprocess,
                  update_interval_s=AUTOSCALER_UPDATE_INTERVAL_S):
@@ -294,8 +335,16 @@ class StandardAutoscaler:
         self.max_concurrent_launches = max_concurrent_launches
         self.process_runner = process_runner
 
+        # Snapshot of the workers' tags and ips, taken by workers() so that
+        # an update doesn't query the provider for every node.
+        self.worker_infos = {}
+
         # Map from node_id to NodeUpdater processes
         self.updaters = {}
+        # Map from node_id to the digests of the file mounts synced to it
+        self.synced_file_mounts = defaultdict(dict)
+        self.file_sync_semaphore = threading.BoundedSemaphore(
+            max_concurrent_syncs)
         self.num_failed_updates = defaultdict(int)
         self.num_successful_updates = defaultdict(int)
         self.num_failures = 0
@@ -357,7 +406,9 @@ class StandardAutoscaler:
         num_pending = self.num_launches_pending.value
         nodes = self.workers()
         self.load_metrics.prune_active_ips(
-            [self.provider.internal_ip(node_id) for node_id in nodes])
+            [self.internal_ip(node_id) for node_id in nodes])
+        for node_id in set(self.synced_file_mounts) - set(nodes):
+            del self.synced_file_mounts[node_id]
         target_workers = self.target_num_workers()
 
         if len(nodes) >= target_workers:
@@ -372,7 +423,7 @@ class StandardAutoscaler:
 
         nodes_to_terminate = []
         for node_id in nodes:
-            node_ip = self.provider.internal_ip(node_id)
+            node_ip = self.internal_ip(node_id)
             if node_ip in last_used and last_used[node_ip] < horizon and \
                     len(nodes) - len(nodes_to_terminate) > target_workers:
                 logger.info("StandardAutoscaler: "
@@ -416,6 +467,11 @@ class StandardAutoscaler:
             self.bringup = False
             self.log_info_string(nodes, target_workers)
 
+        # Launch nodes of the configured node types for queued tasks
+        if self.resource_demand_scheduler:
+            self.launch_nodes_for_demand(nodes)
+            nodes = self.workers()
+
         # Process any completed updates
         completed = []
         for node_id, updater in self.updaters.items():
@@ -430,7 +486,7 @@ class StandardAutoscaler:
                 del self.updaters[node_id]
             # Mark the node as active to prevent the node recovery logic
             # immediately trying to restart Ray on the new node.
-            self.load_metrics.mark_active(self.provider.internal_ip(node_id))
+            self.load_metrics.mark_active(self.internal_ip(node_id))
             nodes = self.workers()
             self.log_info_string(nodes, target_workers)
 
@@ -462,13 +518,26 @@ class StandardAutoscaler:
             validate_config(new_config)
             new_launch_hash = hash_launch_conf(new_config["worker_nodes"],
                                                new_config["auth"])
+            node_types = new_config.get("available_node_types", {})
+            new_launch_hashes_by_type = {
+                node_type: hash_launch_conf(
+                    worker_node_config(new_config, node_type),
+                    new_config["auth"])
+                for node_type in node_types
+            }
             new_runtime_hash = hash_runtime_conf(new_config["file_mounts"], [
                 new_config["worker_setup_commands"],
                 new_config["worker_start_ray_commands"]
             ])
             self.config = new_config
             self.launch_hash = new_launch_hash
+            self.launch_hashes_by_type = new_launch_hashes_by_type
             self.runtime_hash = new_runtime_hash
+            if node_types:
+                self.resource_demand_scheduler = ResourceDemandScheduler(
+                    node_types, new_config["max_workers"])
+            else:
+                self.resource_demand_scheduler = None
         except Exception as e:
             if errors_fatal:
                 raise e
@@ -479,8 +548,13 @@ class StandardAutoscaler:
     def target_num_workers(self):
         target_frac = self.config["target_utilization_fraction"]
         cur_used = self.load_metrics.approx_workers_used()
-        ideal_num_nodes = int(np.ceil(cur_used / float(target_frac)))
-        ideal_num_workers = ideal_num_nodes - 1  # subtract 1 for head node
+        if self.resource_demand_scheduler:
+            # Nodes for the queued tasks are launched by type instead, in
+            # launch_nodes_for_demand.
+            ideal_num_workers = 0
+        else:
+            ideal_num_nodes = int(np.ceil(cur_used / float(target_frac)))
+            ideal_num_workers = ideal_num_nodes - 1  # subtract 1 for head
 
         initial_workers = self.config["initial_workers"]
         aggressive = self.config["autoscaling_mode"] == "aggressive"
@@ -491,7 +565,8 @@ class StandardAutoscaler:
             ideal_num_workers = max(ideal_num_workers, initial_workers)
 
         # Other resources are not supported at present.
-        if "CPU" in self.resource_requests:
+        if "CPU" in self.resource_requests and \
+                not self.resource_demand_scheduler:
             try:
                 cores_per_worker = self.config["worker_nodes"]["Resources"][
                     "CPU"]
@@ -508,14 +583,19 @@ class StandardAutoscaler:
                    max(self.config["min_workers"], ideal_num_workers))
 
     def launch_config_ok(self, node_id):
-        launch_conf = self.provider.node_tags(node_id).get(
-            TAG_RAY_LAUNCH_CONFIG)
-        if self.launch_hash != launch_conf:
+        tags = self.node_tags(node_id)
+        node_type = tags.get(TAG_RAY_USER_NODE_TYPE)
+        if node_type is None:
+            launch_hash = self.launch_hash
+        else:
+            # Nodes of a type that was removed from the config are outdated.
+            launch_hash = self.launch_hashes_by_type.get(node_type)
+        if launch_hash != tags.get(TAG_RAY_LAUNCH_CONFIG):
             return False
         return True
 
     def files_up_to_date(self, node_id):
-        applied = self.provider.node_tags(node_id).get(TAG_RAY_RUNTIME_CONFIG)
+        applied = self.node_tags(node_id).get(TAG_RAY_RUNTIME_CONFIG)
         if applied != self.runtime_hash:
             logger.info("StandardAutoscaler: "
                         "{}: Runtime state is {}, want {}".format(
@@ -526,7 +606,7 @@ class StandardAutoscaler:
     def recover_if_needed(self, node_id, now):
         if not self.can_update(node_id):
             return
-        key = self.provider.internal_ip(node_id)
+        key = self.internal_ip(node_id)
         if key not in self.load_metrics.last_heartbeat_time_by_ip:
             self.load_metrics.last_heartbeat_time_by_ip[key] = now
         last_heartbeat_time = self.load_metrics.last_heartbeat_time_by_ip[key]
@@ -557,7 +637,7 @@ class StandardAutoscaler:
         if not self.can_update(node_id):
             return None, None, None  # no update
 
-        status = self.provider.node_tags(node_id).get(TAG_RAY_NODE_STATUS)
+        status = self.node_tags(node_id).get(TAG_RAY_NODE_STATUS)
         if status == STATUS_UP_TO_DATE and self.files_up_to_date(node_id):
             return None, None, None  # no update
 
@@ -588,7 +668,9 @@ class StandardAutoscaler:
             ray_start_commands=with_head_node_ip(ray_start_commands),
             runtime_hash=self.runtime_hash,
             process_runner=self.process_runner,
-            use_internal_ip=True)
+            use_internal_ip=True,
+            synced_file_mounts=self.synced_file_mounts[node_id],
+            sync_semaphore=self.file_sync_semaphore)
         updater.start()
         self.updaters[node_id] = updater
 
@@ -601,16 +683,84 @@ class StandardAutoscaler:
             return False
         return True
 
-    def launch_new_node(self, count):
+    def launch_new_node(self, count, node_type=None):
         logger.info(
             "StandardAutoscaler: Queue {} new nodes for launch".format(count))
-        self.num_launches_pending.inc(count)
+        self.num_launches_pending.inc(count, key=node_type)
         config = copy.deepcopy(self.config)
-        self.launch_queue.put((config, count))
+        self.launch_queue.put((config, count, node_type))
+
+    def launch_nodes_for_demand(self, nodes):
+        """Launch the cheapest nodes that can run the queued tasks.
+
+        The queued tasks of all nodes are bin-packed onto the free resources
+        of the cluster and the nodes that are still starting. The rest are
+        packed onto new nodes of the types in `available_node_types`.
+        Requested resources that the connected nodes are missing are packed
+        onto the starting and new nodes only.
+        """
+        resource_demands = self.load_metrics.get_resource_demands()
+        requested_demands = []
+        if self.resource_requests:
+            requested_demands = self.requested_resource_demands()
+        if not resource_demands and not requested_demands:
+            return
+
+        node_types = [(self.node_tags(node_id).get(TAG_RAY_USER_NODE_TYPE),
+                       self.internal_ip(node_id)) for node_id in nodes]
+        to_launch = self.resource_demand_scheduler.get_nodes_to_launch(
+            node_types,
+            self.num_launches_pending.breakdown(),
+            self.load_metrics.dynamic_resources_by_ip,
+            resource_demands,
+            requested_demands=requested_demands)
+
+        max_allowed = min(
+            self.max_launch_batch,
+            self.max_concurrent_launches - self.num_launches_pending.value)
+        for node_type, count in sorted(to_launch.items()):
+            count = min(count, max_allowed)
+            if count <= 0:
+                break
+            self.launch_new_node(count, node_type=node_type)
+            max_allowed -= count
+
+    def requested_resource_demands(self):
+        """Turn requested cluster resources into demands for one unit each.
+
+        Only the part of a request that exceeds the resources the cluster
+        already has is returned. Requests that the cluster satisfies are
+        dropped.
+        """
+        demands = []
+        for resource, requested in list(self.resource_requests.items()):
+            existing = sum(
+                resources.get(resource, 0) for resources in
+                self.load_metrics.static_resources_by_ip.values())
+            missing = int(np.ceil(requested - existing))
+            if missing > 0:
+                demands.append(({resource: 1}, missing))
+            else:
+                del self.resource_requests[resource]
+        return demands
 
     def workers(self):
-        return self.provider.non_terminated_nodes(
+        """List the workers and take a snapshot of their tags and ips."""
+        self.worker_infos = self.provider.non_terminated_node_infos(
             tag_filters={TAG_RAY_NODE_TYPE: NODE_TYPE_WORKER})
+        return list(self.worker_infos)
+
+    def node_tags(self, node_id):
+        """Get the tags of a node as of the last call to workers()."""
+        if node_id in self.worker_infos:
+            return self.worker_infos[node_id].tags
+        return self.provider.node_tags(node_id)
+
+    def internal_ip(self, node_id):
+        """Get the internal ip of a node as of the last call to workers()."""
+        if node_id in self.worker_infos:
+            return self.worker_infos[node_id].internal_ip
+        return self.provider.internal_ip(node_id)
 
     def log_info_string(self, nodes, target):
         logger.info("StandardAutoscaler: {}".format(
@@ -686,6 +836,19 @@ def with_head_node_ip(cmds):
     return out
 
 
+def worker_node_config(config, node_type):
+    """Get the provider config to launch a worker node of a type with.
+
+    The node_config of a type in `available_node_types` overrides the fields
+    of `worker_nodes`. A node_type of None means `worker_nodes` itself.
+    """
+    node_config = copy.deepcopy(config["worker_nodes"])
+    if node_type is not None:
+        node_config.update(
+            config["available_node_types"][node_type]["node_config"])
+    return node_config
+
+
 def hash_launch_conf(node_conf, auth):
     hasher = hashlib.sha1()
     hasher.update(
@@ -702,26 +865,6 @@ _hash_cache = {}
 def hash_runtime_conf(file_mounts, extra_objs):
     hasher = hashlib.sha1()
 
-    def add_content_hashes(path):
-        def add_hash_of_file(fpath):
-            with open(fpath, "rb") as f:
-                for chunk in iter(lambda: f.read(2**20), b""):
-                    hasher.update(chunk)
-
-        path = os.path.expanduser(path)
-        if os.path.isdir(path):
-            dirs = []
-            for dirpath, _, filenames in os.walk(path):
-                dirs.append((dirpath, sorted(filenames)))
-            for dirpath, filenames in sorted(dirs):
-                hasher.update(dirpath.encode("utf-8"))
-                for name in filenames:
-                    hasher.update(name.encode("utf-8"))
-                    fpath = os.path.join(dirpath, name)
-                    add_hash_of_file(fpath)
-        else:
-            add_hash_of_file(path)
-
     conf_str = (json.dumps(file_mounts, sort_keys=True).encode("utf-8") +
                 json.dumps(extra_objs, sort_keys=True).encode("utf-8"))
 
@@ -730,7 +873,7 @@ def hash_runtime_conf(file_mounts, extra_objs):
     if conf_str not in _hash_cache:
         hasher.update(conf_str)
         for local_path in sorted(file_mounts.values()):
-            add_content_hashes(local_path)
+            hasher.update(hash_file_mount(local_path).encode("utf-8"))
         _hash_cache[conf_str] = hasher.hexdigest()
 
     return _hash_cache[conf_str]
@@ -1,7 +1,7 @@
 import logging
 
 from ray.autoscaler.kubernetes import core_api, log_prefix
-from ray.autoscaler.node_provider import NodeProvider
+from ray.autoscaler.node_provider import NodeInfo, NodeProvider
 from ray.autoscaler.tags import TAG_RAY_CLUSTER_NAME
 
 logger = logging.getLogger(__name__)
@@ -23,6 +23,15 @@ class KubernetesNodeProvider(NodeProvider):
         self.namespace = provider_config["namespace"]
 
     def non_terminated_nodes(self, tag_filters):
+        return [pod.metadata.name for pod in self._list_pods(tag_filters)]
+
+    def non_terminated_node_infos(self, tag_filters):
+        return {
+            pod.metadata.name: NodeInfo(pod.metadata.labels, pod.status.pod_ip)
+            for pod in self._list_pods(tag_filters)
+        }
+
+    def _list_pods(self, tag_filters):
         # Match pods that are in the 'Pending' or 'Running' phase.
         # Unfortunately there is no OR operator in field selectors, so we
         # have to match on NOT any of the other phases.
@@ -39,8 +48,7 @@ class KubernetesNodeProvider(NodeProvider):
             self.namespace,
             field_selector=field_selector,
             label_selector=label_selector)
-
-        return [pod.metadata.name for pod in pod_list.items]
+        return pod_list.items
 
     def is_running(self, node_id):
         pod = core_api().read_namespaced_pod_status(node_id, self.namespace)
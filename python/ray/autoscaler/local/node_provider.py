@@ -5,7 +5,7 @@ import os
 import socket
 import logging
 
-from ray.autoscaler.node_provider import NodeProvider
+from ray.autoscaler.node_provider import NodeInfo, NodeProvider
 from ray.autoscaler.tags import TAG_RAY_NODE_TYPE, NODE_TYPE_WORKER, \
     NODE_TYPE_HEAD
 
@@ -95,8 +95,18 @@ class LocalNodeProvider(NodeProvider):
                                   provider_config)
 
     def non_terminated_nodes(self, tag_filters):
+        return list(self._non_terminated_workers(tag_filters))
+
+    def non_terminated_node_infos(self, tag_filters):
+        return {
+            worker_ip: NodeInfo(info["tags"], self.internal_ip(worker_ip))
+            for worker_ip, info in self._non_terminated_workers(tag_filters)
+            .items()
+        }
+
+    def _non_terminated_workers(self, tag_filters):
         workers = self.state.get()
-        matching_ips = []
+        matching_workers = {}
         for worker_ip, info in workers.items():
             if info["state"] == "terminated":
                 continue
@@ -106,8 +116,8 @@ class LocalNodeProvider(NodeProvider):
                     ok = False
                     break
             if ok:
-                matching_ips.append(worker_ip)
-        return matching_ips
+                matching_workers[worker_ip] = info
+        return matching_workers
 
     def is_running(self, node_id):
         return self.state.get()[node_id]["state"] == "running"
@@ -1,3 +1,4 @@
+from collections import namedtuple
 import importlib
 import logging
 import os
@@ -5,6 +6,10 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+# The tags and internal ip of a node, as returned by
+# NodeProvider.non_terminated_node_infos.
+NodeInfo = namedtuple("NodeInfo", ["tags", "internal_ip"])
+
 
 def import_aws():
     from ray.autoscaler.aws.config import bootstrap_aws
@@ -166,6 +171,25 @@ class NodeProvider:
         """
         raise NotImplementedError
 
+    def non_terminated_node_infos(self, tag_filters):
+        """Return the tags and internal ips of nodes filtered by tags.
+
+        This lets the autoscaler look up all the nodes it manages at once
+        instead of calling node_tags() and internal_ip() for each of them.
+        The default implementation does exactly that, so providers whose
+        node listing already includes tags and ips should override it to
+        answer with a single request.
+
+        Examples:
+            >>> provider.non_terminated_node_infos({TAG_RAY_NODE_TYPE: "head"})
+            {"node-1": NodeInfo(tags={...}, internal_ip="172.0.0.1")}
+        """
+        return {
+            node_id: NodeInfo(
+                self.node_tags(node_id), self.internal_ip(node_id))
+            for node_id in self.non_terminated_nodes(tag_filters)
+        }
+
     def is_running(self, node_id):
         """Return whether the specified node is running."""
         raise NotImplementedError
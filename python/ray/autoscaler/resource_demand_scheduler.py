@@ -0,0 +1,229 @@
+"""Demand-driven scheduling of worker nodes for the autoscaler.
+
+The raylets report their queued tasks grouped by the resources that each task
+requires (its "shape"). The ResourceDemandScheduler bin-packs these demands
+onto the free resources of the existing nodes, and then picks the cheapest
+set of new nodes from the configured `available_node_types` that can run the
+rest.
+"""
+
+from collections import Counter
+import copy
+import logging
+import math
+
+from ray.ray_constants import to_memory_units
+
+logger = logging.getLogger(__name__)
+
+# Resources that are configured in bytes but scheduled in memory units.
+MEMORY_RESOURCES = ["memory", "object_store_memory"]
+
+# Slack for floating point errors when dividing resource quantities.
+EPSILON = 1e-6
+
+
+class ResourceDemandScheduler:
+    """Decides which node types to launch to satisfy queued resource demands.
+
+    Resource demands are lists of `(shape, count)` pairs, where `shape` is a
+    dict of the resources that each of `count` tasks requires, e.g.
+    `[({"CPU": 1, "GPU": 1}, 4)]`.
+
+    Demands are packed first-fit decreasing: the largest shapes are placed
+    first, each onto the first node that still has room for it. Demands that
+    don't fit onto the existing nodes are packed onto new nodes one at a time,
+    each time choosing the node type that runs the most of the remaining tasks
+    per unit of cost. Finally, new nodes whose tasks fit onto the other new
+    nodes are dropped again.
+    """
+
+    def __init__(self, node_types, max_workers):
+        """Create a scheduler.
+
+        Args:
+            node_types (dict): The `available_node_types` config, mapping each
+                node type name to its `resources`, and optionally its
+                `max_workers` and `cost`. Memory resources are in bytes.
+            max_workers (int): The maximum number of worker nodes of all types.
+        """
+        self.node_types = copy.deepcopy(node_types)
+        for node_type in self.node_types.values():
+            resources = node_type["resources"]
+            for resource in MEMORY_RESOURCES:
+                if resource in resources:
+                    resources[resource] = to_memory_units(
+                        resources[resource], round_up=False)
+        self.max_workers = max_workers
+
+        # The largest amount of each resource that a single node can have,
+        # used to compare the sizes of demands for different resources.
+        self._max_capacity = {}
+        for node_type in self.node_types.values():
+            for resource, amount in node_type["resources"].items():
+                self._max_capacity[resource] = max(
+                    self._max_capacity.get(resource, 0), amount)
+
+    def get_nodes_to_launch(self,
+                            nodes,
+                            pending_launches,
+                            available_resources,
+                            resource_demands,
+                            requested_demands=None):
+        """Get the number of nodes of each type to launch.
+
+        Args:
+            nodes (list): A (node type, internal ip) pair for each existing
+                worker node. The node type is None for nodes launched from
+                the `worker_nodes` config.
+            pending_launches (dict): The number of nodes of each type that
+                are queued for launch but not created yet.
+            available_resources (dict): The currently available resources of
+                each connected node, including the head node, by ip.
+            resource_demands (list): The queued `(shape, count)` demands.
+            requested_demands (list): `(shape, count)` demands for resources
+                that the connected nodes are missing, e.g. from
+                `request_resources`. They are only packed onto nodes that are
+                still starting and new nodes, since the connected nodes'
+                resources were already accounted for.
+
+        Returns:
+            A dict from node type to the number of nodes to launch.
+        """
+        node_type_counts = Counter()
+        capacities = [
+            dict(resources) for resources in available_resources.values()
+        ]
+        # Nodes that haven't connected yet will be able to run tasks soon.
+        starting_capacities = []
+        for node_type, ip in nodes:
+            node_type_counts[node_type] += 1
+            if ip not in available_resources and node_type in self.node_types:
+                starting_capacities.append(
+                    dict(self.node_types[node_type]["resources"]))
+        node_type_counts.update(pending_launches)
+        starting_capacities.extend(
+            self._capacities({
+                node_type: count
+                for node_type, count in pending_launches.items()
+                if node_type in self.node_types
+            }))
+
+        demands = self._pack(capacities, resource_demands)
+        demands = self._drop_infeasible(
+            self._pack(starting_capacities,
+                       demands + list(requested_demands or [])))
+
+        to_launch = Counter()
+        unfulfilled = demands
+        num_workers = sum(node_type_counts.values())
+        while unfulfilled and num_workers < self.max_workers:
+            best = None
+            for node_type, config in sorted(self.node_types.items()):
+                max_of_type = config.get("max_workers", self.max_workers)
+                if (node_type_counts[node_type] + to_launch[node_type] >=
+                        max_of_type):
+                    continue
+                remaining = self._pack([dict(config["resources"])],
+                                       unfulfilled)
+                num_packed = (_num_tasks(unfulfilled) - _num_tasks(remaining))
+                if num_packed == 0:
+                    continue
+                cost = self._cost(node_type)
+                score = (num_packed / cost, -cost)
+                if best is None or score > best[0]:
+                    best = (score, node_type, remaining)
+            if best is None:
+                break
+            _, node_type, unfulfilled = best
+            to_launch[node_type] += 1
+            num_workers += 1
+
+        # Nodes picked early for their cheap capacity may be covered by the
+        # nodes picked later, so drop the most expensive redundant ones.
+        num_unfulfilled = _num_tasks(unfulfilled)
+        for node_type in sorted(to_launch, key=self._cost, reverse=True):
+            while to_launch[node_type] > 0:
+                to_launch[node_type] -= 1
+                remaining = self._pack(self._capacities(to_launch), demands)
+                if _num_tasks(remaining) > num_unfulfilled:
+                    to_launch[node_type] += 1
+                    break
+        to_launch = +to_launch
+
+        if unfulfilled:
+            logger.info("ResourceDemandScheduler: {} queued tasks can't be "
+                        "scheduled within the node limits.".format(
+                            _num_tasks(unfulfilled)))
+        return dict(to_launch)
+
+    def _cost(self, node_type):
+        return self.node_types[node_type].get("cost", 1.0)
+
+    def _capacities(self, node_type_counts):
+        """Get the resources of new nodes of the given types."""
+        return [
+            dict(self.node_types[node_type]["resources"])
+            for node_type, count in node_type_counts.items()
+            for _ in range(count)
+        ]
+
+    def _drop_infeasible(self, demands):
+        """Remove the demands that wouldn't fit onto any node type."""
+        feasible = []
+        for shape, count in demands:
+            if any(
+                    _num_fits(node_type["resources"], shape, 1) > 0
+                    for node_type in self.node_types.values()):
+                feasible.append((shape, count))
+            else:
+                logger.warning("ResourceDemandScheduler: No node type can "
+                               "run tasks that require {}.".format(shape))
+        return feasible
+
+    def _pack(self, capacities, demands):
+        """Bin-pack demands onto nodes first-fit decreasing.
+
+        Args:
+            capacities (list): The free resources of each node. The packed
+                demands are subtracted from them.
+            demands (list): The `(shape, count)` demands to pack.
+
+        Returns:
+            The `(shape, count)` demands that didn't fit.
+        """
+        unfulfilled = []
+        for shape, count in sorted(
+                demands, key=lambda demand: self._size(demand[0]),
+                reverse=True):
+            for capacity in capacities:
+                if count == 0:
+                    break
+                num_fits = _num_fits(capacity, shape, count)
+                for resource, amount in shape.items():
+                    capacity[resource] = (
+                        capacity.get(resource, 0) - num_fits * amount)
+                count -= num_fits
+            if count > 0:
+                unfulfilled.append((shape, count))
+        return unfulfilled
+
+    def _size(self, shape):
+        return sum(amount / self._max_capacity[resource]
+                   if self._max_capacity.get(resource) else float("inf")
+                   for resource, amount in shape.items())
+
+
+def _num_fits(capacity, shape, count):
+    """The number of tasks of a shape, up to count, that fit in capacity."""
+    num_fits = count
+    for resource, amount in shape.items():
+        if amount > 0:
+            num_fits = min(
+                num_fits,
+                int(math.floor(capacity.get(resource, 0) / amount + EPSILON)))
+    return max(num_fits, 0)
+
+
+def _num_tasks(demands):
+    return sum(count for _, count in demands)
@@ -8,6 +8,10 @@ TAG_RAY_NODE_TYPE = "ray-node-type"
 NODE_TYPE_HEAD = "head"
 NODE_TYPE_WORKER = "worker"
 
+# Tag for the name of the user-defined node type of a worker, i.e. its key in
+# the available_node_types config. Unset for nodes launched from worker_nodes.
+TAG_RAY_USER_NODE_TYPE = "ray-user-node-type"
+
 # Tag that reports the current state of the node (e.g. Updating, Up-to-date)
 TAG_RAY_NODE_STATUS = "ray-node-status"
 STATUS_UNINITIALIZED = "uninitialized"
@@ -8,6 +8,7 @@ import logging
 import os
 import subprocess
 import sys
+import threading
 import time
 
 from threading import Thread
@@ -27,6 +28,49 @@ HASH_MAX_LENGTH = 10
 KUBECTL_RSYNC = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "kubernetes/kubectl-rsync.sh")
 
+# Map from file path to its (mtime, size, sha1 digest), so that unchanged
+# files are not read again when file mounts are hashed.
+_file_digest_cache = {}
+_file_digest_cache_lock = threading.Lock()
+
+
+def file_digest(path):
+    """Get the sha1 hex digest of a file's content.
+
+    The digest is cached by the file's modification time and size.
+    """
+    stat = os.stat(path)
+    with _file_digest_cache_lock:
+        cached = _file_digest_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+    hasher = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    with _file_digest_cache_lock:
+        _file_digest_cache[path] = (stat.st_mtime, stat.st_size, digest)
+    return digest
+
+
+def hash_file_mount(path):
+    """Get a digest of the content of a file or directory to mount.
+
+    The digest covers the relative paths and digests of all files in a
+    directory, so it changes when any of them is added, removed or changed.
+    """
+    path = os.path.expanduser(path)
+    if not os.path.isdir(path):
+        return file_digest(path)
+    hasher = hashlib.sha1()
+    for dirpath, _, filenames in sorted(os.walk(path)):
+        for name in sorted(filenames):
+            fpath = os.path.join(dirpath, name)
+            hasher.update(os.path.relpath(fpath, path).encode("utf-8"))
+            hasher.update(file_digest(fpath).encode("utf-8"))
+    return hasher.hexdigest()
+
 
 def with_interactive(cmd):
     force_interactive = ("true && source ~/.bashrc && "
@@ -316,7 +360,9 @@ class NodeUpdater:
                  ray_start_commands,
                  runtime_hash,
                  process_runner=subprocess,
-                 use_internal_ip=False):
+                 use_internal_ip=False,
+                 synced_file_mounts=None,
+                 sync_semaphore=None):
 
         self.log_prefix = "NodeUpdater: {}: ".format(node_id)
         if provider_config["type"] == "kubernetes":
@@ -342,6 +388,12 @@ class NodeUpdater:
         self.setup_commands = setup_commands
         self.ray_start_commands = ray_start_commands
         self.runtime_hash = runtime_hash
+        # Map from remote path to the digest of the content last synced there,
+        # shared with the caller so that later updates skip unchanged mounts.
+        self.synced_file_mounts = (synced_file_mounts
+                                   if synced_file_mounts is not None else {})
+        # Limits the number of updaters that sync files at the same time.
+        self.sync_semaphore = sync_semaphore
 
     def run(self):
         logger.info(self.log_prefix +
@@ -370,20 +422,42 @@ class NodeUpdater:
         self.exitcode = 0
 
     def sync_file_mounts(self, sync_cmd):
-        # Rsync file mounts
+        # Only sync the mounts whose content changed since they were last
+        # synced to this node.
+        digests = {}
         for remote_path, local_path in self.file_mounts.items():
             assert os.path.exists(local_path), local_path
-            if os.path.isdir(local_path):
-                if not local_path.endswith("/"):
-                    local_path += "/"
-                if not remote_path.endswith("/"):
-                    remote_path += "/"
+            digest = hash_file_mount(local_path)
+            if self.synced_file_mounts.get(remote_path) != digest:
+                digests[remote_path] = digest
+        if not digests:
+            logger.info(self.log_prefix + "File mounts are up-to-date")
+            return
 
-            with LogTimer(self.log_prefix +
-                          "Synced {} to {}".format(local_path, remote_path)):
-                self.cmd_runner.run("mkdir -p {}".format(
-                    os.path.dirname(remote_path)))
-                sync_cmd(local_path, remote_path)
+        if self.sync_semaphore is not None:
+            with LogTimer(self.log_prefix + "Waited for other syncs"):
+                self.sync_semaphore.acquire()
+        try:
+            for remote_path, digest in digests.items():
+                self._sync_file_mount(sync_cmd, remote_path,
+                                      self.file_mounts[remote_path])
+                self.synced_file_mounts[remote_path] = digest
+        finally:
+            if self.sync_semaphore is not None:
+                self.sync_semaphore.release()
+
+    def _sync_file_mount(self, sync_cmd, remote_path, local_path):
+        if os.path.isdir(local_path):
+            if not local_path.endswith("/"):
+                local_path += "/"
+            if not remote_path.endswith("/"):
+                remote_path += "/"
+
+        with LogTimer(self.log_prefix +
+                      "Synced {} to {}".format(local_path, remote_path)):
+            self.cmd_runner.run("mkdir -p {}".format(
+                os.path.dirname(remote_path)))
+            sync_cmd(local_path, remote_path)
 
     def wait_ready(self, deadline):
         with LogTimer(self.log_prefix + "Got remote shell"):
@@ -159,6 +159,34 @@ export const getLogs = (hostname: string, pid: number | null) =>
     pid: pid === null ? "" : pid
   });
 
+export interface TaskMemoryPeak {
+  function: string;
+  num_tasks: number;
+  peak_rss_bytes: number;
+  peak_uss_bytes: number;
+  peak_growth_bytes: number;
+}
+
+export interface TaskMemoryResponse {
+  workers: {
+    [workerId: string]: {
+      pid: number;
+      node_ip_address: string;
+      task_ids: string[];
+      functions: string[];
+      actor_id: string | null;
+      rss_bytes: number;
+      uss_bytes: number;
+      timestamp: number;
+    };
+  };
+  functions: { [name: string]: TaskMemoryPeak };
+  actors: { [actorId: string]: TaskMemoryPeak };
+}
+
+export const getTaskMemory = () =>
+  get<TaskMemoryResponse>("/api/task_memory", {});
+
 export type LaunchProfilingResponse = string;
 
 export const launchProfiling = (
@@ -13,6 +13,7 @@ import json
 import logging
 import os
 import re
+import tempfile
 import threading
 import time
 import traceback
@@ -20,7 +21,6 @@ import yaml
 import uuid
 
 from base64 import b64decode
-from collections import defaultdict
 from operator import itemgetter
 from typing import Dict
 
@@ -34,6 +34,7 @@ from ray.core.generated import reporter_pb2_grpc
 from ray.core.generated import core_worker_pb2
 from ray.core.generated import core_worker_pb2_grpc
 import ray.ray_constants as ray_constants
+from ray.dashboard.log_store import LogStore
 
 try:
     from ray.tune.result import DEFAULT_RESULTS_DIR
@@ -119,7 +120,7 @@ class Dashboard(object):
             redis_address, password=redis_password)
         self.temp_dir = temp_dir
 
-        self.node_stats = NodeStats(redis_address, redis_password)
+        self.node_stats = NodeStats(redis_address, redis_password, temp_dir)
         self.raylet_stats = RayletStats(redis_address, redis_password)
         if Analysis is not None:
             self.tune_stats = TuneCollector(DEFAULT_RESULTS_DIR, 2.0)
@@ -306,18 +307,39 @@ class Dashboard(object):
             return await json_response(
                 self.raylet_stats.kill_actor(actor_id, ip_address, port))
 
+        def get_paging(req):
+            offset = req.query.get("offset")
+            if offset is not None:
+                offset = int(offset)
+            limit = req.query.get("limit")
+            if limit is not None:
+                limit = int(limit)
+            return offset, limit
+
         async def logs(req) -> aiohttp.web.Response:
             hostname = req.query.get("hostname")
             pid = req.query.get("pid")
-            result = self.node_stats.get_logs(hostname, pid)
+            try:
+                offset, limit = get_paging(req)
+            except ValueError as e:
+                return await json_response(error=str(e))
+            result = self.node_stats.get_logs(hostname, pid, offset, limit)
             return await json_response(result=result)
 
         async def errors(req) -> aiohttp.web.Response:
             hostname = req.query.get("hostname")
             pid = req.query.get("pid")
-            result = self.node_stats.get_errors(hostname, pid)
+            try:
+                offset, limit = get_paging(req)
+            except ValueError as e:
+                return await json_response(error=str(e))
+            result = self.node_stats.get_errors(hostname, pid, offset, limit)
             return await json_response(result=result)
 
+        async def task_memory(req) -> aiohttp.web.Response:
+            return await json_response(
+                result=ray.state.state.task_memory_stats())
+
         self.app.router.add_get("/", get_index)
         self.app.router.add_get("/favicon.ico", get_favicon)
 
@@ -350,6 +372,7 @@ class Dashboard(object):
         self.app.router.add_get("/api/kill_actor", kill_actor)
         self.app.router.add_get("/api/logs", logs)
         self.app.router.add_get("/api/errors", errors)
+        self.app.router.add_get("/api/task_memory", task_memory)
 
         self.app.router.add_get("/{_}", get_forbidden)
 
@@ -369,7 +392,7 @@ class Dashboard(object):
 
 
 class NodeStats(threading.Thread):
-    def __init__(self, redis_address, redis_password=None):
+    def __init__(self, redis_address, redis_password=None, temp_dir=None):
         self.redis_key = "{}.*".format(ray.gcs_utils.REPORTER_CHANNEL)
         self.redis_client = ray.services.create_redis_client(
             redis_address, password=redis_password)
@@ -397,11 +420,28 @@ class NodeStats(threading.Thread):
             "usedResources": {},
         }
 
-        # Mapping from IP address to PID to list of log lines
-        self._logs = defaultdict(lambda: defaultdict(list))
-
-        # Mapping from IP address to PID to list of error messages
-        self._errors = defaultdict(lambda: defaultdict(list))
+        spill_dir = None
+        if ray_constants.DASHBOARD_LOG_SPILL_BYTES > 0:
+            spill_dir = tempfile.mkdtemp(
+                prefix="dashboard_logs_", dir=temp_dir)
+
+        # Log lines and error messages by IP address and PID. The stores keep
+        # the most recent entries of each process within a byte budget. The
+        # logs of processes that have been silent for a while are forgotten,
+        # but their errors are kept.
+        self._logs = LogStore(
+            ray_constants.DASHBOARD_LOG_BUFFER_BYTES,
+            spill_dir=spill_dir,
+            max_spill_bytes_per_process=(
+                ray_constants.DASHBOARD_LOG_SPILL_BYTES),
+            name="logs",
+            max_idle_s=ray_constants.DASHBOARD_LOG_PROCESS_TTL_S)
+        self._errors = LogStore(
+            ray_constants.DASHBOARD_LOG_BUFFER_BYTES,
+            spill_dir=spill_dir,
+            max_spill_bytes_per_process=(
+                ray_constants.DASHBOARD_LOG_SPILL_BYTES),
+            name="errors")
 
         ray.state.state._initialize_global_state(
             redis_address=redis_address, redis_password=redis_password)
@@ -409,22 +449,10 @@ class NodeStats(threading.Thread):
         super().__init__()
 
     def calculate_log_counts(self):
-        return {
-            ip: {
-                pid: len(logs_for_pid)
-                for pid, logs_for_pid in logs_for_ip.items()
-            }
-            for ip, logs_for_ip in self._logs.items()
-        }
+        return self._logs.counts()
 
     def calculate_error_counts(self):
-        return {
-            ip: {
-                pid: len(errors_for_pid)
-                for pid, errors_for_pid in errors_for_ip.items()
-            }
-            for ip, errors_for_ip in self._errors.items()
-        }
+        return self._errors.counts()
 
     def purge_outdated_stats(self):
         def current(then, now):
@@ -511,19 +539,13 @@ class NodeStats(threading.Thread):
             actor_tree[parent_id]["children"][actor_id] = actor_tree[actor_id]
         return actor_tree["root"]["children"]
 
-    def get_logs(self, hostname, pid):
+    def get_logs(self, hostname, pid, offset=None, limit=None):
         ip = self._node_stats.get(hostname, {"ip": None})["ip"]
-        logs = self._logs.get(ip, {})
-        if pid:
-            logs = {pid: logs.get(pid, [])}
-        return logs
+        return self._logs.get(ip, pid, offset, limit)
 
-    def get_errors(self, hostname, pid):
+    def get_errors(self, hostname, pid, offset=None, limit=None):
         ip = self._node_stats.get(hostname, {"ip": None})["ip"]
-        errors = self._errors.get(ip, {})
-        if pid:
-            errors = {pid: errors.get(pid, [])}
-        return errors
+        return self._errors.get(ip, pid, offset, limit)
 
     def run(self):
         p = self.redis_client.pubsub(ignore_subscribe_messages=True)
@@ -561,49 +583,51 @@ class NodeStats(threading.Thread):
 
         for x in p.listen():
             try:
-                with self._node_stats_lock:
-                    channel = ray.utils.decode(x["channel"])
-                    data = x["data"]
-                    if channel == log_channel:
-                        data = json.loads(ray.utils.decode(data))
-                        ip = data["ip"]
-                        pid = str(data["pid"])
-                        self._logs[ip][pid].extend(data["lines"])
-                    elif channel == str(error_channel):
-                        gcs_entry = ray.gcs_utils.GcsEntry.FromString(data)
-                        error_data = ray.gcs_utils.ErrorTableData.FromString(
-                            gcs_entry.entries[0])
-                        message = error_data.error_message
-                        message = re.sub(r"\x1b\[\d+m", "", message)
-                        match = re.search(r"\(pid=(\d+), ip=(.*?)\)", message)
-                        if match:
-                            pid = match.group(1)
-                            ip = match.group(2)
-                            self._errors[ip][pid].append({
-                                "message": message,
-                                "timestamp": error_data.timestamp,
-                                "type": error_data.type
-                            })
-                    elif channel == str(actor_channel):
-                        gcs_entry = ray.gcs_utils.GcsEntry.FromString(data)
-                        actor_data = ray.gcs_utils.ActorTableData.FromString(
-                            gcs_entry.entries[0])
-                        addr = (actor_data.address.ip_address,
-                                str(actor_data.address.port))
-                        owner_addr = (actor_data.owner_address.ip_address,
-                                      str(actor_data.owner_address.port))
+                # Decode and parse the message before taking the lock, so
+                # that bursts of logs don't block the API handlers.
+                channel = ray.utils.decode(x["channel"])
+                data = x["data"]
+                if channel == log_channel:
+                    for data in ray.gcs_utils.decode_log_batch(data):
+                        self._logs.append(data["ip"], str(data["pid"]),
+                                          data["lines"])
+                elif channel == str(error_channel):
+                    gcs_entry = ray.gcs_utils.GcsEntry.FromString(data)
+                    error_data = ray.gcs_utils.ErrorTableData.FromString(
+                        gcs_entry.entries[0])
+                    message = error_data.error_message
+                    message = re.sub(r"\x1b\[\d+m", "", message)
+                    match = re.search(r"\(pid=(\d+), ip=(.*?)\)", message)
+                    if match:
+                        pid = match.group(1)
+                        ip = match.group(2)
+                        self._errors.append(ip, pid, [{
+                            "message": message,
+                            "timestamp": error_data.timestamp,
+                            "type": error_data.type
+                        }])
+                elif channel == str(actor_channel):
+                    gcs_entry = ray.gcs_utils.GcsEntry.FromString(data)
+                    actor_data = ray.gcs_utils.ActorTableData.FromString(
+                        gcs_entry.entries[0])
+                    addr = (actor_data.address.ip_address,
+                            str(actor_data.address.port))
+                    owner_addr = (actor_data.owner_address.ip_address,
+                                  str(actor_data.owner_address.port))
+                    extra_info = {
+                        "jobId": ray.utils.binary_to_hex(actor_data.job_id),
+                        "state": actor_data.state,
+                        "isDirectCall": actor_data.is_direct_call,
+                        "timestamp": actor_data.timestamp
+                    }
+                    with self._node_stats_lock:
                         self._addr_to_owner_addr[addr] = owner_addr
-                        self._addr_to_actor_id[addr] = ray.utils.binary_to_hex(
-                            actor_data.actor_id)
-                        self._addr_to_extra_info_dict[addr] = {
-                            "jobId": ray.utils.binary_to_hex(
-                                actor_data.job_id),
-                            "state": actor_data.state,
-                            "isDirectCall": actor_data.is_direct_call,
-                            "timestamp": actor_data.timestamp
-                        }
-                    else:
-                        data = json.loads(ray.utils.decode(data))
+                        self._addr_to_actor_id[addr] = (
+                            ray.utils.binary_to_hex(actor_data.actor_id))
+                        self._addr_to_extra_info_dict[addr] = extra_info
+                else:
+                    data = json.loads(ray.utils.decode(data))
+                    with self._node_stats_lock:
                         self._node_stats[data["hostname"]] = data
             except Exception:
                 logger.exception(traceback.format_exc())
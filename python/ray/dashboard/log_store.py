@@ -0,0 +1,363 @@
+"""Bounded storage for the log lines and errors shown by the dashboard.
+
+Entries are kept per (ip, pid) in a ring buffer with a byte cap. When a
+buffer is full, its oldest entries are either dropped or, if spilling is
+enabled, appended to rotating segment files on disk that are themselves
+capped in size. Each entry has an index in the order it was appended, which
+is used to page through what is still stored. Processes that haven't
+appended anything for a while are forgotten, so that exited workers don't
+hold on to their budget.
+"""
+
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# The size of each on-disk segment, as a fraction of the spill cap of a
+# process. Whole segments are deleted when the cap is exceeded.
+SEGMENTS_PER_SPILL_CAP = 4
+
+
+def _entry_size(entry):
+    if isinstance(entry, str):
+        return len(entry)
+    return len(json.dumps(entry))
+
+
+class _Segment:
+    """An on-disk file holding consecutive entries as JSON lines."""
+
+    def __init__(self, path, first_index):
+        self.path = path
+        self.first_index = first_index
+        self.num_entries = 0
+        self.num_bytes = 0
+
+
+class _ProcessEntries:
+    """The stored entries of one process."""
+
+    def __init__(self):
+        # The entries in memory, oldest first, with their sizes.
+        self.entries = collections.deque()
+        self.num_bytes = 0
+        # The index that the next appended entry will get.
+        self.next_index = 0
+        # The spilled entries, oldest segment first.
+        self.segments = collections.deque()
+        self.num_spilled_bytes = 0
+        # The number of evicted entries that failed to be spilled.
+        self.num_dropped = 0
+        # The time of the last append.
+        self.last_append_time = time.time()
+        # Whether the process was pruned.
+        self.deleted = False
+
+    def first_index(self):
+        """The index of the oldest entry still stored."""
+        if self.segments:
+            return self.segments[0].first_index
+        return self.next_index - len(self.entries)
+
+
+class LogStore:
+    """Stores entries per process, within a byte budget per process.
+
+    This class is thread-safe. Reads copy what they need while holding the
+    lock and read spilled segments after releasing it. Evicted entries are
+    queued while holding the lock, and written to the segments in order by
+    whichever appending thread holds the spill lock, after it has released
+    the lock.
+    """
+
+    def __init__(self,
+                 max_bytes_per_process,
+                 spill_dir=None,
+                 max_spill_bytes_per_process=0,
+                 name="logs",
+                 max_idle_s=None):
+        """Create a store.
+
+        Args:
+            max_bytes_per_process (int): The maximum total size of the entries
+                of a process kept in memory.
+            spill_dir (str): The directory to spill evicted entries to. If
+                None, or if max_spill_bytes_per_process is 0, evicted entries
+                are dropped.
+            max_spill_bytes_per_process (int): The maximum total size of the
+                spilled entries of a process.
+            name (str): Prefix of the spilled segment file names.
+            max_idle_s (float): The entries of processes that haven't
+                appended anything for this long are deleted. If None, they
+                are kept forever.
+        """
+        self._max_bytes = max_bytes_per_process
+        self._spill_dir = spill_dir
+        self._max_spill_bytes = (max_spill_bytes_per_process
+                                 if spill_dir is not None else 0)
+        self._segment_bytes = max(
+            1, self._max_spill_bytes // SEGMENTS_PER_SPILL_CAP)
+        self._name = name
+        self._num_segments_created = 0
+        self._max_idle_s = max_idle_s
+        self._last_prune_time = time.time()
+        # Mapping from IP address to PID to _ProcessEntries.
+        self._processes = collections.defaultdict(dict)
+        # The (ip, pid, process, first index, entries) of the evicted entries
+        # to spill, oldest first.
+        self._pending_spills = []
+        # The segments to delete from disk.
+        self._pending_removals = []
+        self._lock = threading.Lock()
+        # Held while writing or deleting segments. This must not be acquired
+        # while holding self._lock.
+        self._spill_lock = threading.Lock()
+
+    def append(self, ip, pid, entries):
+        """Append entries of a process, evicting its oldest if needed."""
+        now = time.time()
+        with self._lock:
+            if (self._max_idle_s is not None
+                    and now - self._last_prune_time >= self._max_idle_s):
+                self._prune(now)
+            process = self._processes[ip].get(pid)
+            if process is None:
+                process = self._processes[ip][pid] = _ProcessEntries()
+            process.last_append_time = now
+            for entry in entries:
+                size = _entry_size(entry)
+                process.entries.append((entry, size))
+                process.num_bytes += size
+            process.next_index += len(entries)
+
+            evicted = []
+            while process.num_bytes > self._max_bytes and process.entries:
+                entry, size = process.entries.popleft()
+                process.num_bytes -= size
+                evicted.append((entry, size))
+            if evicted and self._max_spill_bytes > 0:
+                first_index = (
+                    process.next_index - len(process.entries) - len(evicted))
+                self._pending_spills.append((ip, pid, process, first_index,
+                                             evicted))
+            pending = self._pending_spills or self._pending_removals
+        if pending:
+            self._flush_spills()
+
+    def prune(self, now=None):
+        """Delete the entries of processes idle for more than max_idle_s.
+
+        This is also done periodically by append.
+        """
+        with self._lock:
+            self._prune(time.time() if now is None else now)
+        self._flush_spills()
+
+    def _prune(self, now):
+        """Delete the entries of idle processes. Must hold the lock."""
+        self._last_prune_time = now
+        if self._max_idle_s is None:
+            return
+        for ip, processes in list(self._processes.items()):
+            for pid, process in list(processes.items()):
+                if now - process.last_append_time > self._max_idle_s:
+                    del processes[pid]
+                    process.deleted = True
+                    self._pending_removals.extend(process.segments)
+            if not processes:
+                del self._processes[ip]
+
+    def counts(self):
+        """Get the number of entries ever appended for each process."""
+        with self._lock:
+            return {
+                ip: {
+                    pid: process.next_index
+                    for pid, process in processes.items()
+                }
+                for ip, processes in self._processes.items()
+            }
+
+    def get(self, ip, pid=None, offset=None, limit=None):
+        """Get stored entries of the processes on a node.
+
+        Args:
+            ip (str): The IP address of the node.
+            pid (str): If given, only get the entries of this process.
+            offset (int): The index of the first entry to get. If None, the
+                last `limit` entries are returned, or all the entries in
+                memory if there is no limit.
+            limit (int): The maximum number of entries to get per process.
+
+        Returns:
+            A dict from PID to the list of entries.
+        """
+        reads = {}
+        with self._lock:
+            processes = self._processes.get(ip, {})
+            pids = [pid] if pid else list(processes)
+            for pid in pids:
+                process = processes.get(pid)
+                if process is None:
+                    reads[pid] = ([], [])
+                    continue
+                reads[pid] = self._plan_read(process, offset, limit)
+
+        result = {}
+        for pid, (segment_reads, memory_entries) in reads.items():
+            entries = []
+            for path, start, stop in segment_reads:
+                entries.extend(self._read_segment(path, start, stop))
+            entries.extend(memory_entries)
+            result[pid] = entries
+        return result
+
+    def _plan_read(self, process, offset, limit):
+        """Find the entries to read. Must hold the lock.
+
+        Returns:
+            A list of (path, start, stop) ranges of lines to read from
+            segments, and the list of entries from memory.
+        """
+        memory_start = process.next_index - len(process.entries)
+        if offset is None:
+            if limit is None:
+                offset = memory_start
+            else:
+                offset = process.next_index - limit
+        offset = max(offset, process.first_index())
+        stop = process.next_index
+        if limit is not None:
+            stop = min(stop, offset + limit)
+
+        segment_reads = []
+        for segment in process.segments:
+            segment_stop = segment.first_index + segment.num_entries
+            if segment_stop <= offset or segment.first_index >= stop:
+                continue
+            segment_reads.append(
+                (segment.path,
+                 max(offset, segment.first_index) - segment.first_index,
+                 min(stop, segment_stop) - segment.first_index))
+        memory_entries = [
+            entry for entry, _ in list(process.entries)[max(
+                0, offset - memory_start):max(0, stop - memory_start)]
+        ]
+        return segment_reads, memory_entries
+
+    def _read_segment(self, path, start, stop):
+        entries = []
+        try:
+            with open(path) as f:
+                for i, line in enumerate(f):
+                    if i >= stop:
+                        break
+                    if i >= start:
+                        entries.append(json.loads(line))
+        except (IOError, OSError):
+            # The segment was deleted since the read was planned.
+            pass
+        return entries
+
+    def _flush_spills(self):
+        """Write the pending spills and delete the pending removals."""
+        with self._spill_lock:
+            while True:
+                with self._lock:
+                    spills, self._pending_spills = self._pending_spills, []
+                    removals = self._pending_removals
+                    self._pending_removals = []
+                if not spills and not removals:
+                    return
+                for segment in removals:
+                    self._remove_segment(segment)
+                for ip, pid, process, first_index, evicted in spills:
+                    self._spill(ip, pid, process, first_index, evicted)
+
+    def _spill(self, ip, pid, process, first_index, evicted):
+        """Append evicted entries to the segments.
+
+        Must hold the spill lock and not the lock. The segments are only
+        updated after the entries are written, so reads never see entries
+        that aren't on disk. If a write fails, its entries are dropped and
+        counted in process.num_dropped.
+        """
+        if process.deleted:
+            return
+        # Split the entries into the chunks to append to each segment.
+        segment = process.segments[-1] if process.segments else None
+        if (segment is not None
+                and segment.first_index + segment.num_entries != first_index):
+            # Entries before these ones were dropped.
+            segment = None
+        num_bytes = segment.num_bytes if segment is not None else 0
+        chunks = []
+        for entry, size in evicted:
+            if segment is None or num_bytes >= self._segment_bytes:
+                self._num_segments_created += 1
+                path = os.path.join(
+                    self._spill_dir, "{}-{}-{}-{}.jsonl".format(
+                        self._name, ip, pid, self._num_segments_created))
+                segment = _Segment(path, first_index)
+                num_bytes = 0
+            if not chunks or chunks[-1][0] is not segment:
+                chunks.append([segment, [], 0])
+            chunks[-1][1].append(json.dumps(entry) + "\n")
+            chunks[-1][2] += size
+            num_bytes += size
+            first_index += 1
+
+        written = []
+        removals = []
+        for segment, lines, num_bytes in chunks:
+            if self._write_segment(segment, lines):
+                written.append((segment, len(lines), num_bytes))
+            elif segment.num_entries == 0:
+                removals.append(segment)
+
+        with self._lock:
+            for segment, num_entries, num_bytes in written:
+                if process.deleted:
+                    removals.append(segment)
+                    continue
+                if not process.segments or process.segments[-1] is not segment:
+                    process.segments.append(segment)
+                segment.num_entries += num_entries
+                segment.num_bytes += num_bytes
+                process.num_spilled_bytes += num_bytes
+            process.num_dropped += len(evicted) - sum(
+                num_entries for _, num_entries, _ in written)
+            while process.num_spilled_bytes > self._max_spill_bytes:
+                segment = process.segments.popleft()
+                process.num_spilled_bytes -= segment.num_bytes
+                removals.append(segment)
+        for segment in removals:
+            self._remove_segment(segment)
+
+    def _write_segment(self, segment, lines):
+        """Append lines to a segment file, or to none of it on failure."""
+        start = None
+        try:
+            with open(segment.path, "a") as f:
+                start = f.tell()
+                f.write("".join(lines))
+            return True
+        except (IOError, OSError):
+            logger.exception("Failed to write {}.".format(segment.path))
+            if start is not None:
+                try:
+                    os.truncate(segment.path, start)
+                except OSError:
+                    pass
+            return False
+
+    def _remove_segment(self, segment):
+        try:
+            os.remove(segment.path)
+        except OSError:
+            pass
@@ -59,6 +59,23 @@ def as_future(object_id):
     return handler.as_future(object_id)
 
 
+def as_futures(object_ids):
+    """Turn a list of object_ids into a list of Future objects.
+
+    The objects are checked and fetched in batches, so this is the preferred
+    way to await many objects, e.g., with asyncio.gather(*as_futures(ids)).
+
+    Args:
+        object_ids: A list of Ray object_ids.
+
+    Returns:
+        A list of PlasmaObjectFutures that wait for the object_ids.
+    """
+    if handler is None:
+        init()
+    return handler.as_futures(object_ids)
+
+
 def shutdown():
     """Manually shutdown the async API.
 
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 
 import ray
 from ray.services import logger
@@ -10,52 +11,90 @@ class PlasmaObjectFuture(asyncio.Future):
     pass
 
 
-def _complete_future(event_handler, ray_object_id):
-    # TODO(ilr): Consider race condition between popping from the
-    # waiting_dict and as_future appending to the waiting_dict's list.
-    logger.debug(
-        "Completing plasma futures for object id {}".format(ray_object_id))
-    obj = event_handler._worker.get_objects([ray_object_id], timeout=0)[0]
-    futures = event_handler._waiting_dict.pop(ray_object_id)
-    for fut in futures:
-        try:
-            fut.set_result(obj)
-        except asyncio.InvalidStateError:
-            # Avoid issues where process_notifications
-            # and check_immediately both get executed
-            logger.debug("Failed to set result for future {}."
-                         "Most likely already set.".format(fut))
-
-
 class PlasmaEventHandler:
-    """This class is an event handler for Plasma."""
+    """This class is an event handler for Plasma.
+
+    Newly awaited objects and plasma notifications are not handled one by
+    one. They are coalesced and processed once per event loop iteration: all
+    new objects are checked with a single ray.wait and all ready objects are
+    fetched with a single get.
+    """
 
     def __init__(self, loop, worker):
         super().__init__()
         self._loop = loop
         self._worker = worker
         self._waiting_dict = defaultdict(list)
+        # Objects that were awaited for the first time since the last flush.
+        self._unchecked = {}
+        # Objects that plasma reported as added since the last flush. These
+        # are added from the core worker's IO thread.
+        self._notified = []
+        # Protects the two fields above and _flush_scheduled.
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
 
     def process_notifications(self, messages):
         """Process notifications."""
-        for object_id, object_size, metadata_size in messages:
-            if object_size > 0 and object_id in self._waiting_dict:
-                # This must be asynchronous because it runs on the main IO
-                # thread in the worker. If this is blocked, other messages
-                # won't be received.
-                self._loop.call_soon_threadsafe(_complete_future, self,
-                                                object_id)
+        object_ids = [
+            object_id for object_id, object_size, metadata_size in messages
+            if object_size > 0
+        ]
+        if not object_ids:
+            return
+        with self._lock:
+            self._notified.extend(object_ids)
+            # This must be asynchronous because it runs on the main IO thread
+            # in the worker. If this is blocked, other messages won't be
+            # received.
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Schedule a flush on the event loop. Must hold self._lock."""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self):
+        """Complete the futures of all objects that became ready."""
+        with self._lock:
+            notified, self._notified = self._notified, []
+            unchecked, self._unchecked = list(self._unchecked), {}
+            self._flush_scheduled = False
+
+        ready = dict.fromkeys(notified)
+        if unchecked:
+            # Subscribe before checking so that no object can be added to
+            # plasma in between without us noticing.
+            for object_id in unchecked:
+                self._worker.core_worker.subscribe_to_plasma_object(object_id)
+            ready_ids, _ = ray.wait(
+                unchecked, num_returns=len(unchecked), timeout=0)
+            ready.update(dict.fromkeys(ready_ids))
+        self._complete_futures([
+            object_id for object_id in ready if object_id in self._waiting_dict
+        ])
+
+    def _complete_futures(self, object_ids):
+        if not object_ids:
+            return
+        logger.debug("Completing plasma futures for {} object ids".format(
+            len(object_ids)))
+        objects = self._worker.get_objects(object_ids, timeout=0)
+        for object_id, obj in zip(object_ids, objects):
+            for fut in self._waiting_dict.pop(object_id):
+                if not fut.done():
+                    fut.set_result(obj)
 
     def close(self):
         """Clean up this handler."""
         for futures in self._waiting_dict.values():
             for fut in futures:
                 fut.cancel()
-
-    def check_immediately(self, object_id):
-        ready, _ = ray.wait([object_id], timeout=0)
-        if ready:
-            _complete_future(self, object_id)
+        self._waiting_dict.clear()
+        with self._lock:
+            self._unchecked.clear()
+            self._notified.clear()
 
     def as_future(self, object_id, check_ready=True):
         """Turn an object_id into a Future object.
@@ -72,8 +111,24 @@ class PlasmaEventHandler:
 
         future = PlasmaObjectFuture(loop=self._loop)
         self._waiting_dict[object_id].append(future)
-        if not self.check_immediately(object_id) and len(
-                self._waiting_dict[object_id]) == 1:
-            # Only subscribe once
-            self._worker.core_worker.subscribe_to_plasma_object(object_id)
+        if len(self._waiting_dict[object_id]) == 1:
+            # Only subscribe and check once per object.
+            with self._lock:
+                self._unchecked[object_id] = None
+                self._schedule_flush()
         return future
+
+    def as_futures(self, object_ids):
+        """Turn a list of object_ids into a list of Future objects.
+
+        The objects are checked and fetched together, so awaiting all of them
+        with asyncio.gather or asyncio.wait is much cheaper than awaiting them
+        one by one.
+
+        Args:
+            object_ids: A list of Ray's object_ids.
+
+        Returns:
+            A list of PlasmaObjectFutures that wait for the object_ids.
+        """
+        return [self.as_future(object_id) for object_id in object_ids]
@@ -1,8 +1,12 @@
+import asyncio
 from collections import deque
-import time
 
 import ray
 
+# Items larger than this are put in the object store by the caller and only
+# their ObjectID travels through the queue actor.
+LARGE_ITEM_BYTES = 100 * 1024
+
 
 class Empty(Exception):
     pass
@@ -15,6 +19,9 @@ class Full(Exception):
 class Queue:
     """Queue implementation on Ray.
 
+    The queue is backed by an asyncio actor, so blocking puts and gets wait
+    on the actor instead of polling it, and waiters are served in FIFO order.
+
     Args:
         maxsize (int): maximum size of the queue. If zero, size is unboundend.
     """
@@ -36,7 +43,7 @@ class Queue:
 
     def empty(self):
         """Whether the queue is empty."""
-        return ray.get(self.actor.qsize.remote())
+        return ray.get(self.actor.empty.remote())
 
     def full(self):
         """Whether the queue is full."""
@@ -45,70 +52,62 @@ class Queue:
     def put(self, item, block=True, timeout=None):
         """Adds an item to the queue.
 
-        Uses polling if block=True, so there is no guarantee of order if
-        multiple producers put to the same full queue.
+        If block is True and the queue is full, waits until a free slot is
+        available or the timeout expires.
 
         Raises:
-            Full if the queue is full and blocking is False.
+            Full if the queue is full and blocking is False or the timeout
+            expires.
         """
-        if self.maxsize <= 0:
-            self.actor.put.remote(item)
-        elif not block:
-            if not ray.get(self.actor.put.remote(item)):
-                raise Full
-        elif timeout is None:
-            # Polling
-            # Use a not_full condition variable or promise?
-            while not ray.get(self.actor.put.remote(item)):
-                # Consider adding time.sleep here
-                pass
-        elif timeout < 0:
-            raise ValueError("'timeout' must be a non-negative number")
-        else:
-            endtime = time.time() + timeout
-            # Polling
-            # Use a condition variable or switch to promise?
-            success = False
-            while not success and time.time() < endtime:
-                success = ray.get(self.actor.put.remote(item))
-            if not success:
-                raise Full
+        self._put_items([item], block, timeout)
+
+    def put_batch(self, items, block=True, timeout=None):
+        """Adds a list of items to the queue in a single call.
+
+        The items are added atomically: if block is True, waits until there
+        are free slots for all of them.
+
+        Raises:
+            Full if there is no room for all items and blocking is False or
+            the timeout expires.
+        """
+        items = list(items)
+        if 0 < self.maxsize < len(items):
+            raise ValueError("Cannot put {} items into a queue of maxsize "
+                             "{}".format(len(items), self.maxsize))
+        self._put_items(items, block, timeout)
 
     def get(self, block=True, timeout=None):
         """Gets an item from the queue.
 
-        Uses polling if block=True, so there is no guarantee of order if
-        multiple consumers get from the same empty queue.
+        If block is True and the queue is empty, waits until an item is
+        available or the timeout expires.
 
         Returns:
             The next item in the queue.
 
         Raises:
-            Empty if the queue is empty and blocking is False.
+            Empty if the queue is empty and blocking is False or the timeout
+            expires.
         """
-        if not block:
-            success, item = ray.get(self.actor.get.remote())
-            if not success:
-                raise Empty
-        elif timeout is None:
-            # Polling
-            # Use a not_empty condition variable or return a promise?
-            success, item = ray.get(self.actor.get.remote())
-            while not success:
-                # Consider adding time.sleep here
-                success, item = ray.get(self.actor.get.remote())
-        elif timeout < 0:
-            raise ValueError("'timeout' must be a non-negative number")
-        else:
-            endtime = time.time() + timeout
-            # Polling
-            # Use a not_full condition variable or return a promise?
-            success = False
-            while not success and time.time() < endtime:
-                success, item = ray.get(self.actor.get.remote())
-            if not success:
-                raise Empty
-        return item
+        return self._get_items(1, block, timeout)[0]
+
+    def get_batch(self, num_items, block=True, timeout=None):
+        """Gets up to num_items items from the queue in a single call.
+
+        If block is True, waits until at least one item is available, then
+        returns as many of the queued items as possible without waiting.
+
+        Returns:
+            A list of between 1 and num_items items.
+
+        Raises:
+            Empty if the queue is empty and blocking is False or the timeout
+            expires.
+        """
+        if num_items < 1:
+            raise ValueError("'num_items' must be a positive integer")
+        return self._get_items(num_items, block, timeout)
 
     def put_nowait(self, item):
         """Equivalent to put(item, block=False).
@@ -126,42 +125,137 @@ class Queue:
         """
         return self.get(block=False)
 
+    def _put_items(self, items, block, timeout):
+        timeout = _get_timeout(block, timeout)
+        items = [_wrap_item(item) for item in items]
+        if self.maxsize <= 0:
+            # Puts to an unbounded queue never fail, so don't wait for them.
+            self.actor.put.remote(items)
+        elif not ray.get(self.actor.put.remote(items, timeout)):
+            raise Full
+
+    def _get_items(self, num_items, block, timeout):
+        timeout = _get_timeout(block, timeout)
+        items = ray.get(self.actor.get.remote(num_items, timeout))
+        if not items:
+            raise Empty
+        return _unwrap_items(items)
+
+
+class _ItemRef:
+    """Reference to a large queue item stored in the object store.
+
+    Nesting the ObjectID keeps Ray from resolving it when the item is passed
+    to and returned from the queue actor.
+    """
+
+    def __init__(self, object_id):
+        self.object_id = object_id
+
+
+def _get_timeout(block, timeout):
+    if not block:
+        return 0
+    if timeout is not None and timeout < 0:
+        raise ValueError("'timeout' must be a non-negative number")
+    return timeout
+
+
+def _item_size(item):
+    if isinstance(item, (bytes, bytearray, str)):
+        return len(item)
+    nbytes = getattr(item, "nbytes", 0)
+    return nbytes if isinstance(nbytes, int) else 0
+
+
+def _wrap_item(item):
+    if _item_size(item) > LARGE_ITEM_BYTES:
+        return _ItemRef(ray.put(item))
+    return item
+
+
+def _unwrap_items(items):
+    refs = [i for i, item in enumerate(items) if isinstance(item, _ItemRef)]
+    if refs:
+        values = ray.get([items[i].object_id for i in refs])
+        for i, value in zip(refs, values):
+            items[i] = value
+    return items
+
 
 @ray.remote
 class _QueueActor:
     def __init__(self, maxsize):
         self.maxsize = maxsize
-        self._init(maxsize)
+        self.queue = deque()
+        # Created lazily so it is bound to the actor's event loop.
+        self.changed = None
 
     def qsize(self):
-        return self._qsize()
+        return len(self.queue)
 
     def empty(self):
-        return not self._qsize()
+        return not self.queue
 
     def full(self):
-        return 0 < self.maxsize <= self._qsize()
-
-    def put(self, item):
-        if self.maxsize > 0 and self._qsize() >= self.maxsize:
-            return False
-        self._put(item)
-        return True
+        return 0 < self.maxsize <= len(self.queue)
 
-    def get(self):
-        if not self._qsize():
-            return False, None
-        return True, self._get()
+    async def put(self, items, timeout=None):
+        """Adds all items once there is room for them.
 
-    # Override these for different queue implementations
-    def _init(self, maxsize):
-        self.queue = deque()
-
-    def _qsize(self):
-        return len(self.queue)
+        Returns:
+            Whether the items were added before the timeout expired.
+        """
+        changed = self._get_condition()
+        async with changed:
+            has_room = await self._wait_for(
+                changed, lambda: self._has_room(len(items)), timeout)
+            if not has_room:
+                return False
+            self.queue.extend(items)
+            changed.notify_all()
+        return True
 
-    def _put(self, item):
-        self.queue.append(item)
+    async def get(self, num_items, timeout=None):
+        """Removes up to num_items items once the queue is non-empty.
 
-    def _get(self):
-        return self.queue.popleft()
+        Returns:
+            The removed items, or an empty list if the timeout expired.
+        """
+        changed = self._get_condition()
+        async with changed:
+            not_empty = await self._wait_for(changed, lambda: self.queue,
+                                             timeout)
+            if not not_empty:
+                return []
+            num_items = min(num_items, len(self.queue))
+            items = [self.queue.popleft() for _ in range(num_items)]
+            changed.notify_all()
+        return items
+
+    def _has_room(self, num_items):
+        return self.maxsize <= 0 or len(self.queue) + num_items <= self.maxsize
+
+    def _get_condition(self):
+        if self.changed is None:
+            self.changed = asyncio.Condition()
+        return self.changed
+
+    async def _wait_for(self, condition, predicate, timeout):
+        """Waits on the (held) condition until predicate() is true.
+
+        A timeout of 0 checks the predicate without waiting and None waits
+        forever. Returns whether the predicate holds.
+        """
+        if predicate():
+            return True
+        if timeout == 0:
+            return False
+        if timeout is None:
+            await condition.wait_for(predicate)
+            return True
+        try:
+            await asyncio.wait_for(condition.wait_for(predicate), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
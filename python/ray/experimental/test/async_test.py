@@ -46,6 +46,25 @@ def test_gather(init):
     assert all(a[0] == b[0] for a, b in zip(results, ray.get(tasks)))
 
 
+def test_as_futures(init, monkeypatch):
+    loop = asyncio.get_event_loop()
+    worker = ray.worker.global_worker
+    get_objects = worker.get_objects
+    num_gets = []
+
+    def counting_get_objects(object_ids, timeout=None):
+        num_gets.append(len(object_ids))
+        return get_objects(object_ids, timeout=timeout)
+
+    monkeypatch.setattr(worker, "get_objects", counting_get_objects)
+    object_ids = [ray.put(i) for i in range(100)]
+    futures = async_api.as_futures(object_ids)
+    results = loop.run_until_complete(asyncio.gather(*futures))
+    assert results == list(range(100))
+    # The objects were ready, so they were all fetched at once.
+    assert num_gets == [100]
+
+
 def test_wait(init):
     loop = asyncio.get_event_loop()
     tasks = gen_tasks()
@@ -4,6 +4,7 @@ import importlib
 import inspect
 import json
 import logging
+import os
 import sys
 import time
 import threading
@@ -49,8 +50,9 @@ class FunctionActorManager:
             and execution_info.
         _num_task_executions: The map from job_id to function
             execution times.
-        imported_actor_classes: The set of actor classes keys (format:
-            ActorClass:function_id) that are already in GCS.
+        _exported_blobs: The session indices and content hashes of the
+            pickled functions and classes that this worker has already
+            stored in GCS.
     """
 
     def __init__(self, worker):
@@ -64,16 +66,13 @@ class FunctionActorManager:
         # workers that execute remote functions.
         self._function_execution_info = defaultdict(lambda: {})
         self._num_task_executions = defaultdict(lambda: {})
-        # A set of all of the actor class keys that have been imported by the
-        # import thread. It is safe to convert this worker into an actor of
-        # these types.
-        self.imported_actor_classes = set()
+        self._exported_blobs = set()
         self._loaded_actor_classes = {}
         # Deserialize an ActorHandle will call load_actor_class(). If a
         # function closure captured an ActorHandle, the deserialization of the
         # function will be:
-        #     import_thread.py
-        #         -> fetch_and_register_remote_function (acquire lock)
+        #     _wait_for_function (acquire lock)
+        #         -> fetch_and_register_remote_function (acquire lock, too)
         #         -> _load_actor_class_from_gcs (acquire lock, too)
         # So, the lock should be a reentrant lock.
         self.lock = threading.RLock()
@@ -122,9 +121,81 @@ class FunctionActorManager:
         # Return a hash of the identifier in case it is too large.
         return hashlib.sha1(collision_identifier.encode("ascii")).digest()
 
+    def _export_blob(self, pickled):
+        """Store a pickled function or class in redis under its content hash.
+
+        Identical code that is exported by several jobs or drivers is only
+        stored once.
+
+        Args:
+            pickled: the pickled function or class.
+
+        Returns:
+            The content hash of the pickled function or class.
+        """
+        blob_hash = hashlib.sha1(pickled).digest()
+        # Each Ray session has its own GCS.
+        exported = (self._worker._session_index, blob_hash)
+        if exported not in self._exported_blobs:
+            key = b"FunctionBlob:" + blob_hash
+            # Check first so that we don't send large blobs more than once.
+            if not self._worker.redis_client.exists(key):
+                self._worker.redis_client.set(key, pickled, nx=True)
+            self._exported_blobs.add(exported)
+        return blob_hash
+
+    def _get_blob_cache_path(self, blob_hash):
+        node = self._worker.node
+        if node is None:
+            return None
+        return os.path.join(node.get_session_dir_path(), "function_cache",
+                            blob_hash.hex())
+
+    def _fetch_blob(self, blob_hash):
+        """Fetch a pickled function or class by its content hash.
+
+        Fetched blobs are cached in the session directory, so each node only
+        fetches a blob from redis once.
+
+        Args:
+            blob_hash: the content hash returned by _export_blob.
+
+        Returns:
+            The pickled function or class.
+        """
+        cache_path = self._get_blob_cache_path(blob_hash)
+        if cache_path is not None:
+            try:
+                with open(cache_path, "rb") as f:
+                    return f.read()
+            except OSError:
+                pass
+
+        pickled = self._worker.redis_client.get(b"FunctionBlob:" + blob_hash)
+        if pickled is None:
+            raise ValueError("The function or class with hash {} was not "
+                             "found in GCS.".format(blob_hash.hex()))
+        if cache_path is not None:
+            # Write to a temporary file first so that concurrent readers on
+            # this node never see a partial blob.
+            temp_path = "{}.{}".format(cache_path, os.getpid())
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(temp_path, "wb") as f:
+                    f.write(pickled)
+                os.replace(temp_path, cache_path)
+            except OSError:
+                logger.debug("Failed to cache function %s in %s.",
+                             blob_hash.hex(), cache_path)
+        return pickled
+
     def export(self, remote_function):
         """Pickle a remote function and export it to redis.
 
+        Only a small record is exported per job. The pickled function itself is
+        stored by content hash and workers fetch it the first time they are
+        asked to execute it.
+
         Args:
             remote_function: the RemoteFunction object.
         """
@@ -134,7 +205,7 @@ class FunctionActorManager:
             return
 
         function = remote_function._function
-        pickled_function = pickle.dumps(function)
+        pickled_function = remote_function._pickled_function
 
         check_oversized_pickle(pickled_function,
                                remote_function._function_name,
@@ -148,7 +219,7 @@ class FunctionActorManager:
                 function_id.binary(),
                 "function_name": remote_function._function_name,
                 "module": function.__module__,
-                "function": pickled_function,
+                "function_hash": self._export_blob(pickled_function),
                 "collision_identifier": self.compute_collision_identifier(
                     function),
                 "max_calls": remote_function._max_calls
@@ -156,13 +227,19 @@ class FunctionActorManager:
         self._worker.redis_client.rpush("Exports", key)
 
     def fetch_and_register_remote_function(self, key):
-        """Import a remote function."""
-        (job_id_str, function_id_str, function_name, serialized_function,
-         num_return_vals, module, resources,
+        """Import a remote function.
+
+        Returns:
+            False if the remote function has not been exported yet, True
+                otherwise.
+        """
+        (job_id_str, function_id_str, function_name, function_hash, module,
          max_calls) = self._worker.redis_client.hmget(key, [
-             "job_id", "function_id", "function_name", "function",
-             "num_return_vals", "module", "resources", "max_calls"
+             "job_id", "function_id", "function_name", "function_hash",
+             "module", "max_calls"
          ])
+        if function_hash is None:
+            return False
         function_id = ray.FunctionID(function_id_str)
         job_id = ray.JobID(job_id_str)
         function_name = decode(function_name)
@@ -186,7 +263,7 @@ class FunctionActorManager:
             self._num_task_executions[job_id][function_id] = 0
 
             try:
-                function = pickle.loads(serialized_function)
+                function = pickle.loads(self._fetch_blob(function_hash))
             except Exception:
                 # If an exception was thrown when the remote function was
                 # imported, we record the traceback and notify the scheduler
@@ -216,6 +293,7 @@ class FunctionActorManager:
                 self._worker.redis_client.rpush(
                     b"FunctionTable:" + function_id.binary(),
                     self._worker.worker_id)
+        return True
 
     def get_execution_info(self, job_id, function_descriptor):
         """Get the FunctionExecutionInfo of a remote function.
@@ -282,9 +360,11 @@ class FunctionActorManager:
     def _wait_for_function(self, function_descriptor, job_id, timeout=10):
         """Wait until the function to be executed is present on this worker.
 
-        This method will simply loop until the import thread has imported the
-        relevant function. If we spend too long in this loop, that may indicate
-        a problem somewhere and we will push an error message to the user.
+        Remote functions are fetched from GCS the first time this worker is
+        asked to execute them, so workers never load functions they don't run.
+        This method will loop until the function has been exported. If we
+        spend too long in this loop, that may indicate a problem somewhere and
+        we will push an error message to the user.
 
         If this worker is an actor, then this will wait until the actor has
         been defined.
@@ -300,12 +380,15 @@ class FunctionActorManager:
         warning_sent = False
         while True:
             with self.lock:
-                if (self._worker.actor_id.is_nil()
-                        and (function_descriptor.function_id in
-                             self._function_execution_info[job_id])):
-                    break
-                elif not self._worker.actor_id.is_nil() and (
-                        self._worker.actor_id in self._worker.actors):
+                function_id = function_descriptor.function_id
+                if self._worker.actor_id.is_nil():
+                    if function_id in self._function_execution_info[job_id]:
+                        break
+                    key = (b"RemoteFunction:" + job_id.binary() + b":" +
+                           function_id.binary())
+                    if self.fetch_and_register_remote_function(key):
+                        break
+                elif self._worker.actor_id in self._worker.actors:
                     break
             if time.time() - start_time > timeout:
                 warning_message = ("This worker was asked to execute a "
@@ -352,19 +435,19 @@ class FunctionActorManager:
         job_id = self._worker.current_job_id
         key = (b"ActorClass:" + job_id.binary() + b":" +
                actor_creation_function_descriptor.function_id.binary())
+        pickled_class = pickle.dumps(Class)
+        check_oversized_pickle(pickled_class,
+                               actor_creation_function_descriptor.class_name,
+                               "actor", self._worker)
         actor_class_info = {
             "class_name": actor_creation_function_descriptor.class_name,
             "module": actor_creation_function_descriptor.module_name,
-            "class": pickle.dumps(Class),
+            "class_hash": self._export_blob(pickled_class),
             "job_id": job_id.binary(),
             "collision_identifier": self.compute_collision_identifier(Class),
             "actor_method_names": json.dumps(list(actor_method_names))
         }
 
-        check_oversized_pickle(actor_class_info["class"],
-                               actor_class_info["class_name"], "actor",
-                               self._worker)
-
         self._publish_actor_class_to_key(key, actor_class_info)
         # TODO(rkn): Currently we allow actor classes to be defined
         # within tasks. I tried to disable this, but it may be necessary
@@ -470,19 +553,20 @@ class FunctionActorManager:
         """Load actor class from GCS."""
         key = (b"ActorClass:" + job_id.binary() + b":" +
                actor_creation_function_descriptor.function_id.binary())
-        # Wait for the actor class key to have been imported by the
-        # import thread. TODO(rkn): It shouldn't be possible to end
-        # up in an infinite loop here, but we should push an error to
-        # the driver if too much time is spent here.
-        while key not in self.imported_actor_classes:
+        # Wait for the actor class to have been exported. TODO(rkn): It
+        # shouldn't be possible to end up in an infinite loop here, but we
+        # should push an error to the driver if too much time is spent here.
+        while True:
+            (job_id_str, class_name, module, class_hash,
+             actor_method_names) = self._worker.redis_client.hmget(
+                 key, [
+                     "job_id", "class_name", "module", "class_hash",
+                     "actor_method_names"
+                 ])
+            if class_hash is not None:
+                break
             time.sleep(0.001)
 
-        # Fetch raw data from GCS.
-        (job_id_str, class_name, module, pickled_class,
-         actor_method_names) = self._worker.redis_client.hmget(
-             key,
-             ["job_id", "class_name", "module", "class", "actor_method_names"])
-
         class_name = ensure_str(class_name)
         module_name = ensure_str(module)
         job_id = ray.JobID(job_id_str)
@@ -491,7 +575,7 @@ class FunctionActorManager:
         actor_class = None
         try:
             with self.lock:
-                actor_class = pickle.loads(pickled_class)
+                actor_class = pickle.loads(self._fetch_blob(class_hash))
         except Exception:
             logger.exception("Failed to load actor class %s.", class_name)
             # The actor class failed to be unpickled, create a fake actor
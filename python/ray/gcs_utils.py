@@ -1,3 +1,6 @@
+import json
+import zlib
+
 from ray.core.generated.gcs_pb2 import (
     ActorCheckpointIdData,
     ActorTableData,
@@ -33,6 +36,8 @@ __all__ = [
     "TaskTableData",
     "ResourceTableData",
     "construct_error_message",
+    "decode_log_batch",
+    "encode_log_batch",
 ]
 
 FUNCTION_PREFIX = "RemoteFunction:"
@@ -60,6 +65,38 @@ TablePrefix_JOB_string = "JOB"
 TablePrefix_ACTOR_string = "ACTOR"
 
 
+def job_index_key(table_prefix_string, job_id):
+    """Get the key of the index of a job's entries in a table.
+
+    The Redis module adds the ID of every task and object table entry to the
+    index of its job on the shard that stores the entry.
+
+    Args:
+        table_prefix_string: The prefix of the table, either
+            TablePrefix_RAYLET_TASK_string or TablePrefix_OBJECT_string.
+        job_id: The binary ID of the job.
+
+    Returns:
+        The key of the set of the IDs of the job's entries in the table.
+    """
+    return "JOB_INDEX:{}:".format(table_prefix_string).encode("ascii") + job_id
+
+
+def finished_job_key(job_id):
+    """Get the key that marks a job as finished on a Redis shard.
+
+    The Redis module doesn't add the entries of a job to its indexes on a
+    shard once this key exists there.
+
+    Args:
+        job_id: The binary ID of the job.
+
+    Returns:
+        The key that marks the job as finished.
+    """
+    return b"FINISHED_JOB:" + job_id
+
+
 def construct_error_message(job_id, error_type, message, timestamp):
     """Construct a serialized ErrorTableData object.
 
@@ -79,3 +116,25 @@ def construct_error_message(job_id, error_type, message, timestamp):
     data.error_message = message
     data.timestamp = timestamp
     return data.SerializeToString()
+
+
+def encode_log_batch(batch):
+    """Serialize the log lines that the log monitor publishes in one message.
+
+    Args:
+        batch: A list of dicts, each with the "ip" and "pid" of a process and
+            the "lines" that it logged.
+
+    Returns:
+        The compressed message.
+    """
+    return zlib.compress(json.dumps(batch).encode("utf-8"))
+
+
+def decode_log_batch(data):
+    """Deserialize a message published to LOG_FILE_CHANNEL.
+
+    Returns:
+        The list of dicts passed to encode_log_batch.
+    """
+    return json.loads(zlib.decompress(data).decode("utf-8"))
@@ -135,20 +135,14 @@ class ImportThread:
                         "more discussion.", import_type, name,
                         ray_constants.DUPLICATE_REMOTE_FUNCTION_THRESHOLD)
 
-        if key.startswith(b"RemoteFunction"):
-            with profiling.profile("register_remote_function"):
-                (self.worker.function_actor_manager.
-                 fetch_and_register_remote_function(key))
-        elif key.startswith(b"FunctionsToRun"):
+        if key.startswith(b"FunctionsToRun"):
             with profiling.profile("fetch_and_run_function"):
                 self.fetch_and_execute_function_to_run(key)
-        elif key.startswith(b"ActorClass"):
-            # Keep track of the fact that this actor class has been
-            # exported so that we know it is safe to turn this worker
-            # into an actor of that class.
-            self.worker.function_actor_manager.imported_actor_classes.add(key)
-        # TODO(rkn): We may need to bring back the case of
-        # fetching actor classes here.
+        elif (key.startswith(b"RemoteFunction")
+              or key.startswith(b"ActorClass")):
+            # Remote functions and actor classes are fetched on demand by the
+            # FunctionActorManager the first time this worker needs them.
+            pass
         else:
             assert False, "This code should be unreachable."
 
@@ -1,7 +1,6 @@
 import argparse
 import errno
 import glob
-import json
 import logging
 import os
 import shutil
@@ -31,6 +30,41 @@ class LogFileInfo:
         self.file_position = file_position
         self.file_handle = file_handle
         self.worker_pid = None
+        self.read_first_line = False
+        # The bytes after the last newline read from the file.
+        self.partial_line = b""
+
+
+class LineRateLimiter:
+    """A token bucket limiting the number of lines a worker may publish.
+
+    The bucket holds up to one second's worth of lines, so bursts of up to
+    `max_lines_per_second` lines are published in full.
+    """
+
+    def __init__(self, max_lines_per_second, now):
+        self.max_lines_per_second = max_lines_per_second
+        self.tokens = max_lines_per_second
+        self.last_refill_time = now
+        # The number of lines suppressed since the last time this was
+        # reported, and the time of that report.
+        self.num_suppressed = 0
+        self.last_report_time = 0
+
+    def admit(self, num_lines, now):
+        """Take tokens for up to num_lines lines.
+
+        Returns:
+            The number of lines that may be published.
+        """
+        self.tokens = min(
+            self.max_lines_per_second, self.tokens +
+            (now - self.last_refill_time) * self.max_lines_per_second)
+        self.last_refill_time = now
+        num_admitted = min(num_lines, int(self.tokens))
+        self.tokens -= num_admitted
+        self.num_suppressed += num_lines - num_admitted
+        return num_admitted
 
 
 class LogMonitor:
@@ -48,8 +82,11 @@ class LogMonitor:
     3. Then, we will open as many closed files as we can that may have new
        lines (judged by an increase in file size since the last time the file
        was opened).
-    4. Then we will loop through the open files and see if there are any new
-       lines in the file. If so, we will publish them to Redis.
+    4. Then we will loop through the open files and read a chunk of any new
+       lines in each file.
+    5. At most once per LOG_MONITOR_PUBLISH_INTERVAL_MS, the lines read from
+       all of the files are published to Redis in one compressed message,
+       if anyone is subscribed to them.
 
     Attributes:
         host (str): The hostname of this machine. Used to improve the log
@@ -63,6 +100,9 @@ class LogMonitor:
             files.
         can_open_more_files (bool): True if we can still open more files and
             false otherwise.
+        pending_batch (list): The lines read since the last publish, as a
+            list of dicts with the "ip", "pid" and "lines" of each file.
+        rate_limiters (dict): The LineRateLimiter of each worker PID.
     """
 
     def __init__(self, logs_dir, redis_address, redis_password=None):
@@ -75,6 +115,10 @@ class LogMonitor:
         self.open_file_infos = []
         self.closed_file_infos = []
         self.can_open_more_files = True
+        self.pending_batch = []
+        self.rate_limiters = {}
+        self.has_subscribers = True
+        self.last_subscriber_check_time = 0
 
     def close_all_files(self):
         """Close all open files (so that we can open more)."""
@@ -88,6 +132,7 @@ class LogMonitor:
                 if file_info.worker_pid != "raylet":
                     os.kill(file_info.worker_pid, 0)
             except OSError:
+                self.rate_limiters.pop(file_info.worker_pid, None)
                 # The process is not alive any more, so move the log file
                 # out of the log directory so glob.glob will not be slowed
                 # by it.
@@ -181,74 +226,162 @@ class LogMonitor:
         # Add the files with no changes back to the list of closed files.
         self.closed_file_infos += files_with_no_updates
 
-    def check_log_files_and_publish_updates(self):
-        """Get any changes to the log files and push updates to Redis.
+    def check_subscribers(self):
+        """Check whether anyone is subscribed to the published lines.
+
+        A positive result is cached for
+        LOG_MONITOR_SUBSCRIBER_CHECK_INTERVAL_S. A negative one is not, since
+        lines are discarded while there are no subscribers, and a driver may
+        subscribe at any time.
+        """
+        now = time.time()
+        if (self.has_subscribers and now - self.last_subscriber_check_time <
+                ray_constants.LOG_MONITOR_SUBSCRIBER_CHECK_INTERVAL_S):
+            return True
+        self.last_subscriber_check_time = now
+        [(_, num_subscribers)] = self.redis_client.pubsub_numsub(
+            ray.gcs_utils.LOG_FILE_CHANNEL)
+        self.has_subscribers = num_subscribers > 0
+        return self.has_subscribers
+
+    def read_lines(self, file_info):
+        """Read a chunk of complete lines from an open file.
+
+        A trailing partial line is kept until the rest of it is written, or
+        until a later read finds no new data.
 
         Returns:
-            True if anything was published and false otherwise.
+            A tuple of the decoded lines, and whether the read was limited by
+                LOG_MONITOR_READ_CHUNK_BYTES.
         """
-        anything_published = False
+        chunk_bytes = ray_constants.LOG_MONITOR_READ_CHUNK_BYTES
+        try:
+            chunk = file_info.file_handle.read(chunk_bytes)
+        except Exception:
+            logger.error("Error: Reading file: {}, position: {} "
+                         "failed.".format(file_info.filename,
+                                          file_info.file_position))
+            raise
+        more_available = len(chunk) == chunk_bytes
+        data = file_info.partial_line + chunk
+        end = data.rfind(b"\n") + 1
+        if not chunk or (end == 0 and more_available):
+            # Flush a partial line that isn't growing, or that is longer than
+            # a whole chunk.
+            end = len(data)
+        file_info.partial_line = data[end:]
+        if end == 0:
+            return [], more_available
+        # Replace any characters not in UTF-8 with a replacement character,
+        # see https://stackoverflow.com/a/38565489/10891801
+        text = data[:end].decode("utf-8", "replace")
+        if text.endswith("\n"):
+            text = text[:-1]
+        return text.split("\n"), more_available
+
+    def check_log_files(self):
+        """Read new lines from the open files into the pending batch.
+
+        Returns:
+            True if any file may have more lines to read right away.
+        """
+        more_available = False
+        has_subscribers = self.check_subscribers()
+        now = time.time()
         for file_info in self.open_file_infos:
             assert not file_info.file_handle.closed
 
-            lines_to_publish = []
-            max_num_lines_to_read = 100
-            for _ in range(max_num_lines_to_read):
-                try:
-                    next_line = file_info.file_handle.readline()
-                    # Replace any characters not in UTF-8 with
-                    # a replacement character, see
-                    # https://stackoverflow.com/a/38565489/10891801
-                    next_line = next_line.decode("utf-8", "replace")
-                    if next_line == "":
-                        break
-                    if next_line[-1] == "\n":
-                        next_line = next_line[:-1]
-                    lines_to_publish.append(next_line)
-                except Exception:
-                    logger.error("Error: Reading file: {}, position: {} "
-                                 "failed.".format(
-                                     file_info.full_path,
-                                     file_info.file_info.file_handle.tell()))
-                    raise
-
-            if file_info.file_position == 0:
-                if (len(lines_to_publish) > 0 and
-                        lines_to_publish[0].startswith("Ray worker pid: ")):
-                    file_info.worker_pid = int(
-                        lines_to_publish[0].split(" ")[-1])
-                    lines_to_publish = lines_to_publish[1:]
+            if not has_subscribers and file_info.read_first_line:
+                # Nobody is listening, so skip to the end of the file.
+                file_info.file_handle.seek(0, os.SEEK_END)
+                file_info.file_position = file_info.file_handle.tell()
+                file_info.partial_line = b""
+                continue
+
+            lines, file_more_available = self.read_lines(file_info)
+            more_available = more_available or file_more_available
+
+            if len(lines) > 0 and not file_info.read_first_line:
+                file_info.read_first_line = True
+                if lines[0].startswith("Ray worker pid: "):
+                    file_info.worker_pid = int(lines[0].split(" ")[-1])
+                    lines = lines[1:]
                 elif "/raylet" in file_info.filename:
                     file_info.worker_pid = "raylet"
 
             # Record the current position in the file.
             file_info.file_position = file_info.file_handle.tell()
 
-            if len(lines_to_publish) > 0:
-                self.redis_client.publish(
-                    ray.gcs_utils.LOG_FILE_CHANNEL,
-                    json.dumps({
-                        "ip": self.ip,
-                        "pid": file_info.worker_pid,
-                        "lines": lines_to_publish
-                    }))
-                anything_published = True
+            if not has_subscribers:
+                continue
+            lines = self.rate_limit(file_info, lines, now)
+            if len(lines) > 0:
+                self.pending_batch.append({
+                    "ip": self.ip,
+                    "pid": file_info.worker_pid,
+                    "lines": lines
+                })
+
+        return more_available
+
+    def rate_limit(self, file_info, lines, now):
+        """Drop the lines of a worker that exceed its rate limit.
 
-        return anything_published
+        Returns:
+            The lines to publish. At most once a second, a line saying how
+                many lines were suppressed is added.
+        """
+        max_lines_per_second = ray_constants.LOG_MONITOR_MAX_LINES_PER_SECOND
+        if max_lines_per_second <= 0:
+            return lines
+        limiter = self.rate_limiters.get(file_info.worker_pid)
+        if limiter is None:
+            limiter = LineRateLimiter(max_lines_per_second, now)
+            self.rate_limiters[file_info.worker_pid] = limiter
+        lines = lines[:limiter.admit(len(lines), now)]
+        if limiter.num_suppressed > 0 and now - limiter.last_report_time >= 1:
+            lines.append("[{} lines suppressed, more than {} lines per second "
+                         "were logged. See the log files in {} for the full "
+                         "output.]".format(limiter.num_suppressed,
+                                           max_lines_per_second,
+                                           self.logs_dir))
+            limiter.num_suppressed = 0
+            limiter.last_report_time = now
+        return lines
+
+    def publish_updates(self):
+        """Publish the pending batch of lines to Redis in one message.
+
+        Returns:
+            True if anything was published and false otherwise.
+        """
+        if not self.pending_batch:
+            return False
+        batch, self.pending_batch = self.pending_batch, []
+        self.redis_client.publish(ray.gcs_utils.LOG_FILE_CHANNEL,
+                                  ray.gcs_utils.encode_log_batch(batch))
+        return True
 
     def run(self):
         """Run the log monitor.
 
-        This will query Redis once every second to check if there are new log
-        files to monitor. It will also store those log files in Redis.
+        This will check for new log files and new lines in them continuously,
+        and publish the new lines once every LOG_MONITOR_PUBLISH_INTERVAL_MS.
         """
+        publish_interval_s = (
+            ray_constants.LOG_MONITOR_PUBLISH_INTERVAL_MS / 1000)
+        last_publish_time = 0
         while True:
             self.update_log_filenames()
             self.open_closed_files()
-            anything_published = self.check_log_files_and_publish_updates()
-            # If nothing was published, then wait a little bit before checking
-            # for logs to avoid using too much CPU.
-            if not anything_published:
+            more_available = self.check_log_files()
+            now = time.time()
+            if now - last_publish_time >= publish_interval_s:
+                self.publish_updates()
+                last_publish_time = now
+            # If the files have no more lines right now, then wait a little
+            # bit before checking for logs to avoid using too much CPU.
+            if not more_available:
                 time.sleep(0.05)
 
 
@@ -1,14 +1,53 @@
+from contextlib import contextmanager
+import json
 import logging
 import os
 import sys
+import threading
 import time
 
 # Import ray before psutil will make sure we use psutil's bundled version
 import ray  # noqa F401
 import psutil  # noqa E402
+import ray.ray_constants as ray_constants  # noqa E402
 
 logger = logging.getLogger(__name__)
 
+# The prefix of the Redis hash of the current memory usage of a worker. The
+# key ends with the worker ID and expires unless the worker refreshes it.
+TASK_MEMORY_KEY_PREFIX = b"TaskMemory:"
+# The Redis hash with the peak memory usage of the tasks of each function and
+# actor, across all workers.
+TASK_MEMORY_STATS_KEY = b"TaskMemoryStats"
+# The Redis hash mapping function names to the largest growth of the memory
+# usage of a worker while executing one task of that function.
+TASK_MEMORY_PEAKS_KEY = b"TaskMemoryPeaks"
+# The worker keys expire after this many report intervals.
+TASK_MEMORY_TTL_REPORT_INTERVALS = 5
+
+# Sets a field of a Redis hash to a number if the number is larger.
+_HMAX_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if not current or tonumber(current) < tonumber(ARGV[2]) then
+    redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+end
+"""
+
+# Merges the peak usage of some tasks into a field of a Redis hash.
+_MERGE_PEAK_SCRIPT = """
+local update = cjson.decode(ARGV[2])
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if current then
+    current = cjson.decode(current)
+    update["num_tasks"] = update["num_tasks"] + current["num_tasks"]
+    for _, stat in ipairs({"peak_rss_bytes", "peak_uss_bytes",
+                           "peak_growth_bytes"}) do
+        update[stat] = math.max(update[stat], current[stat])
+    end
+end
+redis.call("HSET", KEYS[1], ARGV[1], cjson.encode(update))
+"""
+
 
 def get_rss(memory_info):
     """Get the estimated non-shared memory usage from psutil memory_info."""
@@ -28,6 +67,189 @@ def get_shared(virtual_memory):
         return 0
 
 
+def get_function_name(function_descriptor):
+    """Get the name that task memory usage is reported under."""
+    return ".".join(name for name in [
+        function_descriptor.module_name, function_descriptor.class_name,
+        function_descriptor.function_name
+    ] if name)
+
+
+class _RunningTask:
+    def __init__(self, function_name, actor_id, rss):
+        self.function_name = function_name
+        self.actor_id = actor_id
+        self.start_rss = rss
+        self.peak_rss = rss
+        self.peak_uss = 0
+
+
+class TaskMemoryTracker:
+    """Samples the memory usage of a worker while it executes tasks.
+
+    A background thread samples the non-shared RSS of the worker every
+    MEMORY_MONITOR_SAMPLE_INTERVAL_MS, and its USS, which is more expensive to
+    get, at most once a second. The samples are attributed to the tasks that
+    are running, and the peak usage of each function and actor is reported to
+    Redis every MEMORY_MONITOR_REPORT_INTERVAL_MS:
+
+    - TASK_MEMORY_KEY_PREFIX + worker ID is a hash with the current usage of
+      the worker under "worker". It expires after
+      TASK_MEMORY_TTL_REPORT_INTERVALS report intervals, so only live
+      workers are listed.
+    - TASK_MEMORY_STATS_KEY has the peak usage of each function and actor
+      under "function:<name>" and "actor:<actor ID>", merged across workers.
+    - TASK_MEMORY_PEAKS_KEY maps each function name to the largest growth of
+      the RSS of a worker during one of its tasks, across all workers.
+    """
+
+    def __init__(self, redis_client, worker_id, node_ip_address):
+        self.redis_client = redis_client
+        self.key = TASK_MEMORY_KEY_PREFIX + worker_id
+        self.node_ip_address = node_ip_address
+        self.process = psutil.Process(os.getpid())
+        self.lock = threading.Lock()
+        # Mapping from task ID to _RunningTask.
+        self.running_tasks = {}
+        # Mapping from "function:<name>" and "actor:<actor ID>" to the peak
+        # usage of the tasks that finished since the last report.
+        self.peaks = {}
+        # The largest RSS growth of a task of each function, for the functions
+        # that grew since the last report.
+        self.growths = {}
+        self.rss = 0
+        self.uss = 0
+        self.last_uss_time = 0
+        self.last_report_time = 0
+        self.last_reported_worker = None
+        self.last_write_time = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, name="ray_task_memory_tracker")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def task_started(self, task_id, function_name, actor_id=None):
+        rss = get_rss(self.process.memory_info())
+        with self.lock:
+            self.rss = rss
+            self.running_tasks[task_id] = _RunningTask(function_name, actor_id,
+                                                       rss)
+
+    def task_finished(self, task_id):
+        self.sample(include_uss=False)
+        with self.lock:
+            task = self.running_tasks.pop(task_id)
+            self._update_peak("function:" + task.function_name, task)
+            if task.actor_id is not None:
+                self._update_peak("actor:" + task.actor_id, task)
+            growth = task.peak_rss - task.start_rss
+            if growth > self.growths.get(task.function_name, -1):
+                self.growths[task.function_name] = growth
+
+    def _update_peak(self, field, task):
+        peak = self.peaks.get(field)
+        if peak is None:
+            peak = self.peaks[field] = {
+                "function": task.function_name,
+                "num_tasks": 0,
+                "peak_rss_bytes": 0,
+                "peak_uss_bytes": 0,
+                "peak_growth_bytes": 0,
+            }
+        peak["num_tasks"] += 1
+        peak["peak_rss_bytes"] = max(peak["peak_rss_bytes"], task.peak_rss)
+        peak["peak_uss_bytes"] = max(peak["peak_uss_bytes"], task.peak_uss)
+        peak["peak_growth_bytes"] = max(peak["peak_growth_bytes"],
+                                        task.peak_rss - task.start_rss)
+
+    def sample(self, include_uss=True):
+        """Sample the memory usage of the worker.
+
+        Args:
+            include_uss (bool): Whether to also sample the USS if it wasn't
+                sampled in the last second.
+        """
+        now = time.time()
+        memory_info = self.process.memory_info()
+        uss = None
+        if include_uss and now - self.last_uss_time >= 1:
+            self.last_uss_time = now
+            try:
+                uss = self.process.memory_full_info().uss
+            except (AttributeError, psutil.AccessDenied):
+                # USS is not available on all platforms.
+                uss = 0
+        rss = get_rss(memory_info)
+        with self.lock:
+            self.rss = rss
+            if uss is not None:
+                self.uss = uss
+            for task in self.running_tasks.values():
+                task.peak_rss = max(task.peak_rss, rss)
+                task.peak_uss = max(task.peak_uss, self.uss)
+
+    def report(self):
+        """Write the current usage and the new peaks to Redis."""
+        now = time.time()
+        ttl_s = (TASK_MEMORY_TTL_REPORT_INTERVALS *
+                 ray_constants.MEMORY_MONITOR_REPORT_INTERVAL_MS / 1000)
+        with self.lock:
+            running = list(self.running_tasks.items())
+            worker = {
+                "pid": self.process.pid,
+                "node_ip_address": self.node_ip_address,
+                "task_ids": [task_id for task_id, _ in running],
+                "functions": [task.function_name for _, task in running],
+                "actor_id": next((task.actor_id for _, task in running
+                                  if task.actor_id is not None), None),
+                "rss_bytes": self.rss,
+                "uss_bytes": self.uss,
+            }
+            if (worker == self.last_reported_worker and not self.peaks
+                    and not running
+                    and now - self.last_write_time < ttl_s / 2):
+                # Don't write to Redis while the worker is idle, except to
+                # keep its key from expiring.
+                return
+            self.last_reported_worker = dict(worker)
+            self.last_write_time = now
+            worker["timestamp"] = now
+            peaks = self.peaks
+            growths = self.growths
+            self.peaks = {}
+            self.growths = {}
+
+        pipe = self.redis_client.pipeline()
+        pipe.hmset(self.key, {"worker": json.dumps(worker)})
+        pipe.expire(self.key, int(ttl_s) + 1)
+        for field, peak in peaks.items():
+            pipe.eval(_MERGE_PEAK_SCRIPT, 1, TASK_MEMORY_STATS_KEY, field,
+                      json.dumps(peak))
+        for function_name, growth in growths.items():
+            pipe.eval(_HMAX_SCRIPT, 1, TASK_MEMORY_PEAKS_KEY, function_name,
+                      growth)
+        pipe.execute()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        sample_interval_s = (
+            ray_constants.MEMORY_MONITOR_SAMPLE_INTERVAL_MS / 1000)
+        report_interval_s = (
+            ray_constants.MEMORY_MONITOR_REPORT_INTERVAL_MS / 1000)
+        while not self.stopped.wait(timeout=sample_interval_s):
+            try:
+                self.sample()
+                if time.time() - self.last_report_time >= report_interval_s:
+                    self.last_report_time = time.time()
+                    self.report()
+            except Exception:
+                logger.exception("Failed to sample the memory usage of "
+                                 "tasks.")
+
+
 class RayOutOfMemoryError(Exception):
     def __init__(self, msg):
         Exception.__init__(self, msg)
@@ -81,6 +303,11 @@ class MemoryMonitor:
         self.last_checked = 0
         self.heap_limit = None
         self.worker_name = None
+        self.task_tracker = None
+        self.redis_client = None
+        # Mapping from function name to the time it was looked up and its
+        # historical peak memory growth, for admission control.
+        self.peak_growth_cache = {}
         try:
             self.error_threshold = float(
                 os.getenv("RAY_MEMORY_MONITOR_ERROR_THRESHOLD"))
@@ -103,19 +330,110 @@ class MemoryMonitor:
         self.heap_limit = limit_bytes
         self.worker_name = worker_name
 
+    def enable_task_tracking(self, redis_client, worker_id, node_ip_address):
+        """Start sampling the memory usage of the tasks of this worker.
+
+        This only has an effect if MEMORY_MONITOR_TRACK_TASKS or
+        MEMORY_MONITOR_ADMISSION_CONTROL is set.
+        """
+        self.redis_client = redis_client
+        if (not ray_constants.MEMORY_MONITOR_TRACK_TASKS
+                and not ray_constants.MEMORY_MONITOR_ADMISSION_CONTROL):
+            return
+        self.task_tracker = TaskMemoryTracker(redis_client, worker_id,
+                                              node_ip_address)
+
+    @contextmanager
+    def track_task(self, task_id, function_name, actor_id=None):
+        """Attribute the memory usage of the worker to a task while it runs.
+
+        Args:
+            task_id (str): The hex ID of the task.
+            function_name (str): The name returned by get_function_name.
+            actor_id (str): The hex ID of the actor, for actor tasks.
+        """
+        if self.task_tracker is None:
+            yield
+            return
+        self.task_tracker.task_started(task_id, function_name, actor_id)
+        try:
+            yield
+        finally:
+            self.task_tracker.task_finished(task_id)
+
+    def get_memory_usage_gb(self):
+        """Get the used and the total memory of the node or container."""
+        total_gb = psutil.virtual_memory().total / (1024**3)
+        used_gb = total_gb - psutil.virtual_memory().available / (1024**3)
+        if self.cgroup_memory_limit_gb < total_gb:
+            total_gb = self.cgroup_memory_limit_gb
+            with open("/sys/fs/cgroup/memory/memory.usage_in_bytes",
+                      "rb") as f:
+                used_gb = int(f.read()) / (1024**3)
+        return used_gb, total_gb
+
+    def get_peak_growth(self, function_name):
+        """Get the largest memory growth of a task of a function, in bytes.
+
+        The value is cached for MEMORY_MONITOR_REPORT_INTERVAL_MS.
+        """
+        now = time.time()
+        cached = self.peak_growth_cache.get(function_name)
+        if cached is not None and now - cached[0] < (
+                ray_constants.MEMORY_MONITOR_REPORT_INTERVAL_MS / 1000):
+            return cached[1]
+        peak_growth = self.redis_client.hget(TASK_MEMORY_PEAKS_KEY,
+                                             function_name)
+        peak_growth = int(peak_growth) if peak_growth is not None else 0
+        self.peak_growth_cache[function_name] = (now, peak_growth)
+        return peak_growth
+
+    def wait_for_memory(self, function_name):
+        """Delay a task until its historical peak usage fits in memory.
+
+        This only has an effect if MEMORY_MONITOR_ADMISSION_CONTROL is set.
+        The task is delayed while the historical peak memory growth of its
+        function would take the memory usage of the node over the error
+        threshold, for at most MEMORY_MONITOR_ADMISSION_TIMEOUT_S.
+        """
+        if (not ray_constants.MEMORY_MONITOR_ADMISSION_CONTROL
+                or self.redis_client is None):
+            return
+        peak_growth_gb = self.get_peak_growth(function_name) / (1024**3)
+        if peak_growth_gb == 0:
+            return
+        start = time.time()
+        delay = 0.1
+        delayed = False
+        while True:
+            used_gb, total_gb = self.get_memory_usage_gb()
+            free_gb = total_gb * self.error_threshold - used_gb
+            if peak_growth_gb <= free_gb:
+                return
+            if (time.time() - start >=
+                    ray_constants.MEMORY_MONITOR_ADMISSION_TIMEOUT_S):
+                logger.warning(
+                    "Running {} although it used up to {} GiB before and "
+                    "only {} GiB are free.".format(function_name,
+                                                   round(peak_growth_gb, 2),
+                                                   round(free_gb, 2)))
+                return
+            if not delayed:
+                delayed = True
+                logger.info("Delaying {}, which used up to {} GiB before, "
+                            "while only {} GiB are free.".format(
+                                function_name, round(peak_growth_gb, 2),
+                                round(free_gb, 2)))
+            time.sleep(delay)
+            delay = min(2 * delay, 1)
+
     def raise_if_low_memory(self):
         if time.time() - self.last_checked > self.check_interval:
             if "RAY_DEBUG_DISABLE_MEMORY_MONITOR" in os.environ:
                 return  # escape hatch, not intended for user use
 
             self.last_checked = time.time()
-            total_gb = psutil.virtual_memory().total / (1024**3)
-            used_gb = total_gb - psutil.virtual_memory().available / (1024**3)
-            if self.cgroup_memory_limit_gb < total_gb:
-                total_gb = self.cgroup_memory_limit_gb
-                with open("/sys/fs/cgroup/memory/memory.usage_in_bytes",
-                          "rb") as f:
-                    used_gb = int(f.read()) / (1024**3)
+            used_gb, total_gb = self.get_memory_usage_gb()
             if used_gb > total_gb * self.error_threshold:
                 raise RayOutOfMemoryError(
                     RayOutOfMemoryError.get_message(used_gb, total_gb,
@@ -1,4 +1,5 @@
 import argparse
+import itertools
 import logging
 import os
 import time
@@ -10,8 +11,7 @@ from ray.autoscaler.autoscaler import LoadMetrics, StandardAutoscaler
 import ray.gcs_utils
 import ray.utils
 import ray.ray_constants as ray_constants
-from ray.utils import (binary_to_hex, binary_to_object_id, binary_to_task_id,
-                       hex_to_binary, setup_logger)
+from ray.utils import binary_to_hex, setup_logger
 from ray.autoscaler.commands import teardown_cluster
 
 logger = logging.getLogger(__name__)
@@ -87,13 +87,18 @@ class Monitor:
                     heartbeat_message.resources_available_capacity))
             for resource in total_resources:
                 available_resources.setdefault(resource, 0.0)
+            resource_demands = [
+                (dict(demand.shape), demand.num_ready_requests_queued)
+                for demand in heartbeat_message.resource_load_by_shape
+            ]
 
             # Update the load metrics for this raylet.
             client_id = ray.utils.binary_to_hex(heartbeat_message.client_id)
             ip = self.raylet_id_to_ip_map.get(client_id)
             if ip:
                 self.load_metrics.update(ip, total_resources,
-                                         available_resources, resource_load)
+                                         available_resources, resource_load,
+                                         resource_demands)
             else:
                 logger.warning(
                     "Monitor: "
@@ -103,69 +108,50 @@ class Monitor:
         """Remove this job's object/task entries from redis.
 
         Removes control-state entries of all tasks and task return
-        objects belonging to the driver.
+        objects belonging to the driver. The entries are found through the
+        per-job indexes that each shard keeps, so the cost is proportional
+        to the number of the job's entries rather than the table sizes.
+        The job is first marked as finished on each shard, so that entries
+        written later aren't indexed again.
 
         Args:
             job_id: The job id.
         """
-
-        xray_task_table_prefix = (
-            ray.gcs_utils.TablePrefix_RAYLET_TASK_string.encode("ascii"))
-        xray_object_table_prefix = (
-            ray.gcs_utils.TablePrefix_OBJECT_string.encode("ascii"))
-
-        task_table_objects = ray.tasks()
-        job_id_hex = binary_to_hex(job_id)
-        job_task_id_bins = set()
-        for task_id_hex, task_info in task_table_objects.items():
-            task_table_object = task_info["TaskSpec"]
-            task_job_id_hex = task_table_object["JobID"]
-            if job_id_hex != task_job_id_hex:
-                # Ignore tasks that aren't from this driver.
-                continue
-            job_task_id_bins.add(hex_to_binary(task_id_hex))
-
-        # Get objects associated with the driver.
-        object_table_objects = ray.objects()
-        job_object_id_bins = set()
-        for object_id, _ in object_table_objects.items():
-            task_id_bin = ray._raylet.compute_task_id(object_id).binary()
-            if task_id_bin in job_task_id_bins:
-                job_object_id_bins.add(object_id.binary())
-
-        def to_shard_index(id_bin):
-            if len(id_bin) == ray.TaskID.size():
-                return binary_to_task_id(id_bin).redis_shard_hash() % len(
-                    ray.state.state.redis_clients)
-            else:
-                return binary_to_object_id(id_bin).redis_shard_hash() % len(
-                    ray.state.state.redis_clients)
-
-        # Form the redis keys to delete.
-        sharded_keys = [[] for _ in range(len(ray.state.state.redis_clients))]
-        for task_id_bin in job_task_id_bins:
-            sharded_keys[to_shard_index(task_id_bin)].append(
-                xray_task_table_prefix + task_id_bin)
-        for object_id_bin in job_object_id_bins:
-            sharded_keys[to_shard_index(object_id_bin)].append(
-                xray_object_table_prefix + object_id_bin)
-
-        # Remove with best effort.
-        for shard_index in range(len(sharded_keys)):
-            keys = sharded_keys[shard_index]
-            if len(keys) == 0:
+        for shard_index, redis in enumerate(ray.state.state.redis_clients):
+            redis.set(
+                ray.gcs_utils.finished_job_key(job_id),
+                1,
+                ex=ray_constants.MONITOR_FINISHED_JOB_TTL_S)
+            num_deleted = 0
+            num_indexed = 0
+            for table_prefix in [
+                    ray.gcs_utils.TablePrefix_RAYLET_TASK_string,
+                    ray.gcs_utils.TablePrefix_OBJECT_string
+            ]:
+                index_key = ray.gcs_utils.job_index_key(table_prefix, job_id)
+                key_prefix = table_prefix.encode("ascii")
+                entry_ids = redis.sscan_iter(
+                    index_key, count=ray_constants.MONITOR_CLEANUP_BATCH_SIZE)
+                while True:
+                    batch = list(
+                        itertools.islice(
+                            entry_ids,
+                            ray_constants.MONITOR_CLEANUP_BATCH_SIZE))
+                    if not batch:
+                        break
+                    num_indexed += len(batch)
+                    num_deleted += redis.delete(
+                        *[key_prefix + entry_id for entry_id in batch])
+                redis.delete(index_key)
+
+            if num_indexed == 0:
                 continue
-            redis = ray.state.state.redis_clients[shard_index]
-            num_deleted = redis.delete(*keys)
+            # Entries that were already deleted, e.g. by ray.internal.free,
+            # are still in the index, so this is only a rough count.
             logger.info("Monitor: "
                         "Removed {} dead redis entries of the "
                         "driver from redis shard {}.".format(
                             num_deleted, shard_index))
-            if num_deleted != len(keys):
-                logger.warning("Monitor: "
-                               "Failed to remove {} relevant redis "
-                               "entries from redis shard {}.".format(
-                                   len(keys) - num_deleted, shard_index))
 
     def xray_job_notification_handler(self, unused_channel, data):
         """Handle a notification that a job has been added or removed.
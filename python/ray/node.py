@@ -106,6 +106,7 @@ class Node:
 
         self._init_temp(redis_client)
 
+        self._worker_zygote_socket_name = None
         if connect_only:
             # Get socket names from the configuration.
             self._plasma_store_socket_name = (
@@ -134,6 +135,9 @@ class Node:
                 default_prefix="plasma_store")
             self._raylet_socket_name = self._prepare_socket_file(
                 self._ray_params.raylet_socket_name, default_prefix="raylet")
+            if self._ray_params.worker_zygote_modules is not None:
+                self._worker_zygote_socket_name = self._prepare_socket_file(
+                    None, default_prefix="worker_zygote")
 
         if head:
             ray_params.update_if_absent(num_redis_shards=1)
@@ -534,6 +538,21 @@ class Node:
             process_info
         ]
 
+    def start_worker_zygote(self):
+        """Start the worker zygote."""
+        stdout_file, stderr_file = self.new_log_files("worker_zygote")
+        process_info = ray.services.start_worker_zygote(
+            self._worker_zygote_socket_name,
+            self._ray_params.worker_zygote_modules,
+            stdout_file=stdout_file,
+            stderr_file=stderr_file,
+            fate_share=self.kernel_fate_share)
+        assert (
+            ray_constants.PROCESS_TYPE_WORKER_ZYGOTE not in self.all_processes)
+        self.all_processes[ray_constants.PROCESS_TYPE_WORKER_ZYGOTE] = [
+            process_info
+        ]
+
     def start_raylet(self, use_valgrind=False, use_profiler=False):
         """Start the raylet.
 
@@ -543,6 +562,15 @@ class Node:
             use_profiler (bool): True if we should start the process in the
                 valgrind profiler.
         """
+        object_spilling_directories = (
+            self._ray_params.object_spilling_directories)
+        if object_spilling_directories:
+            object_spilling_directories = [
+                os.path.abspath(os.path.expanduser(directory))
+                for directory in object_spilling_directories
+            ]
+            for directory in object_spilling_directories:
+                try_to_create_directory(directory)
         stdout_file, stderr_file = self.new_log_files("raylet")
         process_info = ray.services.start_raylet(
             self._redis_address,
@@ -564,6 +592,8 @@ class Node:
             include_java=self._ray_params.include_java,
             java_worker_options=self._ray_params.java_worker_options,
             load_code_from_local=self._ray_params.load_code_from_local,
+            worker_zygote_socket_name=self._worker_zygote_socket_name,
+            object_spilling_directories=object_spilling_directories,
             fate_share=self.kernel_fate_share)
         assert ray_constants.PROCESS_TYPE_RAYLET not in self.all_processes
         self.all_processes[ray_constants.PROCESS_TYPE_RAYLET] = [process_info]
@@ -635,6 +665,8 @@ class Node:
                 self._logs_dir))
 
         self.start_plasma_store()
+        if self._worker_zygote_socket_name is not None:
+            self.start_worker_zygote()
         self.start_raylet()
         self.start_reporter()
 
@@ -770,6 +802,16 @@ class Node:
         self._kill_process_type(
             ray_constants.PROCESS_TYPE_LOG_MONITOR, check_alive=check_alive)
 
+    def kill_worker_zygote(self, check_alive=True):
+        """Kill the worker zygote.
+
+        Args:
+            check_alive (bool): Raise an exception if the process was already
+                dead.
+        """
+        self._kill_process_type(
+            ray_constants.PROCESS_TYPE_WORKER_ZYGOTE, check_alive=check_alive)
+
     def kill_reporter(self, check_alive=True):
         """Kill the reporter.
 
@@ -81,6 +81,12 @@ class RayParams:
             Java worker.
         java_worker_options (list): The command options for Java worker.
         load_code_from_local: Whether load code from local file or from GCS.
+        worker_zygote_modules (list): If not None, Python workers are forked
+            from a per-node zygote process that has already imported Ray and
+            these modules, instead of being started from scratch.
+        object_spilling_directories (list): If not None, pinned objects are
+            spilled to files in these directories when the object store is
+            nearly full, and restored from them when they are needed again.
         _internal_config (str): JSON configuration for overriding
             RayConfig defaults. For testing purposes ONLY.
     """
@@ -121,6 +127,8 @@ class RayParams:
                  include_java=False,
                  java_worker_options=None,
                  load_code_from_local=False,
+                 worker_zygote_modules=None,
+                 object_spilling_directories=None,
                  _internal_config=None):
         self.object_id_seed = object_id_seed
         self.redis_address = redis_address
@@ -155,6 +163,8 @@ class RayParams:
         self.include_java = include_java
         self.java_worker_options = java_worker_options
         self.load_code_from_local = load_code_from_local
+        self.worker_zygote_modules = worker_zygote_modules
+        self.object_spilling_directories = object_spilling_directories
         self._internal_config = _internal_config
         self._check_usage()
 
@@ -129,6 +129,11 @@ AUTOSCALER_MAX_LAUNCH_BATCH = env_integer("AUTOSCALER_MAX_LAUNCH_BATCH", 5)
 AUTOSCALER_MAX_CONCURRENT_LAUNCHES = env_integer(
     "AUTOSCALER_MAX_CONCURRENT_LAUNCHES", 10)
 
+# Max number of nodes to sync file mounts to at a time. Syncs all read from
+# the head node, so this bounds the load on it when many nodes start.
+AUTOSCALER_MAX_CONCURRENT_SYNCS = env_integer(
+    "AUTOSCALER_MAX_CONCURRENT_SYNCS", 10)
+
 # Interval at which to perform autoscaling updates.
 AUTOSCALER_UPDATE_INTERVAL_S = env_integer("AUTOSCALER_UPDATE_INTERVAL_S", 5)
 
@@ -140,6 +145,44 @@ AUTOSCALER_HEARTBEAT_TIMEOUT_S = env_integer("AUTOSCALER_HEARTBEAT_TIMEOUT_S",
 # The reporter will report its statistics this often (milliseconds).
 REPORTER_UPDATE_INTERVAL_MS = env_integer("REPORTER_UPDATE_INTERVAL_MS", 2500)
 
+# The dashboard keeps at most this many bytes of log lines, and separately of
+# error messages, in memory for each worker process.
+DASHBOARD_LOG_BUFFER_BYTES = env_integer("DASHBOARD_LOG_BUFFER_BYTES",
+                                         1 * 1024 * 1024)
+# The dashboard moves older log lines and error messages to disk, up to this
+# many bytes for each worker process. If 0, they are dropped instead.
+DASHBOARD_LOG_SPILL_BYTES = env_integer("DASHBOARD_LOG_SPILL_BYTES", 0)
+# The dashboard forgets the log lines of a process once it hasn't sent any for
+# this many seconds. Error messages are kept.
+DASHBOARD_LOG_PROCESS_TTL_S = env_integer("DASHBOARD_LOG_PROCESS_TTL_S",
+                                          60 * 60)
+
+# If nonzero, workers sample their memory usage while executing tasks and
+# report the peak usage of each function and actor to Redis.
+MEMORY_MONITOR_TRACK_TASKS = env_integer("MEMORY_MONITOR_TRACK_TASKS", 0)
+# Workers sample their memory usage this often while executing tasks.
+MEMORY_MONITOR_SAMPLE_INTERVAL_MS = env_integer(
+    "MEMORY_MONITOR_SAMPLE_INTERVAL_MS", 100)
+# Workers report the peak memory usage of their tasks to Redis this often.
+MEMORY_MONITOR_REPORT_INTERVAL_MS = env_integer(
+    "MEMORY_MONITOR_REPORT_INTERVAL_MS", 2000)
+# If nonzero, workers delay tasks whose historical peak memory usage would
+# take the memory usage of the node over the memory monitor's error threshold,
+# for at most MEMORY_MONITOR_ADMISSION_TIMEOUT_S. This implies
+# MEMORY_MONITOR_TRACK_TASKS.
+MEMORY_MONITOR_ADMISSION_CONTROL = env_integer(
+    "MEMORY_MONITOR_ADMISSION_CONTROL", 0)
+MEMORY_MONITOR_ADMISSION_TIMEOUT_S = env_integer(
+    "MEMORY_MONITOR_ADMISSION_TIMEOUT_S", 30)
+
+# If nonzero, workers sample the stacks of their tasks every this many
+# milliseconds of CPU time. See ray.sampling_profiler.
+SAMPLING_PROFILER_INTERVAL_MS = env_integer("SAMPLING_PROFILER_INTERVAL_MS", 0)
+# Workers report their stack samples, and check whether a driver has started
+# or stopped the sampling profiler, this often.
+SAMPLING_PROFILER_REPORT_INTERVAL_MS = env_integer(
+    "SAMPLING_PROFILER_REPORT_INTERVAL_MS", 5000)
+
 # Max number of retries to AWS (default is 5, time increases exponentially)
 BOTO_MAX_RETRIES = env_integer("BOTO_MAX_RETRIES", 12)
 # Max number of retries to create an EC2 node (retry different subnet)
@@ -171,8 +214,30 @@ PROCESS_TYPE_PLASMA_STORE = "plasma_store"
 PROCESS_TYPE_REDIS_SERVER = "redis_server"
 PROCESS_TYPE_WEB_UI = "web_ui"
 PROCESS_TYPE_GCS_SERVER = "gcs_server"
+PROCESS_TYPE_WORKER_ZYGOTE = "worker_zygote"
 
 LOG_MONITOR_MAX_OPEN_FILES = 200
+# The log monitor reads at most this many bytes from each file at a time.
+LOG_MONITOR_READ_CHUNK_BYTES = env_integer("LOG_MONITOR_READ_CHUNK_BYTES",
+                                           64 * 1024)
+# The log monitor publishes the lines of all files in one message at most
+# this often.
+LOG_MONITOR_PUBLISH_INTERVAL_MS = env_integer(
+    "LOG_MONITOR_PUBLISH_INTERVAL_MS", 100)
+# The log monitor publishes at most this many lines per second from each
+# worker, and replaces the rest with a line saying how many were suppressed.
+# The full output is still in the log files. If 0, lines are not limited.
+LOG_MONITOR_MAX_LINES_PER_SECOND = env_integer(
+    "LOG_MONITOR_MAX_LINES_PER_SECOND", 1000)
+# How often the log monitor checks whether anyone is subscribed to the logs.
+LOG_MONITOR_SUBSCRIBER_CHECK_INTERVAL_S = 1
+
+# The number of task and object table entries of a finished job that the
+# monitor deletes with a single Redis command.
+MONITOR_CLEANUP_BATCH_SIZE = 1000
+# The monitor marks finished jobs on each Redis shard for this long, so that
+# the entries they write afterwards aren't added to the per-job indexes.
+MONITOR_FINISHED_JOB_TTL_S = 24 * 60 * 60
 
 # A constant used as object metadata to indicate the object is raw binary.
 RAW_BUFFER_METADATA = b"RAW"
@@ -198,3 +263,8 @@ MACH_PAGE_SIZE_BYTES = 4096
 # TODO(ffbin): Once we entirely migrate to service-based GCS, we should
 # remove it.
 RAY_GCS_SERVICE_ENABLED = "RAY_GCS_SERVICE_ENABLED"
+
+# Workers forked by the worker zygote register with the raylet using the pid
+# of the launcher process the raylet started, which is passed in this
+# environment variable.
+RAY_WORKER_LAUNCHER_PID_ENV = "RAY_WORKER_LAUNCHER_PID"
@@ -5,6 +5,7 @@ import time
 import numpy as np
 import multiprocessing
 import ray
+from ray.experimental.queue import Queue
 
 # Only run tests matching this filter pattern.
 filter_pattern = os.environ.get("TESTS_TO_RUN", "")
@@ -48,6 +49,11 @@ def small_value():
     return b"ok"
 
 
+@ray.remote
+def small_value_arg(x):
+    return b"ok"
+
+
 @ray.remote
 def small_value_batch(n):
     submitted = [small_value.remote() for _ in range(n)]
@@ -55,6 +61,20 @@ def small_value_batch(n):
     return 0
 
 
+@ray.remote(num_cpus=0)
+class QueueProducer:
+    def __init__(self, queue):
+        self.queue = queue
+
+    def produce(self, n, batch_size=1):
+        if batch_size > 1:
+            for _ in range(n // batch_size):
+                self.queue.put_batch([b"ok"] * batch_size)
+        else:
+            for _ in range(n):
+                self.queue.put(b"ok")
+
+
 def timeit(name, fn, multiplier=1):
     if filter_pattern not in name:
         return
@@ -127,6 +147,16 @@ def main():
 
     timeit("single client tasks async", small_task_async, 1000)
 
+    def small_task_batch():
+        ray.get(small_value.remote_batch([()] * 1000))
+
+    timeit("single client tasks batch", small_task_batch, 1000)
+
+    def small_task_map():
+        ray.get(small_value_arg.map(range(1000)))
+
+    timeit("single client tasks map", small_task_map, 1000)
+
     n = 10000
     m = 4
     actors = [Actor.remote() for _ in range(m)]
@@ -151,6 +181,11 @@ def main():
 
     timeit("1:1 actor calls async", actor_async, 1000)
 
+    def actor_batch():
+        ray.get(a.small_value.batch_remote([()] * 1000))
+
+    timeit("1:1 actor calls batch", actor_batch, 1000)
+
     a = Actor.options(max_concurrency=16).remote()
 
     def actor_concurrent():
@@ -190,6 +225,45 @@ def main():
     timeit("n:n actor calls with arg async", actor_multi2_direct_arg,
            n * len(clients))
 
+    n = 1000
+    q = Queue()
+
+    def queue_put_get():
+        q.put(b"ok")
+        q.get()
+
+    timeit("single client queue put/get", queue_put_get)
+
+    def queue_put_get_batch():
+        q.put_batch([b"ok"] * n)
+        q.get_batch(n)
+
+    timeit("single client queue put/get batch", queue_put_get_batch, n)
+
+    q = Queue(n)
+    producers = [QueueProducer.remote(q) for _ in range(n_cpu)]
+
+    def queue_producer_consumer():
+        ready = [p.produce.remote(n) for p in producers]
+        for _ in range(n * len(producers)):
+            q.get()
+        ray.get(ready)
+
+    timeit("n:1 queue producer/consumer", queue_producer_consumer,
+           n * len(producers))
+
+    batch_size = 100
+
+    def queue_producer_consumer_batch():
+        ready = [p.produce.remote(n, batch_size) for p in producers]
+        remaining = n * len(producers)
+        while remaining > 0:
+            remaining -= len(q.get_batch(remaining))
+        ray.get(ready)
+
+    timeit("n:1 queue producer/consumer batch", queue_producer_consumer_batch,
+           n * len(producers))
+
 
 if __name__ == "__main__":
     main()
@@ -136,23 +136,16 @@ class RemoteFunction:
             def remote(self, *args, **kwargs):
                 return func_cls._remote(args=args, kwargs=kwargs, **options)
 
-        return FuncWrapper()
+            def remote_batch(self, args_list, kwargs_list=None):
+                return func_cls._remote_batch(args_list, kwargs_list,
+                                              **options)
 
-    def _remote(self,
-                args=None,
-                kwargs=None,
-                num_return_vals=None,
-                is_direct_call=None,
-                num_cpus=None,
-                num_gpus=None,
-                memory=None,
-                object_store_memory=None,
-                resources=None,
-                max_retries=None):
-        """Submit the remote function for execution."""
-        worker = ray.worker.get_global_worker()
-        worker.check_connected()
+            def map(self, iterable):
+                return self.remote_batch([(item, ) for item in iterable])
+
+        return FuncWrapper()
 
+    def _export_if_needed(self, worker):
         # If this function was not exported in this session and job, we need to
         # export this function again, because the current GCS doesn't have it.
         if not self._is_cross_language and \
@@ -175,6 +168,132 @@ class RemoteFunction:
             self._last_export_session_and_job = worker.current_session_and_job
             worker.function_actor_manager.export(self)
 
+    def remote_batch(self, args_list, kwargs_list=None):
+        """Submit one task per entry of args_list in a single batch.
+
+        This is equivalent to [f.remote(*args, **kwargs) for args, kwargs in
+        zip(args_list, kwargs_list)], but much cheaper for many small tasks;
+        see `_remote_batch`.
+
+        Args:
+            args_list: A list with the positional arguments of each task.
+            kwargs_list: An optional list with the keyword arguments of each
+                task.
+
+        Returns:
+            A list with the ObjectID(s) returned by each task.
+        """
+        return self._remote_batch(args_list, kwargs_list)
+
+    def map(self, iterable):
+        """Submit one task per element of iterable in a single batch.
+
+        Each element is passed as the sole argument to the function, like
+        [f.remote(x) for x in iterable].
+
+        Returns:
+            A list with the ObjectID(s) returned by each task.
+        """
+        return self._remote_batch([(item, ) for item in iterable])
+
+    def _remote_batch(self,
+                      args_list,
+                      kwargs_list=None,
+                      num_return_vals=None,
+                      is_direct_call=None,
+                      num_cpus=None,
+                      num_gpus=None,
+                      memory=None,
+                      object_store_memory=None,
+                      resources=None,
+                      max_retries=None):
+        """Submit one task per entry of args_list (and kwargs_list).
+
+        Accepts the same options as `_remote`. The export check, resources
+        and task options are resolved once for the whole batch, and all tasks
+        are submitted through a single core worker call. Falls back
+        to calling `_remote` per task in local mode, for cross-language
+        functions, and for functions with an invocation decorator.
+
+        Returns:
+            A list with the ObjectID(s) returned by each task.
+        """
+        worker = ray.worker.get_global_worker()
+        worker.check_connected()
+
+        args_list = [[] if args is None else args for args in args_list]
+        if kwargs_list is None:
+            kwargs_list = [{}] * len(args_list)
+        else:
+            kwargs_list = [{} if kwargs is None else kwargs
+                           for kwargs in kwargs_list]
+            if len(kwargs_list) != len(args_list):
+                raise ValueError("args_list and kwargs_list must have the "
+                                 "same length.")
+
+        if (worker.mode == ray.worker.LOCAL_MODE or self._is_cross_language
+                or self._decorator is not None):
+            return [
+                self._remote(
+                    args=args,
+                    kwargs=kwargs,
+                    num_return_vals=num_return_vals,
+                    is_direct_call=is_direct_call,
+                    num_cpus=num_cpus,
+                    num_gpus=num_gpus,
+                    memory=memory,
+                    object_store_memory=object_store_memory,
+                    resources=resources,
+                    max_retries=max_retries)
+                for args, kwargs in zip(args_list, kwargs_list)
+            ]
+
+        self._export_if_needed(worker)
+
+        if num_return_vals is None:
+            num_return_vals = self._num_return_vals
+        if is_direct_call is not None and not is_direct_call:
+            raise ValueError("Non-direct call tasks are no longer supported.")
+        if max_retries is None:
+            max_retries = self._max_retries
+
+        resources = ray.utils.resources_from_resource_arguments(
+            self._num_cpus, self._num_gpus, self._memory,
+            self._object_store_memory, self._resources, num_cpus, num_gpus,
+            memory, object_store_memory, resources)
+
+        list_args_batch = ray.signature.flatten_args_batch(
+            self._function_signature, args_list, kwargs_list)
+        object_ids_batch = worker.core_worker.submit_tasks(
+            self._language, self._function_descriptor, list_args_batch,
+            num_return_vals, resources, max_retries)
+
+        results = []
+        for object_ids in object_ids_batch:
+            if len(object_ids) == 1:
+                results.append(object_ids[0])
+            elif len(object_ids) > 1:
+                results.append(object_ids)
+            else:
+                results.append(None)
+        return results
+
+    def _remote(self,
+                args=None,
+                kwargs=None,
+                num_return_vals=None,
+                is_direct_call=None,
+                num_cpus=None,
+                num_gpus=None,
+                memory=None,
+                object_store_memory=None,
+                resources=None,
+                max_retries=None):
+        """Submit the remote function for execution."""
+        worker = ray.worker.get_global_worker()
+        worker.check_connected()
+        self._export_if_needed(worker)
+
         kwargs = {} if kwargs is None else kwargs
         args = [] if args is None else args
 
@@ -0,0 +1,176 @@
+"""A low-overhead sampling profiler for the tasks that workers execute.
+
+While it is enabled, each worker samples the Python stack of its main thread
+every SAMPLING_PROFILER_INTERVAL_MS of CPU time, using a SIGPROF interval
+timer. Only samples taken while a task is executing are kept, and they are
+tagged with the name of the task's function. The worker periodically adds the
+counts of its samples to the Redis hash STACK_SAMPLES_KEY_PREFIX + job ID,
+keyed by the stack in the "folded" format used by flamegraph tools:
+
+    module.f;main_loop (worker.py:1);f (module.py:10);g (module.py:20) 42
+
+Python only runs signal handlers on the main thread, while it executes Python
+code, so only the tasks that execute on the main thread are sampled. The tasks
+of threaded actors (max_concurrency > 1) and async actors run on other threads
+while the main thread waits in the core worker, and are not sampled.
+
+The profiler is enabled on all workers if the SAMPLING_PROFILER_INTERVAL_MS
+environment variable is set, or while a driver has called `start()`.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import os
+import signal
+import threading
+
+import ray
+import ray.ray_constants as ray_constants
+
+logger = logging.getLogger(__name__)
+
+# The Redis key holding the sampling interval in milliseconds, if a driver
+# has started the profiler.
+SAMPLING_PROFILER_KEY = b"SamplingProfilerIntervalMs"
+# The prefix of the Redis hash of the stack sample counts of a job.
+STACK_SAMPLES_KEY_PREFIX = b"StackSamples:"
+# Frames deeper than this are not included in the samples.
+MAX_STACK_DEPTH = 128
+
+
+def start(interval_ms=10):
+    """Start sampling the stacks of the tasks on all workers.
+
+    This must be called on a driver. The workers pick up the change within
+    SAMPLING_PROFILER_REPORT_INTERVAL_MS.
+
+    Args:
+        interval_ms (int): The CPU time between samples of a worker.
+    """
+    ray.worker.global_worker.check_connected()
+    ray.worker.global_worker.redis_client.set(SAMPLING_PROFILER_KEY,
+                                              int(interval_ms))
+
+
+def stop():
+    """Stop sampling the stacks of the tasks on all workers."""
+    ray.worker.global_worker.check_connected()
+    ray.worker.global_worker.redis_client.set(SAMPLING_PROFILER_KEY, 0)
+
+
+def _format_frame(code):
+    filename = os.path.basename(code.co_filename)
+    frame = "{} ({}:{})".format(code.co_name, filename, code.co_firstlineno)
+    # Semicolons separate the frames of a stack.
+    return frame.replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the stacks of the tasks that a worker executes.
+
+    Attributes:
+        interval_ms (int): The current sampling interval, or 0 if the
+            profiler is disabled.
+        current_task: A (job ID, function name) pair for the task that the
+            main thread is executing, or None.
+        counts (Counter): The number of samples of each (current_task,
+            stack) pair since the last flush. The stack is a tuple of code
+            objects from the innermost frame outwards.
+    """
+
+    def __init__(self):
+        self.redis_client = None
+        self.interval_ms = 0
+        self.current_task = None
+        self.counts = Counter()
+        self.stopped = threading.Event()
+
+    def connect(self, redis_client):
+        """Install the signal handler and start the reporting thread.
+
+        This must be called from the main thread.
+        """
+        self.redis_client = redis_client
+        if signal.getsignal(signal.SIGPROF) != signal.SIG_DFL:
+            logger.warning("Not installing the sampling profiler because "
+                           "another SIGPROF handler is installed.")
+            return
+        signal.signal(signal.SIGPROF, self._handle_signal)
+        self.set_interval(ray_constants.SAMPLING_PROFILER_INTERVAL_MS)
+        thread = threading.Thread(
+            target=self._run, name="ray_sampling_profiler")
+        thread.daemon = True
+        thread.start()
+
+    @contextmanager
+    def track_task(self, job_id, function_name):
+        """Tag the samples taken while a task executes.
+
+        This has no effect if the task doesn't execute on the main thread.
+
+        Args:
+            job_id (str): The hex ID of the job of the task.
+            function_name (str): The name of the task's function.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        previous_task = self.current_task
+        self.current_task = (job_id, function_name)
+        try:
+            yield
+        finally:
+            self.current_task = previous_task
+
+    def set_interval(self, interval_ms):
+        """Set the sampling interval, or disable sampling if it is 0."""
+        if interval_ms == self.interval_ms:
+            return
+        interval_s = max(interval_ms, 0) / 1000
+        signal.setitimer(signal.ITIMER_PROF, interval_s, interval_s)
+        self.interval_ms = interval_ms
+
+    def _handle_signal(self, signum, frame):
+        current_task = self.current_task
+        if current_task is None:
+            return
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.counts[(current_task, tuple(stack))] += 1
+
+    def flush(self):
+        """Add the samples since the last flush to the counts in Redis."""
+        counts, self.counts = self.counts, Counter()
+        # The signal handler may still add to the old counter, so copy it.
+        counts = list(counts.items())
+        if not counts:
+            return
+        folded = Counter()
+        for ((job_id, function_name), stack), count in counts:
+            frames = [function_name]
+            frames.extend(_format_frame(code) for code in reversed(stack))
+            folded[(job_id, ";".join(frames))] += count
+        pipe = self.redis_client.pipeline()
+        for (job_id, stack), count in folded.items():
+            pipe.hincrby(STACK_SAMPLES_KEY_PREFIX + job_id.encode("ascii"),
+                         stack, count)
+        pipe.execute()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        report_interval_s = (
+            ray_constants.SAMPLING_PROFILER_REPORT_INTERVAL_MS / 1000)
+        while not self.stopped.wait(timeout=report_interval_s):
+            try:
+                interval_ms = self.redis_client.get(SAMPLING_PROFILER_KEY)
+                if interval_ms is None:
+                    interval_ms = ray_constants.SAMPLING_PROFILER_INTERVAL_MS
+                self.set_interval(int(interval_ms))
+                self.flush()
+            except Exception:
+                logger.exception("Failed to report stack samples.")
@@ -275,6 +275,20 @@ def dashboard(cluster_config_file, cluster_name, port):
     is_flag=True,
     default=False,
     help="Specify whether load code from local file or GCS serialization.")
+@click.option(
+    "--worker-zygote-modules",
+    required=False,
+    default=None,
+    type=str,
+    help="fork Python workers from a zygote process that has imported Ray "
+    "and this comma-separated list of modules (may be empty)")
+@click.option(
+    "--object-spilling-directories",
+    required=False,
+    default=None,
+    type=str,
+    help="comma-separated list of directories to spill objects to when the "
+    "object store is nearly full")
 def start(node_ip_address, redis_address, address, redis_port,
           num_redis_shards, redis_max_clients, redis_password,
           redis_shard_ports, object_manager_port, node_manager_port, memory,
@@ -282,7 +296,8 @@ def start(node_ip_address, redis_address, address, redis_port,
           head, include_webui, webui_host, block, plasma_directory, huge_pages,
           autoscaling_config, no_redirect_worker_output, no_redirect_output,
           plasma_store_socket_name, raylet_socket_name, temp_dir, include_java,
-          java_worker_options, load_code_from_local, internal_config):
+          java_worker_options, load_code_from_local, worker_zygote_modules,
+          object_spilling_directories, internal_config):
     if redis_address is not None:
         raise DeprecationWarning("The --redis-address argument is "
                                  "deprecated. Please use --address instead.")
@@ -304,6 +319,14 @@ def start(node_ip_address, redis_address, address, redis_port,
                         "    --resources='{\"CustomResource1\": 3, "
                         "\"CustomReseource2\": 2}'")
 
+    if worker_zygote_modules is not None:
+        worker_zygote_modules = [
+            module for module in worker_zygote_modules.split(",") if module
+        ]
+
+    if object_spilling_directories is not None:
+        object_spilling_directories = object_spilling_directories.split(",")
+
     redirect_worker_output = None if not no_redirect_worker_output else True
     redirect_output = None if not no_redirect_output else True
     ray_params = ray.parameter.RayParams(
@@ -328,6 +351,8 @@ def start(node_ip_address, redis_address, address, redis_port,
         webui_host=webui_host,
         java_worker_options=java_worker_options,
         load_code_from_local=load_code_from_local,
+        worker_zygote_modules=worker_zygote_modules,
+        object_spilling_directories=object_spilling_directories,
         _internal_config=internal_config)
     if head:
         # Start Ray on the head node.
@@ -906,20 +931,93 @@ def clusterbenchmark():
     required=False,
     type=str,
     help="Override the redis address to connect to.")
-def timeline(address):
+@click.option(
+    "--start",
+    required=False,
+    type=float,
+    help="only include events that ended after this UNIX timestamp, or this "
+    "many seconds ago if negative")
+@click.option(
+    "--end",
+    required=False,
+    type=float,
+    help="only include events that started before this UNIX timestamp, or "
+    "this many seconds ago if negative")
+@click.option(
+    "--job",
+    required=False,
+    type=str,
+    help="only include events of the job with this hex ID")
+@click.option(
+    "--node",
+    required=False,
+    type=str,
+    help="only include events of the node with this IP address")
+@click.option(
+    "--sample-rate",
+    required=False,
+    type=float,
+    help="only include about this fraction of the events of each type on "
+    "each worker")
+def timeline(address, start, end, job, node, sample_rate):
     if not address:
         address = services.find_redis_address_or_die()
     logger.info("Connecting to Ray instance at {}.".format(address))
     ray.init(address=address)
-    time = datetime.today().strftime("%Y-%m-%d_%H-%M-%S")
-    filename = "/tmp/ray-timeline-{}.json".format(time)
-    ray.timeline(filename=filename)
+    now = time.time()
+    if start is not None and start < 0:
+        start += now
+    if end is not None and end < 0:
+        end += now
+    filename = "/tmp/ray-timeline-{}.json".format(
+        datetime.today().strftime("%Y-%m-%d_%H-%M-%S"))
+    ray.timeline(
+        filename=filename,
+        start_time=start,
+        end_time=end,
+        job_id=job,
+        node_ip_address=node,
+        sample_rate=sample_rate)
     size = os.path.getsize(filename)
     logger.info("Trace file written to {} ({} bytes).".format(filename, size))
     logger.info(
         "You can open this with chrome://tracing in the Chrome browser.")
 
 
+@cli.command()
+@click.option(
+    "--address",
+    required=False,
+    type=str,
+    help="Override the address to connect to.")
+@click.option(
+    "--job",
+    required=False,
+    type=str,
+    help="only include samples of the job with this hex ID")
+@click.option(
+    "--function",
+    required=False,
+    type=str,
+    help="only include samples of tasks of this function, e.g. "
+    "my_module.MyActor.method")
+def flamegraph(address, job, function):
+    if not address:
+        address = services.find_redis_address_or_die()
+    logger.info("Connecting to Ray instance at {}.".format(address))
+    ray.init(address=address)
+    filename = "/tmp/ray-flamegraph-{}.txt".format(
+        datetime.today().strftime("%Y-%m-%d_%H-%M-%S"))
+    samples = ray.state.flamegraph(
+        filename=filename, job_id=job, function_name=function)
+    logger.info("Stack samples written to {} ({} samples).".format(
+        filename, sum(samples.values())))
+    logger.info("You can render them with flamegraph.pl or by opening them "
+                "in https://www.speedscope.app. To record samples, set "
+                "SAMPLING_PROFILER_INTERVAL_MS or call "
+                "ray.sampling_profiler.start().")
+
+
 @cli.command()
 @click.option(
     "--address",
@@ -966,6 +1064,7 @@ cli.add_command(microbenchmark)
 cli.add_command(stack)
 cli.add_command(stat)
 cli.add_command(timeline)
+cli.add_command(flamegraph)
 cli.add_command(project_cli)
 cli.add_command(session_cli)
 
@@ -1042,6 +1042,41 @@ def start_reporter(redis_address,
     return process_info
 
 
+def start_worker_zygote(socket_name,
+                        preload_modules,
+                        stdout_file=None,
+                        stderr_file=None,
+                        fate_share=None):
+    """Start a worker zygote process.
+
+    Args:
+        socket_name (str): The path of the Unix socket the zygote listens on.
+        preload_modules (list): The names of the modules to import in the
+            zygote before it forks workers.
+        stdout_file: A file handle opened for writing to redirect stdout to. If
+            no redirection should happen, then this should be None.
+        stderr_file: A file handle opened for writing to redirect stderr to. If
+            no redirection should happen, then this should be None.
+
+    Returns:
+        ProcessInfo for the process that was started.
+    """
+    zygote_filepath = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "workers/zygote.py")
+    command = [
+        sys.executable, "-u", zygote_filepath,
+        "--socket-name={}".format(socket_name), "--preload-modules={}".format(
+            ",".join(preload_modules))
+    ]
+    process_info = start_ray_process(
+        command,
+        ray_constants.PROCESS_TYPE_WORKER_ZYGOTE,
+        stdout_file=stdout_file,
+        stderr_file=stderr_file,
+        fate_share=fate_share)
+    return process_info
+
+
 def start_dashboard(require_webui,
                     host,
                     redis_address,
@@ -1184,6 +1219,8 @@ def start_raylet(redis_address,
                  include_java=False,
                  java_worker_options=None,
                  load_code_from_local=False,
+                 worker_zygote_socket_name=None,
+                 object_spilling_directories=None,
                  fate_share=None):
     """Start a raylet, which is a combined local scheduler and object manager.
 
@@ -1216,6 +1253,11 @@ def start_raylet(redis_address,
         include_java (bool): If True, the raylet backend can also support
             Java worker.
         java_worker_options (list): The command options for Java worker.
+        worker_zygote_socket_name (str): If provided, Python workers are
+            forked from the worker zygote listening on this socket.
+        object_spilling_directories (list): If provided, the raylet spills
+            pinned objects to files in these directories when they take up
+            too much of the object store.
     Returns:
         ProcessInfo for the process that was started.
     """
@@ -1260,9 +1302,17 @@ def start_raylet(redis_address,
         java_worker_command = []
 
     # Create the command that the Raylet will use to start workers.
-    start_worker_command = [
-        sys.executable, worker_path,
-        "--node-ip-address={}".format(node_ip_address),
+    if worker_zygote_socket_name is not None:
+        launcher_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "workers/zygote_worker.py")
+        start_worker_command = [
+            sys.executable, launcher_path, worker_zygote_socket_name
+        ]
+    else:
+        start_worker_command = [sys.executable]
+    start_worker_command += [
+        worker_path, "--node-ip-address={}".format(node_ip_address),
         "--node-manager-port={}".format(node_manager_port),
         "--object-store-name={}".format(plasma_store_name),
         "--raylet-name={}".format(raylet_name),
@@ -1300,7 +1350,11 @@ def start_raylet(redis_address,
         "--redis_password={}".format(redis_password or ""),
         "--temp_dir={}".format(temp_dir),
         "--session_dir={}".format(session_dir),
+        "--object_store_memory={}".format(resource_spec.object_store_memory),
     ]
+    if object_spilling_directories:
+        command.append("--object_spilling_directories={}".format(
+            ",".join(object_spilling_directories)))
     process_info = start_ray_process(
         command,
         ray_constants.PROCESS_TYPE_RAYLET,
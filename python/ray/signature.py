@@ -135,10 +135,54 @@ def flatten_args(signature_parameters, args, kwargs):
 
     restored = _restore_parameters(signature_parameters)
     reconstructed_signature = funcsigs.Signature(parameters=restored)
+    _bind(reconstructed_signature, args, kwargs)
+    return _flatten(args, kwargs)
+
+
+def flatten_args_batch(signature_parameters, args_list, kwargs_list):
+    """Validates and flattens the arguments of many calls at once.
+
+    Whether arguments fit in the signature only depends on the number of
+    positional arguments and the names of the keyword arguments, so the
+    arguments are only validated once for each such call shape.
+
+    Args:
+        signature_parameters (list): The list of RayParameter objects
+            representing the function signature, obtained from
+            `extract_signature`.
+        args_list: A list of the non-keyword arguments of each call.
+        kwargs_list: A list of the keyword arguments of each call.
+
+    Returns:
+        A list of flattened argument lists, one per call, see `flatten_args`.
+
+    Raises:
+        TypeError: Raised if the arguments of any call do not fit in the
+            function signature.
+    """
+    restored = _restore_parameters(signature_parameters)
+    reconstructed_signature = funcsigs.Signature(parameters=restored)
+    valid_shapes = set()
+    list_args_batch = []
+    for args, kwargs in zip(args_list, kwargs_list):
+        shape = (len(args), frozenset(kwargs))
+        if shape not in valid_shapes:
+            _bind(reconstructed_signature, args, kwargs)
+            valid_shapes.add(shape)
+        list_args_batch.append(_flatten(args, kwargs))
+    return list_args_batch
+
+
+def _bind(signature, args, kwargs):
+    """Raises a TypeError if the arguments do not fit in the signature."""
     try:
-        reconstructed_signature.bind(*args, **kwargs)
+        signature.bind(*args, **kwargs)
     except TypeError as exc:
         raise TypeError(str(exc))
+
+
+def _flatten(args, kwargs):
+    """Flattens arguments without validating them, see `flatten_args`."""
     list_args = []
     for arg in args:
         list_args += [DUMMY_TYPE, arg]
@@ -1,7 +1,12 @@
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import itertools
 import json
 import logging
+import math
+import queue
 import sys
+import threading
 import time
 
 import ray
@@ -15,6 +20,66 @@ from ray.utils import (decode, binary_to_object_id, binary_to_hex,
 
 logger = logging.getLogger(__name__)
 
+# The number of keys that are looked up in a single Redis pipeline when
+# fetching a whole table.
+TABLE_LOOKUP_BATCH_SIZE = 1000
+
+
+def _iter_concurrently(batch_iterators):
+    """Consume iterators of batches concurrently and stream their items.
+
+    Each iterator is consumed on its own thread, so the (blocking) work of
+    producing the next batch overlaps across iterators. Only a few batches
+    per iterator are buffered, and the threads stop early if the returned
+    generator is closed before it is exhausted.
+
+    Args:
+        batch_iterators: A list of iterators that yield lists of items.
+
+    Yields:
+        The items of all batches, in the order that the batches arrive.
+    """
+    if len(batch_iterators) == 1:
+        for batch in batch_iterators[0]:
+            yield from batch
+        return
+
+    done = object()
+    results = queue.Queue(maxsize=2 * len(batch_iterators))
+    stopped = threading.Event()
+
+    def produce(batches):
+        try:
+            for batch in batches:
+                results.put(batch)
+                if stopped.is_set():
+                    break
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    executor = ThreadPoolExecutor(max_workers=len(batch_iterators))
+    for batches in batch_iterators:
+        executor.submit(produce, batches)
+    num_running = len(batch_iterators)
+    try:
+        while num_running > 0:
+            result = results.get()
+            if result is done:
+                num_running -= 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield from result
+    finally:
+        # Unblock the producers and wait for them to exit.
+        stopped.set()
+        while num_running > 0:
+            if results.get() is done:
+                num_running -= 1
+        executor.shutdown()
+
 
 def _parse_client_table(redis_client):
     """Read the client table.
@@ -116,6 +181,23 @@ def _parse_resource_table(redis_client, client_id):
     return resources
 
 
+def _dump_json_array(items, outfile):
+    """Write the items to a file as a JSON array, one item at a time.
+
+    Unlike json.dump, this doesn't need all of the items in memory at once.
+
+    Args:
+        items: An iterable of JSON-serializable items.
+        outfile: The file to write to.
+    """
+    outfile.write("[")
+    for i, item in enumerate(items):
+        if i > 0:
+            outfile.write(",\n")
+        outfile.write(json.dumps(item))
+    outfile.write("]")
+
+
 class GlobalState:
     """A class used to interface with the Ray control state.
 
@@ -241,6 +323,77 @@ class GlobalState:
             result.extend(list(client.scan_iter(match=pattern)))
         return result
 
+    def _iter_table(self, table_name, redis_clients, key_filter=None):
+        """Stream the raw entries of a table from the given Redis shards.
+
+        The keys of each shard are scanned and looked up in pipelined batches
+        of TABLE_LOOKUP_BATCH_SIZE, and the shards are queried concurrently.
+
+        Args:
+            table_name: The name of the table's prefix, e.g. "OBJECT".
+            redis_clients: Clients for the Redis shards that hold the table.
+            key_filter: If provided, only the keys (without the table prefix)
+                for which this returns True are looked up.
+
+        Yields:
+            Tuples of a key without the table prefix and the raw GCS entry
+                stored under it. Keys that are deleted between the scan and
+                the lookup are skipped.
+        """
+        table_prefix = gcs_utils.TablePrefix.Value(table_name)
+
+        def lookup(client, keys):
+            pipeline = client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.execute_command("RAY.TABLE_LOOKUP", table_prefix, "",
+                                         key)
+            return [(key, message)
+                    for key, message in zip(keys, pipeline.execute())
+                    if message is not None]
+
+        def lookup_shard(client):
+            keys = []
+            for key in client.scan_iter(
+                    match=table_name + "*", count=TABLE_LOOKUP_BATCH_SIZE):
+                key = key[len(table_name):]
+                if key_filter is not None and not key_filter(key):
+                    continue
+                keys.append(key)
+                if len(keys) == TABLE_LOOKUP_BATCH_SIZE:
+                    yield lookup(client, keys)
+                    keys = []
+            if keys:
+                yield lookup(client, keys)
+
+        return _iter_concurrently(
+            [lookup_shard(client) for client in redis_clients])
+
+    def _job_id_key_filter(self, job_id, id_type):
+        """Return a key filter that only matches IDs of the given job.
+
+        Task IDs end with an actor ID, which in turn ends with the ID of the
+        job, and object IDs start with the ID of the task that created them.
+        This lets us filter these tables by job without looking keys up.
+
+        Args:
+            job_id: A JobID or hex string of the job to match, or None to
+                match all jobs.
+            id_type: The type of the ID at the start of the keys, either
+                ray.ActorID or ray.TaskID.
+
+        Returns:
+            A function that takes a key and returns whether it matches, or
+                None if job_id is None.
+        """
+        if job_id is None:
+            return None
+        if not isinstance(job_id, ray.JobID):
+            job_id = ray.JobID(hex_to_binary(job_id))
+        job_id_binary = job_id.binary()
+        id_length = len(id_type.nil().binary())
+        start = id_length - len(job_id_binary)
+        return lambda key: key[start:id_length] == job_id_binary
+
     def _object_table(self, object_id):
         """Fetch and parse the object table information for a single object ID.
 
@@ -260,6 +413,10 @@ class GlobalState:
                                         "", object_id.binary())
         if message is None:
             return {}
+        return self._parse_object_table_entry(message)
+
+    def _parse_object_table_entry(self, message):
+        """Parse the object table entry of a single object ID."""
         gcs_entry = gcs_utils.GcsEntry.FromString(message)
 
         assert len(gcs_entry.entries) > 0
@@ -273,12 +430,33 @@ class GlobalState:
 
         return object_info
 
-    def object_table(self, object_id=None):
+    def iter_object_table(self, job_id=None):
+        """Stream the object table.
+
+        Args:
+            job_id: A JobID or hex string. If provided, only the objects
+                created by this job are fetched.
+
+        Yields:
+            Tuples of an object ID and information about that object.
+        """
+        self._check_connected()
+        entries = self._iter_table(gcs_utils.TablePrefix_OBJECT_string,
+                                   self.redis_clients,
+                                   self._job_id_key_filter(job_id, ray.TaskID))
+        for object_id_binary, message in entries:
+            yield (binary_to_object_id(object_id_binary),
+                   self._parse_object_table_entry(message))
+
+    def object_table(self, object_id=None, job_id=None, limit=None):
         """Fetch and parse the object table info for one or more object IDs.
 
         Args:
             object_id: An object ID to fetch information about. If this is
                 None, then the entire object table is fetched.
+            job_id: A JobID or hex string. If provided, only the objects
+                created by this job are fetched.
+            limit: If provided, at most this many objects are fetched.
 
         Returns:
             Information from the object table.
@@ -289,17 +467,8 @@ class GlobalState:
             return self._object_table(object_id)
         else:
             # Return the entire object table.
-            object_keys = self._keys(gcs_utils.TablePrefix_OBJECT_string + "*")
-            object_ids_binary = {
-                key[len(gcs_utils.TablePrefix_OBJECT_string):]
-                for key in object_keys
-            }
-
-            results = {}
-            for object_id_binary in object_ids_binary:
-                results[binary_to_object_id(object_id_binary)] = (
-                    self._object_table(binary_to_object_id(object_id_binary)))
-            return results
+            return dict(
+                itertools.islice(self.iter_object_table(job_id), limit))
 
     def _actor_table(self, actor_id):
         """Fetch and parse the actor table information for a single actor ID.
@@ -316,6 +485,10 @@ class GlobalState:
             actor_id.binary())
         if message is None:
             return {}
+        return self._parse_actor_table_entry(message)
+
+    def _parse_actor_table_entry(self, message):
+        """Parse the actor table entry of a single actor ID."""
         gcs_entries = gcs_utils.GcsEntry.FromString(message)
 
         assert len(gcs_entries.entries) > 0
@@ -340,12 +513,42 @@ class GlobalState:
 
         return actor_info
 
-    def actor_table(self, actor_id=None):
+    def iter_actor_table(self, job_id=None):
+        """Stream the actor table.
+
+        Args:
+            job_id: A JobID or hex string. If provided, only the actors
+                created by this job are fetched.
+
+        Yields:
+            Tuples of an actor ID hex string and information about that
+                actor.
+        """
+        self._check_connected()
+        actor_id_length = len(ray.ActorID.nil().binary())
+        job_id_filter = self._job_id_key_filter(job_id, ray.ActorID)
+
+        def key_filter(key):
+            # Skip the keys of other tables that share the "ACTOR" prefix,
+            # e.g. ACTOR_CHECKPOINT.
+            return len(key) == actor_id_length and (job_id_filter is None
+                                                    or job_id_filter(key))
+
+        entries = self._iter_table(gcs_utils.TablePrefix_ACTOR_string,
+                                   [self.redis_client], key_filter)
+        for actor_id_binary, message in entries:
+            yield (binary_to_hex(actor_id_binary),
+                   self._parse_actor_table_entry(message))
+
+    def actor_table(self, actor_id=None, job_id=None, limit=None):
         """Fetch and parse the actor table information for one or more actor IDs.
 
         Args:
             actor_id: A hex string of the actor ID to fetch information about.
                 If this is None, then the actor table is fetched.
+            job_id: A JobID or hex string. If provided, only the actors
+                created by this job are fetched.
+            limit: If provided, at most this many actors are fetched.
 
         Returns:
             Information from the actor table.
@@ -355,19 +558,7 @@ class GlobalState:
             actor_id = ray.ActorID(hex_to_binary(actor_id))
             return self._actor_table(actor_id)
         else:
-            actor_table_keys = list(
-                self.redis_client.scan_iter(
-                    match=gcs_utils.TablePrefix_ACTOR_string + "*"))
-            actor_ids_binary = [
-                key[len(gcs_utils.TablePrefix_ACTOR_string):]
-                for key in actor_table_keys
-            ]
-
-            results = {}
-            for actor_id_binary in actor_ids_binary:
-                results[binary_to_hex(actor_id_binary)] = self._actor_table(
-                    ray.ActorID(actor_id_binary))
-            return results
+            return dict(itertools.islice(self.iter_actor_table(job_id), limit))
 
     def _task_table(self, task_id):
         """Fetch and parse the task table information for a single task ID.
@@ -384,6 +575,10 @@ class GlobalState:
             gcs_utils.TablePrefix.Value("RAYLET_TASK"), "", task_id.binary())
         if message is None:
             return {}
+        return self._parse_task_table_entry(message)
+
+    def _parse_task_table_entry(self, message):
+        """Parse the task table entry of a single task ID."""
         gcs_entries = gcs_utils.GcsEntry.FromString(message)
 
         assert len(gcs_entries.entries) == 1
@@ -421,12 +616,33 @@ class GlobalState:
             "TaskSpec": task_spec_info
         }
 
-    def task_table(self, task_id=None):
+    def iter_task_table(self, job_id=None):
+        """Stream the task table.
+
+        Args:
+            job_id: A JobID or hex string. If provided, only the tasks of
+                this job are fetched.
+
+        Yields:
+            Tuples of a task ID hex string and information about that task.
+        """
+        self._check_connected()
+        entries = self._iter_table(gcs_utils.TablePrefix_RAYLET_TASK_string,
+                                   self.redis_clients,
+                                   self._job_id_key_filter(job_id, ray.TaskID))
+        for task_id_binary, message in entries:
+            yield (binary_to_hex(task_id_binary),
+                   self._parse_task_table_entry(message))
+
+    def task_table(self, task_id=None, job_id=None, limit=None):
         """Fetch and parse the task table information for one or more task IDs.
 
         Args:
             task_id: A hex string of the task ID to fetch information about. If
                 this is None, then the task object table is fetched.
+            job_id: A JobID or hex string. If provided, only the tasks of
+                this job are fetched.
+            limit: If provided, at most this many tasks are fetched.
 
         Returns:
             Information from the task table.
@@ -436,18 +652,7 @@ class GlobalState:
             task_id = ray.TaskID(hex_to_binary(task_id))
             return self._task_table(task_id)
         else:
-            task_table_keys = self._keys(
-                gcs_utils.TablePrefix_RAYLET_TASK_string + "*")
-            task_ids_binary = [
-                key[len(gcs_utils.TablePrefix_RAYLET_TASK_string):]
-                for key in task_table_keys
-            ]
-
-            results = {}
-            for task_id_binary in task_ids_binary:
-                results[binary_to_hex(task_id_binary)] = self._task_table(
-                    ray.TaskID(task_id_binary))
-            return results
+            return dict(itertools.islice(self.iter_task_table(job_id), limit))
 
     def client_table(self):
         """Fetch and parse the Redis DB client table.
@@ -542,8 +747,6 @@ class GlobalState:
         Returns:
             A list of the profile events for the specified batch.
         """
-        # TODO(rkn): This method should support limiting the number of log
-        # events and should also support returning a window of events.
         message = self._execute_command(batch_id, "RAY.TABLE_LOOKUP",
                                         gcs_utils.TablePrefix.Value("PROFILE"),
                                         "", batch_id.binary())
@@ -551,6 +754,24 @@ class GlobalState:
         if message is None:
             return []
 
+        return self._parse_profile_table_entry(message)
+
+    def _parse_profile_table_entry(self,
+                                   message,
+                                   start_time=None,
+                                   end_time=None):
+        """Parse the profile events of a single batch.
+
+        Args:
+            message: The raw GCS entry of the batch.
+            start_time: If provided, events that ended before this time are
+                skipped.
+            end_time: If provided, events that started after this time are
+                skipped.
+
+        Returns:
+            A list of the profile events in the batch.
+        """
         gcs_entries = gcs_utils.GcsEntry.FromString(message)
 
         profile_events = []
@@ -563,6 +784,11 @@ class GlobalState:
             node_ip_address = profile_table_message.node_ip_address
 
             for profile_event_message in profile_table_message.profile_events:
+                if ((start_time is not None
+                     and profile_event_message.end_time < start_time)
+                        or (end_time is not None
+                            and profile_event_message.start_time > end_time)):
+                    continue
                 try:
                     extra_data = json.loads(profile_event_message.extra_data)
                 except ValueError:
@@ -574,6 +800,7 @@ class GlobalState:
                     "component_type": component_type,
                     "start_time": profile_event_message.start_time,
                     "end_time": profile_event_message.end_time,
+                    "job_id": binary_to_hex(profile_event_message.job_id),
                     "extra_data": extra_data
                 }
 
@@ -581,23 +808,48 @@ class GlobalState:
 
         return profile_events
 
-    def profile_table(self):
+    def iter_profile_events(self, start_time=None, end_time=None):
+        """Stream the profile events of all components.
+
+        Args:
+            start_time: If provided, only events that ended at or after this
+                time (in seconds since the epoch) are returned.
+            end_time: If provided, only events that started at or before
+                this time are returned.
+
+        Yields:
+            Profile events. Each profile event is a dictionary.
+        """
         self._check_connected()
-        profile_table_keys = self._keys(gcs_utils.TablePrefix_PROFILE_string +
-                                        "*")
-        batch_identifiers_binary = [
-            key[len(gcs_utils.TablePrefix_PROFILE_string):]
-            for key in profile_table_keys
-        ]
+        # Note that if keys are being evicted from Redis, then it is possible
+        # that a batch will be evicted before we get it. Such batches are
+        # skipped.
+        entries = self._iter_table(gcs_utils.TablePrefix_PROFILE_string,
+                                   self.redis_clients)
+        for _, message in entries:
+            yield from self._parse_profile_table_entry(message, start_time,
+                                                       end_time)
+
+    def profile_table(self, start_time=None, end_time=None, limit=None):
+        """Fetch the profile events of all components.
+
+        Args:
+            start_time: If provided, only events that ended at or after this
+                time (in seconds since the epoch) are fetched.
+            end_time: If provided, only events that started at or before
+                this time are fetched.
+            limit: If provided, at most this many events are fetched.
 
+        Returns:
+            A dictionary mapping component ID hex strings to lists of their
+                profile events.
+        """
+        self._check_connected()
         result = defaultdict(list)
-        for batch_id in batch_identifiers_binary:
-            profile_data = self._profile_table(binary_to_object_id(batch_id))
-            # Note that if keys are being evicted from Redis, then it is
-            # possible that the batch will be evicted before we get it.
-            if len(profile_data) > 0:
-                component_id = profile_data[0]["component_id"]
-                result[component_id].extend(profile_data)
+        profile_events = itertools.islice(
+            self.iter_profile_events(start_time, end_time), limit)
+        for profile_event in profile_events:
+            result[profile_event["component_id"]].append(profile_event)
 
         return dict(result)
 
@@ -662,7 +914,106 @@ class GlobalState:
         "cq_build_attempt_failed",
     ]
 
-    def chrome_tracing_dump(self, filename=None):
+    def _filter_profile_events(self,
+                               component_types,
+                               start_time=None,
+                               end_time=None,
+                               job_id=None,
+                               node_ip_address=None):
+        """Stream the profile events that match the given filters.
+
+        Args:
+            component_types: The types of the components to include events
+                of, e.g. ["worker", "driver"].
+            start_time: If provided, only events that ended at or after this
+                time (in seconds since the epoch) are included.
+            end_time: If provided, only events that started at or before
+                this time are included.
+            job_id: A JobID or hex string. If provided, only events that
+                components recorded while working for this job are included.
+            node_ip_address: If provided, only events of components on the
+                node with this IP address are included.
+
+        Yields:
+            Profile events. Each profile event is a dictionary.
+        """
+        if isinstance(job_id, ray.JobID):
+            job_id = job_id.hex()
+        for event in self.iter_profile_events(start_time, end_time):
+            if (event["component_type"] not in component_types
+                    or (job_id is not None and event["job_id"] != job_id)
+                    or (node_ip_address is not None
+                        and event["node_ip_address"] != node_ip_address)):
+                continue
+            yield event
+
+    def _chrome_tracing_events(self, profile_events, sample_rate=None):
+        """Convert worker and driver profile events to chrome tracing events.
+
+        Args:
+            profile_events: An iterable of profile events.
+            sample_rate: If provided, only about this fraction of the events
+                of each type on each row of the timeline is kept. The kept
+                events are evenly spread out, so frequent events are thinned
+                out while the first event of each type is always kept.
+
+        Yields:
+            Chrome tracing events. Each event is a dictionary.
+        """
+        # The number of events seen so far for each row and event type.
+        event_counts = defaultdict(int)
+
+        for event in profile_events:
+            tid = event["component_type"] + ":" + event["component_id"]
+            if sample_rate is not None:
+                sample_key = (tid, event["event_type"])
+                count = event_counts[sample_key]
+                event_counts[sample_key] += 1
+                # Keep the event if it brings the number of kept events up to
+                # the sampled fraction of the events seen so far.
+                num_kept = math.floor((count - 1) * sample_rate)
+                if math.floor(count * sample_rate) == num_kept:
+                    continue
+
+            new_event = {
+                # The category of the event.
+                "cat": event["event_type"],
+                # The string displayed on the event.
+                "name": event["event_type"],
+                # The identifier for the group of rows that the event appears
+                # in.
+                "pid": event["node_ip_address"],
+                # The identifier for the row that the event appears in.
+                "tid": tid,
+                # The start time in microseconds.
+                "ts": self._seconds_to_microseconds(event["start_time"]),
+                # The duration in microseconds.
+                "dur": self._seconds_to_microseconds(event["end_time"] -
+                                                     event["start_time"]),
+                # What is this?
+                "ph": "X",
+                # This is the name of the color to display the box in.
+                "cname": self._default_color_mapping[event["event_type"]],
+                # The extra user-defined data.
+                "args": event["extra_data"],
+            }
+
+            # Modify the json with the additional user-defined extra data.
+            # This can be used to add fields or override existing fields.
+            if "cname" in event["extra_data"]:
+                new_event["cname"] = event["extra_data"]["cname"]
+            if "name" in event["extra_data"]:
+                new_event["name"] = event["extra_data"]["name"]
+
+            yield new_event
+
+    def chrome_tracing_dump(self,
+                            filename=None,
+                            start_time=None,
+                            end_time=None,
+                            job_id=None,
+                            node_ip_address=None,
+                            sample_rate=None):
         """Return a list of profiling events that can viewed as a timeline.
 
         To view this information as a timeline, simply dump it as a json file
@@ -670,9 +1021,23 @@ class GlobalState:
         chrome://tracing in the Chrome web browser and load the dumped file.
         Make sure to enable "Flow events" in the "View Options" menu.
 
+        When a filename is provided, the events are streamed from the GCS to
+        the file, so the timeline of a long job can be dumped without holding
+        all of its events in memory.
+
         Args:
             filename: If a filename is provided, the timeline is dumped to that
                 file.
+            start_time: If provided, only events that ended at or after this
+                time (in seconds since the epoch) are included.
+            end_time: If provided, only events that started at or before
+                this time are included.
+            job_id: A JobID or hex string. If provided, only events that
+                workers recorded while working for this job are included.
+            node_ip_address: If provided, only events of workers on the node
+                with this IP address are included.
+            sample_rate: If provided, only about this fraction of the events
+                of each type on each worker is included.
 
         Returns:
             If filename is not provided, this returns a list of profiling
@@ -680,61 +1045,104 @@ class GlobalState:
         """
         # TODO(rkn): Support including the task specification data in the
         # timeline.
-        # TODO(rkn): This should support viewing just a window of time or a
-        # limited number of events.
-
         self._check_connected()
 
-        profile_table = self.profile_table()
-        all_events = []
-
-        for component_id_hex, component_events in profile_table.items():
-            # Only consider workers and drivers.
-            component_type = component_events[0]["component_type"]
-            if component_type not in ["worker", "driver"]:
-                continue
-
-            for event in component_events:
-                new_event = {
-                    # The category of the event.
-                    "cat": event["event_type"],
-                    # The string displayed on the event.
-                    "name": event["event_type"],
-                    # The identifier for the group of rows that the event
-                    # appears in.
-                    "pid": event["node_ip_address"],
-                    # The identifier for the row that the event appears in.
-                    "tid": event["component_type"] + ":" +
-                    event["component_id"],
-                    # The start time in microseconds.
-                    "ts": self._seconds_to_microseconds(event["start_time"]),
-                    # The duration in microseconds.
-                    "dur": self._seconds_to_microseconds(event["end_time"] -
-                                                         event["start_time"]),
-                    # What is this?
-                    "ph": "X",
-                    # This is the name of the color to display the box in.
-                    "cname": self._default_color_mapping[event["event_type"]],
-                    # The extra user-defined data.
-                    "args": event["extra_data"],
-                }
-
-                # Modify the json with the additional user-defined extra data.
-                # This can be used to add fields or override existing fields.
-                if "cname" in event["extra_data"]:
-                    new_event["cname"] = event["extra_data"]["cname"]
-                if "name" in event["extra_data"]:
-                    new_event["name"] = event["extra_data"]["name"]
+        if sample_rate is not None and not 0 < sample_rate <= 1:
+            raise ValueError(
+                "sample_rate must be in (0, 1], got {}.".format(sample_rate))
 
-                all_events.append(new_event)
+        # Only consider workers and drivers.
+        profile_events = self._filter_profile_events(
+            ["worker", "driver"],
+            start_time=start_time,
+            end_time=end_time,
+            job_id=job_id,
+            node_ip_address=node_ip_address)
+        events = self._chrome_tracing_events(
+            profile_events, sample_rate=sample_rate)
 
         if filename is not None:
             with open(filename, "w") as outfile:
-                json.dump(all_events, outfile)
+                _dump_json_array(events, outfile)
         else:
-            return all_events
+            return list(events)
+
+    def _chrome_tracing_object_transfer_events(self, profile_events):
+        """Convert object manager profile events to chrome tracing events.
+
+        Args:
+            profile_events: An iterable of object manager profile events.
+
+        Yields:
+            Chrome tracing events. Each event is a dictionary.
+        """
+        node_id_to_address = {}
+        for node_info in self.client_table():
+            node_id_to_address[node_info["NodeID"]] = "{}:{}".format(
+                node_info["NodeManagerAddress"],
+                node_info["ObjectManagerPort"])
+
+        for event in profile_events:
+            if event["event_type"] == "transfer_send":
+                object_id, remote_node_id, _, _ = event["extra_data"]
+
+            elif event["event_type"] == "transfer_receive":
+                object_id, remote_node_id, _, _ = event["extra_data"]
 
-    def chrome_tracing_object_transfer_dump(self, filename=None):
+            elif event["event_type"] == "receive_pull_request":
+                object_id, remote_node_id = event["extra_data"]
+
+            else:
+                assert False, "This should be unreachable."
+
+            # Choose a color by reading the first couple of hex digits of
+            # the object ID as an integer and turning that into a color.
+            object_id_int = int(object_id[:2], 16)
+            color = self._chrome_tracing_colors[object_id_int % len(
+                self._chrome_tracing_colors)]
+
+            new_event = {
+                # The category of the event.
+                "cat": event["event_type"],
+                # The string displayed on the event.
+                "name": event["event_type"],
+                # The identifier for the group of rows that the event
+                # appears in.
+                "pid": node_id_to_address[event["component_id"]],
+                # The identifier for the row that the event appears in.
+                "tid": node_id_to_address[remote_node_id],
+                # The start time in microseconds.
+                "ts": self._seconds_to_microseconds(event["start_time"]),
+                # The duration in microseconds.
+                "dur": self._seconds_to_microseconds(event["end_time"] -
+                                                     event["start_time"]),
+                # What is this?
+                "ph": "X",
+                # This is the name of the color to display the box in.
+                "cname": color,
+                # The extra user-defined data.
+                "args": event["extra_data"],
+            }
+            yield new_event
+
+            # Add another box with a color indicating whether it was a send
+            # or a receive event.
+            if event["event_type"] == "transfer_send":
+                additional_event = new_event.copy()
+                additional_event["cname"] = "black"
+                yield additional_event
+            elif event["event_type"] == "transfer_receive":
+                additional_event = new_event.copy()
+                additional_event["cname"] = "grey"
+                yield additional_event
+            else:
+                pass
+
+    def chrome_tracing_object_transfer_dump(self,
+                                            filename=None,
+                                            start_time=None,
+                                            end_time=None,
+                                            node_ip_address=None):
         """Return a list of transfer events that can viewed as a timeline.
 
         To view this information as a timeline, simply dump it as a json file
@@ -745,6 +1153,12 @@ class GlobalState:
         Args:
             filename: If a filename is provided, the timeline is dumped to that
                 file.
+            start_time: If provided, only transfers that ended at or after
+                this time (in seconds since the epoch) are included.
+            end_time: If provided, only transfers that started at or before
+                this time are included.
+            node_ip_address: If provided, only transfers recorded by the node
+                with this IP address are included.
 
         Returns:
             If filename is not provided, this returns a list of profiling
@@ -752,80 +1166,19 @@ class GlobalState:
         """
         self._check_connected()
 
-        node_id_to_address = {}
-        for node_info in self.client_table():
-            node_id_to_address[node_info["NodeID"]] = "{}:{}".format(
-                node_info["NodeManagerAddress"],
-                node_info["ObjectManagerPort"])
-
-        all_events = []
-
-        for key, items in self.profile_table().items():
-            # Only consider object manager events.
-            if items[0]["component_type"] != "object_manager":
-                continue
-
-            for event in items:
-                if event["event_type"] == "transfer_send":
-                    object_id, remote_node_id, _, _ = event["extra_data"]
-
-                elif event["event_type"] == "transfer_receive":
-                    object_id, remote_node_id, _, _ = event["extra_data"]
-
-                elif event["event_type"] == "receive_pull_request":
-                    object_id, remote_node_id = event["extra_data"]
-
-                else:
-                    assert False, "This should be unreachable."
-
-                # Choose a color by reading the first couple of hex digits of
-                # the object ID as an integer and turning that into a color.
-                object_id_int = int(object_id[:2], 16)
-                color = self._chrome_tracing_colors[object_id_int % len(
-                    self._chrome_tracing_colors)]
-
-                new_event = {
-                    # The category of the event.
-                    "cat": event["event_type"],
-                    # The string displayed on the event.
-                    "name": event["event_type"],
-                    # The identifier for the group of rows that the event
-                    # appears in.
-                    "pid": node_id_to_address[key],
-                    # The identifier for the row that the event appears in.
-                    "tid": node_id_to_address[remote_node_id],
-                    # The start time in microseconds.
-                    "ts": self._seconds_to_microseconds(event["start_time"]),
-                    # The duration in microseconds.
-                    "dur": self._seconds_to_microseconds(event["end_time"] -
-                                                         event["start_time"]),
-                    # What is this?
-                    "ph": "X",
-                    # This is the name of the color to display the box in.
-                    "cname": color,
-                    # The extra user-defined data.
-                    "args": event["extra_data"],
-                }
-                all_events.append(new_event)
-
-                # Add another box with a color indicating whether it was a send
-                # or a receive event.
-                if event["event_type"] == "transfer_send":
-                    additional_event = new_event.copy()
-                    additional_event["cname"] = "black"
-                    all_events.append(additional_event)
-                elif event["event_type"] == "transfer_receive":
-                    additional_event = new_event.copy()
-                    additional_event["cname"] = "grey"
-                    all_events.append(additional_event)
-                else:
-                    pass
+        # Only consider object manager events.
+        profile_events = self._filter_profile_events(
+            ["object_manager"],
+            start_time=start_time,
+            end_time=end_time,
+            node_ip_address=node_ip_address)
+        events = self._chrome_tracing_object_transfer_events(profile_events)
 
         if filename is not None:
             with open(filename, "w") as outfile:
-                json.dump(all_events, outfile)
+                _dump_json_array(events, outfile)
         else:
-            return all_events
+            return list(events)
 
     def workers(self):
         """Get a dictionary mapping worker ID to worker information."""
@@ -968,6 +1321,92 @@ class GlobalState:
 
         return dict(total_available_resources)
 
+    def object_spilling_stats(self):
+        """Get the object spilling statistics of every live node.
+
+        Returns:
+            A dictionary mapping node ID to a dictionary with the number of
+                bytes spilled to and restored from disk by that node and the
+                number of its objects that are currently spilled.
+        """
+        self._check_connected()
+
+        import grpc
+        from ray.core.generated import node_manager_pb2
+        from ray.core.generated import node_manager_pb2_grpc
+
+        stats = {}
+        for client in self.client_table():
+            if not client["Alive"]:
+                continue
+            raylet_address = "{}:{}".format(client["NodeManagerAddress"],
+                                            client["NodeManagerPort"])
+            channel = grpc.insecure_channel(raylet_address)
+            stub = node_manager_pb2_grpc.NodeManagerServiceStub(channel)
+            reply = stub.GetNodeStats(
+                node_manager_pb2.GetNodeStatsRequest(), timeout=2.0)
+            channel.close()
+            stats[client["NodeID"]] = {
+                "num_bytes_spilled": reply.num_bytes_spilled,
+                "num_bytes_restored": reply.num_bytes_restored,
+                "num_spilled_objects": reply.num_spilled_objects,
+            }
+        return stats
+
+    def stack_samples(self, job_id=None):
+        """Get the stack samples recorded by the sampling profiler.
+
+        Args:
+            job_id: A JobID or hex string. If provided, only the samples of
+                the tasks of this job are included.
+
+        Returns:
+            A dictionary mapping each stack, in the folded format used by
+                flamegraph tools, to the number of times it was sampled.
+        """
+        self._check_connected()
+
+        prefix = ray.sampling_profiler.STACK_SAMPLES_KEY_PREFIX
+        if job_id is None:
+            keys = self.redis_client.scan_iter(match=prefix + b"*")
+        else:
+            if not isinstance(job_id, ray.JobID):
+                job_id = ray.JobID(hex_to_binary(job_id))
+            keys = [prefix + job_id.hex().encode("ascii")]
+        samples = defaultdict(int)
+        for key in keys:
+            for stack, count in self.redis_client.hgetall(key).items():
+                samples[decode(stack)] += int(count)
+        return dict(samples)
+
+    def task_memory_stats(self):
+        """Get the memory usage of tasks sampled by the workers.
+
+        Returns:
+            A dictionary with three entries:
+                "workers" maps the ID of each live worker to its current
+                    memory usage and the tasks it is executing.
+                "functions" maps each function name to the number of its
+                    tasks that finished and their peak memory usage.
+                "actors" maps each actor ID to the same statistics for the
+                    tasks of that actor.
+        """
+        self._check_connected()
+
+        stats = {"workers": {}, "functions": {}, "actors": {}}
+        prefix = ray.memory_monitor.TASK_MEMORY_KEY_PREFIX
+        for key in self.redis_client.scan_iter(match=prefix + b"*"):
+            worker = self.redis_client.hget(key, "worker")
+            if worker is not None:
+                worker_id = binary_to_hex(key[len(prefix):])
+                stats["workers"][worker_id] = json.loads(decode(worker))
+        peaks = self.redis_client.hgetall(
+            ray.memory_monitor.TASK_MEMORY_STATS_KEY)
+        for field, value in peaks.items():
+            kind, name = decode(field).split(":", 1)
+            stats[kind + "s"][name] = json.loads(decode(value))
+        return stats
+
     def _error_messages(self, job_id):
         """Get the error messages for a specific driver.
 
@@ -1120,61 +1559,95 @@ def node_ids():
     return node_ids
 
 
-def actors(actor_id=None):
+def actors(actor_id=None, job_id=None, limit=None):
     """Fetch and parse the actor info for one or more actor IDs.
 
     Args:
         actor_id: A hex string of the actor ID to fetch information about. If
             this is None, then all actor information is fetched.
+        job_id: A JobID or hex string. If provided, only the actors created by
+            this job are fetched.
+        limit: If provided, at most this many actors are fetched.
 
     Returns:
         Information about the actors.
     """
-    return state.actor_table(actor_id=actor_id)
+    return state.actor_table(actor_id=actor_id, job_id=job_id, limit=limit)
 
 
-def tasks(task_id=None):
+def tasks(task_id=None, job_id=None, limit=None):
     """Fetch and parse the task table information for one or more task IDs.
 
     Args:
         task_id: A hex string of the task ID to fetch information about. If
             this is None, then the task object table is fetched.
+        job_id: A JobID or hex string. If provided, only the tasks of this job
+            are fetched.
+        limit: If provided, at most this many tasks are fetched.
 
     Returns:
         Information from the task table.
     """
-    return state.task_table(task_id=task_id)
+    return state.task_table(task_id=task_id, job_id=job_id, limit=limit)
 
 
-def objects(object_id=None):
+def objects(object_id=None, job_id=None, limit=None):
     """Fetch and parse the object table info for one or more object IDs.
 
     Args:
         object_id: An object ID to fetch information about. If this is None,
             then the entire object table is fetched.
+        job_id: A JobID or hex string. If provided, only the objects created
+            by this job are fetched.
+        limit: If provided, at most this many objects are fetched.
 
     Returns:
         Information from the object table.
     """
-    return state.object_table(object_id=object_id)
+    return state.object_table(object_id=object_id, job_id=job_id, limit=limit)
 
 
-def timeline(filename=None):
+def timeline(filename=None,
+             start_time=None,
+             end_time=None,
+             job_id=None,
+             node_ip_address=None,
+             sample_rate=None):
     """Return a list of profiling events that can viewed as a timeline.
 
     To view this information as a timeline, simply dump it as a json file by
     passing in "filename" or using using json.dump, and then load go to
     chrome://tracing in the Chrome web browser and load the dumped file.
 
+    For long jobs, pass a filename so that the events are streamed to the
+    file instead of being collected in memory, and use the filters to only
+    dump the part of the timeline that is of interest.
+
     Args:
         filename: If a filename is provided, the timeline is dumped to that
             file.
+        start_time: If provided, only events that ended at or after this time
+            (in seconds since the epoch) are included.
+        end_time: If provided, only events that started at or before this
+            time are included.
+        job_id: A JobID or hex string. If provided, only events that workers
+            recorded while working for this job are included.
+        node_ip_address: If provided, only events of workers on the node with
+            this IP address are included.
+        sample_rate: If provided, only about this fraction of the events of
+            each type on each worker is included.
 
     Returns:
         If filename is not provided, this returns a list of profiling events.
             Each profile event is a dictionary.
     """
-    return state.chrome_tracing_dump(filename=filename)
+    return state.chrome_tracing_dump(
+        filename=filename,
+        start_time=start_time,
+        end_time=end_time,
+        job_id=job_id,
+        node_ip_address=node_ip_address,
+        sample_rate=sample_rate)
 
 
 def object_transfer_timeline(filename=None):
@@ -1224,6 +1697,63 @@ def available_resources():
     return state.available_resources()
 
 
+def object_spilling_stats():
+    """Get the object spilling statistics of every live node.
+
+    Returns:
+        A dictionary mapping node ID to a dictionary with the number of bytes
+            spilled to and restored from disk by that node and the number of
+            its objects that are currently spilled.
+    """
+    return state.object_spilling_stats()
+
+
+def flamegraph(filename=None, job_id=None, function_name=None):
+    """Return the stack samples of tasks in the folded flamegraph format.
+
+    The samples are recorded by the sampling profiler, see
+    ray.sampling_profiler. The first frame of each stack is the name of the
+    task's function. Pass "filename" to write one "<stack> <count>" line per
+    stack to a file that flamegraph.pl or https://www.speedscope.app can
+    render.
+
+    Args:
+        filename: If a filename is provided, the samples are dumped to that
+            file.
+        job_id: A JobID or hex string. If provided, only the samples of the
+            tasks of this job are included.
+        function_name: If provided, only the samples of tasks of this
+            function, e.g. "my_module.MyActor.method", are included.
+
+    Returns:
+        A dictionary mapping each stack to the number of times it was
+            sampled.
+    """
+    samples = state.stack_samples(job_id=job_id)
+    if function_name is not None:
+        samples = {
+            stack: count
+            for stack, count in samples.items()
+            if stack.split(";", 1)[0] == function_name
+        }
+    if filename is not None:
+        with open(filename, "w") as outfile:
+            for stack, count in sorted(samples.items()):
+                outfile.write("{} {}\n".format(stack, count))
+    return samples
+
+
+def task_memory_stats():
+    """Get the memory usage of tasks sampled by the workers.
+
+    Returns:
+        A dictionary with the current memory usage of each worker under
+            "workers", and the peak memory usage of the tasks of each function
+            and actor under "functions" and "actors".
+    """
+    return state.task_memory_stats()
+
+
 def errors(all_jobs=False):
     """Get error messages from the cluster.
 
@@ -1,7 +1,13 @@
+import os
+import subprocess
+import sys
+
 import numpy as np
 import pytest
 
 import ray
+from ray.monitor import Monitor
+import ray.ray_constants as ray_constants
 from ray.tests.conftest import _ray_start_cluster
 
 num_tasks_submitted = [10**n for n in range(0, 6)]
@@ -98,3 +104,96 @@ def test_transfer_performance(benchmark, ray_start_cluster_head, object_number,
     object_ids = [ray.put(data) for _ in range(object_number)]
 
     benchmark(benchmark_transfer_object, actor, object_ids)
+
+
+def benchmark_worker_start(num_actors):
+    @ray.remote
+    class Actor:
+        def ping(self):
+            pass
+
+    actors = [Actor.remote() for _ in range(num_actors)]
+    ray.get([actor.ping.remote() for actor in actors])
+    for actor in actors:
+        ray.kill(actor)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "worker_zygote_modules", [None, ["numpy"]], ids=["exec", "zygote"])
+def test_worker_start_performance(benchmark, shutdown_only,
+                                  worker_zygote_modules):
+    ray.init(num_cpus=8, worker_zygote_modules=worker_zygote_modules)
+    # Each actor gets a freshly started worker.
+    benchmark(benchmark_worker_start, 8)
+
+
+def fill_task_table(num_jobs, tasks_per_job):
+    """Add fake task table entries for jobs 1000 to 1000 + num_jobs - 1."""
+    redis_clients = ray.state.state.redis_clients
+    table_prefix = ray.gcs_utils.TablePrefix.Value("RAYLET_TASK")
+    task_id_size = ray.TaskID.size()
+    job_id_size = len(ray.JobID.nil().binary())
+    for job_index in range(num_jobs):
+        job_id = ray.JobID.from_int(1000 + job_index)
+        pipelines = [
+            redis_client.pipeline(transaction=False)
+            for redis_client in redis_clients
+        ]
+        for _ in range(tasks_per_job):
+            task_id = ray.TaskID(
+                os.urandom(task_id_size - job_id_size) + job_id.binary())
+            pipeline = pipelines[task_id.redis_shard_hash() %
+                                 len(redis_clients)]
+            pipeline.execute_command("RAY.TABLE_ADD", table_prefix, 0,
+                                     task_id.binary(), b"")
+        for pipeline in pipelines:
+            pipeline.execute()
+
+
+@pytest.mark.benchmark
+def test_job_cleanup_performance(benchmark, shutdown_only):
+    num_jobs = 100
+    tasks_per_job = 10**4
+    ray.init(num_cpus=1, num_redis_shards=4, redis_max_memory=2 * 10**9)
+    fill_task_table(num_jobs, tasks_per_job)
+    monitor = Monitor(
+        ray.worker._global_node.redis_address,
+        None,
+        redis_password=ray_constants.REDIS_DEFAULT_PASSWORD)
+
+    job_indexes = iter(range(num_jobs))
+
+    def next_job():
+        job_id = ray.JobID.from_int(1000 + next(job_indexes))
+        return (job_id.binary(), ), {}
+
+    # Clean up a different job in each round. Each cleanup should only touch
+    # the entries of its own job out of the million in the table.
+    benchmark.pedantic(
+        monitor._xray_clean_up_entries_for_job, setup=next_job, rounds=10)
+    num_remaining = sum(
+        len(list(redis_client.scan_iter(match="RAYLET_TASK*", count=10**4)))
+        for redis_client in ray.state.state.redis_clients)
+    assert num_remaining == (num_jobs - 10) * tasks_per_job
+
+
+def import_ray():
+    # With -X importtime, Python reports the time spent importing each module
+    # on stderr as "import time: self [us] | cumulative | module".
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import ray"],
+        stderr=subprocess.STDOUT)
+    for line in output.decode("utf-8").splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == "ray":
+            return int(fields[1])
+    raise ValueError("No import time was reported for ray.")
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="-X importtime requires Python 3.7.")
+def test_import_time(benchmark):
+    cumulative_us = benchmark(import_ray)
+    benchmark.extra_info["import_ray_us"] = cumulative_us
@@ -12,6 +12,7 @@ import sys
 import ray
 import ray.test_utils
 import ray.cluster_utils
+import ray.ray_constants as ray_constants
 
 
 def test_actor_exit_from_task(ray_start_regular):
@@ -483,6 +484,62 @@ def test_multiple_return_values(ray_start_regular):
     assert ray.get([id3a, id3b, id3c]) == [1, 2, 3]
 
 
+def test_batch_remote(ray_start_regular):
+    @ray.remote
+    class Counter:
+        def __init__(self):
+            self.values = []
+
+        def add(self, x, fail=False):
+            if fail:
+                raise ValueError("add failed")
+            self.values.append(x)
+            return len(self.values)
+
+        def get_values(self):
+            return self.values
+
+        @ray.method(num_return_vals=2)
+        def pair(self):
+            return 1, 2
+
+    c = Counter.remote()
+
+    assert c.add.batch_remote([]) == []
+    assert ray.get(c.add.batch_remote([(0, )])) == [1]
+    object_ids = c.add.batch_remote([(i, ) for i in range(1, 10)])
+    assert ray.get(object_ids) == list(range(2, 11))
+
+    # Batches are ordered with respect to other calls on the actor.
+    c.add.remote(10)
+    c.add.batch_remote([(11, ), (12, )])
+    assert ray.get(c.get_values.remote()) == list(range(13))
+
+    # A failing call only affects its own return value.
+    object_ids = c.add.batch_remote([(13, ), (14, ), (15, )],
+                                    [None, {
+                                        "fail": True
+                                    }, None])
+    assert ray.get(object_ids[0]) == 14
+    with pytest.raises(ValueError, match="add failed"):
+        ray.get(object_ids[1])
+    assert ray.get(object_ids[2]) == 15
+    ray.test_utils.wait_for_errors(ray_constants.TASK_PUSH_ERROR, 1)
+
+    # ObjectIDs are resolved like for separate calls.
+    x = ray.put(16)
+    object_ids = c.add.batch_remote([(x, ), (17, )], [None, {"fail": x}])
+    assert ray.get(object_ids[0]) == 16
+    with pytest.raises(ValueError, match="add failed"):
+        ray.get(object_ids[1])
+    assert ray.get(c.get_values.remote())[-1] == 16
+
+    with pytest.raises(TypeError):
+        c.add.batch_remote([(1, 2, 3, 4)])
+    with pytest.raises(ValueError):
+        c.pair.batch_remote([()])
+
+
 def test_define_actor(ray_start_regular):
     @ray.remote
     class Test:
@@ -627,6 +627,41 @@ def test_export_after_shutdown(ray_start_regular):
     ray.get(export_definitions_from_worker.remote(f, Actor))
 
 
+def test_lazy_content_addressed_export(ray_start_regular):
+    redis_client = ray.worker.global_worker.redis_client
+
+    def define_function():
+        @ray.remote
+        def f():
+            return 1
+
+        return f
+
+    # Identical definitions are only stored once.
+    ray.get(define_function().remote())
+    num_blobs = len(redis_client.keys("FunctionBlob:*"))
+    for _ in range(3):
+        assert ray.get(define_function().remote()) == 1
+    assert len(redis_client.keys("FunctionBlob:*")) == num_blobs
+
+    @ray.remote
+    def g():
+        return 2
+
+    @ray.remote
+    def is_loaded(function_id):
+        manager = ray.worker.global_worker.function_actor_manager
+        return any(
+            function_id in execution_info
+            for execution_info in manager._function_execution_info.values())
+
+    # Workers only load functions that they are asked to execute.
+    g._export_if_needed(ray.worker.global_worker)
+    function_id = g._function_descriptor.function_id
+    assert not ray.get(is_loaded.remote(function_id))
+    assert ray.get(g.remote()) == 2
+
+
 def test_invalid_unicode_in_worker_log(shutdown_only):
     info = ray.init(num_cpus=1)
 
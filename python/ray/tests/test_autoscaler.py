@@ -1,3 +1,5 @@
+from collections import Counter
+import os
 import shutil
 import tempfile
 import threading
@@ -11,9 +13,13 @@ import ray
 import ray.services as services
 from ray.autoscaler.autoscaler import StandardAutoscaler, LoadMetrics, \
     fillout_defaults, validate_config
+from ray.autoscaler.resource_demand_scheduler import \
+    ResourceDemandScheduler
 from ray.autoscaler.tags import TAG_RAY_NODE_TYPE, TAG_RAY_NODE_STATUS, \
-    STATUS_UP_TO_DATE, STATUS_UPDATE_FAILED
-from ray.autoscaler.node_provider import NODE_PROVIDERS, NodeProvider
+    TAG_RAY_USER_NODE_TYPE, STATUS_UP_TO_DATE, STATUS_UPDATE_FAILED
+from ray.autoscaler.node_provider import NODE_PROVIDERS, NodeInfo, \
+    NodeProvider
+from ray.ray_constants import MEMORY_RESOURCE_UNIT_BYTES
 from ray.test_utils import RayTestTimeoutException
 import pytest
 
@@ -83,8 +89,12 @@ class MockProvider(NodeProvider):
         self.ready_to_create = threading.Event()
         self.ready_to_create.set()
         self.cache_stopped = cache_stopped
+        # The number of calls to each method that a cloud provider would
+        # serve with an API request.
+        self.api_calls = Counter()
 
     def non_terminated_nodes(self, tag_filters):
+        self.api_calls["non_terminated_nodes"] += 1
         if self.throw:
             raise Exception("oops")
         return [
@@ -93,6 +103,16 @@ class MockProvider(NodeProvider):
             and n.state not in ["stopped", "terminated"]
         ]
 
+    def non_terminated_node_infos(self, tag_filters):
+        self.api_calls["non_terminated_node_infos"] += 1
+        if self.throw:
+            raise Exception("oops")
+        return {
+            n.node_id: NodeInfo(n.tags.copy(), n.internal_ip)
+            for n in self.mock_nodes.values() if n.matches(tag_filters)
+            and n.state not in ["stopped", "terminated"]
+        }
+
     def non_terminated_node_ips(self, tag_filters):
         if self.throw:
             raise Exception("oops")
@@ -109,9 +129,11 @@ class MockProvider(NodeProvider):
         return self.mock_nodes[node_id].state in ["stopped", "terminated"]
 
     def node_tags(self, node_id):
+        self.api_calls["node_tags"] += 1
         return self.mock_nodes[node_id].tags
 
     def internal_ip(self, node_id):
+        self.api_calls["internal_ip"] += 1
         return self.mock_nodes[node_id].internal_ip
 
     def external_ip(self, node_id):
@@ -264,6 +286,183 @@ class LoadMetricsTest(unittest.TestCase):
         assert "NumNodesConnected=3" in debug
         assert "NumNodesUsed=2.88" in debug
 
+    def testResourceDemands(self):
+        lm = LoadMetrics()
+        lm.update("1.1.1.1", {"CPU": 2}, {"CPU": 0}, {"CPU": 3}, [({
+            "CPU": 1
+        }, 3)])
+        lm.update("2.2.2.2", {"CPU": 2}, {"CPU": 0}, {
+            "CPU": 2,
+            "GPU": 1
+        }, [({
+            "CPU": 1
+        }, 1), ({
+            "CPU": 1,
+            "GPU": 1
+        }, 1)])
+        lm.update("3.3.3.3", {"CPU": 2}, {"CPU": 2}, {})
+        assert sorted(
+            lm.get_resource_demands(),
+            key=lambda demand: len(demand[0])) == [({
+                "CPU": 1
+            }, 4), ({
+                "CPU": 1,
+                "GPU": 1
+            }, 1)]
+        lm.prune_active_ips({"2.2.2.2"})
+        assert lm.get_resource_demands() == [({
+            "CPU": 1
+        }, 1), ({
+            "CPU": 1,
+            "GPU": 1
+        }, 1)]
+
+
+NODE_TYPES = {
+    "small": {
+        "node_config": {
+            "InstanceType": "small"
+        },
+        "resources": {
+            "CPU": 4
+        },
+        "cost": 1,
+    },
+    "large": {
+        "node_config": {
+            "InstanceType": "large"
+        },
+        "resources": {
+            "CPU": 16
+        },
+        "cost": 3,
+    },
+    "gpu": {
+        "node_config": {
+            "InstanceType": "gpu"
+        },
+        "resources": {
+            "CPU": 8,
+            "GPU": 1,
+            "memory": 100 * MEMORY_RESOURCE_UNIT_BYTES,
+        },
+        "max_workers": 2,
+        "cost": 5,
+    },
+}
+
+
+class ResourceDemandSchedulerTest(unittest.TestCase):
+    def testPacksOntoExistingNodes(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        to_launch = scheduler.get_nodes_to_launch([], {}, {
+            "1.1.1.1": {
+                "CPU": 2
+            },
+            "2.2.2.2": {
+                "CPU": 2
+            }
+        }, [({
+            "CPU": 1
+        }, 4)])
+        assert to_launch == {}
+        to_launch = scheduler.get_nodes_to_launch([], {},
+                                                  {"1.1.1.1": {
+                                                      "CPU": 2
+                                                  }}, [({
+                                                      "CPU": 1
+                                                  }, 4)])
+        assert to_launch == {"small": 1}
+
+    def testLaunchesCheapestNodes(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        # Two small nodes are cheaper than one large node.
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "CPU": 1
+        }, 8)])
+        assert to_launch == {"small": 2}
+        # A large node is cheaper than four small nodes.
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "CPU": 8
+        }, 2)])
+        assert to_launch == {"large": 1}
+
+    def testPacksGPUAndMemoryDemands(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "GPU": 1
+        }, 2), ({
+            "CPU": 1
+        }, 4)])
+        assert to_launch == {"gpu": 2}
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "CPU": 1,
+            "memory": 60
+        }, 2)])
+        assert to_launch == {"gpu": 2}
+
+    def testRespectsMaxWorkers(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "GPU": 1
+        }, 100)])
+        assert to_launch == {"gpu": 2}
+        to_launch = scheduler.get_nodes_to_launch([("gpu", "1.1.1.1")], {},
+                                                  {"1.1.1.1": {
+                                                      "GPU": 0
+                                                  }}, [({
+                                                      "GPU": 1
+                                                  }, 100)])
+        assert to_launch == {"gpu": 1}
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "CPU": 16
+        }, 100)])
+        assert to_launch == {"large": 10}
+        to_launch = scheduler.get_nodes_to_launch([], {"small": 6}, {}, [({
+            "CPU": 16
+        }, 100)])
+        assert to_launch == {"large": 4}
+
+    def testPacksRequestedDemandsOntoNewNodes(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        # A request for 16 CPUs on an idle 8 CPU head node is missing 8 CPUs,
+        # which the head node's free CPUs must not absorb again.
+        to_launch = scheduler.get_nodes_to_launch(
+            [], {}, {"1.1.1.1": {
+                "CPU": 8
+            }}, [],
+            requested_demands=[({
+                "CPU": 1
+            }, 8)])
+        assert to_launch == {"small": 2}
+        # Nodes that are still starting count towards the request.
+        to_launch = scheduler.get_nodes_to_launch(
+            [("small", "2.2.2.2")], {"small": 1}, {"1.1.1.1": {
+                "CPU": 8
+            }}, [],
+            requested_demands=[({
+                "CPU": 1
+            }, 8)])
+        assert to_launch == {}
+
+    def testCountsStartingNodes(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        to_launch = scheduler.get_nodes_to_launch([("small", "1.1.1.1")],
+                                                  {"small": 1}, {}, [({
+                                                      "CPU": 1
+                                                  }, 8)])
+        assert to_launch == {}
+
+    def testIgnoresInfeasibleDemands(self):
+        scheduler = ResourceDemandScheduler(NODE_TYPES, 10)
+        to_launch = scheduler.get_nodes_to_launch([], {}, {}, [({
+            "CPU": 1,
+            "TPU": 1
+        }, 4), ({
+            "CPU": 32
+        }, 1)])
+        assert to_launch == {}
+
 
 class AutoscalingTest(unittest.TestCase):
     def setUp(self):
@@ -666,6 +865,55 @@ class AutoscalingTest(unittest.TestCase):
         self.provider.ready_to_create.set()
         self.waitForNodes(2)
 
+    def testScaleUpByNodeType(self):
+        config = copy.deepcopy(SMALL_CLUSTER)
+        config["min_workers"] = 0
+        config["max_workers"] = 10
+        config["available_node_types"] = NODE_TYPES
+        config_path = self.write_config(config)
+        self.provider = MockProvider()
+        lm = LoadMetrics()
+        autoscaler = StandardAutoscaler(
+            config_path,
+            lm,
+            max_failures=0,
+            process_runner=MockProcessRunner(),
+            update_interval_s=0)
+        autoscaler.update()
+        assert len(self.provider.non_terminated_nodes({})) == 0
+
+        local_ip = services.get_node_ip_address()
+        lm.update(local_ip, {"CPU": 2}, {"CPU": 0}, {
+            "CPU": 10,
+            "GPU": 1
+        }, [({
+            "CPU": 1
+        }, 8), ({
+            "CPU": 1,
+            "GPU": 1
+        }, 1)])
+        autoscaler.update()
+        self.waitForNodes(1, tag_filters={TAG_RAY_USER_NODE_TYPE: "gpu"})
+        self.waitForNodes(1, tag_filters={TAG_RAY_USER_NODE_TYPE: "small"})
+        self.waitFor(lambda: autoscaler.num_launches_pending.value == 0)
+
+        # The new nodes haven't connected yet, but will run the queued tasks.
+        autoscaler.update()
+        assert autoscaler.num_launches_pending.value == 0
+        assert len(self.provider.non_terminated_nodes({})) == 2
+
+        # Changing the config of a node type only replaces nodes of that type.
+        new_config = copy.deepcopy(config)
+        new_config["available_node_types"]["gpu"]["node_config"][
+            "InstanceType"] = "updated"
+        self.write_config(new_config)
+        self.provider.ready_to_create.clear()
+        autoscaler.update()
+        self.waitForNodes(0, tag_filters={TAG_RAY_USER_NODE_TYPE: "gpu"})
+        self.waitForNodes(1, tag_filters={TAG_RAY_USER_NODE_TYPE: "small"})
+        self.provider.ready_to_create.set()
+        self.waitForNodes(1, tag_filters={TAG_RAY_USER_NODE_TYPE: "gpu"})
+
     def testIgnoresCorruptedConfig(self):
         config_path = self.write_config(SMALL_CLUSTER)
         self.provider = MockProvider()
@@ -750,6 +998,34 @@ class AutoscalingTest(unittest.TestCase):
         self.waitForNodes(
             2, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
 
+    def testQueriesProviderOncePerUpdate(self):
+        config = copy.deepcopy(SMALL_CLUSTER)
+        config["min_workers"] = 10
+        config["max_workers"] = 10
+        config_path = self.write_config(config)
+        self.provider = MockProvider()
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_launch_batch=10,
+            max_concurrent_launches=10,
+            max_failures=0,
+            process_runner=MockProcessRunner(),
+            update_interval_s=0)
+        autoscaler.update()
+        self.waitForNodes(10)
+        self.provider.finish_starting_nodes()
+        autoscaler.update()
+        self.waitForNodes(
+            10, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
+        autoscaler.update()
+
+        # Once the cluster is steady, an update lists the workers once and
+        # doesn't look up any node individually.
+        self.provider.api_calls.clear()
+        autoscaler.update()
+        assert self.provider.api_calls == {"non_terminated_node_infos": 1}
+
     def testReportsConfigFailures(self):
         config = copy.deepcopy(SMALL_CLUSTER)
         config["provider"]["type"] = "external"
@@ -949,6 +1225,94 @@ class AutoscalingTest(unittest.TestCase):
             StandardAutoscaler(
                 invalid_provider, LoadMetrics(), update_interval_s=0)
 
+    def testSyncsOnlyChangedFileMounts(self):
+        for name in ["a", "b"]:
+            os.mkdir(os.path.join(self.tmpdir, name))
+            with open(os.path.join(self.tmpdir, name, "file"), "w") as f:
+                f.write(name)
+        config = copy.deepcopy(SMALL_CLUSTER)
+        config["file_mounts"] = {
+            "/remote/a": os.path.join(self.tmpdir, "a"),
+            "/remote/b": os.path.join(self.tmpdir, "b"),
+        }
+        config_path = self.write_config(config)
+        self.provider = MockProvider()
+        runner = MockProcessRunner()
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_failures=0,
+            process_runner=runner,
+            update_interval_s=0)
+        autoscaler.update()
+        self.waitForNodes(2)
+        self.provider.finish_starting_nodes()
+        autoscaler.update()
+        self.waitForNodes(
+            2, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
+        for i in [0, 1]:
+            runner.assert_has_call("172.0.0.{}".format(i), "/remote/a/")
+            runner.assert_has_call("172.0.0.{}".format(i), "/remote/b/")
+
+        # Change one of the mounts and the setup commands, so that the nodes
+        # are updated again.
+        runner.clear_history()
+        with open(os.path.join(self.tmpdir, "a", "file"), "w") as f:
+            f.write("changed")
+        config["worker_setup_commands"] = ["new_worker_setup_cmd"]
+        self.write_config(config)
+        autoscaler.update()
+        self.waitFor(lambda: len([
+            cmd for cmd in runner.calls if "new_worker_setup_cmd" in str(cmd)
+        ]) == 2)
+        for i in [0, 1]:
+            runner.assert_has_call("172.0.0.{}".format(i), "/remote/a/")
+            runner.assert_not_has_call("172.0.0.{}".format(i), "/remote/b/")
+
+    def testLimitsConcurrentFileSyncs(self):
+        class SlowSyncRunner(MockProcessRunner):
+            def __init__(self):
+                super(SlowSyncRunner, self).__init__()
+                self.lock = threading.Lock()
+                self.num_syncing = 0
+                self.max_syncing = 0
+
+            def check_call(self, cmd, *args, **kwargs):
+                if cmd[0] != "rsync":
+                    return super(SlowSyncRunner, self).check_call(
+                        cmd, *args, **kwargs)
+                with self.lock:
+                    self.num_syncing += 1
+                    self.max_syncing = max(self.max_syncing, self.num_syncing)
+                time.sleep(0.1)
+                with self.lock:
+                    self.num_syncing -= 1
+                super(SlowSyncRunner, self).check_call(cmd, *args, **kwargs)
+
+        config = copy.deepcopy(SMALL_CLUSTER)
+        config["min_workers"] = 6
+        config["max_workers"] = 6
+        config["file_mounts"] = {"/remote/dir": self.tmpdir}
+        config_path = self.write_config(config)
+        self.provider = MockProvider()
+        runner = SlowSyncRunner()
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_launch_batch=6,
+            max_concurrent_syncs=2,
+            max_failures=0,
+            process_runner=runner,
+            update_interval_s=0)
+        autoscaler.update()
+        self.waitForNodes(6)
+        self.provider.finish_starting_nodes()
+        autoscaler.update()
+        self.waitForNodes(
+            6, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
+        assert len([cmd for cmd in runner.calls if cmd[0] == "rsync"]) == 6
+        assert runner.max_syncing == 2
+
     def testSetupCommandsWithNoNodeCaching(self):
         config = SMALL_CLUSTER.copy()
         config["min_workers"] = 1
@@ -7,6 +7,7 @@ import os
 import pickle
 import re
 import string
+import subprocess
 import sys
 import threading
 import time
@@ -70,6 +71,20 @@ def test_omp_threads_set(shutdown_only):
     assert os.environ["OMP_NUM_THREADS"] == "1"
 
 
+def test_lazy_submodules():
+    # Optional subpackages aren't imported by "import ray", but are imported
+    # on first access.
+    code = """
+import sys
+import ray
+lazy = ["ray.experimental", "ray.projects", "ray.tune", "ray.util"]
+assert not any(module in sys.modules for module in lazy)
+assert ray.util.ActorPool is not None
+assert "ray.util" in sys.modules
+"""
+    subprocess.check_call([sys.executable, "-c", code])
+
+
 def test_simple_serialization(ray_start_regular):
     primitive_objects = [
         # Various primitive types.
@@ -1236,6 +1251,54 @@ def test_submit_api(shutdown_only):
     assert ray.get([id1, id2, id3, id4]) == [0, 1, "test", 2]
 
 
+def test_submit_batch_api(shutdown_only):
+    ray.init(num_cpus=2, resources={"Custom": 1})
+
+    @ray.remote
+    def f(x, y=0):
+        return x + y
+
+    assert f.map([]) == []
+    assert ray.get(f.map(range(10))) == list(range(10))
+
+    args_list = [(i, ) for i in range(10)]
+    kwargs_list = [{"y": i} for i in range(10)]
+    results = ray.get(f.remote_batch(args_list, kwargs_list))
+    assert results == [2 * i for i in range(10)]
+
+    # Calls with different shapes can be mixed in one batch.
+    args_list = [(1, ), (1, 2), [], (1, )]
+    kwargs_list = [None, None, {"x": 3}, {"y": 4}]
+    results = ray.get(f.remote_batch(args_list, kwargs_list))
+    assert results == [1, 3, 3, 5]
+
+    assert f._remote_batch([(1, ), (2, )], num_return_vals=0) == [None, None]
+
+    with pytest.raises(TypeError):
+        f.remote_batch([(1, ), (1, 2, 3)])
+    with pytest.raises(ValueError):
+        f.remote_batch([(1, )], [{}, {}])
+
+    # ObjectIDs are passed by reference like with f.remote().
+    x = ray.put(1)
+    assert ray.get(f.map([x, x])) == [1, 1]
+
+    @ray.remote
+    def g():
+        return ray.get_resource_ids()
+
+    g_custom = g.options(num_cpus=0, resources={"Custom": 1})
+    resource_ids = ray.get(g_custom.remote_batch([()] * 3))
+    assert all("Custom" in ids for ids in resource_ids)
+
+    # Batches accept the same options as f._remote().
+    f_direct = f.options(is_direct_call=True, num_return_vals=1)
+    assert ray.get(f_direct.remote_batch([(1, ), (2, )])) == [1, 2]
+    assert ray.get(f_direct.map(range(3))) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        f.options(is_direct_call=False).remote_batch([(1, )])
+
+
 def test_many_fractional_resources(shutdown_only):
     ray.init(num_cpus=2, num_gpus=2, resources={"Custom": 2})
 
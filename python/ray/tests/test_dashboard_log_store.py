@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+
+import pytest
+
+import ray.dashboard.log_store as log_store
+from ray.dashboard.log_store import LogStore
+
+
+def test_append_and_get():
+    store = LogStore(100)
+    store.append("1.2.3.4", "1", ["a", "b"])
+    store.append("1.2.3.4", "1", ["c"])
+    store.append("1.2.3.4", "2", ["d"])
+
+    assert store.get("1.2.3.4") == {"1": ["a", "b", "c"], "2": ["d"]}
+    assert store.get("1.2.3.4", "1") == {"1": ["a", "b", "c"]}
+    assert store.get("1.2.3.4", "3") == {"3": []}
+    assert store.get("5.6.7.8") == {}
+    assert store.counts() == {"1.2.3.4": {"1": 3, "2": 1}}
+
+
+def test_evicts_oldest_entries():
+    store = LogStore(10)
+    store.append("ip", "1", ["aaaa", "bbbb"])
+    store.append("ip", "1", ["cccc"])
+    assert store.get("ip", "1") == {"1": ["bbbb", "cccc"]}
+    store.append("ip", "1", ["d" * 20])
+    assert store.get("ip", "1") == {"1": []}
+    # The counts include evicted entries.
+    assert store.counts() == {"ip": {"1": 4}}
+
+
+def test_paging():
+    store = LogStore(100)
+    store.append("ip", "1", [str(i) for i in range(10)])
+    assert store.get("ip", "1", offset=2, limit=3) == {"1": ["2", "3", "4"]}
+    assert store.get("ip", "1", offset=8, limit=5) == {"1": ["8", "9"]}
+    assert store.get("ip", "1", offset=20) == {"1": []}
+    assert store.get("ip", "1", limit=2) == {"1": ["8", "9"]}
+    assert store.get("ip", "1", limit=0) == {"1": []}
+
+    # Offsets before the oldest stored entry start at the oldest one.
+    small_store = LogStore(3)
+    small_store.append("ip", "1", [str(i) for i in range(10)])
+    assert small_store.get("ip", "1", offset=0, limit=2) == {"1": ["7", "8"]}
+
+
+def test_error_entries():
+    store = LogStore(1000)
+    error = {"message": "oops", "timestamp": 1.0, "type": "task"}
+    store.append("ip", "1", [error])
+    assert store.get("ip", "1") == {"1": [error]}
+
+
+def test_spill_to_disk(tmp_path):
+    spill_dir = str(tmp_path)
+    store = LogStore(
+        4, spill_dir=spill_dir, max_spill_bytes_per_process=8, name="logs")
+    store.append("ip", "1", ["0", "1", "2", "3"])
+    assert os.listdir(spill_dir) == []
+
+    store.append("ip", "1", ["4", "5", "6", "7"])
+    assert store.get("ip", "1") == {"1": ["4", "5", "6", "7"]}
+    assert store.get("ip", "1", offset=0) == {"1": [str(i) for i in range(8)]}
+    assert store.get(
+        "ip", "1", offset=2, limit=4) == {
+            "1": ["2", "3", "4", "5"]
+        }
+    assert store.get(
+        "ip", "1", limit=6) == {
+            "1": [str(i) for i in range(2, 8)]
+        }
+
+    # Old segments are deleted once the spilled entries exceed the cap.
+    entries = [chr(ord("a") + i) for i in range(12)]
+    store.append("ip", "1", entries)
+    stored = store.get("ip", "1", offset=0)["1"]
+    assert stored == entries[-len(stored):]
+    assert 10 <= len(stored) <= 12
+    spilled_bytes = sum(
+        os.path.getsize(os.path.join(spill_dir, name))
+        for name in os.listdir(spill_dir))
+    # Each one character entry takes four bytes on disk as a JSON line.
+    assert spilled_bytes <= 4 * 8
+
+
+def test_prunes_idle_processes(tmp_path):
+    spill_dir = str(tmp_path)
+    store = LogStore(
+        1, spill_dir=spill_dir, max_spill_bytes_per_process=100, max_idle_s=10)
+    store.append("ip", "1", ["a", "b", "c"])
+    store.append("ip", "2", ["d"])
+    assert os.listdir(spill_dir) != []
+
+    store.prune(now=time.time() + 5)
+    assert store.counts() == {"ip": {"1": 3, "2": 1}}
+    store.prune(now=time.time() + 20)
+    assert store.counts() == {}
+    assert store.get("ip") == {}
+    assert os.listdir(spill_dir) == []
+
+    # Processes are kept forever by default.
+    store = LogStore(100)
+    store.append("ip", "1", ["a"])
+    store.prune(now=time.time() + 10**6)
+    assert store.counts() == {"ip": {"1": 1}}
+
+
+def test_failed_spill_drops_entries(tmp_path, monkeypatch):
+    spill_dir = str(tmp_path)
+    store = LogStore(
+        2, spill_dir=spill_dir, max_spill_bytes_per_process=100, name="logs")
+    store.append("ip", "1", ["0", "1", "2", "3"])
+
+    class FailingFile:
+        def __init__(self, path, mode):
+            self.f = open(path, mode)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            self.f.close()
+
+        def tell(self):
+            return self.f.tell()
+
+        def write(self, data):
+            self.f.write(data[:1])
+            self.f.flush()
+            raise IOError("disk full")
+
+    monkeypatch.setattr(log_store, "open", FailingFile, raising=False)
+    store.append("ip", "1", ["4", "5"])
+    monkeypatch.undo()
+    store.append("ip", "1", ["6", "7"])
+
+    # The entries that failed to be written are skipped, and the others keep
+    # their indices.
+    assert store.get(
+        "ip", "1", offset=0) == {
+            "1": ["0", "1", "4", "5", "6", "7"]
+        }
+    assert store.get("ip", "1", offset=2, limit=4) == {"1": ["4", "5"]}
+    assert store._processes["ip"]["1"].num_dropped == 2
+    assert store.counts() == {"ip": {"1": 8}}
+    for name in os.listdir(spill_dir):
+        with open(os.path.join(spill_dir, name)) as f:
+            lines = f.read().splitlines()
+        assert "2" not in lines and "3" not in lines
+
+
+def test_get_does_not_wait_for_spill(tmp_path, monkeypatch):
+    spill_dir = str(tmp_path)
+    store = LogStore(
+        1, spill_dir=spill_dir, max_spill_bytes_per_process=100, name="logs")
+    writing = threading.Event()
+    finish = threading.Event()
+    write_segment = store._write_segment
+
+    def slow_write_segment(segment, lines):
+        writing.set()
+        finish.wait()
+        return write_segment(segment, lines)
+
+    monkeypatch.setattr(store, "_write_segment", slow_write_segment)
+    thread = threading.Thread(
+        target=store.append, args=("ip", "1", ["a", "b"]))
+    thread.start()
+    writing.wait()
+    # The entry being spilled isn't readable until it is written.
+    assert store.get("ip", "1", offset=0) == {"1": ["b"]}
+    assert store.counts() == {"ip": {"1": 2}}
+    finish.set()
+    thread.join()
+    assert store.get("ip", "1", offset=0) == {"1": ["a", "b"]}
+
+
+def test_no_spill_without_directory():
+    store = LogStore(2, max_spill_bytes_per_process=100)
+    store.append("ip", "1", ["a", "b", "c"])
+    assert store.get("ip", "1", offset=0) == {"1": ["b", "c"]}
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -3,9 +3,13 @@ try:
     import pytest_timeout
 except ImportError:
     pytest_timeout = None
+import sys
 import time
 
+import numpy as np
+
 import ray
+from ray.test_utils import wait_for_condition
 
 
 # TODO(rliaw): The proper way to do this is to have the pytest config setup.
@@ -106,6 +110,128 @@ def test_global_state_actor_table(ray_start_regular):
     assert get_state() == dead_state
 
 
+def test_global_state_table_filters(ray_start_regular):
+    @ray.remote
+    class Actor:
+        def ready(self):
+            pass
+
+    actors = [Actor.remote() for _ in range(3)]
+    ray.get([a.ready.remote() for a in actors])
+    # Large objects are stored in plasma and added to the object table.
+    object_ids = [ray.put(np.zeros(1024 * 1024)) for _ in range(3)]
+
+    job_id = ray.worker.global_worker.current_job_id
+    other_job_id = ray.JobID.from_int(12345)
+    assert len(ray.actors(job_id=job_id)) == 3
+    assert len(ray.actors(job_id=job_id.hex(), limit=2)) == 2
+    assert len(ray.actors(job_id=other_job_id)) == 0
+
+    def objects_added():
+        return set(object_ids) <= set(ray.objects(job_id=job_id))
+
+    assert wait_for_condition(objects_added)
+    assert len(ray.objects(limit=2)) == 2
+    assert len(ray.objects(job_id=other_job_id)) == 0
+
+
+def test_global_state_iter_concurrently():
+    def batches(values, produced):
+        for value in values:
+            produced.append(value)
+            yield [value]
+
+    produced = [[], []]
+    iterators = [
+        batches(range(0, 100), produced[0]),
+        batches(range(100, 200), produced[1]),
+    ]
+    assert sorted(ray.state._iter_concurrently(iterators)) == list(range(200))
+
+    # Closing the generator early stops the producers.
+    produced = [[], []]
+    iterators = [
+        batches(range(0, 100), produced[0]),
+        batches(range(100, 200), produced[1]),
+    ]
+    items = ray.state._iter_concurrently(iterators)
+    assert next(items) is not None
+    items.close()
+    assert len(produced[0]) < 100 and len(produced[1]) < 100
+
+    def failing():
+        yield [1]
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        list(ray.state._iter_concurrently([failing(), batches([2], [])]))
+
+
+def _synthetic_profile_events(num_events):
+    def iter_profile_events(start_time=None, end_time=None):
+        for i in range(num_events):
+            yield {
+                "event_type": "task" if i % 2 else "ray.get",
+                "component_id": "{:040x}".format(i % 8),
+                "node_ip_address": "10.0.0.{}".format(i % 4),
+                "component_type": "worker",
+                "start_time": float(i),
+                "end_time": i + 0.5,
+                "job_id": "0100",
+                "extra_data": {},
+            }
+
+    global_state = ray.state.GlobalState()
+    # The events don't come from the GCS, so pretend to be connected.
+    global_state.redis_client = global_state.redis_clients = []
+    global_state.iter_profile_events = iter_profile_events
+    return global_state
+
+
+def test_timeline_filters_and_sampling():
+    global_state = _synthetic_profile_events(800)
+    assert len(global_state.chrome_tracing_dump()) == 800
+    events = global_state.chrome_tracing_dump(node_ip_address="10.0.0.1")
+    assert len(events) == 200
+    assert {event["pid"] for event in events} == {"10.0.0.1"}
+    assert len(global_state.chrome_tracing_dump(job_id="0200")) == 0
+
+    # Every row and event type keeps about the sampled fraction of events,
+    # including its first one.
+    events = global_state.chrome_tracing_dump(sample_rate=0.1)
+    assert len(events) == 80
+    assert len({(event["tid"], event["cat"]) for event in events}) == 8
+
+    with pytest.raises(ValueError):
+        global_state.chrome_tracing_dump(sample_rate=0)
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32", reason="The resource module is Unix only.")
+def test_timeline_streaming_memory(tmp_path):
+    import resource
+
+    num_events = 2 * 10**6
+    global_state = _synthetic_profile_events(num_events)
+    filename = str(tmp_path / "timeline.json")
+
+    max_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    global_state.chrome_tracing_dump(filename=filename)
+    max_rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Holding all of the events in memory would take gigabytes. ru_maxrss is
+    # in bytes on macOS and in kilobytes elsewhere.
+    max_rss_growth = max_rss_after - max_rss_before
+    if sys.platform != "darwin":
+        max_rss_growth *= 1024
+    assert max_rss_growth < 100 * 1024 * 1024
+
+    # The events are written one per line.
+    with open(filename) as f:
+        assert f.read(1) == "["
+        assert sum(1 for _ in f) == num_events
+
+
 if __name__ == "__main__":
     import pytest
     import sys
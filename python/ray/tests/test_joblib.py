@@ -162,6 +162,25 @@ def test_cross_validation(shutdown_only):
         assert result > 0.95
 
 
+def test_large_args_passed_by_reference(shutdown_only):
+    register_ray()
+    X = np.random.rand(1000, 1000)
+
+    def f(X, i):
+        # Large arrays are read zero-copy from the object store.
+        return X.flags.writeable, X[i].sum()
+
+    with joblib.parallel_backend("ray", n_jobs=2):
+        results = joblib.Parallel()(joblib.delayed(f)(X, i) for i in range(4))
+    assert [writeable for writeable, _ in results] == [False] * 4
+    assert [total for _, total in results] == [X[i].sum() for i in range(4)]
+
+    with joblib.parallel_backend("ray", n_jobs=2):
+        results = joblib.Parallel(max_nbytes=None)(
+            joblib.delayed(f)(X, i) for i in range(4))
+    assert [total for _, total in results] == [X[i].sum() for i in range(4)]
+
+
 if __name__ == "__main__":
     import pytest
     sys.exit(pytest.main(["-v", __file__]))
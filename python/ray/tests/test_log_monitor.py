@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+import ray
+import ray.gcs_utils
+import ray.ray_constants as ray_constants
+from ray.log_monitor import LogMonitor
+
+
+class MockRedisClient:
+    def __init__(self, num_subscribers=1):
+        self.num_subscribers = num_subscribers
+        self.published = []
+
+    def pubsub_numsub(self, channel):
+        return [(channel.encode("ascii"), self.num_subscribers)]
+
+    def publish(self, channel, message):
+        assert channel == ray.gcs_utils.LOG_FILE_CHANNEL
+        self.published.append(ray.gcs_utils.decode_log_batch(message))
+
+
+@pytest.fixture
+def log_monitor(tmp_path, monkeypatch):
+    redis_client = MockRedisClient()
+    monkeypatch.setattr(ray.services, "get_node_ip_address", lambda: "1.2.3.4")
+    monkeypatch.setattr(ray.services, "create_redis_client",
+                        lambda *args, **kwargs: redis_client)
+    yield LogMonitor(str(tmp_path), "localhost:6379")
+
+
+def write_log(log_monitor, filename, data):
+    with open(os.path.join(log_monitor.logs_dir, filename), "ab") as f:
+        f.write(data)
+
+
+def check_log_files(log_monitor):
+    log_monitor.update_log_filenames()
+    log_monitor.open_closed_files()
+    log_monitor.check_log_files()
+    log_monitor.publish_updates()
+
+
+def test_batches_lines_of_all_files(log_monitor):
+    write_log(log_monitor, "worker-1.out", b"Ray worker pid: 1\na\nb\n")
+    write_log(log_monitor, "worker-2.err", b"Ray worker pid: 2\nc\n")
+    check_log_files(log_monitor)
+
+    published = log_monitor.redis_client.published
+    assert len(published) == 1
+    batch = sorted(published[0], key=lambda data: data["pid"])
+    assert batch == [
+        {
+            "ip": "1.2.3.4",
+            "pid": 1,
+            "lines": ["a", "b"]
+        },
+        {
+            "ip": "1.2.3.4",
+            "pid": 2,
+            "lines": ["c"]
+        },
+    ]
+
+    check_log_files(log_monitor)
+    assert len(published) == 1
+
+
+def test_partial_lines(log_monitor):
+    write_log(log_monitor, "worker-1.out", b"Ray worker pid: 1\na\npar")
+    check_log_files(log_monitor)
+    write_log(log_monitor, "worker-1.out", b"tial\n\xe5b\n")
+    check_log_files(log_monitor)
+    published = log_monitor.redis_client.published
+    assert [batch[0]["lines"]
+            for batch in published] == [["a"], ["partial", "\ufffdb"]]
+
+    # A partial line is published once the file stops growing.
+    write_log(log_monitor, "worker-1.out", b"progress")
+    check_log_files(log_monitor)
+    check_log_files(log_monitor)
+    assert published[-1][0]["lines"] == ["progress"]
+
+
+def test_rate_limit(log_monitor, monkeypatch):
+    monkeypatch.setattr(ray_constants, "LOG_MONITOR_MAX_LINES_PER_SECOND", 10)
+    lines = "".join("{}\n".format(i) for i in range(25))
+    write_log(log_monitor, "worker-1.out",
+              "Ray worker pid: 1\n{}".format(lines).encode("ascii"))
+    check_log_files(log_monitor)
+
+    [[data]] = log_monitor.redis_client.published
+    assert data["lines"][:10] == [str(i) for i in range(10)]
+    assert len(data["lines"]) == 11
+    assert data["lines"][10].startswith("[15 lines suppressed")
+
+
+def test_no_subscribers(log_monitor):
+    log_monitor.redis_client.num_subscribers = 0
+    write_log(log_monitor, "worker-1.out", b"Ray worker pid: 1\na\n")
+    check_log_files(log_monitor)
+    write_log(log_monitor, "worker-1.out", b"b\n")
+    check_log_files(log_monitor)
+    assert log_monitor.redis_client.published == []
+    [file_info] = log_monitor.open_file_infos
+    assert file_info.worker_pid == 1
+    assert file_info.file_position == len(b"Ray worker pid: 1\na\nb\n")
+
+
+def test_subscriber_joins(log_monitor):
+    log_monitor.redis_client.num_subscribers = 0
+    write_log(log_monitor, "worker-1.out", b"Ray worker pid: 1\na\n")
+    check_log_files(log_monitor)
+
+    # Lines written once someone subscribes are published right away.
+    log_monitor.redis_client.num_subscribers = 1
+    write_log(log_monitor, "worker-1.out", b"b\n")
+    check_log_files(log_monitor)
+    assert log_monitor.redis_client.published == [[{
+        "ip": "1.2.3.4",
+        "pid": 1,
+        "lines": ["b"]
+    }]]
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
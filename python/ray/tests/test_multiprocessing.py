@@ -7,6 +7,8 @@ import random
 from collections import defaultdict
 import queue
 
+import numpy as np
+
 import ray
 from ray.test_utils import SignalActor
 from ray.util.multiprocessing import Pool, TimeoutError
@@ -397,6 +399,93 @@ def test_callbacks(pool_4_processes):
             for result in callback_results].count(True) == len(error_indices)
 
 
+def test_map_dynamic_scheduling(shutdown_only):
+    def f(index):
+        # One item runs much longer than the rest.
+        if index == 0:
+            time.sleep(2)
+        return index, os.getpid()
+
+    pool = Pool(processes=4, dynamic_scheduling=True)
+
+    results = pool.map(f, range(200))
+    assert [index for index, _ in results] == list(range(200))
+
+    # The actor running the long item shouldn't be assigned the others.
+    pid_counts = defaultdict(int)
+    for _, pid in results:
+        pid_counts[pid] += 1
+    assert pid_counts[results[0][1]] < 50
+
+    # Generators are consumed lazily rather than treated as a single item.
+    assert pool.map(lambda x: x * 2,
+                    (i for i in range(100))) == [i * 2 for i in range(100)]
+
+    def f(*args):
+        return args
+
+    args = [tuple(range(i)) for i in range(100)]
+    assert pool.starmap(f, args, chunksize=7) == args
+    assert pool.map(f, []) == []
+
+    callback_queue = queue.Queue()
+    result = pool.map_async(
+        lambda x: x, range(100), callback=callback_queue.put)
+    assert sorted(result.get()) == list(range(100))
+    assert sorted(callback_queue.get() for _ in range(100)) == list(range(100))
+
+    def bad_func(index):
+        if index == 50:
+            raise Exception("test_map_dynamic_scheduling failure")
+
+    with pytest.raises(Exception, match="test_map_dynamic_scheduling failure"):
+        pool.map(bad_func, range(100))
+
+    # Errors raised by the iterable are returned rather than lost.
+    def bad_generator():
+        for i in range(50):
+            yield i
+        raise ValueError("test_map_dynamic_scheduling generator failure")
+
+    error_queue = queue.Queue()
+    result = pool.map_async(
+        lambda x: x, bad_generator(), error_callback=error_queue.put)
+    with pytest.raises(
+            ValueError, match="test_map_dynamic_scheduling generator failure"):
+        result.get()
+    assert not result.successful()
+    assert isinstance(error_queue.get(timeout=1), ValueError)
+
+    pool.terminate()
+    pool.join()
+
+
+def test_large_args(shutdown_only):
+    large = np.zeros(1024 * 1024)
+    small = np.zeros(10)
+
+    def f(args):
+        array, index = args
+        return array.flags.writeable, index
+
+    pool = Pool(processes=2, large_arg_nbytes=1024)
+    results = pool.map(f, [(large, i) for i in range(10)], chunksize=1)
+    assert [index for _, index in results] == list(range(10))
+    assert not any(writeable for writeable, _ in results)
+    # The array is only put in the object store once.
+    assert len(pool._arg_object_ids) == 1
+
+    results = pool.map(f, [(small, i) for i in range(10)])
+    assert [index for _, index in results] == list(range(10))
+    assert len(pool._arg_object_ids) == 1
+
+    # Entries are dropped once the array is garbage collected.
+    del large
+    assert len(pool._arg_object_ids) == 0
+    pool.terminate()
+    pool.join()
+
+
 def test_imap(pool_4_processes):
     def f(args):
         time.sleep(0.1 * random.random())
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import time
 
@@ -117,6 +118,66 @@ def test_queue(ray_start_regular):
         assert q.qsize() == size
 
 
+def test_queue_batch(ray_start_regular):
+    @ray.remote
+    def put_batch_async(queue, items, sleep):
+        time.sleep(sleep)
+        queue.put_batch(items)
+
+    q = Queue()
+
+    items = list(range(100))
+    q.put_batch(items)
+    assert q.qsize() == len(items)
+    assert q.get_batch(10) == items[:10]
+    assert q.get_batch(1000) == items[10:]
+    assert q.empty()
+
+    with pytest.raises(Empty):
+        q.get_batch(10, block=False)
+
+    with pytest.raises(ValueError):
+        q.get_batch(0)
+
+    # A blocking get_batch returns as soon as any items are available.
+    put_batch_async.remote(q, [0, 1], 0.2)
+    assert q.get_batch(10) == [0, 1]
+
+    # Batches are put atomically into bounded queues.
+    q = Queue(3)
+
+    with pytest.raises(ValueError):
+        q.put_batch(range(4))
+
+    q.put(0)
+    with pytest.raises(Full):
+        q.put_batch([1, 2, 3], block=False)
+    assert q.qsize() == 1
+
+    with pytest.raises(Full):
+        q.put_batch([1, 2, 3], timeout=0.2)
+    assert q.qsize() == 1
+
+    q.put_batch([1, 2])
+    assert q.full()
+    assert q.get_batch(3) == [0, 1, 2]
+
+
+def test_queue_large_items(ray_start_regular):
+    q = Queue()
+
+    small = np.arange(10)
+    large = np.arange(1024 * 1024)
+    q.put_batch([small, large, b"x" * (1024 * 1024)])
+    q.put(large)
+
+    result = q.get_batch(3)
+    assert np.array_equal(result[0], small)
+    assert np.array_equal(result[1], large)
+    assert result[2] == b"x" * (1024 * 1024)
+    assert np.array_equal(q.get(), large)
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", __file__]))
@@ -1,8 +1,10 @@
 import os
+import psutil
 import pytest
 import redis
 
 import ray
+import ray.ray_constants as ray_constants
 from ray.cluster_utils import Cluster
 
 
@@ -73,6 +75,34 @@ class TestRedisPassword:
         assert redis_client.ping()
 
 
+def test_worker_zygote(shutdown_only):
+    # colorsys is not imported by default workers.
+    ray.init(num_cpus=2, worker_zygote_modules=["colorsys"])
+    zygote = ray.worker._global_node.all_processes[
+        ray_constants.PROCESS_TYPE_WORKER_ZYGOTE][0].process
+
+    @ray.remote
+    def f():
+        import sys
+        return os.getppid(), "colorsys" in sys.modules
+
+    parent_pid, preloaded = ray.get(f.remote())
+    assert parent_pid == zygote.pid
+    assert preloaded
+
+    @ray.remote
+    class Actor:
+        def getpid(self):
+            return os.getpid()
+
+    actor = Actor.remote()
+    pid = ray.get(actor.getpid.remote())
+    ray.kill(actor)
+    # The forked worker exits along with the launcher the raylet kills.
+    psutil.Process(pid).wait(timeout=10)
+    assert not psutil.pid_exists(pid)
+
+
 if __name__ == "__main__":
     import pytest
     import sys
@@ -4,6 +4,7 @@ import copy
 import json
 import logging
 import gc
+import os
 import time
 import weakref
 
@@ -371,6 +372,104 @@ def test_feature_flag(shutdown_only):
     _fill_object_store_and_get(actor.get_large_object.remote(), succeed=False)
 
 
+def test_object_spilling(shutdown_only, tmp_path):
+    spill_directories = [str(tmp_path / "spill1"), str(tmp_path / "spill2")]
+    ray.init(
+        object_store_memory=100 * 1024 * 1024,
+        object_spilling_directories=spill_directories,
+        _internal_config=json.dumps({
+            "object_spilling_threshold": 0.5
+        }))
+
+    # These objects are all pinned, so without spilling the later ray.puts
+    # would fail because the object store is full.
+    object_ids = [
+        ray.put(np.full(20 * 1024 * 1024, i, dtype=np.uint8))
+        for i in range(10)
+    ]
+
+    # Objects are written to disk in the background.
+    def get_stats():
+        (stats, ) = ray.state.object_spilling_stats().values()
+        return stats
+
+    assert wait_for_condition(
+        lambda: get_stats()["num_spilled_objects"] > 0, timeout_ms=10000)
+    assert get_stats()["num_bytes_spilled"] > 0
+    assert any(os.listdir(directory) for directory in spill_directories)
+
+    # Waits that don't block don't restore spilled objects.
+    ray.wait(object_ids, num_returns=len(object_ids), timeout=0)
+    assert get_stats()["num_bytes_restored"] == 0
+
+    # Spilled objects are restored transparently.
+    for i, object_id in enumerate(object_ids):
+        array = ray.get(object_id)
+        assert array[0] == i and array[-1] == i
+        del array
+    assert get_stats()["num_bytes_restored"] > 0
+
+    # The files of spilled objects are deleted once they go out of scope.
+    del object_ids
+    assert wait_for_condition(
+        lambda: not any(
+            os.listdir(directory) for directory in spill_directories),
+        timeout_ms=10000)
+
+
+def test_object_spilling_remote_get(ray_start_cluster, tmp_path):
+    cluster = ray_start_cluster
+    spill_directory = str(tmp_path / "spill")
+    # Objects put by the driver are pinned and spilled on the head node.
+    cluster.add_node(
+        num_cpus=0,
+        object_store_memory=100 * 1024 * 1024,
+        object_spilling_directories=[spill_directory],
+        _internal_config=json.dumps({
+            "object_spilling_threshold": 0.5
+        }))
+    cluster.add_node(
+        num_cpus=1,
+        resources={"remote": 1},
+        object_store_memory=100 * 1024 * 1024)
+    ray.init(address=cluster.address)
+
+    object_ids = [
+        ray.put(np.full(20 * 1024 * 1024, i, dtype=np.uint8))
+        for i in range(10)
+    ]
+
+    def get_stats(stat):
+        stats = ray.state.object_spilling_stats().values()
+        return sum(node_stats[stat] for node_stats in stats)
+
+    assert wait_for_condition(
+        lambda: get_stats("num_spilled_objects") > 0, timeout_ms=10000)
+
+    @ray.remote(resources={"remote": 1})
+    def check(i, array):
+        return array[0] == i and array[-1] == i
+
+    @ray.remote(resources={"remote": 1})
+    def check_all(object_ids):
+        for i, object_id in enumerate(object_ids):
+            array = ray.get(object_id)
+            if array[0] != i or array[-1] != i:
+                return False
+            del array
+        return True
+
+    # Spilled objects are restored on the head node and pulled by the other
+    # node, both for task arguments and for ray.get in a task.
+    assert all(
+        ray.get([
+            check.remote(i, object_id)
+            for i, object_id in enumerate(object_ids)
+        ]))
+    assert ray.get(check_all.remote(object_ids))
+    assert get_stats("num_bytes_restored") > 0
+
+
 # Remote function takes serialized reference and doesn't hold onto it after
 # finishing. Referenced object shouldn't be evicted while the task is pending
 # and should be evicted after it returns.
@@ -0,0 +1,131 @@
+import signal
+import threading
+import time
+
+import pytest
+
+import ray
+import ray.sampling_profiler as sampling_profiler
+from ray.sampling_profiler import SamplingProfiler
+
+
+class MockPipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    def hincrby(self, key, field, amount):
+        fields = self.redis_client.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    def execute(self):
+        pass
+
+
+class MockRedisClient:
+    def __init__(self):
+        self.hashes = {}
+
+    def get(self, key):
+        return None
+
+    def pipeline(self):
+        return MockPipeline(self)
+
+
+def busy_loop(duration_s):
+    start = time.time()
+    while time.time() - start < duration_s:
+        pass
+
+
+def test_sampling_profiler():
+    redis_client = MockRedisClient()
+    profiler = SamplingProfiler()
+    profiler.connect(redis_client)
+    profiler.stop()
+    try:
+        profiler.set_interval(1)
+        busy_loop(0.1)
+        with profiler.track_task("abcd", "module.busy_loop"):
+            busy_loop(0.5)
+        profiler.set_interval(0)
+        profiler.flush()
+    finally:
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    stacks = redis_client.hashes[sampling_profiler.STACK_SAMPLES_KEY_PREFIX +
+                                 b"abcd"]
+    assert sum(stacks.values()) > 10
+    for stack in stacks:
+        frames = stack.split(";")
+        assert frames[0] == "module.busy_loop"
+        assert any(
+            frame.startswith("test_sampling_profiler ") for frame in frames)
+    assert any(
+        stack.split(";")[-1].startswith("busy_loop ") for stack in stacks)
+
+
+def test_sampling_profiler_threads():
+    redis_client = MockRedisClient()
+    profiler = SamplingProfiler()
+    profiler.connect(redis_client)
+    profiler.stop()
+    # Tasks that run on other threads, as in threaded and async actors, are
+    # not tracked, even if they start before and finish after a task on the
+    # main thread.
+    started = threading.Event()
+    finish = threading.Event()
+
+    def run_task():
+        with profiler.track_task("abcd", "module.g"):
+            started.set()
+            finish.wait()
+
+    thread = threading.Thread(target=run_task)
+    try:
+        profiler.set_interval(1)
+        thread.start()
+        started.wait()
+        assert profiler.current_task is None
+        with profiler.track_task("abcd", "module.busy_loop"):
+            busy_loop(0.5)
+        assert profiler.current_task is None
+        finish.set()
+        thread.join()
+        profiler.set_interval(0)
+        profiler.flush()
+    finally:
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    stacks = redis_client.hashes[sampling_profiler.STACK_SAMPLES_KEY_PREFIX +
+                                 b"abcd"]
+    assert sum(stacks.values()) > 10
+    assert all(stack.split(";")[0] == "module.busy_loop" for stack in stacks)
+
+
+def test_flamegraph(shutdown_only, monkeypatch):
+    monkeypatch.setenv("SAMPLING_PROFILER_INTERVAL_MS", "1")
+    monkeypatch.setenv("SAMPLING_PROFILER_REPORT_INTERVAL_MS", "100")
+    ray.init(num_cpus=1)
+
+    @ray.remote
+    def f():
+        busy_loop(1)
+
+    ray.get(f.remote())
+
+    start = time.time()
+    while True:
+        samples = ray.state.flamegraph()
+        if any("busy_loop" in stack for stack in samples):
+            break
+        assert time.time() - start < 10
+        time.sleep(0.1)
+    for stack, count in samples.items():
+        assert stack.split(";")[0].endswith(".f")
+        assert count > 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
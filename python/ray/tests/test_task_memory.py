@@ -0,0 +1,127 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+import ray
+import ray.memory_monitor as memory_monitor
+from ray.memory_monitor import TaskMemoryTracker
+
+MB = 1024 * 1024
+
+
+class MockPipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    def hmset(self, key, fields):
+        self.redis_client.hashes.setdefault(key, {}).update(fields)
+
+    def expire(self, key, ttl_s):
+        self.redis_client.ttls[key] = ttl_s
+
+    def eval(self, script, num_keys, key, field, value):
+        fields = self.redis_client.hashes.setdefault(key, {})
+        current = fields.get(field)
+        if script != memory_monitor._MERGE_PEAK_SCRIPT:
+            if current is None or current < value:
+                fields[field] = value
+            return
+        value = json.loads(value)
+        if current is not None:
+            current = json.loads(current)
+            value["num_tasks"] += current["num_tasks"]
+            for stat in [
+                    "peak_rss_bytes", "peak_uss_bytes", "peak_growth_bytes"
+            ]:
+                value[stat] = max(value[stat], current[stat])
+        fields[field] = json.dumps(value)
+
+    def execute(self):
+        pass
+
+
+class MockRedisClient:
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    def pipeline(self):
+        return MockPipeline(self)
+
+
+def test_task_memory_tracker():
+    redis_client = MockRedisClient()
+    tracker = TaskMemoryTracker(redis_client, b"worker", "1.2.3.4")
+    tracker.stop()
+
+    tracker.task_started("task1", "module.f")
+    data = np.ones(100 * MB, dtype=np.uint8)
+    tracker.sample()
+    tracker.task_finished("task1")
+    del data
+    tracker.task_started("task2", "module.Actor.g", actor_id="actor")
+    tracker.task_finished("task2")
+    tracker.task_started("task3", "module.f")
+    tracker.report()
+
+    key = memory_monitor.TASK_MEMORY_KEY_PREFIX + b"worker"
+    worker = json.loads(redis_client.hashes[key]["worker"])
+    assert worker["node_ip_address"] == "1.2.3.4"
+    assert worker["task_ids"] == ["task3"]
+    assert worker["functions"] == ["module.f"]
+    # The key of the worker expires unless it keeps reporting.
+    assert list(redis_client.hashes[key]) == ["worker"]
+    assert redis_client.ttls[key] > 0
+
+    stats = redis_client.hashes[memory_monitor.TASK_MEMORY_STATS_KEY]
+    f = json.loads(stats["function:module.f"])
+    assert f["num_tasks"] == 1
+    assert f["peak_growth_bytes"] >= 90 * MB
+    assert f["peak_rss_bytes"] >= f["peak_growth_bytes"]
+    g = json.loads(stats["function:module.Actor.g"])
+    assert g["num_tasks"] == 1
+    assert json.loads(stats["actor:actor"]) == g
+
+    peaks = redis_client.hashes[memory_monitor.TASK_MEMORY_PEAKS_KEY]
+    assert peaks["module.f"] == f["peak_growth_bytes"]
+    assert peaks["module.Actor.g"] == g["peak_growth_bytes"]
+
+    # The peaks of later tasks are merged into the reported ones.
+    tracker.task_finished("task3")
+    tracker.report()
+    f = json.loads(stats["function:module.f"])
+    assert f["num_tasks"] == 2
+    assert f["peak_growth_bytes"] >= 90 * MB
+    assert json.loads(stats["function:module.Actor.g"])["num_tasks"] == 1
+
+
+def test_task_memory_stats(shutdown_only, monkeypatch):
+    monkeypatch.setenv("MEMORY_MONITOR_TRACK_TASKS", "1")
+    ray.init(num_cpus=1)
+
+    @ray.remote
+    def allocate():
+        data = np.ones(100 * MB, dtype=np.uint8)
+        time.sleep(1)
+        return data.sum()
+
+    ray.get(allocate.remote())
+
+    name = memory_monitor.get_function_name(allocate._function_descriptor)
+    start = time.time()
+    while True:
+        stats = ray.state.task_memory_stats()
+        if name in stats["functions"]:
+            break
+        assert time.time() - start < 10
+        time.sleep(0.1)
+    assert stats["functions"][name]["num_tasks"] == 1
+    assert stats["functions"][name]["peak_growth_bytes"] >= 90 * MB
+    assert len(stats["workers"]) >= 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -1,4 +1,5 @@
 from joblib._parallel_backends import MultiprocessingBackend
+from joblib.disk import memstr_to_bytes
 from joblib.pool import PicklingPool
 import logging
 
@@ -45,6 +46,13 @@ class RayBackend(MultiprocessingBackend):
                     ray.init()
             ray_cpus = int(ray.state.cluster_resources()["CPU"])
             n_jobs = ray_cpus
+        """Put arrays larger than joblib's max_nbytes in the object store once
+        and pass them by reference, the counterpart of joblib memmapping them.
+        """
+        max_nbytes = memmappingpool_args.get("max_nbytes", "1M")
+        if isinstance(max_nbytes, str):
+            max_nbytes = memstr_to_bytes(max_nbytes)
+        memmappingpool_args["large_arg_nbytes"] = max_nbytes
 
         eff_n_jobs = super(RayBackend, self).configure(
             n_jobs, parallel, prefer, require, **memmappingpool_args)
@@ -1,5 +1,6 @@
 import logging
 from multiprocessing import TimeoutError
+import io
 import os
 import time
 import random
@@ -7,13 +8,21 @@ import collections
 import threading
 import queue
 import copy
+import weakref
+
+import numpy as np
 
 import ray
+from ray import cloudpickle
 
 logger = logging.getLogger(__name__)
 
 RAY_ADDRESS_ENV = "RAY_ADDRESS"
 
+# With dynamic scheduling, chunks are sized to run for at least this many
+# seconds once the per-item runtime is known, to amortize per-task overhead.
+DYNAMIC_MIN_CHUNK_SECONDS = 0.1
+
 
 # Helper function to divide a by b and round the result up.
 def div_round_up(a, b):
@@ -25,20 +34,52 @@ class PoolTaskError(Exception):
         self.underlying = underlying
 
 
-class ResultThread(threading.Thread):
+class _BaseResultThread(threading.Thread):
+    """Collects the results of chunks and runs the callbacks on them."""
+
+    def __init__(self, callback=None, error_callback=None):
+        threading.Thread.__init__(self, daemon=True)
+        self._got_error = False
+        self._results = []
+        self._callback = callback
+        self._error_callback = error_callback
+
+    def _get_batch(self, ready_id):
+        try:
+            batch = ray.get(ready_id)
+        except ray.exceptions.RayError as e:
+            batch = [e]
+        self._run_callbacks(batch)
+        return batch
+
+    def _run_callbacks(self, batch):
+        for result in batch:
+            if isinstance(result, Exception):
+                self._got_error = True
+                if self._error_callback is not None:
+                    self._error_callback(result)
+            elif self._callback is not None:
+                self._callback(result)
+
+    def got_error(self):
+        # Should only be called after the thread finishes.
+        return self._got_error
+
+    def results(self):
+        # Should only be called after the thread finishes.
+        return self._results
+
+
+class ResultThread(_BaseResultThread):
     def __init__(self,
                  object_ids,
                  callback=None,
                  error_callback=None,
                  total_object_ids=None):
-        threading.Thread.__init__(self, daemon=True)
-        self._got_error = False
+        _BaseResultThread.__init__(self, callback, error_callback)
         self._object_ids = []
         self._num_ready = 0
-        self._results = []
         self._ready_index_queue = queue.Queue()
-        self._callback = callback
-        self._error_callback = error_callback
         self._total_object_ids = total_object_ids or len(object_ids)
         self._indices = {}
         # Thread-safe queue used to add ObjectIDs to fetch after creating
@@ -71,34 +112,15 @@ class ResultThread(threading.Thread):
                     break
 
             [ready_id], unready = ray.wait(unready, num_returns=1)
-            try:
-                batch = ray.get(ready_id)
-            except ray.exceptions.RayError as e:
-                batch = [e]
-            for result in batch:
-                if isinstance(result, Exception):
-                    self._got_error = True
-                    if self._error_callback is not None:
-                        self._error_callback(result)
-                elif self._callback is not None:
-                    self._callback(result)
-
+            batch = self._get_batch(ready_id)
             self._num_ready += 1
             self._results[self._indices[ready_id]] = batch
             self._ready_index_queue.put(self._indices[ready_id])
 
-    def got_error(self):
-        # Should only be called after the thread finishes.
-        return self._got_error
-
     def result(self, index):
         # Should only be called on results that are ready.
         return self._results[index]
 
-    def results(self):
-        # Should only be called after the thread finishes.
-        return self._results
-
     def next_ready_index(self, timeout=None):
         try:
             return self._ready_index_queue.get(timeout=timeout)
@@ -107,6 +129,101 @@ class ResultThread(threading.Thread):
             raise TimeoutError
 
 
+class DynamicResultThread(_BaseResultThread):
+    """Schedules the chunks of a map pull-based and collects their results.
+
+    Each actor in the pool has a single chunk in flight and is given the
+    next one as soon as it returns, so slow items only hold up the actor
+    running them. Chunk sizes adapt to the measured per-item runtime: when the
+    number of items is known, each chunk takes half of an even share of the
+    remaining items (large early, shrinking towards the end), but is never
+    shorter than DYNAMIC_MIN_CHUNK_SECONDS. The iterable is consumed lazily,
+    so generators are supported.
+    """
+
+    def __init__(self,
+                 pool,
+                 func,
+                 iterable,
+                 chunksize=None,
+                 unpack_args=False,
+                 callback=None,
+                 error_callback=None):
+        _BaseResultThread.__init__(self, callback, error_callback)
+        self._pool = pool
+        self._func = func
+        self._iterator = iter(iterable)
+        self._remaining = (len(iterable)
+                           if hasattr(iterable, "__len__") else None)
+        self._chunksize = chunksize
+        self._unpack_args = unpack_args
+        self._exhausted = False
+        self._item_time = None
+        # ObjectID -> (actor index, chunk index, chunk length, submit time).
+        self._in_flight = {}
+
+    def _next_chunksize(self):
+        if self._chunksize:
+            return self._chunksize
+        chunksize = 1
+        if self._item_time is not None:
+            chunksize = max(
+                chunksize,
+                int(DYNAMIC_MIN_CHUNK_SECONDS / max(self._item_time, 1e-9)))
+        if self._remaining is not None:
+            chunksize = max(
+                chunksize,
+                div_round_up(self._remaining, 2 * len(self._pool._actor_pool)))
+        return chunksize
+
+    def _submit_next_chunk(self, actor_index):
+        if self._exhausted:
+            return
+        try:
+            chunk = self._pool._get_chunk(
+                self._iterator, self._next_chunksize(), self._unpack_args)
+            if len(chunk) > 0:
+                object_id = self._pool._run_batch(actor_index, self._func,
+                                                  chunk)
+        except Exception as e:
+            # The iterable raised or the chunk couldn't be submitted. Stop
+            # consuming the iterable and return the error as a result.
+            self._exhausted = True
+            batch = [e]
+            self._run_callbacks(batch)
+            self._results.append(batch)
+            return
+        if len(chunk) == 0:
+            self._exhausted = True
+            return
+        if self._remaining is not None:
+            self._remaining = max(0, self._remaining - len(chunk))
+
+        self._in_flight[object_id] = (actor_index, len(self._results),
+                                      len(chunk), time.time())
+        self._results.append(None)
+
+    def _record_item_time(self, num_items, elapsed):
+        item_time = elapsed / num_items
+        if self._item_time is None:
+            self._item_time = item_time
+        else:
+            self._item_time = (self._item_time + item_time) / 2
+
+    def run(self):
+        for actor_index in range(len(self._pool._actor_pool)):
+            self._submit_next_chunk(actor_index)
+
+        while len(self._in_flight) > 0:
+            [ready_id], _ = ray.wait(list(self._in_flight), num_returns=1)
+            actor_index, chunk_index, num_items, start = self._in_flight.pop(
+                ready_id)
+            self._record_item_time(num_items, time.time() - start)
+            # Refill the idle actor before processing the results.
+            self._submit_next_chunk(actor_index)
+            self._results[chunk_index] = self._get_batch(ready_id)
+
+
 class AsyncResult:
     """An asynchronous interface to task results.
 
@@ -117,10 +234,13 @@ class AsyncResult:
                  chunk_object_ids,
                  callback=None,
                  error_callback=None,
-                 single_result=False):
+                 single_result=False,
+                 result_thread=None):
         self._single_result = single_result
-        self._result_thread = ResultThread(chunk_object_ids, callback,
-                                           error_callback)
+        if result_thread is None:
+            result_thread = ResultThread(chunk_object_ids, callback,
+                                         error_callback)
+        self._result_thread = result_thread
         self._result_thread.start()
 
     def wait(self, timeout=None):
@@ -279,6 +399,43 @@ class UnorderedIMapIterator(IMapIterator):
         return self._ready_objects.popleft()
 
 
+class _ArgPickler(cloudpickle.CloudPickler):
+    """Pickles a batch, replacing large NumPy arrays by object store refs.
+
+    Arrays of at least pool._large_arg_nbytes bytes anywhere in the pickled
+    objects (including inside functions such as joblib's BatchedCalls) are
+    put in the object store once per pool and recorded in object_ids; the
+    pickle only stores their index in that list.
+    """
+
+    def __init__(self, file, pool):
+        super().__init__(file)
+        self._pool = pool
+        self._indices = {}
+        self.object_ids = []
+
+    def persistent_id(self, obj):
+        if (type(obj) is not np.ndarray or obj.dtype.hasobject
+                or obj.nbytes < self._pool._large_arg_nbytes):
+            return None
+        object_id = self._pool._put_arg(obj)
+        if object_id not in self._indices:
+            self._indices[object_id] = len(self.object_ids)
+            self.object_ids.append(object_id)
+        return self._indices[object_id]
+
+
+class _ArgUnpickler(cloudpickle.pickle.Unpickler):
+    """Loads a batch pickled by _ArgPickler given the referenced arrays."""
+
+    def __init__(self, file, args):
+        super().__init__(file)
+        self._args = args
+
+    def persistent_load(self, index):
+        return self._args[index]
+
+
 @ray.remote(num_cpus=1)
 class PoolActor:
     """Actor used to process tasks submitted to a Pool."""
@@ -303,6 +460,13 @@ class PoolActor:
                 results.append(PoolTaskError(e))
         return results
 
+    def run_pickled_batch(self, pickled_batch, *args):
+        # The arrays referenced by the batch are passed as top-level
+        # arguments, so they are read zero-copy from the object store and
+        # stay pinned while the batch runs.
+        func, batch = _ArgUnpickler(io.BytesIO(pickled_batch), args).load()
+        return self.run_batch(func, batch)
+
 
 # https://docs.python.org/3/library/multiprocessing.html#module-multiprocessing.pool
 class Pool:
@@ -321,6 +485,17 @@ class Pool:
             Ray cluster will be started on this machine. Otherwise, this will
             be passed to `ray.init()` to connect to a running cluster. This may
             also be specified using the `RAY_ADDRESS` environment variable.
+        large_arg_nbytes: if set, NumPy arrays of at least this many bytes
+            in the function or arguments of a task are put in the object
+            store once and passed by reference rather than serialized into
+            every batch, and the actor processes receive read-only zero-copy
+            views of them. Like joblib's memmapping, this assumes the arrays
+            are not modified in place. None (the default) disables this.
+        dynamic_scheduling: if True, map and starmap hand out chunks to the
+            actor processes as they become idle instead of assigning them
+            round-robin up front, size chunks adaptively based on the measured
+            runtime per item, and consume the iterable lazily. This balances
+            load when task durations are skewed.
     """
 
     def __init__(self,
@@ -329,8 +504,19 @@ class Pool:
                  initargs=None,
                  maxtasksperchild=None,
                  context=None,
-                 ray_address=None):
+                 ray_address=None,
+                 large_arg_nbytes=None,
+                 dynamic_scheduling=False):
         self._closed = False
+        self._large_arg_nbytes = large_arg_nbytes
+        # id(array) -> (weakref to the array, ObjectID) of the large arguments
+        # already put in the object store.
+        self._arg_object_ids = {}
+        self._dynamic_scheduling = dynamic_scheduling
+        # Result threads of dynamically scheduled maps submit tasks
+        # concurrently with the caller. Reentrant because the weakref
+        # callbacks of large arguments may run while it is held.
+        self._submit_lock = threading.RLock()
         self._initializer = initializer
         self._initargs = initargs
         self._maxtasksperchild = maxtasksperchild or -1
@@ -407,16 +593,50 @@ class Pool:
     def _random_actor_index(self):
         return random.randrange(len(self._actor_pool))
 
+    def _put_arg(self, arg):
+        key = id(arg)
+        with self._submit_lock:
+            entry = self._arg_object_ids.get(key)
+            if entry is not None and entry[0]() is arg:
+                return entry[1]
+
+            def remove(ref):
+                with self._submit_lock:
+                    if self._arg_object_ids.get(key, (None, ))[0] is ref:
+                        del self._arg_object_ids[key]
+
+            object_id = ray.put(arg)
+            self._arg_object_ids[key] = (weakref.ref(arg, remove), object_id)
+            return object_id
+
+    def _pickle_batch(self, func, batch):
+        file = io.BytesIO()
+        pickler = _ArgPickler(file, self)
+        pickler.dump((func, batch))
+        return file.getvalue(), pickler.object_ids
+
     # Batch should be a list of tuples: (args, kwargs).
     def _run_batch(self, actor_index, func, batch):
-        actor, count = self._actor_pool[actor_index]
-        object_id = actor.run_batch.remote(func, batch)
-        count += 1
-        assert self._maxtasksperchild == -1 or count <= self._maxtasksperchild
-        if count == self._maxtasksperchild:
-            self._stop_actor(actor)
-            actor, count = self._new_actor_entry()
-        self._actor_pool[actor_index] = (actor, count)
+        pickled_batch = None
+        if self._large_arg_nbytes is not None:
+            # Send the pickle even if it references no arrays, so the batch
+            # isn't serialized twice.
+            pickled_batch, arg_ids = self._pickle_batch(func, batch)
+
+        with self._submit_lock:
+            actor, count = self._actor_pool[actor_index]
+            if pickled_batch is None:
+                object_id = actor.run_batch.remote(func, batch)
+            else:
+                object_id = actor.run_pickled_batch.remote(
+                    pickled_batch, *arg_ids)
+            count += 1
+            assert (self._maxtasksperchild == -1
+                    or count <= self._maxtasksperchild)
+            if count == self._maxtasksperchild:
+                self._stop_actor(actor)
+                actor, count = self._new_actor_entry()
+            self._actor_pool[actor_index] = (actor, count)
         return object_id
 
     def apply(self, func, args=None, kwargs=None):
@@ -469,12 +689,7 @@ class Pool:
             chunksize += 1
         return chunksize
 
-    def _submit_chunk(self,
-                      func,
-                      iterator,
-                      chunksize,
-                      actor_index,
-                      unpack_args=False):
+    def _get_chunk(self, iterator, chunksize, unpack_args=False):
         chunk = []
         while len(chunk) < chunksize:
             try:
@@ -484,6 +699,15 @@ class Pool:
                 chunk.append((args, {}))
             except StopIteration:
                 break
+        return chunk
+
+    def _submit_chunk(self,
+                      func,
+                      iterator,
+                      chunksize,
+                      actor_index,
+                      unpack_args=False):
+        chunk = self._get_chunk(iterator, chunksize, unpack_args)
 
         # Nothing to submit. The caller should prevent this.
         assert len(chunk) > 0
@@ -520,6 +744,17 @@ class Pool:
                    callback=None,
                    error_callback=None):
         self._check_running()
+        if self._dynamic_scheduling:
+            result_thread = DynamicResultThread(
+                self,
+                func,
+                iterable,
+                chunksize=chunksize,
+                unpack_args=unpack_args,
+                callback=callback,
+                error_callback=error_callback)
+            return AsyncResult([], result_thread=result_thread)
+
         object_ids = self._chunk_and_run(
             func, iterable, chunksize=chunksize, unpack_args=unpack_args)
         return AsyncResult(object_ids, callback, error_callback)
@@ -25,6 +25,7 @@ import ray.node
 import ray.parameter
 import ray.ray_constants as ray_constants
 import ray.remote_function
+import ray.sampling_profiler as sampling_profiler
 import ray.serialization as serialization
 import ray.services as services
 import ray
@@ -117,6 +118,7 @@ class Worker:
         # CUDA_VISIBLE_DEVICES environment variable.
         self.original_gpu_ids = ray.utils.get_cuda_visible_devices()
         self.memory_monitor = memory_monitor.MemoryMonitor()
+        self.sampling_profiler = sampling_profiler.SamplingProfiler()
         # A dictionary that maps from driver id to SerializationContext
         # TODO: clean up the SerializationContext once the job finished.
         self.serialization_context_map = {}
@@ -551,7 +553,9 @@ def init(address=None,
          load_code_from_local=False,
          use_pickle=True,
          _internal_config=None,
-         lru_evict=False):
+         lru_evict=False,
+         worker_zygote_modules=None,
+         object_spilling_directories=None):
     """Connect to an existing Ray cluster or start one and connect to it.
 
     This method handles two cases. Either a Ray cluster already exists and we
@@ -653,6 +657,15 @@ def init(address=None,
             reference counting will be used to decide which objects are safe to
             evict and when under memory pressure, ray.ObjectStoreFullError may
             be thrown.
+        worker_zygote_modules (list): If not None, Python workers are forked
+            from a per-node zygote process that has already imported Ray and
+            these modules (e.g., ["tensorflow"]), which makes starting workers
+            much faster. The modules must not start threads on import.
+        object_spilling_directories (list): If not None, objects that are
+            still referenced are spilled to files in these directories when
+            they take up too much of the object store (by default 80%, see
+            the object_spilling_threshold internal config), and are restored
+            transparently when they are needed again on this node.
 
     Returns:
         Address information about the started processes.
@@ -747,6 +760,8 @@ def init(address=None,
             raylet_socket_name=raylet_socket_name,
             temp_dir=temp_dir,
             load_code_from_local=load_code_from_local,
+            worker_zygote_modules=worker_zygote_modules,
+            object_spilling_directories=object_spilling_directories,
             _internal_config=_internal_config,
         )
         # Start the Ray processes. We set shutdown_at_exit=False because we
@@ -797,6 +812,13 @@ def init(address=None,
         if raylet_socket_name is not None:
             raise ValueError("When connecting to an existing cluster, "
                              "raylet_socket_name must not be provided.")
+        if worker_zygote_modules is not None:
+            raise ValueError("When connecting to an existing cluster, "
+                             "worker_zygote_modules must not be provided.")
+        if object_spilling_directories is not None:
+            raise ValueError("When connecting to an existing cluster, "
+                             "object_spilling_directories must not be "
+                             "provided.")
         if _internal_config is not None:
             logger.warning(
                 "When connecting to an existing cluster, "
@@ -954,7 +976,7 @@ def print_logs(redis_client, threads_stopped):
                 continue
             num_consecutive_messages_received += 1
 
-            data = json.loads(ray.utils.decode(msg["data"]))
+            batch = ray.gcs_utils.decode_log_batch(msg["data"])
 
             def color_for(data):
                 if data["pid"] == "raylet":
@@ -962,16 +984,17 @@ def print_logs(redis_client, threads_stopped):
                 else:
                     return colorama.Fore.CYAN
 
-            if data["ip"] == localhost:
-                for line in data["lines"]:
-                    print("{}{}(pid={}){} {}".format(
-                        colorama.Style.DIM, color_for(data), data["pid"],
-                        colorama.Style.RESET_ALL, line))
-            else:
-                for line in data["lines"]:
-                    print("{}{}(pid={}, ip={}){} {}".format(
-                        colorama.Style.DIM, color_for(data), data["pid"],
-                        data["ip"], colorama.Style.RESET_ALL, line))
+            for data in batch:
+                if data["ip"] == localhost:
+                    for line in data["lines"]:
+                        print("{}{}(pid={}){} {}".format(
+                            colorama.Style.DIM, color_for(data), data["pid"],
+                            colorama.Style.RESET_ALL, line))
+                else:
+                    for line in data["lines"]:
+                        print("{}{}(pid={}, ip={}){} {}".format(
+                            colorama.Style.DIM, color_for(data), data["pid"],
+                            data["ip"], colorama.Style.RESET_ALL, line))
 
             if (num_consecutive_messages_received % 100 == 0
                     and num_consecutive_messages_received > 0):
@@ -1251,6 +1274,9 @@ def connect(node,
             worker_dict["stdout_file"] = os.path.abspath(log_stdout_file.name)
             worker_dict["stderr_file"] = os.path.abspath(log_stderr_file.name)
         worker.redis_client.hmset(b"Workers:" + worker.worker_id, worker_dict)
+        worker.memory_monitor.enable_task_tracking(
+            worker.redis_client, worker.worker_id, node.node_ip_address)
+        worker.sampling_profiler.connect(worker.redis_client)
     else:
         raise ValueError("Invalid worker mode. Expected DRIVER or WORKER.")
 
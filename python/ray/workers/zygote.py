@@ -0,0 +1,190 @@
+"""Per-node zygote that forks preloaded Python workers.
+
+The zygote imports Ray and a configurable list of modules once, then listens
+on a Unix socket. The raylet starts workers with zygote_worker.py, a small
+launcher that doesn't import Ray: it sends its command line, environment and
+standard streams to the zygote, which forks a child that runs the worker with
+everything already imported.
+
+The raylet identifies and kills workers by the pid it started, so the child
+registers with the launcher's pid (see RAY_WORKER_LAUNCHER_PID_ENV) and exits
+as soon as the launcher does. The launcher in turn exits with the child's exit
+code once the child is done.
+
+Forking is only safe while the zygote has a single thread, so the preloaded
+modules must not start threads at import time, and the job's exported
+functions are still loaded by each worker after it connects.
+"""
+
+import argparse
+import array
+import atexit
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import struct
+import sys
+import threading
+import traceback
+
+# Import everything default_worker.py needs so forked workers start warm.
+import ray
+import ray.actor  # noqa: F401
+import ray.node  # noqa: F401
+import ray.parameter  # noqa: F401
+import ray.ray_constants as ray_constants
+import ray.utils
+
+# The launcher sends its request as a length-prefixed JSON message along with
+# its stdin, stdout and stderr file descriptors.
+HEADER = struct.Struct("!I")
+NUM_FDS = 3
+# The forked child sends its pid to the launcher when it starts and its exit
+# code before it exits.
+INT = struct.Struct("!i")
+
+parser = argparse.ArgumentParser(
+    description=("Preload modules and fork Python workers on request."))
+parser.add_argument(
+    "--socket-name",
+    required=True,
+    type=str,
+    help="the path of the Unix socket to listen on")
+parser.add_argument(
+    "--preload-modules",
+    required=False,
+    type=str,
+    default="",
+    help="comma-separated list of modules to import before forking workers")
+parser.add_argument(
+    "--logging-level",
+    required=False,
+    type=str,
+    default=ray_constants.LOGGER_LEVEL,
+    choices=ray_constants.LOGGER_LEVEL_CHOICES,
+    help=ray_constants.LOGGER_LEVEL_HELP)
+parser.add_argument(
+    "--logging-format",
+    required=False,
+    type=str,
+    default=ray_constants.LOGGER_FORMAT,
+    help=ray_constants.LOGGER_FORMAT_HELP)
+
+
+def recv_request(conn):
+    """Receive a launcher's request and standard stream descriptors."""
+    fds = array.array("i")
+    data, ancdata, _, _ = conn.recvmsg(4096,
+                                       socket.CMSG_LEN(NUM_FDS * fds.itemsize))
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(
+                cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+    if len(data) < HEADER.size or len(fds) != NUM_FDS:
+        raise ValueError("Malformed zygote request.")
+    (length, ) = HEADER.unpack_from(data)
+    data = data[HEADER.size:]
+    while len(data) < length:
+        chunk = conn.recv(length - len(data))
+        if not chunk:
+            raise ValueError("Truncated zygote request.")
+        data += chunk
+    return json.loads(data.decode("utf-8")), list(fds)
+
+
+def exit_with_launcher(conn):
+    """Exit the worker once the launcher exits or is killed."""
+    try:
+        while conn.recv(1):
+            pass
+    except OSError:
+        pass
+    os._exit(1)
+
+
+def run_worker(conn, request, fds):
+    """Run a worker in a freshly forked child. Never returns."""
+    exit_code = 1
+    try:
+        conn.sendall(INT.pack(os.getpid()))
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.environ[ray_constants.RAY_WORKER_LAUNCHER_PID_ENV] = str(
+            request["launcher_pid"])
+        # Don't share the zygote's random state among workers.
+        if "numpy" in sys.modules:
+            sys.modules["numpy"].random.seed()
+
+        threading.Thread(
+            target=exit_with_launcher, args=(conn, ), daemon=True).start()
+
+        worker_path = request["argv"][0]
+        sys.argv = request["argv"]
+        sys.path[0] = os.path.dirname(os.path.abspath(worker_path))
+        try:
+            runpy.run_path(worker_path, run_name="__main__")
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(INT.pack(exit_code))
+        finally:
+            os._exit(exit_code)
+
+
+def serve(socket_name):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if os.path.exists(socket_name):
+        os.unlink(socket_name)
+    server.bind(socket_name)
+    server.listen(128)
+    # Let the kernel reap the forked workers.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    while True:
+        conn, _ = server.accept()
+        try:
+            request, fds = recv_request(conn)
+        except (OSError, ValueError):
+            traceback.print_exc()
+            conn.close()
+            continue
+
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            run_worker(conn, request, fds)
+        for fd in fds:
+            os.close(fd)
+        conn.close()
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    ray.utils.setup_logger(args.logging_level, args.logging_format)
+
+    for module_name in filter(None, args.preload_modules.split(",")):
+        importlib.import_module(module_name)
+    if threading.active_count() > 1:
+        raise RuntimeError(
+            "The worker zygote must be single-threaded to fork safely, but "
+            "importing {} started threads.".format(args.preload_modules))
+
+    serve(args.socket_name)
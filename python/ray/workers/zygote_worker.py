@@ -0,0 +1,70 @@
+"""Launcher that starts a worker by forking it from the node's zygote.
+
+Usage: zygote_worker.py ZYGOTE_SOCKET WORKER_PATH [WORKER_ARGS...]
+
+The raylet runs this instead of default_worker.py when the worker zygote is
+enabled. It deliberately doesn't import Ray so that it starts quickly. It
+stays alive for as long as the forked worker runs, forwards termination
+signals to it, and exits with its exit code. If the zygote can't be reached,
+it runs the worker directly instead.
+"""
+
+import array
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+# Must match zygote.py.
+HEADER = struct.Struct("!I")
+INT = struct.Struct("!i")
+
+
+def recv_int(conn):
+    data = b""
+    while len(data) < INT.size:
+        chunk = conn.recv(INT.size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return INT.unpack(data)[0]
+
+
+def main(socket_name, argv):
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(socket_name)
+    except OSError:
+        os.execv(sys.executable, [sys.executable] + argv)
+
+    request = json.dumps({
+        "argv": argv,
+        "env": dict(os.environ),
+        "cwd": os.getcwd(),
+        "launcher_pid": os.getpid(),
+    }).encode("utf-8")
+    fds = array.array("i", [0, 1, 2])
+    conn.sendmsg([HEADER.pack(len(request)) + request],
+                 [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds.tobytes())])
+
+    worker_pid = recv_int(conn)
+    if worker_pid is None:
+        sys.exit(1)
+
+    def forward(signum, frame):
+        try:
+            os.kill(worker_pid, signum)
+        except OSError:
+            pass
+
+    for signum in [signal.SIGTERM, signal.SIGINT, signal.SIGHUP]:
+        signal.signal(signum, forward)
+
+    exit_code = recv_int(conn)
+    sys.exit(1 if exit_code is None else exit_code)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2:])
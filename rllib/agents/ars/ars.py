@@ -13,6 +13,7 @@ from ray.rllib.agents import Trainer, with_common_config
 from ray.rllib.agents.ars import optimizers
 from ray.rllib.agents.ars import policies
 from ray.rllib.agents.ars import utils
+from ray.rllib.agents.es.es import create_shared_noise, get_noise_table
 from ray.rllib.policy.sample_batch import DEFAULT_POLICY_ID
 from ray.rllib.utils.annotations import override
 from ray.rllib.utils.memory import ray_get_and_free
@@ -35,6 +36,7 @@ DEFAULT_CONFIG = with_common_config({
     "sgd_stepsize": 0.01,  # sgd step-size
     "observation_filter": "MeanStdFilter",
     "noise_size": 250000000,
+    "noise_table": "object_store",  # "object_store" or "node_local", see ES
     "eval_prob": 0.03,  # probability of evaluating the parameter rewards
     "report_length": 10,  # how many of the last rewards we average over
     "offset": 0,
@@ -43,36 +45,12 @@ DEFAULT_CONFIG = with_common_config({
 # yapf: enable
 
 
-@ray.remote
-def create_shared_noise(count):
-    """Create a large array of noise to be shared by all workers."""
-    seed = 123
-    noise = np.random.RandomState(seed).randn(count).astype(np.float32)
-    return noise
-
-
-class SharedNoiseTable:
-    def __init__(self, noise):
-        self.noise = noise
-        assert self.noise.dtype == np.float32
-
-    def get(self, i, dim):
-        return self.noise[i:i + dim]
-
-    def sample_index(self, dim):
-        return np.random.randint(0, len(self.noise) - dim + 1)
-
-    def get_delta(self, dim):
-        idx = self.sample_index(dim)
-        return idx, self.get(idx, dim)
-
-
 @ray.remote
 class Worker:
     def __init__(self, config, env_creator, noise, min_task_runtime=0.2):
         self.min_task_runtime = min_task_runtime
         self.config = config
-        self.noise = SharedNoiseTable(noise)
+        self.noise = get_noise_table(config, noise)
 
         self.env = env_creator(config["env_config"])
         from ray.rllib import models
@@ -183,8 +161,12 @@ class ARSTrainer(Trainer):
 
         # Create the shared noise table.
         logger.info("Creating shared noise table.")
-        noise_id = create_shared_noise.remote(config["noise_size"])
-        self.noise = SharedNoiseTable(ray.get(noise_id))
+        if config["noise_table"] == "object_store":
+            noise_id = create_shared_noise.remote(config["noise_size"])
+            self.noise = get_noise_table(config, ray.get(noise_id))
+        else:
+            noise_id = None
+            self.noise = get_noise_table(config)
 
         # Create the actors.
         logger.info("Creating actors.")
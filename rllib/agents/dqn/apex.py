@@ -22,6 +22,10 @@ APEX_DEFAULT_CONFIG = merge_dicts(
             DQN_CONFIG["optimizer"], {
                 "max_weight_sync_delay": 400,
                 "num_replay_buffer_shards": 4,
+                # Place the replay shards on the rollout workers' nodes.
+                "replay_node_affinity": False,
+                # Number of train batches fetched per replay shard call.
+                "replays_per_call": 1,
                 "debug": False
             }),
         "n_step": 3,
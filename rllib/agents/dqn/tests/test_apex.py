@@ -23,6 +23,27 @@ class TestApex(unittest.TestCase):
         eps = [i["cur_epsilon"] for i in infos]
         assert np.allclose(eps, [1.0, 0.016190862, 0.00065536, 2.6527108e-05])
 
+    def test_apex_replay_node_affinity(self):
+        config = apex.APEX_DEFAULT_CONFIG.copy()
+        config["num_workers"] = 2
+        config["num_gpus"] = 0
+        config["learning_starts"] = 100
+        config["timesteps_per_iteration"] = 100
+        config["min_iter_time_s"] = 1
+        config["optimizer"]["num_replay_buffer_shards"] = 2
+        config["optimizer"]["replay_node_affinity"] = True
+        config["optimizer"]["replays_per_call"] = 2
+        trainer = apex.ApexTrainer(config, env="CartPole-v0")
+        optimizer = trainer.optimizer
+        # On a single node, every worker adds to the node's replay shards.
+        for ev in trainer.workers.remote_workers():
+            assert optimizer.worker_replay_actors[ev] == \
+                optimizer.replay_actors
+        for _ in range(3):
+            trainer.train()
+        assert optimizer.num_steps_sampled > 0
+        trainer.stop()
+
 
 if __name__ == "__main__":
     import sys
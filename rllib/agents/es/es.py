@@ -2,8 +2,10 @@
 # https://github.com/openai/evolution-strategies-starter.
 
 from collections import namedtuple
+from filelock import FileLock
 import logging
 import numpy as np
+import os
 import time
 
 import ray
@@ -35,24 +37,101 @@ DEFAULT_CONFIG = with_common_config({
     "stepsize": 0.01,
     "observation_filter": "MeanStdFilter",
     "noise_size": 250000000,
+    # How the noise table reaches the workers. "object_store" creates it once
+    # and shares it zero-copy through the object store; "node_local"
+    # regenerates it deterministically from the seed into one read-only
+    # memory-mapped file per node, so no noise is shipped between nodes.
+    "noise_table": "object_store",
+    # If > 0, each worker evaluates this many perturbations at once against
+    # 2 * population_size copies of the env, computing the actions of all
+    # perturbed policies with a single session call per step.
+    "population_size": 0,
     "report_length": 10,
 })
 # __sphinx_doc_end__
 # yapf: enable
 
+NOISE_SEED = 123
+
+# Number of noise values generated at a time when writing a node-local table.
+_NOISE_CHUNK_SIZE = 2**24
+
 
 @ray.remote
 def create_shared_noise(count):
     """Create a large array of noise to be shared by all workers."""
-    seed = 123
-    noise = np.random.RandomState(seed).randn(count).astype(np.float32)
+    noise = np.random.RandomState(NOISE_SEED).randn(count).astype(np.float32)
     return noise
 
 
+def create_node_local_noise(count, directory=None):
+    """Map the noise table from a file that is written once per node.
+
+    The table is regenerated from ``NOISE_SEED``, so it is identical to the
+    one returned by ``create_shared_noise``. Every process on the node that
+    calls this maps the same file read-only, so the pages are shared through
+    the OS page cache and the table costs one copy per node.
+
+    Args:
+        count (int): Number of float32 noise values in the table.
+        directory (str): Where to keep the file. Defaults to the session
+            directory of the local Ray node.
+
+    Returns:
+        A read-only np.memmap of shape (count, ).
+    """
+    if directory is None:
+        directory = ray.worker._global_node.get_session_dir_path()
+    path = os.path.join(directory, "es_noise_{}_{}.float32".format(
+        NOISE_SEED, count))
+    with FileLock(path + ".lock"):
+        if not os.path.exists(path):
+            tmp_path = "{}.{}.tmp".format(path, os.getpid())
+            noise = np.memmap(
+                tmp_path, dtype=np.float32, mode="w+", shape=(count, ))
+            # Draw in chunks so generating the table does not need a full
+            # float64 copy of it in memory. The legacy RandomState stream
+            # is the same whether drawn at once or in pieces.
+            rs = np.random.RandomState(NOISE_SEED)
+            for start in range(0, count, _NOISE_CHUNK_SIZE):
+                end = min(start + _NOISE_CHUNK_SIZE, count)
+                noise[start:end] = rs.randn(end - start)
+            noise.flush()
+            del noise
+            os.rename(tmp_path, path)
+    return np.memmap(path, dtype=np.float32, mode="r", shape=(count, ))
+
+
+def get_noise_table(config, noise=None):
+    """Return the SharedNoiseTable selected by config["noise_table"].
+
+    Args:
+        config (dict): Trainer config.
+        noise (np.ndarray): The table fetched from the object store, if
+            config["noise_table"] is "object_store".
+    """
+    if config["noise_table"] == "object_store":
+        return SharedNoiseTable(noise)
+    elif config["noise_table"] == "node_local":
+        return SharedNoiseTable(create_node_local_noise(config["noise_size"]))
+    else:
+        raise ValueError("Unknown noise_table mode: {}".format(
+            config["noise_table"]))
+
+
 class SharedNoiseTable:
+    """Read-only view on a noise table shared by all workers on a node.
+
+    The table is never copied: the underlying buffer is either an object
+    store buffer or a memory-mapped file, and the view is marked read-only so
+    that any accidental in-place write fails loudly instead of triggering a
+    private copy of the whole table.
+    """
+
     def __init__(self, noise):
-        self.noise = noise
-        assert self.noise.dtype == np.float32
+        assert noise.dtype == np.float32
+        self.noise = noise.view()
+        self.noise.flags.writeable = False
 
     def get(self, i, dim):
         return self.noise[i:i + dim]
@@ -60,6 +139,23 @@ class SharedNoiseTable:
     def sample_index(self, dim):
         return np.random.randint(0, len(self.noise) - dim + 1)
 
+    def get_batch(self, indices, dim):
+        """Gather the noise vectors at the given indices into one array.
+
+        Returns:
+            Array of shape (len(indices), dim).
+        """
+        windows = np.lib.stride_tricks.as_strided(
+            self.noise,
+            shape=(len(self.noise) - dim + 1, dim),
+            strides=(self.noise.itemsize, self.noise.itemsize),
+            writeable=False)
+        return windows[np.asarray(indices, dtype=np.int64)]
+
+    def get_delta(self, dim):
+        idx = self.sample_index(dim)
+        return idx, self.get(idx, dim)
+
 
 @ray.remote
 class Worker:
@@ -73,7 +169,7 @@ class Worker:
         self.min_task_runtime = min_task_runtime
         self.config = config
         self.policy_params = policy_params
-        self.noise = SharedNoiseTable(noise)
+        self.noise = get_noise_table(config, noise)
 
         env_context = EnvContext(config["env_config"] or {}, worker_index)
         self.env = env_creator(env_context)
@@ -81,10 +177,22 @@ class Worker:
         self.preprocessor = models.ModelCatalog.get_preprocessor(
             self.env, config["model"])
 
+        # The positive and negative perturbations of each population member
+        # are evaluated side by side, so we need two envs per member.
+        self.population_size = config["population_size"]
+        self.population_envs = [
+            env_creator(env_context) for _ in range(2 * self.population_size)
+        ]
+
         self.sess = utils.make_session(single_threaded=True)
         self.policy = policies.GenericPolicy(
-            self.sess, self.env.action_space, self.env.observation_space,
-            self.preprocessor, config["observation_filter"], config["model"],
+            self.sess,
+            self.env.action_space,
+            self.env.observation_space,
+            self.preprocessor,
+            config["observation_filter"],
+            config["model"],
+            population_size=2 * self.population_size,
             **policy_params)
 
     @property
@@ -129,6 +237,34 @@ class Worker:
                 rewards, length = self.rollout(timestep_limit, add_noise=False)
                 eval_returns.append(rewards.sum())
                 eval_lengths.append(length)
+            elif self.population_size > 0:
+                # Evaluate a whole population of perturbations at once.
+                indices = [
+                    self.noise.sample_index(self.policy.num_params)
+                    for _ in range(self.population_size)
+                ]
+                perturbations = self.config["noise_stdev"] * \
+                    self.noise.get_batch(indices, self.policy.num_params)
+                self.policy.set_population_weights(
+                    np.concatenate(
+                        [params + perturbations, params - perturbations]))
+                results = policies.batched_rollout(
+                    self.policy,
+                    self.population_envs,
+                    timestep_limit=timestep_limit,
+                    add_noise=True)
+
+                for i, noise_index in enumerate(indices):
+                    rewards_pos, lengths_pos = results[i]
+                    rewards_neg, lengths_neg = results[self.population_size +
+                                                       i]
+                    noise_indices.append(noise_index)
+                    returns.append([rewards_pos.sum(), rewards_neg.sum()])
+                    sign_returns.append([
+                        np.sign(rewards_pos).sum(),
+                        np.sign(rewards_neg).sum()
+                    ])
+                    lengths.append([lengths_pos, lengths_neg])
             else:
                 # Do a regular run with parameter perturbations.
                 noise_index = self.noise.sample_index(self.policy.num_params)
@@ -189,8 +325,12 @@ class ESTrainer(Trainer):
 
         # Create the shared noise table.
         logger.info("Creating shared noise table.")
-        noise_id = create_shared_noise.remote(config["noise_size"])
-        self.noise = SharedNoiseTable(ray.get(noise_id))
+        if config["noise_table"] == "object_store":
+            noise_id = create_shared_noise.remote(config["noise_size"])
+            self.noise = get_noise_table(config, ray.get(noise_id))
+        else:
+            noise_id = None
+            self.noise = get_noise_table(config)
 
         # Create the actors.
         logger.info("Creating actors.")
@@ -252,10 +392,11 @@ class ESTrainer(Trainer):
             raise NotImplementedError(config["return_proc_mode"])
 
         # Compute and take a step.
-        g, count = utils.batched_weighted_sum(
+        g, count = utils.batched_weighted_noise_sum(
             proc_noisy_returns[:, 0] - proc_noisy_returns[:, 1],
-            (self.noise.get(index, self.policy.num_params)
-             for index in noise_indices),
+            self.noise,
+            noise_indices,
+            self.policy.num_params,
             batch_size=500)
         g /= noisy_returns.size
         assert (g.shape == (self.policy.num_params, ) and g.dtype == np.float32
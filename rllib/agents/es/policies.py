@@ -14,22 +14,26 @@ from ray.rllib.utils import try_import_tf
 tf = try_import_tf()
 
 
-def rollout(policy, env, timestep_limit=None, add_noise=False):
-    """Do a rollout.
-
-    If add_noise is True, the rollout will take noisy actions with
-    noise drawn from that stream. Otherwise, no action noise will be added.
-    """
+def _get_timestep_limit(env, timestep_limit):
     max_timestep_limit = 999999
     env_timestep_limit = env.spec.max_episode_steps if (
             hasattr(env, "spec") and hasattr(env.spec, "max_episode_steps")) \
         else max_timestep_limit
     timestep_limit = (env_timestep_limit if timestep_limit is None else min(
         timestep_limit, env_timestep_limit))
+    return timestep_limit or max_timestep_limit
+
+
+def rollout(policy, env, timestep_limit=None, add_noise=False):
+    """Do a rollout.
+
+    If add_noise is True, the rollout will take noisy actions with
+    noise drawn from that stream. Otherwise, no action noise will be added.
+    """
     rews = []
     t = 0
     observation = env.reset()
-    for _ in range(timestep_limit or max_timestep_limit):
+    for _ in range(_get_timestep_limit(env, timestep_limit)):
         ac = policy.compute(observation, add_noise=add_noise)[0]
         observation, rew, done, _ = env.step(ac)
         rews.append(rew)
@@ -40,9 +44,45 @@ def rollout(policy, env, timestep_limit=None, add_noise=False):
     return rews, t
 
 
+def batched_rollout(policy, envs, timestep_limit=None, add_noise=False):
+    """Do one rollout per population member of the policy, in lockstep.
+
+    Population member i acts in envs[i]. At every step, the actions of all
+    members whose episode is still running are computed in a single session
+    call (see GenericPolicy.compute_population).
+
+    Returns:
+        List with one (rewards, length) tuple per env.
+    """
+    timestep_limit = _get_timestep_limit(envs[0], timestep_limit)
+    rews = [[] for _ in envs]
+    observations = [env.reset() for env in envs]
+    running = list(range(len(envs)))
+    for _ in range(timestep_limit):
+        if not running:
+            break
+        actions = policy.compute_population(
+            [observations[i] for i in running], running, add_noise=add_noise)
+        still_running = []
+        for i, ac in zip(running, actions):
+            observations[i], rew, done, _ = envs[i].step(ac)
+            rews[i].append(rew)
+            if not done:
+                still_running.append(i)
+        running = still_running
+    return [(np.array(r, dtype=np.float32), len(r)) for r in rews]
+
+
 class GenericPolicy:
-    def __init__(self, sess, action_space, obs_space, preprocessor,
-                 observation_filter, model_options, action_noise_std):
+    def __init__(self,
+                 sess,
+                 action_space,
+                 obs_space,
+                 preprocessor,
+                 observation_filter,
+                 model_options,
+                 action_noise_std,
+                 population_size=0):
         self.sess = sess
         self.action_space = action_space
         self.action_noise_std = action_noise_std
@@ -67,6 +107,27 @@ class GenericPolicy:
         self.num_params = sum(
             np.prod(variable.shape.as_list())
             for _, variable in self.variables.variables.items())
+
+        # Copies of the network, one per population member, so that a
+        # population of parameter vectors can be evaluated with one session
+        # call per step. All members share the observation filter.
+        self.population_inputs = []
+        self.population_samplers = []
+        self.population_variables = []
+        for i in range(population_size):
+            with tf.variable_scope("population_{}".format(i)):
+                inputs = tf.placeholder(tf.float32,
+                                        [None] + list(self.preprocessor.shape))
+                model = ModelCatalog.get_model({
+                    "obs": inputs
+                }, obs_space, action_space, dist_dim, model_options)
+                self.population_inputs.append(inputs)
+                self.population_samplers.append(
+                    dist_class(model.outputs, model).sample())
+                self.population_variables.append(
+                    ray.experimental.tf_utils.TensorFlowVariables(
+                        model.outputs, self.sess))
+
         self.sess.run(tf.global_variables_initializer())
 
     def compute(self, observation, add_noise=False, update=True):
@@ -79,9 +140,60 @@ class GenericPolicy:
             action += np.random.randn(*action.shape) * self.action_noise_std
         return action
 
+    def compute_population(self,
+                           observations,
+                           members,
+                           add_noise=False,
+                           update=True):
+        """Compute one action per population member in one session call.
+
+        Args:
+            observations (list): One raw observation per member.
+            members (list): Indices of the population members to act with.
+
+        Returns:
+            List of actions, one per member.
+        """
+        observations = np.stack(
+            [self.preprocessor.transform(o) for o in observations])
+        observations = self.observation_filter(observations, update=update)
+        outputs = self.sess.run(
+            [self.population_samplers[m] for m in members],
+            feed_dict={
+                self.population_inputs[m]: observations[j:j + 1]
+                for j, m in enumerate(members)
+            })
+        actions = []
+        for output in outputs:
+            action = _unbatch_tuple_actions(output)
+            if add_noise and isinstance(self.action_space, gym.spaces.Box):
+                action += np.random.randn(*action.shape) * \
+                    self.action_noise_std
+            actions.append(action[0])
+        return actions
+
     def set_weights(self, x):
         self.variables.set_flat(x)
 
+    def set_population_weights(self, xs):
+        """Set the flat weights of every population member in one call.
+
+        Args:
+            xs (np.ndarray): Array of shape (population_size, num_params).
+        """
+        assert len(xs) == len(self.population_variables), xs.shape
+        assignments, feed_dict = [], {}
+        for variables, x in zip(self.population_variables, xs):
+            shapes = [
+                v.get_shape().as_list() for v in variables.variables.values()
+            ]
+            for k, array in zip(variables.variables.keys(),
+                                ray.experimental.tf_utils.unflatten(x,
+                                                                    shapes)):
+                assignments.append(variables.assignment_nodes[k])
+                feed_dict[variables.placeholders[k]] = array
+        self.sess.run(assignments, feed_dict=feed_dict)
+
     def get_weights(self):
         return self.variables.get_flat()
 
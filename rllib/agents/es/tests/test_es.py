@@ -0,0 +1,51 @@
+import numpy as np
+import unittest
+
+import ray
+import ray.rllib.agents.es as es
+from ray.rllib.agents.es import utils
+from ray.rllib.agents.es.es import SharedNoiseTable
+
+
+class TestES(unittest.TestCase):
+    def setUp(self):
+        ray.init(num_cpus=2)
+
+    def tearDown(self):
+        ray.shutdown()
+
+    def test_es_compilation(self):
+        """Test whether an ESTrainer can be built and trained."""
+        config = es.DEFAULT_CONFIG.copy()
+        config["num_workers"] = 1
+        config["episodes_per_batch"] = 10
+        config["train_batch_size"] = 100
+        config["noise_size"] = 2500000
+
+        for population_size in [0, 4]:
+            config["population_size"] = population_size
+            trainer = es.ESTrainer(config=config, env="CartPole-v0")
+            for _ in range(2):
+                results = trainer.train()
+                assert results["info"]["episodes_this_iter"] >= 10
+            trainer.stop()
+
+    def test_batched_weighted_noise_sum(self):
+        noise = SharedNoiseTable(np.random.randn(10000).astype(np.float32))
+        dim = 50
+        indices = np.array([noise.sample_index(dim) for _ in range(1234)])
+        weights = np.random.randn(len(indices)).astype(np.float32)
+
+        expected, expected_count = utils.batched_weighted_sum(
+            weights, (noise.get(i, dim) for i in indices), batch_size=500)
+        total, count = utils.batched_weighted_noise_sum(
+            weights, noise, indices, dim, batch_size=500)
+        assert count == expected_count == len(indices)
+        assert total.dtype == np.float32
+        assert np.allclose(total, expected, atol=1e-4)
+
+
+if __name__ == "__main__":
+    import pytest
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,98 @@
+import numpy as np
+import os
+import psutil
+import pytest
+import tempfile
+import unittest
+
+import ray
+from ray.rllib.agents.es import es
+from ray.rllib.agents.es.es import (create_node_local_noise,
+                                    create_shared_noise, get_noise_table,
+                                    SharedNoiseTable)
+
+# 100MB of float32 noise.
+NOISE_SIZE = 25 * 1000 * 1000
+NOISE_BYTES = NOISE_SIZE * 4
+
+
+@ray.remote
+class NoiseReader:
+    def __init__(self, mode, noise=None, directory=None):
+        self.process = psutil.Process()
+        self.uss_before = self.process.memory_full_info().uss
+        if mode == "object_store":
+            self.noise = SharedNoiseTable(noise)
+        else:
+            self.noise = SharedNoiseTable(
+                create_node_local_noise(NOISE_SIZE, directory))
+        # Touch every page of the table.
+        self.total = float(np.sum(self.noise.noise, dtype=np.float64))
+
+    def checksum(self):
+        return self.total
+
+    def writeable(self):
+        return self.noise.get(0, 10).flags.writeable
+
+    def private_bytes(self):
+        return self.process.memory_full_info().uss - self.uss_before
+
+
+class SharedNoiseTableTest(unittest.TestCase):
+    def setUp(self):
+        ray.init(num_cpus=4, object_store_memory=500 * 1024 * 1024)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        ray.shutdown()
+
+    def _check_per_node_footprint(self, readers):
+        # Every table has identical content...
+        assert len(set(ray.get([r.checksum.remote() for r in readers]))) == 1
+        # ...is read-only...
+        assert not any(ray.get([r.writeable.remote() for r in readers]))
+        # ...and is not privately copied into any of the worker processes.
+        usage = ray.get([r.private_bytes.remote() for r in readers])
+        for private_bytes in usage:
+            assert private_bytes < NOISE_BYTES / 2, private_bytes
+
+    def testObjectStoreNoiseIsZeroCopy(self):
+        noise_id = create_shared_noise.remote(NOISE_SIZE)
+        readers = [
+            NoiseReader.remote("object_store", noise_id) for _ in range(3)
+        ]
+        self._check_per_node_footprint(readers)
+
+    def testNodeLocalNoiseIsSharedPerNode(self):
+        readers = [
+            NoiseReader.remote("node_local", directory=self.directory)
+            for _ in range(3)
+        ]
+        self._check_per_node_footprint(readers)
+        # Exactly one table file was written for the node.
+        tables = [
+            f for f in os.listdir(self.directory) if f.endswith(".float32")
+        ]
+        assert len(tables) == 1, tables
+        assert os.path.getsize(os.path.join(self.directory,
+                                            tables[0])) == NOISE_BYTES
+
+    def testNodeLocalNoiseMatchesObjectStoreNoise(self):
+        count = 1000
+        expected = ray.get(create_shared_noise.remote(count))
+        config = {"noise_table": "node_local", "noise_size": count}
+        # Force the table to be generated in several chunks.
+        chunk_size, es._NOISE_CHUNK_SIZE = es._NOISE_CHUNK_SIZE, 64
+        try:
+            table = get_noise_table(config)
+        finally:
+            es._NOISE_CHUNK_SIZE = chunk_size
+        assert np.array_equal(table.noise, expected)
+        with pytest.raises(ValueError):
+            table.get(0, 10)[0] = 1.0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
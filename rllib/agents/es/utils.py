@@ -57,3 +57,29 @@ def batched_weighted_sum(weights, vecs, batch_size):
             np.asarray(batch_vecs, dtype=np.float32))
         num_items_summed += len(batch_weights)
     return total, num_items_summed
+
+
+def batched_weighted_noise_sum(weights, noise, noise_indices, dim, batch_size):
+    """Like batched_weighted_sum, but takes indices into a noise table.
+
+    Each batch of noise vectors is gathered from the table in one step
+    instead of being stacked from a generator of slices.
+
+    Args:
+        weights (np.ndarray): One weight per noise index.
+        noise (SharedNoiseTable): Table the indices point into.
+        noise_indices (np.ndarray): Start index of each noise vector.
+        dim (int): Length of each noise vector.
+        batch_size (int): Number of vectors to sum at a time.
+    """
+    assert len(weights) == len(noise_indices)
+    total = 0
+    num_items_summed = 0
+    for start in range(0, len(noise_indices), batch_size):
+        batch_weights = np.asarray(
+            weights[start:start + batch_size], dtype=np.float32)
+        batch_vecs = noise.get_batch(noise_indices[start:start + batch_size],
+                                     dim)
+        total += np.dot(batch_weights, batch_vecs)
+        num_items_summed += len(batch_weights)
+    return total, num_items_summed
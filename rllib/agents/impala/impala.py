@@ -34,7 +34,8 @@ DEFAULT_CONFIG = with_common_config({
     # number of GPUs the learner should use.
     "num_gpus": 1,
     # set >1 to load data into GPUs in parallel. Increases GPU memory usage
-    # proportionally with the number of buffers.
+    # proportionally with the number of buffers. With 2 buffers, the next
+    # train batch is transferred while the current one is trained on.
     "num_data_loader_buffers": 1,
     # how many train batches should be retained for minibatching. This conf
     # only has an effect if `num_sgd_iter > 1`.
@@ -51,6 +51,8 @@ class LearnerThread(threading.Thread):
         self.grad_timer = TimerStat()
         self.load_timer = TimerStat()
         self.load_wait_timer = TimerStat()
+        self.prepare_timer = TimerStat()
+        self.buffer_wait_timer = TimerStat()
         self.daemon = True
         self.weights_updated = False
         self.stats = {}
@@ -3,6 +3,7 @@
 import logging
 import threading
 import math
+import numpy as np
 
 from six.moves import queue
 
@@ -12,6 +13,7 @@ from ray.rllib.optimizers.aso_learner import LearnerThread
 from ray.rllib.optimizers.aso_minibatch_buffer import MinibatchBuffer
 from ray.rllib.optimizers.multi_gpu_impl import LocalSyncParallelOptimizer
 from ray.rllib.utils.annotations import override
+from ray.rllib.utils.memory import aligned_array
 from ray.rllib.utils.timer import TimerStat
 from ray.rllib.utils import try_import_tf
 
@@ -111,6 +113,10 @@ class TFMultiGPULearner(LearnerThread):
         self.ready_optimizers = queue.Queue()
         for opt in self.par_opt:
             self.idle_optimizers.put(opt)
+        # Bounds the number of batches being prepared or loaded at once to
+        # the number of device buffers, so that surplus loader threads wait
+        # here instead of competing with the learner thread for the GIL.
+        self.loading_slots = threading.Semaphore(len(self.par_opt))
         for i in range(num_data_load_threads):
             self.loader_thread = _LoaderThread(self, share_stats=(i == 0))
             self.loader_thread.start()
@@ -138,15 +144,28 @@ class TFMultiGPULearner(LearnerThread):
 
 
 class _LoaderThread(threading.Thread):
+    """Loads train batches into idle device buffers.
+
+    Each batch goes through two stages: it is first prepared into 64-byte
+    aligned host arrays without holding a device buffer, so that this
+    overlaps with the learner training on the buffers already loaded, and
+    then transferred into the next idle device buffer.
+    """
+
     def __init__(self, learner, share_stats):
         threading.Thread.__init__(self)
         self.learner = learner
         self.daemon = True
+        self.staging_area = _StagingArea()
         if share_stats:
             self.queue_timer = learner.queue_timer
+            self.prepare_timer = learner.prepare_timer
+            self.buffer_wait_timer = learner.buffer_wait_timer
             self.load_timer = learner.load_timer
         else:
             self.queue_timer = TimerStat()
+            self.prepare_timer = TimerStat()
+            self.buffer_wait_timer = TimerStat()
             self.load_timer = TimerStat()
 
     def run(self):
@@ -155,19 +174,53 @@ class _LoaderThread(threading.Thread):
 
     def _step(self):
         s = self.learner
-        with self.queue_timer:
-            batch = s.inqueue.get()
-
-        opt = s.idle_optimizers.get()
-
-        with self.load_timer:
-            tuples = s.policy._get_loss_inputs_dict(batch, shuffle=False)
-            data_keys = [ph for _, ph in s.policy._loss_inputs]
-            if s.policy._state_inputs:
-                state_keys = s.policy._state_inputs + [s.policy._seq_lens]
-            else:
-                state_keys = []
-            opt.load_data(s.sess, [tuples[k] for k in data_keys],
-                          [tuples[k] for k in state_keys])
-
-        s.ready_optimizers.put(opt)
+        with s.loading_slots:
+            with self.queue_timer:
+                batch = s.inqueue.get()
+
+            with self.prepare_timer:
+                tuples = s.policy._get_loss_inputs_dict(batch, shuffle=False)
+                data_keys = [ph for _, ph in s.policy._loss_inputs]
+                if s.policy._state_inputs:
+                    state_keys = s.policy._state_inputs + [s.policy._seq_lens]
+                else:
+                    state_keys = []
+                inputs = [
+                    self.staging_area.stage(k, tuples[k]) for k in data_keys
+                ]
+                state_inputs = [
+                    self.staging_area.stage(k, tuples[k]) for k in state_keys
+                ]
+
+            with self.buffer_wait_timer:
+                opt = s.idle_optimizers.get()
+
+            with self.load_timer:
+                opt.load_data(s.sess, inputs, state_inputs)
+
+            s.ready_optimizers.put(opt)
+
+
+class _StagingArea:
+    """Reusable 64-byte aligned host buffers for staging loader inputs.
+
+    TensorFlow can feed aligned, contiguous arrays without an extra copy.
+    Arrays that are already aligned (e.g. built by concat_aligned) are passed
+    through as is; others are copied into a buffer that is reused across
+    batches of the same shape.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def stage(self, key, arr):
+        if (not isinstance(arr, np.ndarray)
+                or arr.dtype not in [np.float32, np.float64, np.uint8]
+                or (arr.flags.c_contiguous and arr.ctypes.data % 64 == 0)):
+            return arr
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != arr.shape or buf.dtype != arr.dtype:
+            buf = aligned_array(arr.size, arr.dtype).reshape(arr.shape)
+            self._buffers[key] = buf
+        np.copyto(buf, arr)
+        return buf
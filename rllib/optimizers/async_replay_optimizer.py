@@ -20,7 +20,8 @@ from ray.rllib.policy.sample_batch import SampleBatch, DEFAULT_POLICY_ID, \
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer
 from ray.rllib.utils.annotations import override
-from ray.rllib.utils.actors import TaskPool, create_colocated
+from ray.rllib.utils.actors import TaskPool, create_colocated, \
+    create_spread
 from ray.rllib.utils.memory import ray_get_and_free
 from ray.rllib.utils.timer import TimerStat
 from ray.rllib.utils.window_stat import WindowStat
@@ -60,7 +61,10 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                  num_replay_buffer_shards=1,
                  max_weight_sync_delay=400,
                  debug=False,
-                 batch_replay=False):
+                 batch_replay=False,
+                 replay_node_affinity=False,
+                 replays_per_call=1,
+                 replay_frame_stack=0):
         """Initialize an async replay optimizer.
 
         Arguments:
@@ -82,6 +86,15 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             debug (bool): return extra debug stats
             batch_replay (bool): replay entire sequential batches of
                 experiences instead of sampling steps individually
+            replay_node_affinity (bool): spread the replay shards over the
+                nodes of the cluster instead of colocating them with the
+                learner, and have each rollout worker add its samples to a
+                shard on its own node if there is one
+            replays_per_call (int): number of train batches to fetch from a
+                replay shard per call, amortizing the actor call overhead
+            replay_frame_stack (int): if > 0, observations are stacks of this
+                many frames along their last axis, and the replay shards
+                store each distinct frame only once
         """
         PolicyOptimizer.__init__(self, workers)
 
@@ -91,6 +104,8 @@ class AsyncReplayOptimizer(PolicyOptimizer):
         self.prioritized_replay_beta = prioritized_replay_beta
         self.prioritized_replay_eps = prioritized_replay_eps
         self.max_weight_sync_delay = max_weight_sync_delay
+        self.replay_node_affinity = replay_node_affinity
+        self.replays_per_call = replays_per_call
 
         self.learner = LearnerThread(self.workers.local_worker())
         self.learner.start()
@@ -99,7 +114,7 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             replay_cls = BatchReplayActor
         else:
             replay_cls = ReplayActor
-        self.replay_actors = create_colocated(replay_cls, [
+        replay_args = [
             num_replay_buffer_shards,
             learning_starts,
             buffer_size,
@@ -107,7 +122,24 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             prioritized_replay_alpha,
             prioritized_replay_beta,
             prioritized_replay_eps,
-        ], num_replay_buffer_shards)
+            replay_frame_stack,
+        ]
+        if self.replay_node_affinity:
+            self.replay_actors = create_spread(replay_cls, replay_args,
+                                               num_replay_buffer_shards)
+        else:
+            self.replay_actors = create_colocated(replay_cls, replay_args,
+                                                  num_replay_buffer_shards)
+
+        # Replay shards by node ip, and the shards each worker adds to.
+        self.node_replay_actors = collections.defaultdict(list)
+        if self.replay_node_affinity:
+            for ip, ra in zip(
+                    ray.get([
+                        ra.get_node_ip.remote() for ra in self.replay_actors
+                    ]), self.replay_actors):
+                self.node_replay_actors[ip].append(ra)
+        self.worker_replay_actors = {}
 
         # Stats
         self.timers = {
@@ -128,7 +160,7 @@ class AsyncReplayOptimizer(PolicyOptimizer):
         self.replay_tasks = TaskPool()
         for ra in self.replay_actors:
             for _ in range(REPLAY_QUEUE_DEPTH):
-                self.replay_tasks.add(ra, ra.replay.remote())
+                self.replay_tasks.add(ra, self._replay(ra))
 
         # Kick off async background sampling
         self.sample_tasks = TaskPool()
@@ -162,6 +194,7 @@ class AsyncReplayOptimizer(PolicyOptimizer):
     def reset(self, remote_workers):
         self.workers.reset(remote_workers)
         self.sample_tasks.reset_workers(remote_workers)
+        self._assign_replay_actors(remote_workers)
 
     @override(PolicyOptimizer)
     def stats(self):
@@ -198,6 +231,7 @@ class AsyncReplayOptimizer(PolicyOptimizer):
     # For https://github.com/ray-project/ray/issues/2541 only
     def _set_workers(self, remote_workers):
         self.workers.reset(remote_workers)
+        self._assign_replay_actors(remote_workers)
         weights = self.workers.local_worker().get_weights()
         for ev in self.workers.remote_workers():
             ev.set_weights.remote(weights)
@@ -205,6 +239,22 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             for _ in range(SAMPLE_QUEUE_DEPTH):
                 self.sample_tasks.add(ev, ev.sample_with_count.remote())
 
+    def _assign_replay_actors(self, remote_workers):
+        """Pick the replay shards each worker adds its samples to."""
+        self.worker_replay_actors = {}
+        if not self.replay_node_affinity:
+            return
+        ips = ray.get([ev.get_node_ip.remote() for ev in remote_workers])
+        for ip, ev in zip(ips, remote_workers):
+            # Fall back to all shards for nodes that have none.
+            self.worker_replay_actors[ev] = (self.node_replay_actors.get(ip)
+                                             or self.replay_actors)
+
+    def _replay(self, ra):
+        if self.replays_per_call > 1:
+            return ra.replay_n.remote(self.replays_per_call)
+        return ra.replay.remote()
+
     def _step(self):
         sample_timesteps, train_timesteps = 0, 0
         weights = None
@@ -240,7 +290,8 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                 sample_timesteps += counts[i]
                 # Send the data to the replay buffer
                 random.choice(
-                    self.replay_actors).add_batch.remote(sample_batch)
+                    self.worker_replay_actors.get(
+                        ev, self.replay_actors)).add_batch.remote(sample_batch)
 
                 # Update weights if needed.
                 self.steps_since_update[ev] += counts[i]
@@ -266,20 +317,34 @@ class AsyncReplayOptimizer(PolicyOptimizer):
 
         with self.timers["replay_processing"]:
             for ra, replay in self.replay_tasks.completed():
-                self.replay_tasks.add(ra, ra.replay.remote())
+                self.replay_tasks.add(ra, self._replay(ra))
                 if self.learner.inqueue.full():
-                    self.num_samples_dropped += 1
-                else:
-                    with self.timers["get_samples"]:
-                        samples = ray_get_and_free(replay)
-                    # Defensive copy against plasma crashes, see #2610 #3452
-                    self.learner.inqueue.put((ra, samples and samples.copy()))
+                    self.num_samples_dropped += self.replays_per_call
+                    continue
+                with self.timers["get_samples"]:
+                    samples = ray_get_and_free(replay)
+                if self.replays_per_call == 1:
+                    samples = [samples]
+                for s in samples:
+                    if self.learner.inqueue.full():
+                        self.num_samples_dropped += 1
+                    else:
+                        # Defensive copy against plasma crashes, see #2610
+                        # #3452
+                        self.learner.inqueue.put((ra, s and s.copy()))
 
         with self.timers["update_priorities"]:
+            # Send all pending priority updates of a shard in one call.
+            prio_dicts = collections.defaultdict(list)
             while not self.learner.outqueue.empty():
                 ra, prio_dict, count = self.learner.outqueue.get()
-                ra.update_priorities.remote(prio_dict)
+                prio_dicts[ra].append(prio_dict)
                 train_timesteps += count
+            for ra, dicts in prio_dicts.items():
+                if len(dicts) == 1:
+                    ra.update_priorities.remote(dicts[0])
+                else:
+                    ra.update_priorities_n.remote(dicts)
 
         return sample_timesteps, train_timesteps
 
@@ -291,9 +356,15 @@ class ReplayActor(ParallelIteratorWorker):
     Ray actors are single-threaded, so for scalability multiple replay actors
     may be created to increase parallelism."""
 
-    def __init__(self, num_shards, learning_starts, buffer_size,
-                 train_batch_size, prioritized_replay_alpha,
-                 prioritized_replay_beta, prioritized_replay_eps):
+    def __init__(self,
+                 num_shards,
+                 learning_starts,
+                 buffer_size,
+                 train_batch_size,
+                 prioritized_replay_alpha,
+                 prioritized_replay_beta,
+                 prioritized_replay_eps,
+                 frame_stack=0):
         self.replay_starts = learning_starts // num_shards
         self.buffer_size = buffer_size // num_shards
         self.train_batch_size = train_batch_size
@@ -308,7 +379,9 @@ class ReplayActor(ParallelIteratorWorker):
 
         def new_buffer():
             return PrioritizedReplayBuffer(
-                self.buffer_size, alpha=prioritized_replay_alpha)
+                self.buffer_size,
+                alpha=prioritized_replay_alpha,
+                frame_stack=frame_stack)
 
         self.replay_buffers = collections.defaultdict(new_buffer)
 
@@ -321,6 +394,9 @@ class ReplayActor(ParallelIteratorWorker):
     def get_host(self):
         return os.uname()[1]
 
+    def get_node_ip(self):
+        return ray.services.get_node_ip_address()
+
     def add_batch(self, batch):
         # Handle everything as if multiagent
         if isinstance(batch, SampleBatch):
@@ -354,6 +430,10 @@ class ReplayActor(ParallelIteratorWorker):
                 })
             return MultiAgentBatch(samples, self.train_batch_size)
 
+    def replay_n(self, n):
+        """Return a list of n replay batches in a single actor call."""
+        return [self.replay() for _ in range(n)]
+
     def update_priorities(self, prio_dict):
         with self.update_priorities_timer:
             for policy_id, (batch_indexes, td_errors) in prio_dict.items():
@@ -362,6 +442,11 @@ class ReplayActor(ParallelIteratorWorker):
                 self.replay_buffers[policy_id].update_priorities(
                     batch_indexes, new_priorities)
 
+    def update_priorities_n(self, prio_dicts):
+        """Apply a list of priority updates in order."""
+        for prio_dict in prio_dicts:
+            self.update_priorities(prio_dict)
+
     def stats(self, debug=False):
         stat = {
             "add_batch_time_ms": round(1000 * self.add_batch_timer.mean, 3),
@@ -385,9 +470,15 @@ class BatchReplayActor:
     This allows for RNN models, but ignores prioritization params.
     """
 
-    def __init__(self, num_shards, learning_starts, buffer_size,
-                 train_batch_size, prioritized_replay_alpha,
-                 prioritized_replay_beta, prioritized_replay_eps):
+    def __init__(self,
+                 num_shards,
+                 learning_starts,
+                 buffer_size,
+                 train_batch_size,
+                 prioritized_replay_alpha,
+                 prioritized_replay_beta,
+                 prioritized_replay_eps,
+                 frame_stack=0):
         self.replay_starts = learning_starts // num_shards
         self.buffer_size = buffer_size // num_shards
         self.train_batch_size = train_batch_size
@@ -400,6 +491,9 @@ class BatchReplayActor:
     def get_host(self):
         return os.uname()[1]
 
+    def get_node_ip(self):
+        return ray.services.get_node_ip_address()
+
     def add_batch(self, batch):
         # Handle everything as if multiagent
         if isinstance(batch, SampleBatch):
@@ -415,9 +509,15 @@ class BatchReplayActor:
             return None
         return random.choice(self.buffer)
 
+    def replay_n(self, n):
+        return [self.replay() for _ in range(n)]
+
     def update_priorities(self, prio_dict):
         pass
 
+    def update_priorities_n(self, prio_dicts):
+        pass
+
     def stats(self, debug=False):
         stat = {
             "cur_size": self.cur_size,
@@ -158,6 +158,9 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
         stats["timing_breakdown"] = {
             "optimizer_step_time_ms": timer_to_ms(self._optimizer_step_timer),
             "learner_grad_time_ms": timer_to_ms(self.learner.grad_timer),
+            "learner_prepare_time_ms": timer_to_ms(self.learner.prepare_timer),
+            "learner_buffer_wait_time_ms": timer_to_ms(
+                self.learner.buffer_wait_timer),
             "learner_load_time_ms": timer_to_ms(self.learner.load_timer),
             "learner_load_wait_time_ms": timer_to_ms(
                 self.learner.load_wait_timer),
@@ -1,17 +1,84 @@
+import hashlib
 import numpy as np
 import random
 import sys
 
 from ray.rllib.optimizers.segment_tree import SumSegmentTree, MinSegmentTree
 from ray.rllib.utils.annotations import DeveloperAPI
-from ray.rllib.utils.compression import unpack_if_needed
+from ray.rllib.utils.compression import is_compressed, pack, \
+    unpack_if_needed
 from ray.rllib.utils.window_stat import WindowStat
 
 
+@DeveloperAPI
+class FrameStore:
+    """Content-addressed, reference-counted store of single frames.
+
+    A stacked observation (e.g. from Atari framestacking) shares all but one
+    of its frames with the previous observation of its episode, and the
+    obs / new_obs of a transition share most of their frames too. This
+    stores each distinct frame once, keyed by a SHA-1 hash of its content,
+    and represents a stacked observation by the tuple of its frame keys.
+    """
+
+    def __init__(self, num_frames):
+        """Create a frame store.
+
+        Parameters
+        ----------
+        num_frames: int
+          Number of frames stacked along the last axis of each observation.
+        """
+        self.num_frames = num_frames
+        # Frame key -> [frame, reference count].
+        self._frames = {}
+        self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, obs):
+        """Store the frames of a stacked observation.
+
+        The frames are kept LZ4 compressed if the observation was.
+
+        Returns the tuple of frame keys to pass to get() and release().
+        """
+        compressed = is_compressed(obs)
+        obs = unpack_if_needed(obs)
+        keys = []
+        for frame in np.split(obs, self.num_frames, axis=-1):
+            frame = np.ascontiguousarray(frame)
+            key = hashlib.sha1(frame).digest()
+            entry = self._frames.get(key)
+            if entry is None:
+                stored = pack(frame) if compressed else frame
+                self._frames[key] = [stored, 1]
+                self.size_bytes += sys.getsizeof(stored)
+            else:
+                entry[1] += 1
+            keys.append(key)
+        return tuple(keys)
+
+    def get(self, keys):
+        """Reconstruct a stacked observation from its frame keys."""
+        return np.concatenate(
+            [unpack_if_needed(self._frames[k][0]) for k in keys], axis=-1)
+
+    def release(self, keys):
+        """Drop one reference to each frame, freeing unreferenced frames."""
+        for key in keys:
+            entry = self._frames[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                self.size_bytes -= sys.getsizeof(entry[0])
+                del self._frames[key]
+
+
 @DeveloperAPI
 class ReplayBuffer:
     @DeveloperAPI
-    def __init__(self, size):
+    def __init__(self, size, frame_stack=0):
         """Create Prioritized Replay buffer.
 
         Parameters
@@ -19,7 +86,11 @@ class ReplayBuffer:
         size: int
           Max number of transitions to store in the buffer. When the buffer
           overflows the old memories are dropped.
+        frame_stack: int
+          If > 0, observations are stacks of this many frames along their
+          last axis, and each distinct frame is stored only once.
         """
+        self._frame_store = FrameStore(frame_stack) if frame_stack else None
         self._storage = []
         self._maxsize = size
         self._next_idx = 0
@@ -35,6 +106,9 @@ class ReplayBuffer:
 
     @DeveloperAPI
     def add(self, obs_t, action, reward, obs_tp1, done, weight):
+        if self._frame_store is not None:
+            obs_t = self._frame_store.put(obs_t)
+            obs_tp1 = self._frame_store.put(obs_tp1)
         data = (obs_t, action, reward, obs_tp1, done)
         self._num_added += 1
 
@@ -42,6 +116,10 @@ class ReplayBuffer:
             self._storage.append(data)
             self._est_size_bytes += sum(sys.getsizeof(d) for d in data)
         else:
+            if self._frame_store is not None:
+                evicted = self._storage[self._next_idx]
+                self._frame_store.release(evicted[0])
+                self._frame_store.release(evicted[3])
             self._storage[self._next_idx] = data
         if self._next_idx + 1 >= self._maxsize:
             self._eviction_started = True
@@ -55,6 +133,9 @@ class ReplayBuffer:
         for i in idxes:
             data = self._storage[i]
             obs_t, action, reward, obs_tp1, done = data
+            if self._frame_store is not None:
+                obs_t = self._frame_store.get(obs_t)
+                obs_tp1 = self._frame_store.get(obs_tp1)
             obses_t.append(np.array(unpack_if_needed(obs_t), copy=False))
             actions.append(np.array(action, copy=False))
             rewards.append(reward)
@@ -111,6 +192,9 @@ class ReplayBuffer:
             "est_size_bytes": self._est_size_bytes,
             "num_entries": len(self._storage),
         }
+        if self._frame_store is not None:
+            data["num_frames"] = len(self._frame_store)
+            data["est_size_bytes"] += self._frame_store.size_bytes
         if debug:
             data.update(self._evicted_hit_stats.stats())
         return data
@@ -119,7 +203,7 @@ class ReplayBuffer:
 @DeveloperAPI
 class PrioritizedReplayBuffer(ReplayBuffer):
     @DeveloperAPI
-    def __init__(self, size, alpha):
+    def __init__(self, size, alpha, frame_stack=0):
         """Create Prioritized Replay buffer.
 
         Parameters
@@ -130,12 +214,14 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         alpha: float
           how much prioritization is used
           (0 - no prioritization, 1 - full prioritization)
+        frame_stack: int
+          See ReplayBuffer.__init__
 
         See Also
         --------
         ReplayBuffer.__init__
         """
-        super(PrioritizedReplayBuffer, self).__init__(size)
+        super(PrioritizedReplayBuffer, self).__init__(size, frame_stack)
         assert alpha > 0
         self._alpha = alpha
 
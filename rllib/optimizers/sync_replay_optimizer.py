@@ -39,6 +39,7 @@ class SyncReplayOptimizer(PolicyOptimizer):
             before_learn_on_batch=None,
             synchronize_sampling=False,
             prioritized_replay_beta_annealing_timesteps=100000 * 0.2,
+            replay_frame_stack=0,
     ):
         """Initialize an sync replay optimizer.
 
@@ -59,6 +60,10 @@ class SyncReplayOptimizer(PolicyOptimizer):
                 all policies with the same indices (used in MADDPG).
             prioritized_replay_beta_annealing_timesteps (int): The timestep at
                 which PR-beta annealing should end.
+            replay_frame_stack (int): if > 0, observations are stacks of this
+                many frames along their last axis (e.g. 4 for Atari
+                framestacking), and the replay buffer stores each distinct
+                frame only once instead of every stacked obs and new_obs.
         """
         PolicyOptimizer.__init__(self, workers)
 
@@ -89,11 +94,14 @@ class SyncReplayOptimizer(PolicyOptimizer):
 
             def new_buffer():
                 return PrioritizedReplayBuffer(
-                    buffer_size, alpha=prioritized_replay_alpha)
+                    buffer_size,
+                    alpha=prioritized_replay_alpha,
+                    frame_stack=replay_frame_stack)
         else:
 
             def new_buffer():
-                return ReplayBuffer(buffer_size)
+                return ReplayBuffer(
+                    buffer_size, frame_stack=replay_frame_stack)
 
         self.replay_buffers = collections.defaultdict(new_buffer)
 
@@ -9,10 +9,12 @@ from ray.rllib.agents.ppo.ppo_tf_policy import PPOTFPolicy
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
 from ray.rllib.evaluation.worker_set import WorkerSet
 from ray.rllib.optimizers import AsyncGradientsOptimizer, AsyncSamplesOptimizer
+from ray.rllib.optimizers.aso_multi_gpu_learner import _StagingArea
 from ray.rllib.optimizers.aso_tree_aggregator import TreeAggregator
 from ray.rllib.policy.sample_batch import SampleBatch
 from ray.rllib.tests.mock_worker import _MockWorker
 from ray.rllib.utils import try_import_tf
+from ray.rllib.utils.memory import concat_aligned
 
 tf = try_import_tf()
 
@@ -143,6 +145,28 @@ class AsyncSamplesOptimizerTest(unittest.TestCase):
             workers, num_gpus=1, num_data_loader_buffers=1, _fake_gpus=True)
         self._wait_for(optimizer, 1000, 1000)
 
+    def test_multi_gpu_double_buffered_load(self):
+        local, remotes = self._make_envs()
+        workers = WorkerSet._from_existing(local, remotes)
+        optimizer = AsyncSamplesOptimizer(
+            workers, num_gpus=1, num_data_loader_buffers=2, _fake_gpus=True)
+        self._wait_for(optimizer, 1000, 1000)
+        timing = optimizer.stats()["timing_breakdown"]
+        for stage in ["dequeue", "prepare", "buffer_wait", "load", "grad"]:
+            self.assertIn("learner_{}_time_ms".format(stage), timing)
+
+    def test_staging_area(self):
+        staging_area = _StagingArea()
+        aligned = concat_aligned([np.ones(10), np.ones(10)])
+        self.assertIs(staging_area.stage("a", aligned), aligned)
+        unaligned = np.ones(101, dtype=np.float32)[1:]
+        staged = staging_area.stage("b", unaligned)
+        self.assertEqual(staged.ctypes.data % 64, 0)
+        self.assertTrue(np.array_equal(staged, unaligned))
+        # The staging buffer is reused for arrays of the same shape.
+        self.assertIs(staging_area.stage("b", unaligned * 2), staged)
+        self.assertTrue(np.array_equal(staged, unaligned * 2))
+
     def test_multiple_passes(self):
         local, remotes = self._make_envs()
         workers = WorkerSet._from_existing(local, remotes)
@@ -0,0 +1,71 @@
+import numpy as np
+import unittest
+
+from ray.rllib.optimizers.replay_buffer import ReplayBuffer, \
+    PrioritizedReplayBuffer
+from ray.rllib.utils.compression import pack
+
+
+class TestFrameStackReplayBuffer(unittest.TestCase):
+    """Tests storing framestacked observations with deduplicated frames."""
+
+    k = 4
+    dim = 84
+
+    def _episode(self, length, n_step=1):
+        """Yields framestacked (obs_t, obs_tp1) pairs of one episode."""
+        frames = [
+            np.random.randint(0, 255, (self.dim, self.dim, 1), np.uint8)
+            for _ in range(length + n_step)
+        ]
+        # The first obs of an episode repeats the reset frame.
+        frames = [frames[0]] * (self.k - 1) + frames
+        for t in range(length):
+            obs_t = np.concatenate(frames[t:t + self.k], axis=2)
+            obs_tp1 = np.concatenate(
+                frames[t + n_step:t + n_step + self.k], axis=2)
+            yield obs_t, obs_tp1
+
+    def _check_roundtrip(self, n_step, compress):
+        buf = ReplayBuffer(100, frame_stack=self.k)
+        transitions = list(self._episode(50, n_step))
+        for obs_t, obs_tp1 in transitions:
+            if compress:
+                obs_t, obs_tp1 = pack(obs_t), pack(obs_tp1)
+            buf.add(obs_t, 0, 1.0, obs_tp1, False, None)
+
+        # Each distinct frame is stored once.
+        self.assertEqual(buf.stats()["num_frames"], 50 + n_step)
+
+        obses_t, _, _, obses_tp1, _ = buf._encode_sample(range(50))
+        for i, (obs_t, obs_tp1) in enumerate(transitions):
+            self.assertTrue(np.array_equal(obses_t[i], obs_t))
+            self.assertTrue(np.array_equal(obses_tp1[i], obs_tp1))
+            self.assertEqual(obses_t[i].shape, (self.dim, self.dim, self.k))
+
+    def test_frames_are_deduplicated(self):
+        self._check_roundtrip(n_step=1, compress=False)
+
+    def test_frames_are_deduplicated_n_step(self):
+        self._check_roundtrip(n_step=3, compress=False)
+
+    def test_frames_are_deduplicated_compressed(self):
+        self._check_roundtrip(n_step=1, compress=True)
+
+    def test_evicted_frames_are_freed(self):
+        buf = PrioritizedReplayBuffer(10, alpha=1.0, frame_stack=self.k)
+        for _ in range(5):
+            for obs_t, obs_tp1 in self._episode(20):
+                buf.add(obs_t, 0, 1.0, obs_tp1, False, None)
+        self.assertEqual(len(buf), 10)
+        # Only the frames of the 10 most recent transitions are kept.
+        self.assertEqual(buf.stats()["num_frames"], 10 + self.k)
+        obses_t, _, _, obses_tp1, _, _, _ = buf.sample(8, beta=1.0)
+        self.assertEqual(obses_t.shape, (8, self.dim, self.dim, self.k))
+        self.assertEqual(obses_tp1.shape, (8, self.dim, self.dim, self.k))
+
+
+if __name__ == "__main__":
+    import pytest
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -1,9 +1,12 @@
 import gym
+import numpy as np
 import time
 import unittest
 
 import ray
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
+from ray.rllib.optimizers.async_replay_optimizer import ReplayActor
+from ray.rllib.policy.sample_batch import SampleBatch
 from ray.rllib.tests.test_rollout_worker import MockPolicy
 
 
@@ -34,6 +37,47 @@ class TestPerf(unittest.TestCase):
                 count / (time.time() - start)))
             print()
 
+    def test_apex_replay_throughput(self):
+        num_shards = 2
+        batch_size = 50
+        train_batch_size = 512
+        shards = [
+            ReplayActor.remote(num_shards, 1000, 100000, train_batch_size, 0.6,
+                               0.4, 1e-6) for _ in range(num_shards)
+        ]
+        batch = ray.put(
+            SampleBatch({
+                "obs": np.random.randn(batch_size, 4),
+                "actions": np.zeros(batch_size, dtype=np.int64),
+                "rewards": np.ones(batch_size),
+                "new_obs": np.random.randn(batch_size, 4),
+                "dones": np.zeros(batch_size, dtype=bool),
+                "weights": np.ones(batch_size),
+            }))
+
+        start = time.time()
+        count = 0
+        while time.time() - start < 1:
+            ray.get([s.add_batch.remote(batch) for s in shards])
+            count += batch_size * num_shards
+        print()
+        print("Replay samples in per second {}".format(
+            count / (time.time() - start)))
+
+        for replays_per_call in [1, 4, 16]:
+            start = time.time()
+            count = 0
+            while time.time() - start < 1:
+                if replays_per_call == 1:
+                    ray.get([s.replay.remote() for s in shards])
+                else:
+                    ray.get(
+                        [s.replay_n.remote(replays_per_call) for s in shards])
+                count += train_batch_size * replays_per_call * num_shards
+            print("Replay samples out per second ({} per call) {}".format(
+                replays_per_call, count / (time.time() - start)))
+        print()
+
 
 if __name__ == "__main__":
     import pytest
@@ -107,3 +107,19 @@ def create_colocated(cls, args, count):
     for a in ok[count:]:
         a.__ray_terminate__.remote()
     return ok[:count]
+
+
+def create_spread(cls, args, count):
+    """Create actors spread round-robin over the nodes of the cluster.
+
+    Each actor is pinned to its node by requesting a tiny amount of that
+    node's "node:<ip>" resource.
+    """
+    node_ids = sorted(ray.state.node_ids())
+    logger.info("Creating {} actors spread over {} nodes".format(
+        count, len(node_ids)))
+    return [
+        cls.options(resources={
+            node_ids[i % len(node_ids)]: 0.001
+        }).remote(*args) for i in range(count)
+    ]
@@ -25,12 +25,17 @@ ProfileEvent::ProfileEvent(const std::shared_ptr<Profiler> &profiler,
     : profiler_(profiler) {
   rpc_event_.set_event_type(event_type);
   rpc_event_.set_start_time(absl::GetCurrentTimeNanos() / 1e9);
+  const JobID &job_id = profiler_->GetCurrentJobID();
+  if (!job_id.IsNil()) {
+    rpc_event_.set_job_id(job_id.Binary());
+  }
 }
 
 Profiler::Profiler(WorkerContext &worker_context, const std::string &node_ip_address,
                    boost::asio::io_service &io_service,
                    const std::shared_ptr<gcs::GcsClient> &gcs_client)
-    : io_service_(io_service),
+    : worker_context_(worker_context),
+      io_service_(io_service),
       timer_(io_service_, boost::asio::chrono::seconds(1)),
       rpc_profile_data_(new rpc::ProfileTableData()),
       gcs_client_(gcs_client) {
@@ -34,6 +34,9 @@ class Profiler {
   // Add an event to the queue to be flushed periodically.
   void AddEvent(const rpc::ProfileTableData::ProfileEvent &event) LOCKS_EXCLUDED(mutex_);
 
+  // Get the job that the worker is currently working for.
+  const JobID &GetCurrentJobID() const { return worker_context_.GetCurrentJobID(); }
+
  private:
   // Flush all of the events that have been added since last flush to the GCS.
   void FlushEvents() LOCKS_EXCLUDED(mutex_);
@@ -41,6 +44,9 @@ class Profiler {
   // Mutex guarding rpc_profile_data_.
   absl::Mutex mutex_;
 
+  // Context of the worker that the events are recorded for.
+  WorkerContext &worker_context_;
+
   // ASIO IO service event loop. Must be started by the caller.
   boost::asio::io_service &io_service_;
 
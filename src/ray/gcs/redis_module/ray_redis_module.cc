@@ -172,6 +172,50 @@ Status OpenPrefixedKey(RedisModuleKey **out, RedisModuleCtx *ctx,
                          /*mutated_key_str=*/nullptr);
 }
 
+/// Add the ID of a task or object table entry to the index of its job's entries
+/// in that table. This lets the monitor clean up the entries of a finished job
+/// without scanning the whole table. Each shard keeps the indexes of the entries
+/// that it stores, as sets at JOB_INDEX:<table prefix>:<job ID>. Entries of
+/// other tables aren't indexed. Neither are the entries of jobs that the monitor
+/// has marked as finished with the key FINISHED_JOB:<job ID>, so that entries
+/// written after the cleanup don't create an index that is never deleted.
+///
+/// \param prefix_str The table prefix of the entry.
+/// \param id The ID of the entry. Task and object IDs both start with a task
+/// ID, which ends with the ID of the task's job.
+/// \return Status.
+Status AddToJobIndex(RedisModuleCtx *ctx, RedisModuleString *prefix_str,
+                     RedisModuleString *id) {
+  TablePrefix prefix;
+  RAY_RETURN_NOT_OK(ParseTablePrefix(prefix_str, &prefix));
+  if (prefix != TablePrefix::RAYLET_TASK && prefix != TablePrefix::OBJECT) {
+    return Status::OK();
+  }
+  size_t id_size;
+  const char *id_data = RedisModule_StringPtrLen(id, &id_size);
+  if (id_size < ray::TaskID::Size()) {
+    return Status::Invalid("The ID is too short to contain a job ID.");
+  }
+  const char *job_id_data = id_data + ray::TaskID::Size() - ray::JobID::Size();
+  RedisModuleString *finished_key =
+      RedisString_Format(ctx, "FINISHED_JOB:%b", job_id_data, ray::JobID::Size());
+  RedisModuleKey *key = reinterpret_cast<RedisModuleKey *>(
+      RedisModule_OpenKey(ctx, finished_key, REDISMODULE_READ));
+  bool finished = RedisModule_KeyType(key) != REDISMODULE_KEYTYPE_EMPTY;
+  RedisModule_CloseKey(key);
+  if (finished) {
+    return Status::OK();
+  }
+  RedisModuleString *index_key =
+      RedisString_Format(ctx, "JOB_INDEX:%s:%b", TablePrefix_Name(prefix).c_str(),
+                         job_id_data, ray::JobID::Size());
+  RedisModuleCallReply *reply = RedisModule_Call(ctx, "SADD", "ss", index_key, id);
+  if (RedisModule_CallReplyType(reply) == REDISMODULE_REPLY_ERROR) {
+    return Status::RedisError("Failed to add the entry to its job's index.");
+  }
+  return Status::OK();
+}
+
 /// Open the key used to store the channels that should be published to when an
 /// update happens at the given keyname.
 Status GetBroadcastKey(RedisModuleCtx *ctx, RedisModuleString *pubsub_channel_str,
@@ -284,6 +328,7 @@ int TableAdd_DoWrite(RedisModuleCtx *ctx, RedisModuleString **argv, int argc,
   REPLY_AND_RETURN_IF_NOT_OK(OpenPrefixedKey(
       &key, ctx, prefix_str, id, REDISMODULE_READ | REDISMODULE_WRITE, mutated_key_str));
   RedisModule_StringSet(key, data);
+  RAY_IGNORE_EXPR(AddToJobIndex(ctx, prefix_str, id));
   return REDISMODULE_OK;
 }
 
@@ -479,6 +524,9 @@ int Set_DoWrite(RedisModuleCtx *ctx, RedisModuleString **argv, int argc, bool is
       RedisModule_Call(ctx, is_add ? "SADD" : "SREM", "ss", key_string, data);
   if (RedisModule_CallReplyType(reply) != REDISMODULE_REPLY_ERROR) {
     *changed = RedisModule_CallReplyInteger(reply) > 0;
+    if (is_add && *changed) {
+      RAY_IGNORE_EXPR(AddToJobIndex(ctx, prefix_str, id));
+    }
     if (!is_add && *changed) {
       // try to delete the empty set.
       RedisModuleKey *key;
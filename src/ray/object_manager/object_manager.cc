@@ -78,8 +78,11 @@ void ObjectManager::HandleObjectAdded(
   RAY_LOG(DEBUG) << "Object added " << object_id;
   RAY_CHECK(local_objects_.count(object_id) == 0);
   local_objects_[object_id].object_info = object_info;
-  ray::Status status =
-      object_directory_->ReportObjectAdded(object_id, self_node_id_, object_info);
+  // A restored spilled object is still listed as a location of this node.
+  if (spilled_objects_.erase(object_id) == 0) {
+    ray::Status status =
+        object_directory_->ReportObjectAdded(object_id, self_node_id_, object_info);
+  }
 
   // Handle the unfulfilled_push_requests_ which contains the push request that is not
   // completed due to unsatisfied local objects.
@@ -106,10 +109,48 @@ void ObjectManager::NotifyDirectoryObjectDeleted(const ObjectID &object_id) {
   RAY_CHECK(it != local_objects_.end());
   auto object_info = it->second.object_info;
   local_objects_.erase(it);
+  if (spilled_objects_.count(object_id) > 0) {
+    // The object was spilled to disk, so this node can still provide it.
+    return;
+  }
   ray::Status status =
       object_directory_->ReportObjectRemoved(object_id, self_node_id_, object_info);
 }
 
+void ObjectManager::SetRestoreSpilledObjectCallback(
+    const std::function<void(const ObjectID &)> &callback) {
+  restore_spilled_object_ = callback;
+}
+
+void ObjectManager::ObjectsSpilled(const std::vector<ObjectID> &object_ids) {
+  for (const auto &object_id : object_ids) {
+    auto it = local_objects_.find(object_id);
+    if (it != local_objects_.end()) {
+      spilled_objects_[object_id] = it->second.object_info;
+    }
+  }
+}
+
+void ObjectManager::SpilledObjectRestored(const ObjectID &object_id) {
+  // Otherwise, the object is forgotten once its addition to the local store is
+  // handled, without reporting this node as a location again.
+  if (local_objects_.count(object_id) > 0) {
+    spilled_objects_.erase(object_id);
+  }
+}
+
+void ObjectManager::SpilledObjectDeleted(const ObjectID &object_id) {
+  auto it = spilled_objects_.find(object_id);
+  if (it == spilled_objects_.end()) {
+    return;
+  }
+  if (local_objects_.count(object_id) == 0) {
+    ray::Status status =
+        object_directory_->ReportObjectRemoved(object_id, self_node_id_, it->second);
+  }
+  spilled_objects_.erase(it);
+}
+
 ray::Status ObjectManager::SubscribeObjAdded(
     std::function<void(const object_manager::protocol::ObjectInfoT &)> callback) {
   store_notification_.SubscribeObjAdded(callback);
@@ -132,6 +173,11 @@ ray::Status ObjectManager::Pull(const ObjectID &object_id) {
   if (pull_requests_.find(object_id) != pull_requests_.end()) {
     return ray::Status::OK();
   }
+  if (spilled_objects_.count(object_id) > 0 && restore_spilled_object_) {
+    // The object was spilled on this node. The pull is canceled once the object
+    // is restored.
+    restore_spilled_object_(object_id);
+  }
 
   pull_requests_.emplace(object_id, PullRequest());
   // Subscribe to object notifications. A notification will be received every
@@ -186,6 +232,11 @@ void ObjectManager::TryPull(const ObjectID &object_id) {
   // Make sure that there is at least one client which is not the local client.
   // TODO(rkn): It may actually be possible for this check to fail.
   if (node_vector.size() == 1 && node_vector[0] == self_node_id_) {
+    if (spilled_objects_.count(object_id) > 0) {
+      // The object is being restored from disk.
+      it->second.timer_set = false;
+      return;
+    }
     RAY_LOG(ERROR) << "The object manager with ID " << self_node_id_
                    << " is trying to pull object " << object_id
                    << " but the object table suggests that this object manager "
@@ -342,6 +393,10 @@ void ObjectManager::Push(const ObjectID &object_id, const ClientID &client_id) {
   RAY_LOG(DEBUG) << "Push on " << self_node_id_ << " to " << client_id << " of object "
                  << object_id;
   if (local_objects_.count(object_id) == 0) {
+    if (spilled_objects_.count(object_id) > 0 && restore_spilled_object_) {
+      // The object was spilled on this node. It is pushed once it is restored.
+      restore_spilled_object_(object_id);
+    }
     // Avoid setting duplicated timer for the same object and client pair.
     auto &clients = unfulfilled_push_requests_[object_id];
     if (clients.count(client_id) == 0) {
@@ -840,6 +895,7 @@ std::string ObjectManager::DebugString() const {
   result << "\n- num local objects: " << local_objects_.size();
   result << "\n- num active wait requests: " << active_wait_requests_.size();
   result << "\n- num unfulfilled push requests: " << unfulfilled_push_requests_.size();
+  result << "\n- num spilled objects: " << spilled_objects_.size();
   result << "\n- num pull requests: " << pull_requests_.size();
   result << "\n- num buffered profile events: " << profile_events_.size();
   result << "\n" << object_directory_->DebugString();
@@ -245,6 +245,33 @@ class ObjectManager : public ObjectManagerInterface,
   ///                   or send it to all the object stores.
   void FreeObjects(const std::vector<ObjectID> &object_ids, bool local_only);
 
+  /// Set the callback to restore an object that this node spilled to disk. It is
+  /// called when the object is pulled, by this node or by a remote one, and
+  /// should write the object back into the local store.
+  ///
+  /// \param callback The callback to call with the ID of the spilled object.
+  void SetRestoreSpilledObjectCallback(
+      const std::function<void(const ObjectID &)> &callback);
+
+  /// Record that local objects were spilled to disk and are about to be deleted
+  /// from the local store. This node stays a location of the objects in the object
+  /// directory, and they are restored when they are pulled.
+  ///
+  /// \param object_ids The IDs of the spilled objects.
+  void ObjectsSpilled(const std::vector<ObjectID> &object_ids);
+
+  /// Record that a spilled object was restored to the local store, or that it
+  /// turned out to still be there.
+  ///
+  /// \param object_id The ID of the restored object.
+  void SpilledObjectRestored(const ObjectID &object_id);
+
+  /// Record that the file of a spilled object was deleted. If the object isn't
+  /// in the local store, this node is removed from its locations.
+  ///
+  /// \param object_id The ID of the deleted object.
+  void SpilledObjectDeleted(const ObjectID &object_id);
+
   /// Return profiling information and reset the profiling information.
   ///
   /// \return All profiling information that has accumulated since the last call
@@ -393,6 +420,13 @@ class ObjectManager : public ObjectManagerInterface,
   /// including when the object was last pushed to other object managers.
   std::unordered_map<ObjectID, LocalObjectInfo> local_objects_;
 
+  /// Mapping from the objects that this node spilled to disk to the information
+  /// about them that was reported to the object directory.
+  std::unordered_map<ObjectID, object_manager::protocol::ObjectInfoT> spilled_objects_;
+
+  /// The callback to restore a spilled object.
+  std::function<void(const ObjectID &)> restore_spilled_object_;
+
   /// This is used as the callback identifier in Pull for
   /// SubscribeObjectLocations. We only need one identifier because we never need to
   /// subscribe multiple times to the same object during Pull.
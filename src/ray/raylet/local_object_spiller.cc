@@ -0,0 +1,339 @@
+// Copyright 2017 The Ray Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//  http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "ray/raylet/local_object_spiller.h"
+
+#include <cstdio>
+#include <fstream>
+#include <sstream>
+
+#include "ray/util/logging.h"
+
+namespace ray {
+
+namespace raylet {
+
+namespace {
+
+/// Spilled objects are stored as a header with the sizes of the data and the
+/// metadata, followed by the data and the metadata.
+struct SpillFileHeader {
+  int64_t data_size;
+  int64_t metadata_size;
+};
+
+}  // namespace
+
+LocalObjectSpiller::LocalObjectSpiller(boost::asio::io_service &main_service,
+                                       const std::vector<std::string> &spill_directories,
+                                       int64_t spill_threshold_bytes)
+    : main_service_(main_service),
+      io_work_(new boost::asio::io_service::work(io_service_)),
+      spill_directories_(spill_directories),
+      spill_threshold_bytes_(spill_threshold_bytes) {
+  if (Enabled()) {
+    io_thread_ = std::thread([this]() { io_service_.run(); });
+  }
+}
+
+LocalObjectSpiller::~LocalObjectSpiller() {
+  // Let the I/O thread finish the queued requests instead of stopping it, so
+  // that no file is left half written and no request is run after the join.
+  io_work_.reset();
+  if (io_thread_.joinable()) {
+    io_thread_.join();
+  }
+}
+
+void LocalObjectSpiller::ObjectPinned(const ObjectID &object_id, int64_t object_size) {
+  if (!Enabled() || pinned_objects_.count(object_id) > 0 ||
+      spilling_objects_.count(object_id) > 0) {
+    return;
+  }
+  auto lru_position = pinned_objects_lru_.insert(pinned_objects_lru_.end(), object_id);
+  pinned_objects_.emplace(object_id, PinnedObject{object_size, lru_position});
+  pinned_bytes_ += object_size;
+}
+
+void LocalObjectSpiller::ObjectUsed(const ObjectID &object_id) {
+  auto it = pinned_objects_.find(object_id);
+  if (it == pinned_objects_.end()) {
+    return;
+  }
+  pinned_objects_lru_.splice(pinned_objects_lru_.end(), pinned_objects_lru_,
+                             it->second.lru_position);
+}
+
+void LocalObjectSpiller::ObjectUnpinned(const ObjectID &object_id) {
+  auto spilling_it = spilling_objects_.find(object_id);
+  if (spilling_it != spilling_objects_.end()) {
+    spilling_it->second.unpinned = true;
+    return;
+  }
+  auto it = pinned_objects_.find(object_id);
+  if (it == pinned_objects_.end()) {
+    return;
+  }
+  pinned_bytes_ -= it->second.size;
+  pinned_objects_lru_.erase(it->second.lru_position);
+  pinned_objects_.erase(it);
+}
+
+std::vector<ObjectID> LocalObjectSpiller::GetObjectsToSpill(
+    const absl::flat_hash_set<ObjectID> &excluded_object_ids) const {
+  std::vector<ObjectID> objects_to_spill;
+  int64_t pinned_bytes = pinned_bytes_;
+  for (const auto &object_id : pinned_objects_lru_) {
+    if (pinned_bytes <= spill_threshold_bytes_) {
+      break;
+    }
+    if (excluded_object_ids.count(object_id) > 0) {
+      continue;
+    }
+    objects_to_spill.push_back(object_id);
+    pinned_bytes -= pinned_objects_.at(object_id).size;
+  }
+  return objects_to_spill;
+}
+
+Status LocalObjectSpiller::WriteObject(const SpillRequest &request) {
+  SpillFileHeader header;
+  header.data_size = request.data ? request.data->Size() : 0;
+  header.metadata_size = request.metadata ? request.metadata->Size() : 0;
+  std::ofstream file(request.path, std::ios::binary | std::ios::trunc);
+  file.write(reinterpret_cast<const char *>(&header), sizeof(header));
+  if (header.data_size > 0) {
+    file.write(reinterpret_cast<const char *>(request.data->Data()), header.data_size);
+  }
+  if (header.metadata_size > 0) {
+    file.write(reinterpret_cast<const char *>(request.metadata->Data()),
+               header.metadata_size);
+  }
+  file.close();
+  if (!file) {
+    std::remove(request.path.c_str());
+    return Status::IOError("Failed to write spilled object " + request.object_id.Hex() +
+                           " to " + request.path);
+  }
+  return Status::OK();
+}
+
+void LocalObjectSpiller::SpillObjects(const std::vector<ObjectID> &object_ids,
+                                      const std::vector<const RayObject *> &objects,
+                                      const SpillCallback &callback) {
+  RAY_CHECK(Enabled());
+  RAY_CHECK(object_ids.size() == objects.size());
+  std::vector<SpillRequest> requests;
+  for (size_t i = 0; i < object_ids.size(); i++) {
+    const ObjectID &object_id = object_ids[i];
+    auto it = pinned_objects_.find(object_id);
+    RAY_CHECK(it != pinned_objects_.end());
+    int64_t size = it->second.size;
+    ObjectUnpinned(object_id);
+    spilling_objects_.emplace(object_id, SpillingObject{size, /*unpinned=*/false});
+
+    const std::string &directory = spill_directories_[next_directory_index_];
+    next_directory_index_ = (next_directory_index_ + 1) % spill_directories_.size();
+    requests.push_back(SpillRequest{
+        object_id, directory + "/" + object_id.Hex(),
+        objects[i]->HasData() ? objects[i]->GetData() : nullptr,
+        objects[i]->HasMetadata() ? objects[i]->GetMetadata() : nullptr});
+  }
+  // The destructor waits for the I/O thread, but the completion may only run on
+  // the main thread after the spiller is gone.
+  std::weak_ptr<bool> alive = alive_;
+  io_service_.post([this, alive, requests, callback]() {
+    std::vector<Status> statuses;
+    for (const auto &request : requests) {
+      statuses.push_back(WriteObject(request));
+    }
+    main_service_.post([this, alive, requests, statuses, callback]() {
+      if (alive.expired()) {
+        return;
+      }
+      SpillObjectsDone(requests, statuses, callback);
+    });
+  });
+}
+
+void LocalObjectSpiller::SpillObjectsDone(const std::vector<SpillRequest> &requests,
+                                          const std::vector<Status> &statuses,
+                                          const SpillCallback &callback) {
+  std::vector<ObjectID> spilled_object_ids;
+  for (size_t i = 0; i < requests.size(); i++) {
+    const SpillRequest &request = requests[i];
+    auto it = spilling_objects_.find(request.object_id);
+    RAY_CHECK(it != spilling_objects_.end());
+    const SpillingObject spilling_object = it->second;
+    spilling_objects_.erase(it);
+
+    if (!statuses[i].ok()) {
+      RAY_LOG(WARNING) << "Failed to spill object " << request.object_id << ": "
+                       << statuses[i].ToString();
+      if (!spilling_object.unpinned) {
+        ObjectPinned(request.object_id, spilling_object.size);
+      }
+      continue;
+    }
+    if (spilling_object.unpinned) {
+      // The object went out of scope while it was being written.
+      DeleteFile(request.path);
+      continue;
+    }
+
+    std::string metadata;
+    if (request.metadata) {
+      metadata.assign(reinterpret_cast<const char *>(request.metadata->Data()),
+                      request.metadata->Size());
+    }
+    int64_t data_size = request.data ? request.data->Size() : 0;
+    spilled_objects_.emplace(request.object_id,
+                             SpilledObject{request.path, data_size, metadata,
+                                           /*restoring=*/false, /*deleted=*/false});
+    num_bytes_spilled_ += spilling_object.size;
+    spilled_object_ids.push_back(request.object_id);
+    RAY_LOG(DEBUG) << "Spilled object " << request.object_id << " to " << request.path;
+  }
+  callback(spilled_object_ids);
+}
+
+bool LocalObjectSpiller::IsSpilled(const ObjectID &object_id) const {
+  auto it = spilled_objects_.find(object_id);
+  return it != spilled_objects_.end() && !it->second.restoring;
+}
+
+void LocalObjectSpiller::RestoreObject(const ObjectID &object_id,
+                                       plasma::PlasmaClient &store_client,
+                                       const RestoreCallback &callback) {
+  auto it = spilled_objects_.find(object_id);
+  if (it == spilled_objects_.end() || it->second.restoring) {
+    callback(object_id, Status::KeyError("Object " + object_id.Hex() +
+                                         " is not spilled or is being restored."));
+    return;
+  }
+  SpilledObject &spilled_object = it->second;
+
+  const plasma::ObjectID plasma_id = object_id.ToPlasmaId();
+  std::shared_ptr<arrow::Buffer> data;
+  arrow::Status status = store_client.Create(
+      plasma_id, spilled_object.data_size,
+      reinterpret_cast<const uint8_t *>(spilled_object.metadata.data()),
+      spilled_object.metadata.size(), &data, /*device_num=*/0, /*evict_if_full=*/true);
+  if (plasma::IsPlasmaStoreFull(status)) {
+    callback(object_id, Status::ObjectStoreFull("Not enough space to restore object " +
+                                                object_id.Hex()));
+    return;
+  }
+  if (plasma::IsPlasmaObjectExists(status)) {
+    DeleteSpilledObject(object_id);
+    callback(object_id, Status::OK());
+    return;
+  }
+  if (!status.ok()) {
+    callback(object_id, Status::IOError(status.message()));
+    return;
+  }
+
+  spilled_object.restoring = true;
+  const std::string path = spilled_object.path;
+  const int64_t data_size = spilled_object.data_size;
+  // See SpillObjects. The store client belongs to the owner of the spiller, so
+  // it is only used if the spiller is still alive.
+  std::weak_ptr<bool> alive = alive_;
+  io_service_.post([this, alive, object_id, path, data_size, data, &store_client,
+                    callback]() {
+    std::ifstream file(path, std::ios::binary);
+    file.seekg(sizeof(SpillFileHeader));
+    file.read(reinterpret_cast<char *>(data->mutable_data()), data_size);
+    Status status = Status::OK();
+    if (!file) {
+      status = Status::IOError("Failed to read spilled object " + object_id.Hex() +
+                               " from " + path);
+    }
+    main_service_.post([this, alive, object_id, &store_client, status, callback]() {
+      if (alive.expired()) {
+        return;
+      }
+      RestoreObjectDone(object_id, store_client, status, callback);
+    });
+  });
+}
+
+void LocalObjectSpiller::RestoreObjectDone(const ObjectID &object_id,
+                                           plasma::PlasmaClient &store_client,
+                                           const Status &status,
+                                           const RestoreCallback &callback) {
+  auto it = spilled_objects_.find(object_id);
+  RAY_CHECK(it != spilled_objects_.end() && it->second.restoring);
+  const plasma::ObjectID plasma_id = object_id.ToPlasmaId();
+  if (!status.ok() || it->second.deleted) {
+    RAY_ARROW_CHECK_OK(store_client.Release(plasma_id));
+    RAY_ARROW_CHECK_OK(store_client.Abort(plasma_id));
+    it->second.restoring = false;
+    if (it->second.deleted) {
+      DeleteSpilledObject(object_id);
+      callback(object_id,
+               Status::KeyError("Object " + object_id.Hex() + " went out of scope."));
+    } else {
+      callback(object_id, status);
+    }
+    return;
+  }
+  RAY_ARROW_CHECK_OK(store_client.Seal(plasma_id));
+  RAY_ARROW_CHECK_OK(store_client.Release(plasma_id));
+
+  num_bytes_restored_ += it->second.data_size + it->second.metadata.size();
+  RAY_LOG(DEBUG) << "Restored object " << object_id << " from " << it->second.path;
+  it->second.restoring = false;
+  DeleteSpilledObject(object_id);
+  callback(object_id, Status::OK());
+}
+
+void LocalObjectSpiller::DeleteSpilledObject(const ObjectID &object_id) {
+  auto it = spilled_objects_.find(object_id);
+  if (it == spilled_objects_.end()) {
+    return;
+  }
+  if (it->second.restoring) {
+    // The file is deleted once the restore is aborted.
+    it->second.deleted = true;
+    return;
+  }
+  DeleteFile(it->second.path);
+  spilled_objects_.erase(it);
+}
+
+void LocalObjectSpiller::DeleteFile(const std::string &path) {
+  io_service_.post([path]() {
+    if (std::remove(path.c_str()) != 0) {
+      RAY_LOG(WARNING) << "Failed to delete spilled object file " << path;
+    }
+  });
+}
+
+std::string LocalObjectSpiller::DebugString() const {
+  std::stringstream result;
+  result << "LocalObjectSpiller:";
+  result << "\n- num pinned objects tracked: " << pinned_objects_.size();
+  result << "\n- num pinned bytes tracked: " << pinned_bytes_;
+  result << "\n- num objects being spilled: " << spilling_objects_.size();
+  result << "\n- num objects spilled: " << spilled_objects_.size();
+  result << "\n- num bytes spilled: " << num_bytes_spilled_;
+  result << "\n- num bytes restored: " << num_bytes_restored_;
+  return result.str();
+}
+
+}  // namespace raylet
+
+}  // namespace ray
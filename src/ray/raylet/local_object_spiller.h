@@ -0,0 +1,242 @@
+// Copyright 2017 The Ray Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//  http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#ifndef RAY_RAYLET_LOCAL_OBJECT_SPILLER_H
+#define RAY_RAYLET_LOCAL_OBJECT_SPILLER_H
+
+#include <boost/asio.hpp>
+#include <functional>
+#include <list>
+#include <memory>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "absl/container/flat_hash_map.h"
+#include "absl/container/flat_hash_set.h"
+#include "plasma/client.h"
+#include "ray/common/id.h"
+#include "ray/common/ray_object.h"
+#include "ray/common/status.h"
+
+namespace ray {
+
+namespace raylet {
+
+/// The LocalObjectSpiller spills pinned objects to local disk when they take up
+/// too much of the object store, and restores them when they are needed again.
+///
+/// The object store cannot evict objects that the node manager pins on behalf of
+/// their owners, so a node that holds many live objects eventually fails to
+/// create new ones. The spiller tracks the pinned objects in least-recently-used
+/// order. Once their total size exceeds the spilling threshold, the node manager
+/// writes the least recently used ones to files with SpillObjects and then unpins
+/// and deletes them from the object store.
+///
+/// All file I/O runs on a separate thread, so that spilling and restoring large
+/// objects doesn't block the main event loop. Completions are posted back to the
+/// main io_service, and all other methods must be called from the main thread.
+class LocalObjectSpiller {
+ public:
+  /// Called with the IDs of the objects that were written to disk.
+  using SpillCallback = std::function<void(const std::vector<ObjectID> &object_ids)>;
+  /// Called once a spilled object was written back into the object store, or
+  /// with an error if it couldn't be.
+  using RestoreCallback =
+      std::function<void(const ObjectID &object_id, const Status &status)>;
+
+  /// Create a local object spiller.
+  ///
+  /// \param main_service The main event loop to run the callbacks on.
+  /// \param spill_directories The directories to write spilled objects to.
+  /// Objects are spread across them round-robin. If empty, spilling is disabled.
+  /// \param spill_threshold_bytes The total size of pinned objects above which
+  /// objects are spilled.
+  LocalObjectSpiller(boost::asio::io_service &main_service,
+                     const std::vector<std::string> &spill_directories,
+                     int64_t spill_threshold_bytes);
+
+  /// Finishes the queued writes, reads and deletions. Their callbacks are
+  /// dropped if they have not run on the main thread yet.
+  ~LocalObjectSpiller();
+
+  /// Whether spilling is enabled on this node.
+  bool Enabled() const { return !spill_directories_.empty(); }
+
+  /// Start tracking a newly pinned object as the most recently used one.
+  ///
+  /// \param object_id The ID of the pinned object.
+  /// \param object_size The size of the object's data and metadata in bytes.
+  void ObjectPinned(const ObjectID &object_id, int64_t object_size);
+
+  /// Mark a pinned object as the most recently used one. Does nothing if the
+  /// object isn't tracked.
+  void ObjectUsed(const ObjectID &object_id);
+
+  /// Stop tracking a pinned object. If the object is being spilled, its file is
+  /// deleted once the write finishes. Does nothing if the object isn't tracked.
+  void ObjectUnpinned(const ObjectID &object_id);
+
+  /// Get the least recently used pinned objects that should be spilled to bring
+  /// the total size of pinned objects back under the threshold.
+  ///
+  /// \param excluded_object_ids Objects that must not be spilled, e.g. because a
+  /// request that is still in flight restored them.
+  /// \return The IDs of the objects to spill.
+  std::vector<ObjectID> GetObjectsToSpill(
+      const absl::flat_hash_set<ObjectID> &excluded_object_ids) const;
+
+  /// Write pinned objects to disk on the I/O thread. They stop counting towards
+  /// the pinned objects right away. Once the objects were written, the callback
+  /// is called with the IDs of those that the caller should now unpin and delete
+  /// from the object store. Objects that failed to be written are tracked as
+  /// pinned again, and objects that were unpinned in the meantime are deleted
+  /// from disk instead.
+  ///
+  /// \param object_ids The IDs of the objects to spill.
+  /// \param objects The pinned objects. Their buffers are kept alive until the
+  /// write finishes.
+  /// \param callback The callback to call on the main thread.
+  void SpillObjects(const std::vector<ObjectID> &object_ids,
+                    const std::vector<const RayObject *> &objects,
+                    const SpillCallback &callback);
+
+  /// Whether an object is spilled to disk and not already being restored.
+  bool IsSpilled(const ObjectID &object_id) const;
+
+  /// Write a spilled object back into the object store and delete its file. The
+  /// object is created in the object store on the calling thread and its data is
+  /// read on the I/O thread. The caller is responsible for pinning the restored
+  /// object again.
+  ///
+  /// \param object_id The ID of the spilled object.
+  /// \param store_client The client to create the object with.
+  /// \param callback The callback to call on the main thread. If the object store
+  /// is full, the object stays spilled and the callback is called right away.
+  void RestoreObject(const ObjectID &object_id, plasma::PlasmaClient &store_client,
+                     const RestoreCallback &callback);
+
+  /// Delete the file of a spilled object that went out of scope. If the object is
+  /// being restored, the restore is aborted. Does nothing if the object isn't
+  /// spilled.
+  void DeleteSpilledObject(const ObjectID &object_id);
+
+  /// The total number of bytes spilled to disk since the node started.
+  int64_t NumBytesSpilled() const { return num_bytes_spilled_; }
+
+  /// The total number of bytes restored from disk since the node started.
+  int64_t NumBytesRestored() const { return num_bytes_restored_; }
+
+  /// The number of objects that are currently spilled.
+  size_t NumObjectsSpilled() const { return spilled_objects_.size(); }
+
+  /// Returns debug string for class.
+  ///
+  /// \return string.
+  std::string DebugString() const;
+
+ private:
+  /// The location of a spilled object.
+  struct SpilledObject {
+    /// The file that the object was written to.
+    std::string path;
+    /// The size of the object's data in bytes.
+    int64_t data_size;
+    /// The object's metadata. It is small and needed to create the object when it
+    /// is restored, so it is kept in memory as well as in the file.
+    std::string metadata;
+    /// Whether the object is being restored.
+    bool restoring;
+    /// Whether the object went out of scope while it was being restored.
+    bool deleted;
+  };
+
+  /// A pinned object that may be spilled.
+  struct PinnedObject {
+    /// The size of the object's data and metadata in bytes.
+    int64_t size;
+    /// The object's position in pinned_objects_lru_.
+    std::list<ObjectID>::iterator lru_position;
+  };
+
+  /// An object that is being written to disk.
+  struct SpillingObject {
+    /// The size of the object's data and metadata in bytes.
+    int64_t size;
+    /// Whether the object was unpinned while it was being written.
+    bool unpinned;
+  };
+
+  /// An object to write to disk on the I/O thread.
+  struct SpillRequest {
+    ObjectID object_id;
+    std::string path;
+    std::shared_ptr<Buffer> data;
+    std::shared_ptr<Buffer> metadata;
+  };
+
+  /// Write an object to disk. Called on the I/O thread.
+  static Status WriteObject(const SpillRequest &request);
+
+  /// Handle the written objects on the main thread.
+  void SpillObjectsDone(const std::vector<SpillRequest> &requests,
+                        const std::vector<Status> &statuses,
+                        const SpillCallback &callback);
+
+  /// Seal or abort a restored object on the main thread.
+  void RestoreObjectDone(const ObjectID &object_id, plasma::PlasmaClient &store_client,
+                         const Status &status, const RestoreCallback &callback);
+
+  /// Delete a file on the I/O thread.
+  void DeleteFile(const std::string &path);
+
+  /// The main event loop to run the callbacks on.
+  boost::asio::io_service &main_service_;
+  /// The event loop of the I/O thread.
+  boost::asio::io_service io_service_;
+  /// Keeps the I/O thread running while there is no I/O to do. Reset on
+  /// destruction so that the thread exits once the queued I/O is done.
+  std::unique_ptr<boost::asio::io_service::work> io_work_;
+  /// The thread that reads and writes the files of spilled objects.
+  std::thread io_thread_;
+  /// The directories to write spilled objects to.
+  const std::vector<std::string> spill_directories_;
+  /// The total size of pinned objects above which objects are spilled.
+  const int64_t spill_threshold_bytes_;
+  /// The index of the directory to write the next spilled object to.
+  size_t next_directory_index_ = 0;
+  /// The tracked pinned objects.
+  absl::flat_hash_map<ObjectID, PinnedObject> pinned_objects_;
+  /// The tracked pinned objects, from least to most recently used.
+  std::list<ObjectID> pinned_objects_lru_;
+  /// The total size of the tracked pinned objects in bytes.
+  int64_t pinned_bytes_ = 0;
+  /// The objects that are being written to disk.
+  absl::flat_hash_map<ObjectID, SpillingObject> spilling_objects_;
+  /// The objects that are currently spilled.
+  absl::flat_hash_map<ObjectID, SpilledObject> spilled_objects_;
+  /// The total number of bytes spilled to disk.
+  int64_t num_bytes_spilled_ = 0;
+  /// The total number of bytes restored from disk.
+  int64_t num_bytes_restored_ = 0;
+  /// Expires when the spiller is destroyed. The callbacks posted to the main
+  /// event loop hold a weak pointer to it so that they don't run afterwards.
+  std::shared_ptr<bool> alive_ = std::make_shared<bool>(true);
+};
+
+}  // namespace raylet
+
+}  // namespace ray
+
+#endif  // RAY_RAYLET_LOCAL_OBJECT_SPILLER_H
@@ -40,6 +40,9 @@ DEFINE_string(java_worker_command, "", "Java worker command.");
 DEFINE_string(redis_password, "", "The password of redis.");
 DEFINE_string(temp_dir, "", "Temporary directory.");
 DEFINE_string(session_dir, "", "The path of this ray session directory.");
+DEFINE_int64(object_store_memory, -1, "The capacity of the object store in bytes.");
+DEFINE_string(object_spilling_directories, "",
+              "Comma-separated directories to spill objects to.");
 DEFINE_bool(disable_stats, false, "Whether disable the stats.");
 DEFINE_string(stat_address, "127.0.0.1:8888", "The address that we report metrics to.");
 DEFINE_bool(enable_stdout_exporter, false,
@@ -72,6 +75,8 @@ int main(int argc, char *argv[]) {
   const std::string redis_password = FLAGS_redis_password;
   const std::string temp_dir = FLAGS_temp_dir;
   const std::string session_dir = FLAGS_session_dir;
+  const int64_t object_store_memory = FLAGS_object_store_memory;
+  const std::string object_spilling_directories = FLAGS_object_spilling_directories;
   const bool disable_stats = FLAGS_disable_stats;
   const std::string stat_address = FLAGS_stat_address;
   const bool enable_stdout_exporter = FLAGS_enable_stdout_exporter;
@@ -149,6 +154,17 @@ int main(int argc, char *argv[]) {
   node_manager_config.store_socket_name = store_socket_name;
   node_manager_config.temp_dir = temp_dir;
   node_manager_config.session_dir = session_dir;
+  if (!object_spilling_directories.empty()) {
+    RAY_CHECK(object_store_memory > 0)
+        << "The object store memory must be set to enable object spilling.";
+    std::istringstream directories_string(object_spilling_directories);
+    std::string directory;
+    while (std::getline(directories_string, directory, ',')) {
+      node_manager_config.object_spilling_directories.push_back(directory);
+    }
+  }
+  node_manager_config.object_spilling_threshold_bytes = static_cast<int64_t>(
+      object_store_memory * RayConfig::instance().object_spilling_threshold());
 
   // Configuration for the object manager.
   ray::ObjectManagerConfig object_manager_config;
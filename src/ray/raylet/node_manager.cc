@@ -126,7 +126,9 @@ NodeManager::NodeManager(boost::asio::io_service &io_service,
       node_manager_server_("NodeManager", config.node_manager_port),
       node_manager_service_(io_service, *this),
       client_call_manager_(io_service),
-      new_scheduler_enabled_(RayConfig::instance().new_scheduler_enabled()) {
+      new_scheduler_enabled_(RayConfig::instance().new_scheduler_enabled()),
+      local_object_spiller_(io_service, config.object_spilling_directories,
+                            config.object_spilling_threshold_bytes) {
   RAY_CHECK(heartbeat_period_.count() > 0);
   // Initialize the resource map with own cluster resource configuration.
   cluster_resource_map_.emplace(self_node_id_,
@@ -139,6 +141,10 @@ NodeManager::NodeManager(boost::asio::io_service &io_service,
       }));
   RAY_CHECK_OK(object_manager_.SubscribeObjDeleted(
       [this](const ObjectID &object_id) { HandleObjectMissing(object_id); }));
+  if (local_object_spiller_.Enabled()) {
+    object_manager_.SetRestoreSpilledObjectCallback(
+        [this](const ObjectID &object_id) { RestoreSpilledObjects({object_id}); });
+  }
 
   if (new_scheduler_enabled_) {
     SchedulingResources &local_resources = cluster_resource_map_[self_node_id_];
@@ -321,6 +327,11 @@ void NodeManager::Heartbeat() {
     heartbeat_data->add_resource_load_label(resource_pair.first);
     heartbeat_data->add_resource_load_capacity(resource_pair.second);
   }
+  for (const auto &demand : local_queues_.GetResourceLoadByShape()) {
+    auto resource_demand = heartbeat_data->add_resource_load_by_shape();
+    resource_demand->mutable_shape()->insert(demand.first.begin(), demand.first.end());
+    resource_demand->set_num_ready_requests_queued(demand.second);
+  }
 
   // Set the global gc bit on the outgoing heartbeat message.
   if (should_global_gc_) {
@@ -1303,6 +1314,7 @@ void NodeManager::ProcessDisconnectClientMessage(
 void NodeManager::ProcessFetchOrReconstructMessage(
     const std::shared_ptr<LocalClientConnection> &client, const uint8_t *message_data) {
   auto message = flatbuffers::GetRoot<protocol::FetchOrReconstruct>(message_data);
+  RestoreSpilledObjects(from_flatbuf<ObjectID>(*message->object_ids()));
   std::vector<ObjectID> required_object_ids;
   for (int64_t i = 0; i < message->object_ids()->size(); ++i) {
     ObjectID object_id = from_flatbuf<ObjectID>(*message->object_ids()->Get(i));
@@ -1337,6 +1349,11 @@ void NodeManager::ProcessWaitRequestMessage(
   int64_t wait_ms = message->timeout();
   uint64_t num_required_objects = static_cast<uint64_t>(message->num_ready_objects());
   bool wait_local = message->wait_local();
+  if (wait_ms != 0) {
+    // Don't restore spilled objects for a wait that only checks which objects
+    // are ready.
+    RestoreSpilledObjects(object_ids);
+  }
 
   std::vector<ObjectID> required_object_ids;
   for (auto const &object_id : object_ids) {
@@ -3153,6 +3170,7 @@ std::string NodeManager::DebugString() const {
   result << "\n" << worker_pool_.DebugString();
   result << "\n" << local_queues_.DebugString();
   result << "\n" << reconstruction_policy_.DebugString();
+  result << "\n" << local_object_spiller_.DebugString();
   result << "\n" << task_dependency_manager_.DebugString();
   result << "\n" << lineage_cache_.DebugString();
   {
@@ -3247,10 +3265,7 @@ void NodeManager::HandlePinObjectIDs(const rpc::PinObjectIDsRequest &request,
     }
 
     RAY_LOG(DEBUG) << "Pinning object " << object_id;
-    pinned_objects_.emplace(
-        object_id, std::unique_ptr<RayObject>(new RayObject(
-                       std::make_shared<PlasmaBuffer>(plasma_results[i].data),
-                       std::make_shared<PlasmaBuffer>(plasma_results[i].metadata), {})));
+    PinObject(object_id, plasma_results[i]);
     i++;
 
     // Send a long-running RPC request to the owner for each object. When we get a
@@ -3268,6 +3283,9 @@ void NodeManager::HandlePinObjectIDs(const rpc::PinObjectIDsRequest &request,
           }
           RAY_LOG(DEBUG) << "Unpinning object " << object_id;
           pinned_objects_.erase(object_id);
+          local_object_spiller_.ObjectUnpinned(object_id);
+          local_object_spiller_.DeleteSpilledObject(object_id);
+          object_manager_.SpilledObjectDeleted(object_id);
 
           // Try to evict all copies of the object from the cluster.
           objects_to_free_.push_back(object_id);
@@ -3283,9 +3301,109 @@ void NodeManager::HandlePinObjectIDs(const rpc::PinObjectIDsRequest &request,
           }
         }));
   }
+  SpillObjectsIfNeeded();
   send_reply_callback(Status::OK(), nullptr, nullptr);
 }
 
+void NodeManager::PinObject(const ObjectID &object_id,
+                            const plasma::ObjectBuffer &plasma_object) {
+  pinned_objects_.emplace(
+      object_id, std::unique_ptr<RayObject>(new RayObject(
+                     std::make_shared<PlasmaBuffer>(plasma_object.data),
+                     std::make_shared<PlasmaBuffer>(plasma_object.metadata), {})));
+  local_object_spiller_.ObjectPinned(
+      object_id, plasma_object.data->size() + plasma_object.metadata->size());
+}
+
+void NodeManager::SpillObjectsIfNeeded(
+    const absl::flat_hash_set<ObjectID> &excluded_object_ids) {
+  if (!local_object_spiller_.Enabled()) {
+    return;
+  }
+  std::vector<ObjectID> object_ids =
+      local_object_spiller_.GetObjectsToSpill(excluded_object_ids);
+  if (object_ids.empty()) {
+    return;
+  }
+  std::vector<const RayObject *> objects;
+  for (const auto &object_id : object_ids) {
+    auto it = pinned_objects_.find(object_id);
+    RAY_CHECK(it != pinned_objects_.end());
+    objects.push_back(it->second.get());
+  }
+  // The objects stay pinned until they are written to disk, so that they can
+  // still be read in the meantime.
+  local_object_spiller_.SpillObjects(
+      object_ids, objects, [this](const std::vector<ObjectID> &spilled_object_ids) {
+        if (spilled_object_ids.empty()) {
+          return;
+        }
+        // Unpin the objects and delete them from plasma to free up their memory.
+        // This node stays a location of the objects, and they are restored from
+        // disk the next time they are requested on this node or pulled by
+        // another one.
+        for (const auto &object_id : spilled_object_ids) {
+          pinned_objects_.erase(object_id);
+        }
+        RAY_LOG(DEBUG) << "Spilled " << spilled_object_ids.size() << " objects to disk";
+        object_manager_.ObjectsSpilled(spilled_object_ids);
+        object_manager_.FreeObjects(spilled_object_ids, /*local_only=*/true);
+      });
+}
+
+void NodeManager::RestoreSpilledObjects(const std::vector<ObjectID> &object_ids) {
+  if (!local_object_spiller_.Enabled()) {
+    return;
+  }
+  std::vector<ObjectID> spilled_object_ids;
+  for (const auto &object_id : object_ids) {
+    if (local_object_spiller_.IsSpilled(object_id)) {
+      spilled_object_ids.push_back(object_id);
+    } else {
+      local_object_spiller_.ObjectUsed(object_id);
+    }
+  }
+  if (spilled_object_ids.empty()) {
+    return;
+  }
+
+  // Once all of the objects are restored, spill others if needed. The objects
+  // of this request are excluded, since the requester hasn't read them yet.
+  auto num_restoring = std::make_shared<size_t>(spilled_object_ids.size());
+  auto requested_object_ids = std::make_shared<absl::flat_hash_set<ObjectID>>(
+      object_ids.begin(), object_ids.end());
+  for (const auto &object_id : spilled_object_ids) {
+    local_object_spiller_.RestoreObject(
+        object_id, store_client_,
+        [this, num_restoring, requested_object_ids](const ObjectID &object_id,
+                                                    const Status &status) {
+          if (!status.ok()) {
+            // The object stays spilled. The requester will retry the request.
+            RAY_LOG(WARNING) << "Failed to restore spilled object " << object_id << ": "
+                             << status.ToString();
+          } else {
+            object_manager_.SpilledObjectRestored(object_id);
+            if (pinned_objects_.count(object_id) == 0) {
+              // The owner still holds a reference to the object, so pin it again.
+              std::vector<plasma::ObjectBuffer> plasma_results;
+              if (!store_client_
+                       .Get({object_id.ToPlasmaId()}, /*timeout_ms=*/0, &plasma_results)
+                       .ok() ||
+                  plasma_results[0].data == nullptr) {
+                RAY_LOG(WARNING) << "Plasma object " << object_id
+                                 << " was evicted before the raylet could pin it.";
+              } else {
+                PinObject(object_id, plasma_results[0]);
+              }
+            }
+          }
+          if (--*num_restoring == 0) {
+            SpillObjectsIfNeeded(*requested_object_ids);
+          }
+        });
+  }
+}
+
 void NodeManager::FlushObjectsToFree() {
   if (free_objects_period_ < 0) {
     return;
@@ -3307,6 +3425,9 @@ void NodeManager::HandleGetNodeStats(const rpc::GetNodeStatsRequest &request,
     worker_stats->set_pid(driver->GetProcess().GetId());
     worker_stats->set_is_driver(true);
   }
+  reply->set_num_bytes_spilled(local_object_spiller_.NumBytesSpilled());
+  reply->set_num_bytes_restored(local_object_spiller_.NumBytesRestored());
+  reply->set_num_spilled_objects(local_object_spiller_.NumObjectsSpilled());
   // NOTE(sang): Currently reporting only infeasible/ready ActorCreationTask
   // because Ray dashboard only renders actorCreationTask as of Feb 3 2020.
   // TODO(sang): Support dashboard for non-ActorCreationTask.
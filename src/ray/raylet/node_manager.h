@@ -31,6 +31,7 @@
 #include "ray/object_manager/object_manager.h"
 #include "ray/raylet/actor_registration.h"
 #include "ray/raylet/lineage_cache.h"
+#include "ray/raylet/local_object_spiller.h"
 #include "ray/raylet/scheduling_policy.h"
 #include "ray/raylet/scheduling_queue.h"
 #include "ray/raylet/reconstruction_policy.h"
@@ -86,6 +87,10 @@ struct NodeManagerConfig {
   std::string session_dir;
   /// The raylet config list of this node.
   std::unordered_map<std::string, std::string> raylet_config;
+  /// The directories to spill objects to. If empty, spilling is disabled.
+  std::vector<std::string> object_spilling_directories;
+  /// The total size of pinned objects above which objects are spilled.
+  int64_t object_spilling_threshold_bytes;
 };
 
 class NodeManager : public rpc::NodeManagerServiceHandler {
@@ -738,6 +743,29 @@ class NodeManager : public rpc::NodeManagerServiceHandler {
 
   absl::flat_hash_map<ObjectID, std::unique_ptr<RayObject>> pinned_objects_;
 
+  /// Spills pinned objects to disk when they take up too much of the object store.
+  LocalObjectSpiller local_object_spiller_;
+
+  /// Pin an object in plasma until its owner notifies us that it can be unpinned.
+  ///
+  /// \param object_id The ID of the object.
+  /// \param plasma_object The object's buffers, returned by a plasma Get.
+  void PinObject(const ObjectID &object_id, const plasma::ObjectBuffer &plasma_object);
+
+  /// Spill the least recently used pinned objects to disk if they take up more
+  /// of the object store than the spilling threshold. The objects are unpinned
+  /// once they are written.
+  ///
+  /// \param excluded_object_ids Objects that must not be spilled.
+  void SpillObjectsIfNeeded(
+      const absl::flat_hash_set<ObjectID> &excluded_object_ids = {});
+
+  /// Asynchronously restore any of the given objects that were spilled to disk,
+  /// and mark the others as recently used. The restored objects are pinned again.
+  ///
+  /// \param object_ids The IDs of the objects that were requested.
+  void RestoreSpilledObjects(const std::vector<ObjectID> &object_ids);
+
   /// Wait for a task's arguments to become ready.
   void WaitForTaskArgsRequests(std::pair<ScheduleFn, Task> &work);
 
@@ -162,6 +162,20 @@ Status raylet::RayletConnection::AtomicRequestReply(
   return ReadMessage(reply_type, reply_message);
 }
 
+namespace {
+
+/// Get the pid to register with the raylet. Workers forked by the worker zygote
+/// use the pid of the launcher process that the raylet started for them.
+pid_t GetRegistrationPid(bool is_worker) {
+  const char *launcher_pid = std::getenv("RAY_WORKER_LAUNCHER_PID");
+  if (is_worker && launcher_pid != nullptr) {
+    return static_cast<pid_t>(std::strtol(launcher_pid, nullptr, 10));
+  }
+  return getpid();
+}
+
+}  // namespace
+
 raylet::RayletClient::RayletClient(
     std::shared_ptr<rpc::NodeManagerWorkerClient> grpc_client)
     : grpc_client_(std::move(grpc_client)) {}
@@ -178,8 +192,8 @@ raylet::RayletClient::RayletClient(
 
   flatbuffers::FlatBufferBuilder fbb;
   auto message = protocol::CreateRegisterClientRequest(
-      fbb, is_worker, to_flatbuf(fbb, worker_id), getpid(), to_flatbuf(fbb, job_id),
-      language, port);
+      fbb, is_worker, to_flatbuf(fbb, worker_id), GetRegistrationPid(is_worker),
+      to_flatbuf(fbb, job_id), language, port);
   fbb.Finish(message);
   // Register the process ID with the raylet.
   // NOTE(swang): If raylet exits and we are registered as a worker, we will get killed.
@@ -152,6 +152,32 @@ ResourceSet SchedulingQueue::GetResourceLoad() const {
   return load;
 }
 
+std::map<std::map<std::string, double>, uint64_t>
+SchedulingQueue::GetResourceLoadByShape() const {
+  std::map<std::map<std::string, double>, uint64_t> load_by_shape;
+  // All tasks of a scheduling class require the same resources.
+  for (const auto &entry : ready_queue_->GetTasksByClass()) {
+    if (entry.second.empty()) {
+      continue;
+    }
+    const auto &resources =
+        TaskSpecification::GetSchedulingClassDescriptor(entry.first).first;
+    const auto resource_map = resources.GetResourceMap();
+    load_by_shape[std::map<std::string, double>(resource_map.begin(),
+                                                resource_map.end())] +=
+        entry.second.size();
+  }
+  // Also take into account infeasible tasks so they show up for autoscaling.
+  for (const auto &task :
+       task_queues_[static_cast<int>(TaskState::INFEASIBLE)]->GetTasks()) {
+    const auto resource_map =
+        task.GetTaskSpecification().GetRequiredResources().GetResourceMap();
+    load_by_shape[std::map<std::string, double>(resource_map.begin(),
+                                                resource_map.end())] += 1;
+  }
+  return load_by_shape;
+}
+
 const std::unordered_set<TaskID> &SchedulingQueue::GetBlockedTaskIds() const {
   return blocked_task_ids_;
 }
@@ -17,6 +17,8 @@
 
 #include <array>
 #include <list>
+#include <map>
+#include <string>
 #include <unordered_map>
 #include <unordered_set>
 #include <vector>
@@ -213,6 +215,13 @@ class SchedulingQueue {
   /// this raylet.
   ResourceSet GetResourceLoad() const;
 
+  /// \brief Return the resource demands of all tasks exerting load on this raylet,
+  /// grouped by the resources that each task requires.
+  ///
+  /// \return A map from the resources that a task requires to the number of queued
+  /// tasks that require them.
+  std::map<std::map<std::string, double>, uint64_t> GetResourceLoadByShape() const;
+
   /// Get the tasks in the blocked state.
   ///
   /// \return A const reference to the tasks that are are blocked on a data